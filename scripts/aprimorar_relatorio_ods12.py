@@ -2,481 +2,14 @@
 # -*- coding: utf-8 -*-
 """
 Script para aprimorar o relatório técnico sobre o ODS 12 com dados adicionais.
-Este script complementa o relatório inicial, adicionando análises mais detalhadas
-sobre os indicadores de Consumo e Produção Responsáveis em Sergipe.
-"""
-
-import os
-import json
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from datetime import datetime
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak, ListFlowable, ListItem
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT, TA_CENTER
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics.charts.piecharts import Pie
-from reportlab.graphics.charts.linecharts import LineChart
-from reportlab.graphics.charts.legends import Legend
-
-# Configurar diretórios e caminhos
-BASE_DIR = '/workspaces/limfs'
-DATA_DIR = os.path.join(BASE_DIR, 'dados')
-OUTPUT_DIR = os.path.join(BASE_DIR, 'docs/relatorios')
-
-# Garantir que o diretório de saída existe
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# Função para carregar dados JSON
-def load_json_data(filename):
-    filepath = os.path.join(DATA_DIR, filename)
-    try:
-        with open(filepath, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        print(f"Arquivo não encontrado: {filepath}")
-        return {}
-    except json.JSONDecodeError:
-        print(f"Erro ao decodificar JSON do arquivo: {filepath}")
-        return {}
-
-# Carregamento de dados
-residuos_data = load_json_data('residuos_reciclados.json')
-
-# Simular dados históricos para análise (já que temos apenas um valor atual)
-def gerar_dados_historicos():
-    # Dados simulados para mostrar tendência de crescimento na reciclagem
-    anos = list(range(2018, 2025))
-    valores = [3.1, 3.6, 4.0, 4.5, 5.0, 5.5, 6.2]
-    
-    # Meta ODS para 2030
-    anos_projetados = list(range(2018, 2031))
-    valores_projetados = [3.1, 3.6, 4.0, 4.5, 5.0, 5.5, 6.2]
-    
-    # Projeção para atingir meta de 15% até 2030
-    for i in range(7, 13):
-        valores_projetados.append(6.2 + (15.0 - 6.2) * (i - 6) / (12 - 6))
-    
-    return {
-        'anos': anos,
-        'valores': valores,
-        'anos_projetados': anos_projetados,
-        'valores_projetados': valores_projetados
-    }
-
-# Gerar dados simulados para análise comparativa
-dados_historicos = gerar_dados_historicos()
-
-# Criar DataFrame com dados históricos
-df_residuos = pd.DataFrame({
-    'Ano': dados_historicos['anos'],
-    'Percentual_Reciclagem': dados_historicos['valores']
-})
 
-# Simular dados de distribuição dos tipos de resíduos reciclados
-tipos_residuos = ['Plástico', 'Papel/Papelão', 'Vidro', 'Metal', 'Orgânicos', 'Outros']
-percentuais_tipos = [30, 25, 15, 20, 5, 5]  # Porcentagem de cada tipo no total reciclado
-
-# Simular dados de iniciativas sustentáveis por município
-municipios = ['Aracaju', 'Nossa Senhora do Socorro', 'São Cristóvão', 'Lagarto', 'Itabaiana', 'Outros']
-iniciativas_por_municipio = [42, 18, 15, 12, 10, 38]
-
-# Função para criar gráfico de barras
-def criar_grafico_barras(titulo, dados_x, dados_y, nome_arquivo, legenda_x, legenda_y):
-    plt.figure(figsize=(10, 6))
-    plt.bar(dados_x, dados_y, color='#3FB049')  # cor verde do ODS 12
-    plt.title(titulo, fontsize=14, fontweight='bold')
-    plt.xlabel(legenda_x)
-    plt.ylabel(legenda_y)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    
-    # Salvar o gráfico
-    caminho_grafico = os.path.join(OUTPUT_DIR, nome_arquivo)
-    plt.savefig(caminho_grafico)
-    plt.close()
-    return caminho_grafico
-
-# Função para criar gráfico de pizza
-def criar_grafico_pizza(titulo, labels, valores, nome_arquivo):
-    plt.figure(figsize=(8, 8))
-    plt.pie(valores, labels=labels, autopct='%1.1f%%', startangle=90, 
-            colors=['#3FB049', '#56C456', '#76D275', '#98E097', '#B8EBB8', '#D8F5D8'])
-    plt.title(titulo, fontsize=14, fontweight='bold')
-    plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-    
-    # Salvar o gráfico
-    caminho_grafico = os.path.join(OUTPUT_DIR, nome_arquivo)
-    plt.savefig(caminho_grafico)
-    plt.close()
-    return caminho_grafico
-
-# Função para criar gráfico de linha com projeção
-def criar_grafico_linha_projetado(titulo, anos, valores, anos_projetados, valores_projetados, nome_arquivo):
-    plt.figure(figsize=(12, 6))
-    
-    # Dados históricos
-    plt.plot(anos, valores, 'o-', color='#3FB049', linewidth=2, label='Percentual reciclado')
-    
-    # Projeção
-    plt.plot(anos_projetados[len(anos):], valores_projetados[len(valores):], '--', color='#3FB049', linewidth=2, alpha=0.7, label='Projeção')
-    
-    # Linha meta
-    plt.axhline(y=15, color='r', linestyle='-', label='Meta ODS (15%)')
-    
-    plt.title(titulo, fontsize=14, fontweight='bold')
-    plt.xlabel('Ano')
-    plt.ylabel('Percentual (%)')
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.legend()
-    plt.tight_layout()
-    
-    # Salvar o gráfico
-    caminho_grafico = os.path.join(OUTPUT_DIR, nome_arquivo)
-    plt.savefig(caminho_grafico)
-    plt.close()
-    return caminho_grafico
-
-# Criar gráficos para o relatório
-grafico_historico = criar_grafico_barras(
-    'Evolução do Percentual de Resíduos Reciclados em Sergipe (2018-2024)',
-    df_residuos['Ano'],
-    df_residuos['Percentual_Reciclagem'],
-    'ods12_evolucao_reciclagem.png',
-    'Ano',
-    'Percentual de Resíduos Reciclados (%)'
-)
-
-grafico_pizza = criar_grafico_pizza(
-    'Distribuição dos Tipos de Resíduos Reciclados em Sergipe (2024)',
-    tipos_residuos,
-    percentuais_tipos,
-    'ods12_tipos_residuos.png'
-)
-
-grafico_municipios = criar_grafico_barras(
-    'Iniciativas de Consumo e Produção Sustentável por Município (2024)',
-    municipios,
-    iniciativas_por_municipio,
-    'ods12_iniciativas_municipios.png',
-    'Município',
-    'Número de Iniciativas'
-)
+Mantido por compatibilidade: equivale a `limfs-relatorios aprimorar`.
+O relatório fica em relatorios/ods12_aprimorado.py.
+"""
 
-grafico_projecao = criar_grafico_linha_projetado(
-    'Projeção do Percentual de Resíduos Reciclados até 2030',
-    dados_historicos['anos'],
-    dados_historicos['valores'],
-    dados_historicos['anos_projetados'],
-    dados_historicos['valores_projetados'],
-    'ods12_projecao_2030.png'
-)
+import sys
 
-# Função para adicionar conteúdo ao relatório existente
-def aprimorar_relatorio():
-    # Caminho do relatório existente
-    relatorio_existente = os.path.join(OUTPUT_DIR, 'relatorio_tecnico_ods12.pdf')
-    
-    # Verificar se o relatório existe
-    if not os.path.exists(relatorio_existente):
-        print("Relatório original não encontrado. Criando um novo relatório.")
-    
-    # Caminho para o novo relatório aprimorado
-    relatorio_aprimorado = os.path.join(OUTPUT_DIR, 'relatorio_tecnico_aprimorado_ods12.pdf')
-    
-    # Configurar documento
-    doc = SimpleDocTemplate(
-        relatorio_aprimorado,
-        pagesize=A4,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=72
-    )
-    
-    # Criar estilos
-    styles = getSampleStyleSheet()
-    
-    # Estilos personalizados
-    titulo_estilo = ParagraphStyle(
-        'TituloEstilo',
-        parent=styles['Heading1'],
-        fontName='Helvetica-Bold',
-        fontSize=18,
-        textColor=colors.darkgreen,
-        spaceAfter=16,
-        alignment=TA_CENTER
-    )
-    
-    subtitulo_estilo = ParagraphStyle(
-        'SubtituloEstilo',
-        parent=styles['Heading2'],
-        fontName='Helvetica-Bold',
-        fontSize=14,
-        textColor=colors.darkgreen,
-        spaceAfter=10
-    )
-    
-    paragrafo_estilo = ParagraphStyle(
-        'ParagrafoEstilo',
-        parent=styles['Normal'],
-        fontName='Helvetica',
-        fontSize=11,
-        leading=14,
-        alignment=TA_JUSTIFY,
-        spaceAfter=8
-    )
-    
-    lista_estilo = ParagraphStyle(
-        'ListaEstilo',
-        parent=styles['Normal'],
-        fontName='Helvetica',
-        fontSize=11,
-        leading=14,
-        leftIndent=20
-    )
-    
-    # Lista de elementos para o documento
-    elementos = []
-    
-    # Título
-    elementos.append(Paragraph(
-        "RELATÓRIO TÉCNICO APRIMORADO: ODS 12 - CONSUMO E PRODUÇÃO RESPONSÁVEIS",
-        titulo_estilo
-    ))
-    elementos.append(Spacer(1, 20))
-    
-    # Introdução
-    elementos.append(Paragraph("1. INTRODUÇÃO", subtitulo_estilo))
-    elementos.append(Paragraph(
-        "Este relatório apresenta uma análise técnica aprofundada sobre o ODS 12 - Consumo e Produção Responsáveis, "
-        "com foco na situação atual em Sergipe. O documento foi elaborado pelo Laboratório de Indicadores para "
-        "Monitoramento das Famílias Sergipanas (LIMFS) e tem como objetivo fornecer dados atualizados e recomendações "
-        "para orientar políticas públicas e iniciativas relacionadas à sustentabilidade no consumo e na produção.",
-        paragrafo_estilo
-    ))
-    elementos.append(Spacer(1, 10))
-    
-    # Dados atuais
-    elementos.append(Paragraph("2. SITUAÇÃO ATUAL", subtitulo_estilo))
-    elementos.append(Paragraph(
-        f"Atualmente, o percentual de resíduos sólidos urbanos reciclados em Sergipe é de "
-        f"{residuos_data.get('dados', {}).get('valor', 'N/A')}%, conforme dados atualizados em "
-        f"{residuos_data.get('ultimaAtualizacao', 'data não disponível')}. Este indicador é considerado "
-        f"central para o monitoramento do progresso do ODS 12 no estado.",
-        paragrafo_estilo
-    ))
-    elementos.append(Spacer(1, 10))
-    elementos.append(Paragraph(
-        "Os dados disponíveis mostram uma tendência de crescimento gradual nos últimos anos, mas ainda "
-        "distante da meta estipulada de 15% até 2030, conforme alinhamento com os objetivos nacionais para o ODS 12.",
-        paragrafo_estilo
-    ))
-    
-    # Adicionar gráfico histórico
-    elementos.append(Spacer(1, 10))
-    img_historico = Image(grafico_historico)
-    img_historico.drawHeight = 4 * inch
-    img_historico.drawWidth = 6 * inch
-    elementos.append(img_historico)
-    elementos.append(Spacer(1, 10))
-    elementos.append(Paragraph(
-        "Figura 1: Evolução histórica do percentual de resíduos reciclados em Sergipe.",
-        styles['Caption']
-    ))
-    elementos.append(Spacer(1, 15))
-    
-    # Análise de distribuição dos resíduos
-    elementos.append(Paragraph("3. DISTRIBUIÇÃO DOS RESÍDUOS RECICLADOS", subtitulo_estilo))
-    elementos.append(Paragraph(
-        "A análise da composição dos resíduos reciclados revela que os materiais plásticos e papel/papelão "
-        "constituem a maior parte do volume processado. Contudo, observa-se uma baixa taxa de reciclagem de "
-        "resíduos orgânicos, que representam cerca de 50% do total de resíduos gerados no estado.",
-        paragrafo_estilo
-    ))
-    
-    # Adicionar gráfico de pizza
-    elementos.append(Spacer(1, 10))
-    img_pizza = Image(grafico_pizza)
-    img_pizza.drawHeight = 4 * inch
-    img_pizza.drawWidth = 4 * inch
-    elementos.append(img_pizza)
-    elementos.append(Spacer(1, 10))
-    elementos.append(Paragraph(
-        "Figura 2: Distribuição dos tipos de resíduos reciclados em Sergipe.",
-        styles['Caption']
-    ))
-    elementos.append(Spacer(1, 15))
-    
-    # Análise de iniciativas por município
-    elementos.append(Paragraph("4. INICIATIVAS SUSTENTÁVEIS POR MUNICÍPIO", subtitulo_estilo))
-    elementos.append(Paragraph(
-        "O mapeamento das iniciativas de consumo e produção sustentável em Sergipe revela uma "
-        "concentração significativa em Aracaju, seguida por outros centros urbanos. É necessário "
-        "ampliar estas iniciativas para municípios de menor porte para garantir um desenvolvimento "
-        "mais equilibrado em todo o estado.",
-        paragrafo_estilo
-    ))
-    
-    # Adicionar gráfico de iniciativas por município
-    elementos.append(Spacer(1, 10))
-    img_municipios = Image(grafico_municipios)
-    img_municipios.drawHeight = 4 * inch
-    img_municipios.drawWidth = 6 * inch
-    elementos.append(img_municipios)
-    elementos.append(Spacer(1, 10))
-    elementos.append(Paragraph(
-        "Figura 3: Iniciativas de consumo e produção sustentável por município em Sergipe.",
-        styles['Caption']
-    ))
-    elementos.append(Spacer(1, 15))
-    
-    # Projeção e metas
-    elementos.append(Paragraph("5. PROJEÇÃO E METAS", subtitulo_estilo))
-    elementos.append(Paragraph(
-        "Com base na tendência atual, foi realizada uma projeção para avaliar a possibilidade de atingir a meta "
-        "de 15% de resíduos reciclados até 2030. A análise indica que, mantendo o ritmo atual de crescimento, "
-        "Sergipe ficará aquém da meta estabelecida, atingindo aproximadamente 11% até 2030.",
-        paragrafo_estilo
-    ))
-    
-    # Adicionar gráfico de projeção
-    elementos.append(Spacer(1, 10))
-    img_projecao = Image(grafico_projecao)
-    img_projecao.drawHeight = 4 * inch
-    img_projecao.drawWidth = 6 * inch
-    elementos.append(img_projecao)
-    elementos.append(Spacer(1, 10))
-    elementos.append(Paragraph(
-        "Figura 4: Projeção do percentual de resíduos reciclados até 2030.",
-        styles['Caption']
-    ))
-    elementos.append(Spacer(1, 15))
-    
-    # Quebra de página
-    elementos.append(PageBreak())
-    
-    # Recomendações de políticas
-    elementos.append(Paragraph("6. RECOMENDAÇÕES DE POLÍTICAS PÚBLICAS", subtitulo_estilo))
-    elementos.append(Paragraph(
-        "Com base na análise técnica realizada e nas boas práticas identificadas, apresentamos as seguintes "
-        "recomendações para acelerar o progresso em direção às metas do ODS 12 em Sergipe:",
-        paragrafo_estilo
-    ))
-    
-    # Lista de recomendações
-    recomendacoes = [
-        Paragraph("Desenvolver uma política estadual de economia circular, com incentivos fiscais para empresas "
-                 "que adotem modelos de negócios circulares, investindo em design de produtos para durabilidade, "
-                 "reparabilidade e reciclabilidade.", lista_estilo),
-        Paragraph("Criar um programa de apoio técnico e financeiro para cooperativas de catadores, visando aumentar "
-                 "a capacidade de processamento e agregação de valor aos materiais reciclados.", lista_estilo),
-        Paragraph("Implementar um sistema de logística reversa efetivo para embalagens, eletrônicos, medicamentos e "
-                 "outros produtos prioritários, envolvendo produtores, distribuidores, comerciantes e consumidores.", lista_estilo),
-        Paragraph("Fortalecer programas educacionais sobre consumo consciente e sustentável nas escolas, universidades "
-                 "e comunidades, promovendo mudanças de comportamento.", lista_estilo),
-        Paragraph("Implementar políticas para reduzir o desperdício de alimentos em toda a cadeia produtiva, "
-                 "desde a produção agrícola até o consumo final.", lista_estilo),
-        Paragraph("Criar um fundo estadual para financiar projetos de inovação em consumo e produção sustentáveis, "
-                 "priorizando tecnologias de baixo carbono e resíduo zero.", lista_estilo),
-        Paragraph("Estabelecer critérios de sustentabilidade para compras públicas, incentivando a demanda por produtos "
-                 "e serviços ambientalmente responsáveis.", lista_estilo)
-    ]
-    
-    elementos.append(ListFlowable(
-        recomendacoes,
-        bulletType='bullet',
-        start=0
-    ))
-    elementos.append(Spacer(1, 15))
-    
-    # Ações prioritárias
-    elementos.append(Paragraph("7. AÇÕES PRIORITÁRIAS", subtitulo_estilo))
-    elementos.append(Paragraph(
-        "Para acelerar o progresso do ODS 12 em Sergipe, destacamos as seguintes ações prioritárias para "
-        "implementação imediata:",
-        paragrafo_estilo
-    ))
-    
-    # Tabela de ações prioritárias
-    dados_tabela = [
-        ['Ação', 'Horizonte', 'Impacto Esperado'],
-        ['Ampliar coleta seletiva para todos os municípios', 'Curto prazo (1-2 anos)', 'Alto'],
-        ['Programa de compostagem de resíduos orgânicos', 'Médio prazo (2-3 anos)', 'Alto'],
-        ['Criar centros de reparo e reutilização', 'Médio prazo (2-3 anos)', 'Médio'],
-        ['Implementar logística reversa abrangente', 'Longo prazo (3-5 anos)', 'Alto'],
-        ['Campanha educativa sobre desperdício alimentar', 'Curto prazo (1 ano)', 'Médio']
-    ]
-    
-    # Criar tabela
-    tabela = Table(dados_tabela, colWidths=[doc.width * 0.4, doc.width * 0.3, doc.width * 0.2])
-    tabela.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.green),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    
-    elementos.append(tabela)
-    elementos.append(Spacer(1, 15))
-    
-    # Conclusão
-    elementos.append(Paragraph("8. CONCLUSÃO", subtitulo_estilo))
-    elementos.append(Paragraph(
-        "A análise técnica do ODS 12 em Sergipe revela avanços significativos na implementação de práticas "
-        "de consumo e produção sustentáveis, mas também mostra desafios importantes a serem superados. O ritmo "
-        "atual de progresso é insuficiente para alcançar as metas estabelecidas até 2030, o que demanda uma "
-        "intensificação dos esforços e a adoção de políticas mais ambiciosas.",
-        paragrafo_estilo
-    ))
-    elementos.append(Spacer(1, 10))
-    elementos.append(Paragraph(
-        "Com a implementação das recomendações e ações prioritárias propostas neste relatório, estima-se que "
-        "Sergipe possa aumentar seu percentual de reciclagem para próximo de 15% até 2030, além de promover "
-        "avanços significativos em outras dimensões do consumo e produção responsáveis.",
-        paragrafo_estilo
-    ))
-    elementos.append(Spacer(1, 10))
-    elementos.append(Paragraph(
-        "É fundamental o engajamento de todos os setores da sociedade – governo, empresas, instituições de "
-        "ensino e pesquisa, organizações da sociedade civil e cidadãos – para que as transformações necessárias "
-        "ganhem escala e se tornem permanentes, contribuindo para um futuro mais sustentável para toda a população "
-        "sergipana.",
-        paragrafo_estilo
-    ))
-    
-    # Referências
-    elementos.append(PageBreak())
-    elementos.append(Paragraph("9. REFERÊNCIAS", subtitulo_estilo))
-    referencias = [
-        Paragraph("Organização das Nações Unidas (ONU). Objetivos de Desenvolvimento Sustentável - ODS 12. Disponível em: https://brasil.un.org/pt-br/sdgs/12", lista_estilo),
-        Paragraph("ABRELPE. Panorama dos Resíduos Sólidos no Brasil 2024.", lista_estilo),
-        Paragraph("SEMARH/SE. Plano Estadual de Resíduos Sólidos de Sergipe, 2023.", lista_estilo),
-        Paragraph("IBGE. Pesquisa Nacional de Saneamento Básico, 2023.", lista_estilo),
-        Paragraph("Laboratório de Indicadores para Monitoramento das Famílias Sergipanas (LIMFS). Painel ODS 12 - Consumo e Produção Responsáveis, 2025.", lista_estilo)
-    ]
-    
-    elementos.append(ListFlowable(
-        referencias,
-        bulletType='bullet',
-        start=0
-    ))
-    
-    # Construir documento
-    doc.build(elementos)
-    
-    print(f"Relatório aprimorado gerado com sucesso em: {relatorio_aprimorado}")
-    return relatorio_aprimorado
+from relatorios.cli import main
 
-# Executar função para criar relatório aprimorado
-relatorio_final = aprimorar_relatorio()
-print(f"Processo concluído! O relatório técnico aprimorado foi salvo em: {relatorio_final}")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main(['aprimorar', *sys.argv[1:]]))
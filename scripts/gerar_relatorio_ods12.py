@@ -5,572 +5,13 @@
 Gerador de Relatório Técnico do ODS 12 - Consumo e Produção Responsáveis
 Laboratório de Indicadores para Monitoramento das Famílias Sergipanas (LIMFS)
 
-Este script importa dados relacionados ao ODS 12 dos arquivos JSON do projeto,
-realiza análises técnicas e gera um relatório detalhado em formato PDF.
-
-Data: 14/04/2025
+Mantido por compatibilidade: equivale a `limfs-relatorios gerar --ods12`.
+O gerador fica em relatorios/ods12.py.
 """
 
-import os
 import sys
-import json
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch, cm
-from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER, TA_LEFT
-
-# Configurando o estilo do matplotlib
-plt.style.use('seaborn-v0_8-whitegrid')
-mpl.rcParams['font.family'] = 'sans-serif'
-mpl.rcParams['font.sans-serif'] = ['Arial', 'Liberation Sans']
-mpl.rcParams['axes.labelsize'] = 12
-mpl.rcParams['axes.titlesize'] = 14
-mpl.rcParams['xtick.labelsize'] = 10
-mpl.rcParams['ytick.labelsize'] = 10
-
-# Definição das cores ODS 12
-ODS12_COLOR = "#BF8B2E"
-ODS12_COLOR_LIGHT = "rgba(191, 139, 46, 0.2)"
-
-# Caminhos dos arquivos
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DADOS_DIR = os.path.join(BASE_DIR, 'dados')
-REPORT_DIR = os.path.join(BASE_DIR, 'docs', 'relatorios')
-OUTPUT_FILE = os.path.join(REPORT_DIR, 'relatorio_tecnico_ods12.pdf')
-DATA_FILES = {
-    'residuos': os.path.join(DADOS_DIR, 'residuos_reciclados.json'),
-    'dados_historicos': os.path.join(DADOS_DIR, 'indicadores.json')
-}
-
-# Garantir que os diretórios existam
-os.makedirs(REPORT_DIR, exist_ok=True)
-
-class ODS12ReportGenerator:
-    """Classe para geração de relatório técnico do ODS 12"""
-    
-    def __init__(self):
-        self.dados = {}
-        self.historico = []
-        self.ultima_atualizacao = None
-        self.dados_complementares = {}
-        
-    def carregar_dados(self):
-        """Importa os dados dos arquivos JSON"""
-        print("Importando dados do ODS 12...")
-        
-        # Carregar dados de resíduos reciclados
-        try:
-            with open(DATA_FILES['residuos'], 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                self.dados['residuos'] = data.get('dados', {})
-                self.ultima_atualizacao = data.get('ultimaAtualizacao')
-                print(f"Dados de resíduos carregados: {self.ultima_atualizacao}")
-        except Exception as e:
-            print(f"ERRO ao importar dados de resíduos: {e}")
-            sys.exit(1)
-                
-        # Carregar dados históricos dos serviços
-        try:
-            # Simulando a extração dos dados históricos do arquivo JS
-            # Em um ambiente de produção, estes dados poderiam vir de uma API ou banco de dados
-            dados_historicos = [
-                {'ano': 2017, 'valor': 2.1},
-                {'ano': 2018, 'valor': 2.5},
-                {'ano': 2019, 'valor': 3.2},
-                {'ano': 2020, 'valor': 3.8},
-                {'ano': 2021, 'valor': 4.3},
-                {'ano': 2022, 'valor': 5.0},
-                {'ano': 2023, 'valor': 5.7},
-                {'ano': 2024, 'valor': 6.2}
-            ]
-            
-            self.historico = dados_historicos
-            print(f"Dados históricos carregados: {len(dados_historicos)} registros")
-        except Exception as e:
-            print(f"ERRO ao importar dados históricos: {e}")
-            
-        # Carregar dados complementares para o relatório
-        self.dados_complementares = {
-            'meta_nacional': 15.0,  # Meta nacional para reciclagem em 2030
-            'media_brasil': 4.0,    # Média nacional atual
-            'melhor_estado': 12.5,  # Estado com melhor desempenho
-            'programas': [
-                {'nome': 'Coleta Seletiva Municipal', 'municipios': 15, 'percentual': 20.0},
-                {'nome': 'Cooperativas de Reciclagem', 'municipios': 8, 'percentual': 10.7},
-                {'nome': 'Ecopontos de Coleta', 'municipios': 12, 'percentual': 16.0},
-                {'nome': 'Compostagem', 'municipios': 5, 'percentual': 6.7}
-            ]
-        }
-        
-        return True
-        
-    def analisar_dados(self):
-        """Realiza análise dos dados importados"""
-        print("Analisando dados do ODS 12...")
-        
-        # Converter para DataFrame para facilitar a análise
-        df = pd.DataFrame(self.historico)
-        
-        # Calcular as principais métricas
-        self.analise = {
-            'valor_atual': df.iloc[-1]['valor'],
-            'valor_inicial': df.iloc[0]['valor'],
-            'variacao_percentual': ((df.iloc[-1]['valor'] - df.iloc[0]['valor']) / df.iloc[0]['valor']) * 100,
-            'taxa_crescimento_anual': ((df.iloc[-1]['valor'] / df.iloc[0]['valor']) ** (1/(len(df)-1)) - 1) * 100,
-            'tendencia': 'crescente' if df['valor'].is_monotonic_increasing else 'variável',
-            'gap_meta': self.dados_complementares['meta_nacional'] - df.iloc[-1]['valor'],
-            'anos_restantes': 2030 - 2024,
-            'taxa_necessaria': (self.dados_complementares['meta_nacional'] - df.iloc[-1]['valor']) / (2030 - 2024)
-        }
-        
-        # Calcular projeção para atingir a meta
-        anos_projecao = list(range(2024, 2031))
-        valores_projecao = [df.iloc[-1]['valor']]
-        
-        for i in range(1, len(anos_projecao)):
-            valor = valores_projecao[0] + (self.analise['taxa_necessaria'] * i)
-            valores_projecao.append(round(valor, 2))
-            
-        self.analise['projecao'] = list(zip(anos_projecao, valores_projecao))
-        
-        print("Análise concluída com sucesso")
-        return True
-        
-    def gerar_graficos(self):
-        """Gera os gráficos para o relatório"""
-        print("Gerando gráficos para o relatório...")
-        
-        # Diretório para salvar os gráficos
-        charts_dir = os.path.join(REPORT_DIR, 'charts')
-        os.makedirs(charts_dir, exist_ok=True)
-        
-        # Gráfico 1: Evolução histórica
-        plt.figure(figsize=(10, 6))
-        df = pd.DataFrame(self.historico)
-        plt.plot(df['ano'], df['valor'], marker='o', linewidth=2, color=ODS12_COLOR)
-        plt.title('Evolução da Taxa de Reciclagem de Resíduos Sólidos Urbanos em Sergipe (2017-2024)')
-        plt.xlabel('Ano')
-        plt.ylabel('Percentual (%)')
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.tight_layout()
-        grafico1_path = os.path.join(charts_dir, 'evolucao_reciclagem.png')
-        plt.savefig(grafico1_path, dpi=300, bbox_inches='tight')
-        self.grafico1_path = grafico1_path
-        
-        # Gráfico 2: Comparação com meta e média nacional
-        plt.figure(figsize=(10, 6))
-        categorias = ['Sergipe (2024)', 'Média Brasil', 'Melhor Estado', 'Meta 2030']
-        valores = [
-            self.analise['valor_atual'],
-            self.dados_complementares['media_brasil'],
-            self.dados_complementares['melhor_estado'],
-            self.dados_complementares['meta_nacional']
-        ]
-        plt.bar(categorias, valores, color=[ODS12_COLOR, '#3F7E44', '#56C02B', '#DDA63A'])
-        plt.title('Comparação da Taxa de Reciclagem: Situação Atual vs. Meta')
-        plt.ylabel('Percentual (%)')
-        plt.grid(True, axis='y', linestyle='--', alpha=0.7)
-        
-        # Adicionar os valores nas barras
-        for i, v in enumerate(valores):
-            plt.text(i, v + 0.5, f'{v}%', ha='center', fontweight='bold')
-            
-        plt.tight_layout()
-        grafico2_path = os.path.join(charts_dir, 'comparativo_reciclagem.png')
-        plt.savefig(grafico2_path, dpi=300, bbox_inches='tight')
-        self.grafico2_path = grafico2_path
-        
-        # Gráfico 3: Projeção até 2030
-        plt.figure(figsize=(10, 6))
-        
-        # Dados históricos
-        anos = df['ano'].tolist()
-        valores = df['valor'].tolist()
-        
-        # Dados projetados
-        anos_proj = [p[0] for p in self.analise['projecao']]
-        valores_proj = [p[1] for p in self.analise['projecao']]
-        
-        plt.plot(anos, valores, marker='o', linewidth=2, color=ODS12_COLOR, label='Dados históricos')
-        plt.plot(anos_proj, valores_proj, marker='s', linestyle='--', linewidth=2, 
-                 color='#56C02B', label='Projeção necessária')
-        
-        # Linha da meta
-        plt.axhline(y=self.dados_complementares['meta_nacional'], color='#DDA63A', 
-                   linestyle='-.', label=f"Meta 2030: {self.dados_complementares['meta_nacional']}%")
-        
-        plt.title('Projeção da Taxa de Reciclagem até 2030 para Atingir a Meta')
-        plt.xlabel('Ano')
-        plt.ylabel('Percentual (%)')
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.legend()
-        plt.tight_layout()
-        grafico3_path = os.path.join(charts_dir, 'projecao_reciclagem.png')
-        plt.savefig(grafico3_path, dpi=300, bbox_inches='tight')
-        self.grafico3_path = grafico3_path
-        
-        # Gráfico 4: Iniciativas por município
-        plt.figure(figsize=(10, 6))
-        programas = [p['nome'] for p in self.dados_complementares['programas']]
-        percentuais = [p['percentual'] for p in self.dados_complementares['programas']]
-        
-        plt.bar(programas, percentuais, color=['#BF8B2E', '#3F7E44', '#56C02B', '#DDA63A'])
-        plt.title('Iniciativas de Gestão de Resíduos por Município em Sergipe')
-        plt.ylabel('Percentual de Municípios (%)')
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(True, axis='y', linestyle='--', alpha=0.7)
-        
-        # Adicionar os valores nas barras
-        for i, v in enumerate(percentuais):
-            plt.text(i, v + 0.5, f'{v}%', ha='center')
-            
-        plt.tight_layout()
-        grafico4_path = os.path.join(charts_dir, 'iniciativas_reciclagem.png')
-        plt.savefig(grafico4_path, dpi=300, bbox_inches='tight')
-        self.grafico4_path = grafico4_path
-        
-        print("Gráficos gerados com sucesso")
-        return True
-    
-    def gerar_relatorio(self):
-        """Gera o relatório técnico em PDF"""
-        print(f"Gerando relatório técnico em PDF: {OUTPUT_FILE}")
-        
-        # Configuração do documento
-        doc = SimpleDocTemplate(
-            OUTPUT_FILE,
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
-        )
-        
-        # Estilos
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(
-            name='Justify',
-            alignment=TA_JUSTIFY,
-            fontName='Helvetica',
-            fontSize=12,
-            leading=14
-        ))
-        
-        styles.add(ParagraphStyle(
-            name='Center',
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            fontSize=14,
-            leading=16
-        ))
-        
-        styles.add(ParagraphStyle(
-            name='Section',
-            alignment=TA_LEFT,
-            fontName='Helvetica-Bold',
-            fontSize=16,
-            leading=18,
-            spaceAfter=6
-        ))
-        
-        styles.add(ParagraphStyle(
-            name='Subsection',
-            alignment=TA_LEFT,
-            fontName='Helvetica-Bold',
-            fontSize=14,
-            leading=16,
-            spaceAfter=6
-        ))
-        
-        # Elementos do relatório
-        elements = []
-        
-        # Título e data
-        elements.append(Paragraph("<font size='18' color='#BF8B2E'>RELATÓRIO TÉCNICO: ODS 12</font>", styles['Center']))
-        elements.append(Paragraph("<font size='16'>Consumo e Produção Responsáveis em Sergipe</font>", styles['Center']))
-        elements.append(Spacer(1, 20))
-        elements.append(Paragraph(f"<font size='12'>Data: {datetime.now().strftime('%d/%m/%Y')}</font>", styles['Center']))
-        elements.append(Paragraph(f"<font size='12'>Dados atualizados em: {self.ultima_atualizacao}</font>", styles['Center']))
-        elements.append(Spacer(1, 30))
-        
-        # 1. Introdução
-        elements.append(Paragraph("1. INTRODUÇÃO", styles['Section']))
-        elements.append(Paragraph(
-            "O Objetivo de Desenvolvimento Sustentável 12 (ODS 12) tem como foco assegurar padrões de produção e "
-            "consumo sustentáveis. Este relatório técnico apresenta um diagnóstico da situação atual do estado de "
-            "Sergipe em relação a um dos principais indicadores do ODS 12: a taxa de reciclagem de resíduos "
-            "sólidos urbanos.", styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph(
-            "A gestão adequada de resíduos sólidos é um componente essencial para o desenvolvimento sustentável, "
-            "com impactos diretos na qualidade de vida das populações urbanas, na preservação ambiental e na "
-            "eficiência no uso de recursos naturais. Através da análise deste indicador, é possível avaliar o "
-            "progresso do estado em direção a padrões mais sustentáveis de produção e consumo.",
-            styles['Justify']))
-        elements.append(Spacer(1, 20))
-        
-        # 2. Metodologia
-        elements.append(Paragraph("2. METODOLOGIA", styles['Section']))
-        elements.append(Paragraph(
-            "Este relatório foi elaborado a partir da análise de dados históricos da taxa de reciclagem de resíduos "
-            "sólidos urbanos em Sergipe entre 2017 e 2024. Os dados foram obtidos através de arquivos JSON estruturados "
-            "que integram o Sistema de Indicadores do Laboratório de Indicadores para Monitoramento das Famílias "
-            "Sergipanas (LIMFS).", styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph("2.1 Fonte dos Dados", styles['Subsection']))
-        elements.append(Paragraph(
-            "Os dados primários são originários do Sistema Nacional de Informações sobre Saneamento (SNIS) e de "
-            "pesquisas do IBGE, compilados e validados pela equipe técnica do LIMFS. A taxa de reciclagem é calculada "
-            "como a proporção entre o volume de resíduos reciclados ou coletados seletivamente e o total de resíduos "
-            "sólidos urbanos gerados no estado, expressa em percentual.",
-            styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph("2.2 Processamento e Análise", styles['Subsection']))
-        elements.append(Paragraph(
-            "Para a análise dos dados, utilizamos técnicas estatísticas para identificar tendências, calcular taxas "
-            "de crescimento anual, e projetar cenários futuros. Também realizamos análises comparativas entre a "
-            "situação atual de Sergipe, a média nacional, o estado com melhor desempenho e a meta estabelecida para "
-            "2030 em alinhamento com os compromissos nacionais para os ODS.",
-            styles['Justify']))
-        elements.append(Spacer(1, 20))
-        
-        # 3. Resultados
-        elements.append(Paragraph("3. RESULTADOS", styles['Section']))
-        
-        # 3.1 Evolução Histórica
-        elements.append(Paragraph("3.1 Evolução Histórica da Taxa de Reciclagem", styles['Subsection']))
-        elements.append(Paragraph(
-            f"A taxa de reciclagem de resíduos sólidos urbanos em Sergipe apresentou crescimento constante ao longo "
-            f"dos últimos 8 anos, saindo de {self.analise['valor_inicial']}% em 2017 para {self.analise['valor_atual']}% "
-            f"em 2024, o que representa um aumento de {self.analise['variacao_percentual']:.1f}% no período.",
-            styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        # Inserir gráfico de evolução
-        img = Image(self.grafico1_path)
-        img.drawHeight = 4*inch
-        img.drawWidth = 6*inch
-        elements.append(img)
-        elements.append(Paragraph("Figura 1: Evolução da Taxa de Reciclagem de Resíduos Sólidos em Sergipe (2017-2024)", styles['Center']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph(
-            f"A taxa de crescimento anual composta (CAGR) foi de {self.analise['taxa_crescimento_anual']:.1f}%, "
-            f"indicando um progresso gradual, porém consistente na implementação de políticas e práticas de coleta "
-            f"seletiva e reciclagem no estado.",
-            styles['Justify']))
-        elements.append(Spacer(1, 20))
-        
-        # 3.2 Análise Comparativa
-        elements.append(Paragraph("3.2 Análise Comparativa", styles['Subsection']))
-        elements.append(Paragraph(
-            f"Quando comparamos o desempenho atual de Sergipe ({self.analise['valor_atual']}%) com a média nacional "
-            f"({self.dados_complementares['media_brasil']}%), observamos que o estado apresenta um desempenho acima "
-            f"da média do país, demonstrando avanços importantes na implementação de políticas de gestão de resíduos.",
-            styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        # Inserir gráfico comparativo
-        img = Image(self.grafico2_path)
-        img.drawHeight = 4*inch
-        img.drawWidth = 6*inch
-        elements.append(img)
-        elements.append(Paragraph("Figura 2: Comparação da Taxa de Reciclagem: Situação Atual vs. Meta", styles['Center']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph(
-            f"No entanto, existe ainda uma lacuna significativa de {self.analise['gap_meta']:.1f} pontos percentuais "
-            f"em relação à meta nacional de {self.dados_complementares['meta_nacional']}% para 2030, estabelecida "
-            f"em alinhamento com os compromissos do Brasil para os ODS.",
-            styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph(
-            f"O estado com melhor desempenho no país atualmente registra taxa de {self.dados_complementares['melhor_estado']}%, "
-            f"demonstrando que é possível alcançar índices mais elevados de reciclagem com políticas públicas "
-            f"eficientes e participação ativa da sociedade.",
-            styles['Justify']))
-        elements.append(Spacer(1, 20))
-        
-        # 3.3 Projeções e Metas
-        elements.append(Paragraph("3.3 Projeções e Metas", styles['Subsection']))
-        elements.append(Paragraph(
-            f"Para atingir a meta de {self.dados_complementares['meta_nacional']}% de reciclagem até 2030, Sergipe precisará "
-            f"aumentar sua taxa de reciclagem em {self.analise['gap_meta']:.1f} pontos percentuais nos próximos "
-            f"{self.analise['anos_restantes']} anos, o que equivale a um aumento anual médio de "
-            f"{self.analise['taxa_necessaria']:.2f} pontos percentuais.",
-            styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        # Inserir gráfico de projeção
-        img = Image(self.grafico3_path)
-        img.drawHeight = 4*inch
-        img.drawWidth = 6*inch
-        elements.append(img)
-        elements.append(Paragraph("Figura 3: Projeção da Taxa de Reciclagem até 2030 para Atingir a Meta", styles['Center']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph(
-            f"Esta taxa de crescimento necessária ({self.analise['taxa_necessaria']:.2f} pontos percentuais por ano) "
-            f"é significativamente superior à taxa de crescimento histórica ({(self.historico[-1]['valor'] - self.historico[-2]['valor']):.1f} "
-            f"pontos percentuais entre 2023 e 2024), indicando que esforços adicionais e estratégias mais assertivas "
-            f"serão necessários para alcançar a meta estabelecida.",
-            styles['Justify']))
-        elements.append(Spacer(1, 20))
-        
-        # 3.4 Iniciativas e Infraestrutura
-        elements.append(Paragraph("3.4 Iniciativas e Infraestrutura", styles['Subsection']))
-        elements.append(Paragraph(
-            "A análise da infraestrutura atual de gestão de resíduos em Sergipe mostra que há uma distribuição desigual "
-            "de iniciativas entre os 75 municípios do estado:",
-            styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        # Inserir gráfico de iniciativas
-        img = Image(self.grafico4_path)
-        img.drawHeight = 4*inch
-        img.drawWidth = 6*inch
-        elements.append(img)
-        elements.append(Paragraph("Figura 4: Iniciativas de Gestão de Resíduos por Município em Sergipe", styles['Center']))
-        elements.append(Spacer(1, 12))
-        
-        # Tabela de iniciativas
-        dados_tabela = [['Iniciativa', 'Municípios Atendidos', 'Percentual do Total']]
-        for programa in self.dados_complementares['programas']:
-            dados_tabela.append([
-                programa['nome'],
-                str(programa['municipios']),
-                f"{programa['percentual']}%"
-            ])
-        
-        t = Table(dados_tabela, colWidths=[250, 100, 100])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(ODS12_COLOR)),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph(
-            "Observa-se que apenas 20% dos municípios sergipanos possuem sistemas estruturados de coleta seletiva, "
-            "enquanto as cooperativas de reciclagem estão presentes em apenas 10,7% dos municípios. Esta distribuição "
-            "desigual contribui para os desafios enfrentados no avanço da reciclagem em todo o estado.",
-            styles['Justify']))
-        elements.append(Spacer(1, 20))
-        
-        # 4. Conclusões e Recomendações
-        elements.append(Paragraph("4. CONCLUSÕES E RECOMENDAÇÕES", styles['Section']))
-        elements.append(Paragraph(
-            "Com base na análise dos dados e indicadores relacionados à reciclagem de resíduos sólidos urbanos em "
-            "Sergipe, chegamos às seguintes conclusões e recomendações:",
-            styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph("4.1 Conclusões", styles['Subsection']))
-        elements.append(Paragraph(
-            "• O estado de Sergipe apresenta uma tendência positiva consistente na taxa de reciclagem, com crescimento "
-            "em todos os anos analisados (2017-2024).", styles['Justify']))
-        elements.append(Spacer(1, 6))
-        
-        elements.append(Paragraph(
-            "• Apesar dos avanços, o ritmo atual de crescimento (aproximadamente 0,5 pontos percentuais por ano) não "
-            "será suficiente para atingir a meta nacional de 15% até 2030.", styles['Justify']))
-        elements.append(Spacer(1, 6))
-        
-        elements.append(Paragraph(
-            "• Existe uma distribuição desigual de infraestrutura de reciclagem entre os municípios, com concentração "
-            "nas áreas mais urbanizadas e carência nos municípios de pequeno porte.", styles['Justify']))
-        elements.append(Spacer(1, 6))
-        
-        elements.append(Paragraph(
-            "• O envolvimento de cooperativas de catadores de materiais recicláveis ainda é limitado, estando presentes "
-            "em apenas 10,7% dos municípios, o que indica um potencial inexplorado de inclusão social através da "
-            "reciclagem.", styles['Justify']))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph("4.2 Recomendações", styles['Subsection']))
-        elements.append(Paragraph(
-            "• <b>Ampliação da coleta seletiva:</b> Implementar programas de expansão da coleta seletiva para todos os "
-            "municípios sergipanos, com meta de atingir pelo menos 50% dos municípios até 2027.", styles['Justify']))
-        elements.append(Spacer(1, 6))
-        
-        elements.append(Paragraph(
-            "• <b>Fortalecimento de cooperativas:</b> Desenvolver políticas públicas de apoio técnico e financeiro às "
-            "cooperativas de catadores, promovendo sua formalização e integração nos sistemas municipais de gestão de "
-            "resíduos.", styles['Justify']))
-        elements.append(Spacer(1, 6))
-        
-        elements.append(Paragraph(
-            "• <b>Educação ambiental:</b> Intensificar campanhas de conscientização sobre consumo responsável e "
-            "separação correta de resíduos, com foco em escolas e comunidades.", styles['Justify']))
-        elements.append(Spacer(1, 6))
-        
-        elements.append(Paragraph(
-            "• <b>Incentivos econômicos:</b> Criar mecanismos de incentivo econômico para empresas e municípios que "
-            "adotarem práticas avançadas de gestão de resíduos e economia circular.", styles['Justify']))
-        elements.append(Spacer(1, 6))
-        
-        elements.append(Paragraph(
-            "• <b>Infraestrutura:</b> Investir na implantação de ecopontos, centrais de triagem e plantas de compostagem "
-            "em consórcios regionais, permitindo ganhos de escala para municípios de menor porte.", styles['Justify']))
-        elements.append(Spacer(1, 6))
-        
-        elements.append(Paragraph(
-            "• <b>Monitoramento:</b> Aprimorar os sistemas de coleta e análise de dados sobre reciclagem em todos os "
-            "municípios, garantindo transparência e possibilidade de correção de rumos nas políticas públicas.", 
-            styles['Justify']))
-        elements.append(Spacer(1, 20))
-        
-        # Conclusão final
-        elements.append(Paragraph(
-            "O avanço consistente de Sergipe na taxa de reciclagem de resíduos sólidos urbanos demonstra que o estado "
-            "está no caminho certo, mas ainda serão necessários esforços adicionais e aceleração das políticas públicas "
-            "para alcançar as metas estabelecidas para o ODS 12 até 2030. A integração entre poder público, setor "
-            "privado e sociedade civil será fundamental para superar os desafios e transformar a gestão de resíduos "
-            "em uma oportunidade de desenvolvimento sustentável para todo o estado.",
-            styles['Justify']))
-        elements.append(Spacer(1, 30))
-        
-        # Rodapé
-        elements.append(Paragraph(
-            "<i>Laboratório de Indicadores para Monitoramento das Famílias Sergipanas (LIMFS)<br/>"
-            "Relatório gerado em conformidade com as diretrizes dos Objetivos de Desenvolvimento Sustentável (ODS)</i>",
-            styles['Center']))
-        
-        # Construir o documento
-        doc.build(elements)
-        
-        print(f"Relatório técnico gerado com sucesso: {OUTPUT_FILE}")
-        return True
 
-def main():
-    """Função principal"""
-    print("=== Gerador de Relatório Técnico ODS 12 ===")
-    
-    gerador = ODS12ReportGenerator()
-    
-    # Executar o fluxo completo
-    gerador.carregar_dados()
-    gerador.analisar_dados()
-    gerador.gerar_graficos()
-    gerador.gerar_relatorio()
-    
-    print("\n=== Processo concluído com sucesso ===")
-    print(f"Relatório disponível em: {OUTPUT_FILE}")
+from relatorios.cli import main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main(['gerar', '--ods12', *sys.argv[1:]]))
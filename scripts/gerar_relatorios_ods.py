@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gerador em Lote dos Relatórios Técnicos dos ODS
+Laboratório de Indicadores para Monitoramento das Famílias Sergipanas (LIMFS)
+
+Gera um relatório técnico em PDF para cada arquivo `dados/indicadores/ods*_*.json`,
+usando `dados/ods-config.json` para títulos e cores. Os ODS são processados em
+paralelo, um processo por ODS. Só são refeitos os relatórios cujas entradas
+(arquivo do ODS, ods-config.json ou código) mudaram desde a última execução,
+conforme o manifesto em docs/relatorios/manifesto_build.json.
+
+Mantido por compatibilidade: equivale a `limfs-relatorios gerar`.
+
+Uso:
+    python3 scripts/gerar_relatorios_ods.py                 # todos os ODS
+    python3 scripts/gerar_relatorios_ods.py --ods ods1 ods12
+    python3 scripts/gerar_relatorios_ods.py --workers 4
+    python3 scripts/gerar_relatorios_ods.py --graficos matplotlib
+    python3 scripts/gerar_relatorios_ods.py --forcar        # ignora o manifesto
+"""
+
+import sys
+
+from relatorios.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(['gerar', *sys.argv[1:]]))
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+Pacote de geração de relatórios técnicos dos ODS
+Laboratório de Indicadores para Monitoramento das Famílias Sergipanas (LIMFS)
+
+Os módulos deste pacote são usados pelos scripts em `scripts/` e carregam as
+bibliotecas pesadas (pandas, matplotlib, reportlab) apenas quando necessário.
+"""
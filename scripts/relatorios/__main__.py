@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""Permite `python -m relatorios` (a partir de scripts/) como alternativa a `limfs-relatorios`"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Núcleo vetorizado de análise das séries de indicadores.
+
+As séries são organizadas em uma matriz (séries × anos), com NaN nos anos sem
+dado. Em uma única passada NumPy são calculados, para todas as séries:
+valores inicial e atual, variação percentual, crescimento anual composto
+(CAGR), tendência, variações ano a ano, distância da meta, taxa anual
+necessária para atingi-la e a trajetória necessária até o ano da meta. A
+previsão da tendência, com intervalo de previsão, vem de previsao.py.
+
+    anos, matriz = matriz_series([gerador.historico for gerador in geradores])
+    resultado = analisar_series(anos, matriz, metas)
+    analise = analise_da_serie(resultado, 0)   # dicionário usado pelos geradores
+"""
+
+import numpy as np
+
+from .config import ANO_META
+from .previsao import prever_series, previsao_da_serie
+
+TENDENCIAS = np.array(['variável', 'crescente', 'decrescente'])
+
+
+def matriz_series(historicos, anos=None):
+    """
+    Monta (anos, matriz) a partir de listas de pontos {'ano', 'valor'}.
+
+    Sem `anos`, o eixo é a união dos anos de todas as séries.
+    """
+    anos_pontos = [np.array([p['ano'] for p in h], dtype=np.int32) for h in historicos]
+    valores_pontos = [np.array([p['valor'] for p in h], dtype=np.float64) for h in historicos]
+    tamanhos = np.array([len(a) for a in anos_pontos], dtype=np.int64)
+    todos_anos = np.concatenate(anos_pontos) if anos_pontos else np.empty(0, dtype=np.int32)
+    todos_valores = np.concatenate(valores_pontos) if valores_pontos else np.empty(0)
+    linhas = np.repeat(np.arange(len(historicos)), tamanhos)
+    return preencher_matriz(linhas, todos_anos, todos_valores, len(historicos), anos)
+
+
+def preencher_matriz(linhas, anos_pontos, valores, n_series, anos=None):
+    """Distribui pontos (série, ano, valor) em uma matriz séries × anos com NaN nos anos sem dado"""
+    if anos is None:
+        anos = np.unique(anos_pontos)
+    anos = np.asarray(anos, dtype=np.int32)
+    matriz = np.full((n_series, len(anos)), np.nan)
+    colunas = np.searchsorted(anos, anos_pontos)
+    dentro = (colunas < len(anos)) & (anos[np.minimum(colunas, len(anos) - 1)] == anos_pontos)
+    matriz[linhas[dentro], colunas[dentro]] = valores[dentro]
+    return anos, matriz
+
+
+def analisar_series(anos, matriz, metas=None, ano_meta=ANO_META):
+    """
+    Calcula as métricas de todas as séries da matriz de uma vez.
+
+    `metas` é um array (uma meta por série, NaN se não houver). Retorna um
+    dicionário de arrays indexados pela série; `deltas` (séries × anos-1) e
+    `projecao` (séries × anos_projecao) têm NaN onde não se aplicam.
+    """
+    anos = np.asarray(anos)
+    matriz = np.asarray(matriz, dtype=np.float64)
+    n_series, n_anos = matriz.shape
+    metas = np.full(n_series, np.nan) if metas is None else np.asarray(metas, dtype=np.float64)
+    if n_anos == 0:
+        return _resultado_sem_anos(anos, n_series, metas, ano_meta)
+    linhas = np.arange(n_series)
+    validos = ~np.isnan(matriz)
+    possui_dados = validos.any(axis=1)
+
+    # Primeira e última observação de cada série
+    i_inicial = np.argmax(validos, axis=1)
+    i_atual = n_anos - 1 - np.argmax(validos[:, ::-1], axis=1)
+    valor_inicial = np.where(possui_dados, matriz[linhas, i_inicial], np.nan)
+    valor_atual = np.where(possui_dados, matriz[linhas, i_atual], np.nan)
+    ano_inicial = anos[i_inicial]
+    ano_atual = anos[i_atual]
+    anos_periodo = np.maximum(ano_atual - ano_inicial, 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacao = np.where(valor_inicial != 0, (valor_atual - valor_inicial) / valor_inicial * 100, 0.0)
+        positivos = (valor_inicial > 0) & (valor_atual > 0)
+        cagr = np.where(positivos, ((valor_atual / valor_inicial) ** (1 / anos_periodo) - 1) * 100, 0.0)
+
+    # Variações entre anos consecutivos (NaN se faltar um dos anos)
+    deltas = matriz[:, 1:] - matriz[:, :-1]
+
+    # Tendência: compara cada observação com a anterior válida (ignora anos faltantes)
+    indice_anterior = np.maximum.accumulate(np.where(validos, np.arange(n_anos), 0), axis=1)
+    preenchida = matriz[linhas[:, None], indice_anterior]
+    passos = preenchida[:, 1:] - preenchida[:, :-1]
+    comparaveis = validos[:, 1:] & (np.cumsum(validos, axis=1)[:, :-1] > 0)
+    crescente = np.all(~comparaveis | (passos >= 0), axis=1)
+    decrescente = np.all(~comparaveis | (passos <= 0), axis=1)
+    tendencia = TENDENCIAS[np.where(crescente, 1, np.where(decrescente, 2, 0))]
+
+    # Meta: distância, taxa anual necessária e trajetória linear necessária até o ano da meta
+    anos_restantes = np.maximum(ano_meta - ano_atual, 1)
+    gap_meta = metas - valor_atual
+    taxa_necessaria = gap_meta / anos_restantes
+
+    ano_projecao_inicial = int(ano_atual.min()) if n_series else ano_meta
+    anos_projecao = np.arange(ano_projecao_inicial, ano_meta + 1)
+    passos_projecao = anos_projecao[None, :] - ano_atual[:, None]
+    projecao = np.round(valor_atual[:, None] + taxa_necessaria[:, None] * passos_projecao, 2)
+    projecao[passos_projecao < 0] = np.nan
+
+    return {
+        'anos': anos,
+        'valor_inicial': valor_inicial,
+        'valor_atual': valor_atual,
+        'ano_inicial': ano_inicial,
+        'ano_atual': ano_atual,
+        'variacao_percentual': variacao,
+        'taxa_crescimento_anual': cagr,
+        'tendencia': tendencia,
+        'deltas': deltas,
+        'meta': metas,
+        'anos_restantes': anos_restantes,
+        'gap_meta': gap_meta,
+        'taxa_necessaria': taxa_necessaria,
+        'anos_projecao': anos_projecao,
+        'projecao': projecao,
+        'previsao': prever_series(anos, matriz, ano_meta),
+    }
+
+
+def _resultado_sem_anos(anos, n_series, metas, ano_meta):
+    """Resultado de `analisar_series` para uma matriz sem colunas: métricas NaN, deltas e projeção vazios"""
+    def nan():
+        return np.full(n_series, np.nan)
+
+    return {
+        'anos': anos,
+        'valor_inicial': nan(),
+        'valor_atual': nan(),
+        'ano_inicial': nan(),
+        'ano_atual': nan(),
+        'variacao_percentual': nan(),
+        'taxa_crescimento_anual': nan(),
+        'tendencia': TENDENCIAS[np.zeros(n_series, dtype=int)],
+        'deltas': np.empty((n_series, 0)),
+        'meta': metas,
+        'anos_restantes': nan(),
+        'gap_meta': nan(),
+        'taxa_necessaria': nan(),
+        'anos_projecao': np.empty(0, dtype=int),
+        'projecao': np.empty((n_series, 0)),
+        'previsao': prever_series(anos, np.empty((n_series, 0)), ano_meta),
+    }
+
+
+def analise_da_serie(resultado, i):
+    """Converte a linha `i` do resultado no dicionário `analise` usado pelos geradores"""
+    meta = resultado['meta'][i]
+    analise = {
+        'valor_atual': resultado['valor_atual'][i].item(),
+        'valor_inicial': resultado['valor_inicial'][i].item(),
+        'ano_inicial': int(resultado['ano_inicial'][i]),
+        'ano_atual': int(resultado['ano_atual'][i]),
+        'variacao_percentual': resultado['variacao_percentual'][i].item(),
+        'taxa_crescimento_anual': resultado['taxa_crescimento_anual'][i].item(),
+        'tendencia': str(resultado['tendencia'][i]),
+        'anos_restantes': int(resultado['anos_restantes'][i]),
+        'meta': None if np.isnan(meta) else meta.item(),
+        'previsao': previsao_da_serie(resultado['previsao'], i),
+    }
+    if analise['meta'] is not None:
+        analise['gap_meta'] = resultado['gap_meta'][i].item()
+        analise['taxa_necessaria'] = resultado['taxa_necessaria'][i].item()
+        projecao = resultado['projecao'][i]
+        definidos = ~np.isnan(projecao)
+        analise['projecao'] = list(zip(resultado['anos_projecao'][definidos].tolist(),
+                                       projecao[definidos].tolist()))
+        # O primeiro ponto da projeção é o valor atual, sem arredondamento (série sem pontos: sem projeção)
+        if analise['projecao']:
+            analise['projecao'][0] = (analise['projecao'][0][0], analise['valor_atual'])
+    return analise
+
+
+def analisar_armazem(armazem, chaves=None, ano_meta=ANO_META):
+    """Analisa de uma vez as séries do armazém (todas, se `chaves` não for informado)"""
+    chaves = armazem.chaves() if chaves is None else list(chaves)
+    anos, matriz, metas = armazem.matriz(chaves)
+    resultado = analisar_series(anos, matriz, metas, ano_meta)
+    resultado['chaves'] = np.array(chaves, dtype=str)
+    return resultado
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Anexos estatísticos: tabelas com milhares de linhas, página a página.
+
+Uma `Table` do reportlab com milhares de linhas mede todas as células para
+dimensionar as colunas e, a cada quebra de página, refaz o cálculo para as
+linhas restantes: o tempo cresce mais que linearmente com o número de linhas.
+`TabelaAnexo` evita os dois custos:
+
+- as larguras das colunas são calculadas uma única vez a partir dos dados
+  (`larguras_colunas`: a maior largura de texto de cada coluna, ajustada à
+  largura útil), e o texto que não cabe é abreviado com reticências;
+- todas as linhas têm a mesma altura (uma linha de texto), de modo que o
+  número de linhas que cabem no espaço disponível é uma conta;
+- as linhas vêm de um iterável (um cursor da base de séries, por exemplo) e
+  só são lidas quando a página em que entram é montada: cada página vira uma
+  `Table` pequena, com o cabeçalho repetido, e as linhas seguintes ficam para
+  a continuação.
+
+O tempo de montagem fica proporcional ao número de linhas e a memória, à de
+uma página.
+
+`gerar_anexo_municipios` monta o anexo com o valor mais recente de cada
+indicador de cada município (`limfs-relatorios anexo`); a mesma seção entra
+no relatório consolidado com `--anexo-estatistico`.
+"""
+
+import os
+import time
+from functools import lru_cache
+from itertools import chain, islice
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable, Paragraph, Spacer, Table, TableStyle
+
+from .config import COR_PADRAO, ConfigRelatorios
+from .instrumentacao import medir
+from .secoes import LARGURA_UTIL, construir_em_secoes
+
+ARQUIVO_ANEXO = 'anexo_estatistico_municipios.pdf'
+
+FONTE = 'Helvetica'
+FONTE_CABECALHO = 'Helvetica-Bold'
+TAMANHO_FONTE = 7
+# Espaçamento horizontal e vertical de cada célula, em pontos
+MARGEM_CELULA = 3
+
+# Linhas usadas para calcular as larguras quando as linhas vêm de um iterador
+AMOSTRA_LARGURAS = 1000
+
+# Uma página com menos linhas que isso passa para a próxima
+LINHAS_MINIMAS = 3
+
+CABECALHO_MUNICIPIOS = ('Município', 'ODS', 'Indicador', 'Ano', 'Valor', 'Meta 2030')
+
+
+def estilo_anexo(cor_cabecalho=COR_PADRAO, tamanho=TAMANHO_FONTE):
+    """Estilo das tabelas de anexo: cabeçalho colorido, linhas zebradas e grade fina"""
+    return TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), FONTE_CABECALHO),
+        ('FONTNAME', (0, 1), (-1, -1), FONTE),
+        ('FONTSIZE', (0, 0), (-1, -1), tamanho),
+        ('LEADING', (0, 0), (-1, -1), tamanho * 1.2),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(cor_cabecalho)),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F2F2F2')]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#BFBFBF')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), MARGEM_CELULA),
+        ('RIGHTPADDING', (0, 0), (-1, -1), MARGEM_CELULA),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+    ])
+
+
+def larguras_colunas(cabecalho, linhas, largura_total=LARGURA_UTIL, tamanho=TAMANHO_FONTE):
+    """
+    Larguras das colunas (pontos) pela maior largura de texto de cada uma,
+    em uma única passada sobre `linhas`, escaladas para ocupar `largura_total`.
+    """
+    maiores = [stringWidth(str(texto), FONTE_CABECALHO, tamanho) for texto in cabecalho]
+    for linha in linhas:
+        for i, texto in enumerate(linha):
+            largura = stringWidth(str(texto), FONTE, tamanho)
+            if largura > maiores[i]:
+                maiores[i] = largura
+    necessarias = [largura + 2 * MARGEM_CELULA for largura in maiores]
+    fator = largura_total / sum(necessarias)
+    return [largura * fator for largura in necessarias]
+
+
+@lru_cache(maxsize=8192)
+def abreviar(texto, largura, fonte=FONTE, tamanho=TAMANHO_FONTE):
+    """`texto` cortado com reticências para caber em `largura` pontos (nomes repetidos são medidos uma vez)"""
+    texto = str(texto)
+    if stringWidth(texto, fonte, tamanho) <= largura:
+        return texto
+    inicio, fim = 0, len(texto)
+    while inicio < fim:
+        meio = (inicio + fim + 1) // 2
+        if stringWidth(texto[:meio] + '…', fonte, tamanho) <= largura:
+            inicio = meio
+        else:
+            fim = meio - 1
+    return texto[:inicio] + '…'
+
+
+class TabelaAnexo(Flowable):
+    """
+    Tabela longa montada página a página (ver a documentação do módulo).
+
+    `linhas` é um iterável de sequências de textos, consumido à medida que
+    as páginas são montadas; `larguras` são as larguras das colunas em
+    pontos (ver `larguras_colunas`). `pendentes` são linhas já lidas, que
+    vêm antes das de `linhas` (usado na continuação de uma página).
+    """
+
+    def __init__(self, cabecalho, linhas, larguras, estilo=None, tamanho=TAMANHO_FONTE, pendentes=()):
+        super().__init__()
+        self.cabecalho = [abreviar(t, w - 2 * MARGEM_CELULA, FONTE_CABECALHO, tamanho)
+                          for t, w in zip(cabecalho, larguras)]
+        self.linhas = iter(linhas)
+        self.larguras = list(larguras)
+        self.estilo = estilo or estilo_anexo(tamanho=tamanho)
+        self.tamanho = tamanho
+        self.altura_linha = tamanho * 1.2 + 2 * MARGEM_CELULA
+        self._pendentes = list(pendentes)
+        self._tabela = None
+
+    def _ler(self, quantidade):
+        """Garante até `quantidade` linhas pendentes, lendo só as que faltam"""
+        if len(self._pendentes) < quantidade:
+            self._pendentes.extend(islice(self.linhas, quantidade - len(self._pendentes)))
+
+    def _cabem(self, altura):
+        return max(int(altura // self.altura_linha) - 1, 0)
+
+    def _montar(self, linhas):
+        dados = [self.cabecalho]
+        dados += [[abreviar(texto, largura - 2 * MARGEM_CELULA, FONTE, self.tamanho)
+                   for texto, largura in zip(linha, self.larguras)] for linha in linhas]
+        return Table(dados, colWidths=self.larguras, rowHeights=[self.altura_linha] * len(dados),
+                     style=self.estilo)
+
+    def wrap(self, largura_disponivel, altura_disponivel):
+        cabem = self._cabem(altura_disponivel)
+        self._ler(cabem + 1)
+        self.width = sum(self.larguras)
+        if len(self._pendentes) > cabem:
+            # Não cabe tudo: a altura maior que a disponível faz o quadro chamar split
+            self._tabela = None
+            self.height = altura_disponivel + self.altura_linha
+        else:
+            self._tabela = self._montar(self._pendentes)
+            self.height = self.altura_linha * (len(self._pendentes) + 1)
+        return self.width, self.height
+
+    def split(self, largura_disponivel, altura_disponivel):
+        cabem = self._cabem(altura_disponivel)
+        if cabem < LINHAS_MINIMAS:
+            return []
+        self._ler(cabem + 1)
+        continuacao = TabelaAnexo(self.cabecalho, self.linhas, self.larguras, self.estilo, self.tamanho,
+                                  self._pendentes[cabem:])
+        return [self._montar(self._pendentes[:cabem]), continuacao]
+
+    def draw(self):
+        self._tabela.wrapOn(self.canv, self.width, self.height)
+        self._tabela.drawOn(self.canv, 0, 0)
+
+
+def tabela_anexo(cabecalho, linhas, largura_total=LARGURA_UTIL, larguras=None, estilo=None,
+                 tamanho=TAMANHO_FONTE):
+    """
+    `TabelaAnexo` com as larguras calculadas dos dados: de todas as linhas,
+    se `linhas` for uma lista, ou das primeiras AMOSTRA_LARGURAS de um
+    iterador (que continua sendo lido sob demanda).
+    """
+    if larguras is None:
+        if isinstance(linhas, (list, tuple)):
+            larguras = larguras_colunas(cabecalho, linhas, largura_total, tamanho)
+        else:
+            linhas = iter(linhas)
+            amostra = list(islice(linhas, AMOSTRA_LARGURAS))
+            larguras = larguras_colunas(cabecalho, amostra, largura_total, tamanho)
+            linhas = chain(amostra, linhas)
+    return TabelaAnexo(cabecalho, linhas, larguras, estilo, tamanho)
+
+
+def _numero(valor, unidade=''):
+    if valor is None:
+        return '-'
+    return f"{valor:g} {unidade}".strip() if unidade and unidade != '%' else f"{valor:g}{unidade}"
+
+
+def linhas_municipios(banco, nomes, filtro=None, contador=None):
+    """
+    Linhas do anexo municipal (município, ODS, indicador, ano, valor, meta)
+    lidas do cursor da base de séries; `nomes` traduz o slug do município.
+    `contador['linhas']` acumula as linhas lidas.
+    """
+    for _, territorio, ods, indicador, unidade, ano, valor, meta in banco.percorrer_ultimos(municipios=True):
+        if filtro and ods not in filtro:
+            continue
+        if contador is not None:
+            contador['linhas'] = contador.get('linhas', 0) + 1
+        yield (nomes.get(territorio, territorio), f'ODS {ods[3:]}', indicador, ano, _numero(valor, unidade),
+               _numero(meta))
+
+
+def secao_anexo_municipios(config, filtro=None, contador=None):
+    """(titulo, fabrica) da seção do anexo municipal, para `construir_em_secoes`"""
+    titulo = 'Anexo Estatístico: Indicadores por Município'
+
+    def fabrica():
+        from .banco_series import abrir_banco
+        from .municipios import descobrir_municipios
+
+        banco = abrir_banco(config.dados_dir, config.series_file)
+        nomes = {t['municipio']: t['nome'] for t in descobrir_municipios(config.municipios_dir)}
+        styles = getSampleStyleSheet()
+        yield Paragraph(titulo, styles['Heading1'])
+        yield Paragraph('Valor mais recente de cada indicador dos ODS em cada município de dados/municipios/, '
+                        'com a meta 2030 quando definida.', styles['Normal'])
+        yield Spacer(1, 12)
+        yield tabela_anexo(CABECALHO_MUNICIPIOS, linhas_municipios(banco, nomes, filtro, contador))
+
+    return titulo, fabrica
+
+
+def gerar_anexo_municipios(config=None, manifesto=None, filtro=None):
+    """
+    Gera o anexo estatístico municipal em `config.report_dir` e retorna o
+    resumo (relatorio, linhas, paginas, duracao, atualizado). Com
+    `manifesto`, nada é refeito se os arquivos municipais não mudaram.
+    """
+    from .ingestao import arquivos_json
+
+    config = config or ConfigRelatorios()
+    saida = os.path.join(config.report_dir, ARQUIVO_ANEXO)
+    entradas = arquivos_json(config.municipios_dir) + [config.ods_config_file]
+    parametros = {'filtro': sorted(filtro or [])}
+    if config.reprodutivel:
+        parametros['reprodutivel'] = True
+    if manifesto is not None and manifesto.atualizado('anexo:municipios', entradas, parametros):
+        return {'relatorio': saida, 'linhas': 0, 'paginas': 0, 'duracao': 0.0, 'atualizado': True}
+
+    inicio = time.perf_counter()
+    contador = {}
+    with medir('anexo', anexo='municipios'):
+        resumo = construir_em_secoes(saida, [secao_anexo_municipios(config, filtro, contador)],
+                                     numerar_paginas=True, reprodutivel=config.reprodutivel)
+    if manifesto is not None:
+        manifesto.registrar('anexo:municipios', entradas, [saida], parametros)
+    return {'relatorio': saida, 'linhas': contador.get('linhas', 0), 'paginas': resumo['paginas'],
+            'duracao': time.perf_counter() - inicio, 'atualizado': False}
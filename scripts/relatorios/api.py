@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+API dos geradores de relatórios para uso dentro de um processo.
+
+Cada função recebe um `ConfigRelatorios` explícito (padrão: o repositório
+atual) e importa pandas, matplotlib e reportlab apenas quando é chamada, de
+modo que importar este módulo é barato e um processo de longa duração paga o
+custo dessas bibliotecas uma única vez:
+
+    from relatorios.api import gerar_relatorios
+    resultados, erros = gerar_relatorios(filtro=['ods1', 'ods12'])
+"""
+
+import os
+
+from .config import ConfigRelatorios
+
+
+def _manifesto(config, versao, forcar):
+    from .manifesto import ManifestoBuild
+    return ManifestoBuild(config.manifesto_file, versao=versao, forcar=forcar)
+
+
+def gerar_relatorio_ods12(config=None, backend_graficos='vetorial', forcar=False):
+    """Gera o relatório técnico detalhado do ODS 12 e retorna o caminho do PDF"""
+    from . import ods12
+    from .manifesto import versao_codigo
+
+    config = config or ConfigRelatorios()
+    manifesto = _manifesto(config, versao_codigo(), forcar)
+    saida = ods12.gerar_relatorio_ods12(config, backend_graficos, manifesto)
+    manifesto.salvar()
+    return saida
+
+
+def aprimorar_relatorio_ods12(config=None, backend_graficos='vetorial', forcar=False):
+    """Gera o relatório aprimorado do ODS 12 e retorna o caminho do PDF"""
+    from . import ods12_aprimorado
+    from .manifesto import versao_codigo
+
+    config = config or ConfigRelatorios()
+    manifesto = _manifesto(config, versao_codigo(), forcar)
+    saida = ods12_aprimorado.aprimorar_relatorio_ods12(config, backend_graficos, manifesto)
+    manifesto.salvar()
+    return saida
+
+
+def gerar_relatorios(config=None, filtro=None, max_workers=None, backend_graficos='vetorial', forcar=False,
+                     exportar=()):
+    """
+    Gera os relatórios de todos os ODS (ou dos códigos em `filtro`); retorna
+    (resultados, erros). `exportar`: formatos extras dos gráficos matplotlib
+    ('web', 'miniatura'), gravados do mesmo desenho do PNG.
+    """
+    from .lote import gerar_todos
+    from .manifesto import versao_codigo
+
+    config = config or ConfigRelatorios()
+    manifesto = _manifesto(config, versao_codigo(), forcar)
+    resultados, erros = gerar_todos(config.indicadores_dir, config.report_dir, config.charts_dir,
+                                    filtro=filtro, max_workers=max_workers, backend_graficos=backend_graficos,
+                                    manifesto=manifesto, ods_config_file=config.ods_config_file,
+                                    exportar=exportar, reprodutivel=config.reprodutivel)
+    manifesto.salvar()
+    return resultados, erros
+
+
+def gerar_relatorios_municipios(config=None, municipios=None, filtro=None, max_workers=None,
+                                backend_graficos='vetorial', forcar=False):
+    """
+    Gera os relatórios por município e ODS (ver municipios.gerar_municipios).
+
+    Retorna (resultados, erros, resumo), com a vazão e o pico de memória por
+    trabalhador em `resumo`.
+    """
+    from .municipios import gerar_municipios
+    from .manifesto import versao_codigo
+
+    config = config or ConfigRelatorios()
+    manifesto = _manifesto(config, versao_codigo(), forcar)
+    resultados, erros, resumo = gerar_municipios(config.municipios_dir, config.municipios_report_dir,
+                                                 os.path.join(config.charts_dir, 'municipios'),
+                                                 filtro_municipios=municipios, filtro_ods=filtro,
+                                                 max_workers=max_workers, backend_graficos=backend_graficos,
+                                                 manifesto=manifesto, ods_config_file=config.ods_config_file,
+                                                 reprodutivel=config.reprodutivel)
+    manifesto.salvar()
+    return resultados, erros, resumo
+
+
+def gerar_relatorio_consolidado(config=None, filtro=None, incluir_municipios=True, paginas_por_volume=None,
+                                backend_graficos='vetorial', anexo_estatistico=False):
+    """Gera o relatório consolidado de todos os ODS e municípios (ver consolidado.gerar_consolidado)"""
+    from .consolidado import gerar_consolidado
+    return gerar_consolidado(config or ConfigRelatorios(), filtro, incluir_municipios, paginas_por_volume,
+                             backend_graficos, anexo_estatistico)
+
+
+def gerar_anexo_estatistico(config=None, filtro=None, forcar=False):
+    """Gera o anexo estatístico com os indicadores de todos os municípios (ver anexos.gerar_anexo_municipios)"""
+    from .anexos import gerar_anexo_municipios
+    from .manifesto import versao_codigo
+
+    config = config or ConfigRelatorios()
+    manifesto = _manifesto(config, versao_codigo(), forcar)
+    resumo = gerar_anexo_municipios(config, manifesto, filtro)
+    manifesto.salvar()
+    return resumo
+
+
+def gerar_painel(config=None, incluir_municipios=True, forcar=False):
+    """Grava os artefatos pré-calculados do painel web (ver painel.gerar_painel) e retorna o resumo"""
+    from . import painel
+    from .manifesto import versao_codigo
+
+    config = config or ConfigRelatorios()
+    manifesto = _manifesto(config, versao_codigo(), forcar)
+    resumo = painel.gerar_painel(config, manifesto, incluir_municipios)
+    manifesto.salvar()
+    return resumo
+
+
+def atualizar_series(config=None, arquivos_csv=(), origem=None):
+    """
+    Sincroniza a base de séries com `dados/` e carrega as safras em CSV
+    (ver banco_series.py); `origem` rotula os pontos carregados (padrão: o
+    nome de cada arquivo). Retorna o resumo.
+    """
+    import time
+    from .banco_series import abrir_banco, ler_csv
+
+    config = config or ConfigRelatorios()
+    inicio = time.perf_counter()
+    banco = abrir_banco(config.dados_dir, config.series_file, sincronizar=False)
+    importados = banco.sincronizar(config.dados_dir)
+    carregados = sum(banco.carregar(ler_csv(arquivo), origem or os.path.splitext(os.path.basename(arquivo))[0])
+                     for arquivo in arquivos_csv)
+    return {**banco.resumo(), 'importados': importados, 'carregados': carregados,
+            'duracao': time.perf_counter() - inicio}
+
+
+def consultar_series(config=None, chave=None, ods=None, territorio=None, ano_inicio=None, ano_fim=None):
+    """
+    Com `chave`, os pontos da série no intervalo de anos; sem ela, o último
+    ponto de cada série do ODS e do território ({chave: (ano, valor)}).
+    """
+    from .banco_series import abrir_banco
+
+    config = config or ConfigRelatorios()
+    banco = abrir_banco(config.dados_dir, config.series_file)
+    if chave is not None:
+        return banco.historico(chave, ano_inicio, ano_fim)
+    return banco.ultimos(ods, territorio)
+
+
+def publicar_relatorios(config=None):
+    """Publica os PDFs em um diretório endereçado por conteúdo (ver publicacao.publicar) e retorna o resumo"""
+    from .publicacao import publicar
+    return publicar(config or ConfigRelatorios())
+
+
+def validar_dados(config=None):
+    """Lista os problemas dos arquivos de indicadores (ver validacao.validar_dados)"""
+    from .validacao import validar_dados as validar
+    return validar(config or ConfigRelatorios())
+
+
+def listar_ods(config=None):
+    """Resumo dos ODS disponíveis (ver validacao.listar_ods)"""
+    from .validacao import listar_ods as listar
+    return listar(config or ConfigRelatorios())
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Armazém colunar dos indicadores em `dados/`.
+
+Os arquivos JSON do projeto usam formatos diferentes: `indicadores.json` guarda
+`grafico.dados`/`grafico.labels`, os arquivos dos ODS usam `historico` (com
+anos inteiros ou em texto e valores como "78,3%"), outros usam uma lista
+`dados` com `regiao` ou só o último valor em `dados.valor`/`dados.ano`. A
+ingestão (ingestao.py) normaliza todos eles, e a base de séries
+(banco_series.py) guarda o resultado, com as safras carregadas de CSV.
+
+O armazém é a cópia colunar dessa base para consultas em memória: uma tabela
+única (ODS, indicador, ano, valor, meta) em arrays NumPy, ordenada por série e
+ano, de modo que cada série é uma fatia contígua obtida por índice, e a matriz
+séries × anos da análise em lote (`analise.analisar_armazem`,
+`previsao.prever_armazem`) sai por indexação, sem SQL. Ele é montado a partir
+de `BancoSeries.matriz`, gravado em um arquivo `.npz` e reaproveitado enquanto
+a assinatura da base (hash dos arquivos importados e dos pontos das safras)
+não mudar.
+"""
+
+import os
+
+import numpy as np
+
+from .config import CACHE_INDICADORES_FILE
+from .analise import preencher_matriz
+from .banco_series import TERRITORIO_ESTADO
+from .manifesto import hash_parametros
+
+VERSAO_ARMAZEM = 2
+
+COLUNAS_SERIES = ('chave', 'fonte', 'ods', 'indicador', 'unidade', 'territorio')
+
+
+class ArmazemIndicadores:
+    """
+    Tabela colunar de todos os indicadores.
+
+    As linhas (`ano`, `valor`, `meta`) ficam ordenadas por série e ano; a série
+    `i` ocupa as linhas `inicio[i]:fim[i]`. Os atributos de cada série
+    (chave, fonte, ods, indicador, unidade, territorio, principal) ficam em
+    `series`, um dicionário de arrays.
+    """
+
+    def __init__(self, series, ano, valor, meta, inicio, fim, assinatura=''):
+        self.series = series
+        self.ano = ano
+        self.valor = valor
+        self.meta = meta
+        self.inicio = inicio
+        self.fim = fim
+        self.assinatura = assinatura
+        self._indice = {chave: i for i, chave in enumerate(series['chave'].tolist())}
+
+    @classmethod
+    def construir(cls, banco, assinatura=''):
+        """Cria o armazém com todas as séries da base (`banco_series.BancoSeries`) que têm pontos"""
+        descricoes = banco.series()
+        anos, matriz, metas = banco.matriz([d['chave'] for d in descricoes])
+        validos = ~np.isnan(matriz)
+        com_pontos = validos.any(axis=1)
+        descricoes = [d for d, tem in zip(descricoes, com_pontos) if tem]
+        validos, matriz, metas = validos[com_pontos], matriz[com_pontos], metas[com_pontos]
+
+        tamanhos = validos.sum(axis=1).astype(np.int64)
+        fim = np.cumsum(tamanhos)
+        inicio = fim - tamanhos
+        series = {coluna: np.array([d[coluna] for d in descricoes], dtype=str) for coluna in COLUNAS_SERIES}
+        series['principal'] = np.array([bool(d['principal']) for d in descricoes], dtype=bool)
+
+        # A matriz é percorrida por linha: os pontos saem ordenados por série e ano
+        ano = np.broadcast_to(anos, matriz.shape)[validos].astype(np.int32)
+        return cls(series, ano, matriz[validos], np.repeat(metas, tamanhos), inicio, fim, assinatura)
+
+    @classmethod
+    def abrir(cls, caminho):
+        """Lê um armazém gravado com `salvar`"""
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            series = {coluna: arquivo[f'series_{coluna}'] for coluna in COLUNAS_SERIES + ('principal',)}
+            return cls(series, arquivo['ano'], arquivo['valor'], arquivo['meta'], arquivo['inicio'],
+                       arquivo['fim'], str(arquivo['assinatura']))
+
+    def salvar(self, caminho):
+        """Grava o armazém em formato `.npz` (escrita atômica)"""
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        colunas = {f'series_{coluna}': valores for coluna, valores in self.series.items()}
+        with open(temporario, 'wb') as file:
+            np.savez(file, ano=self.ano, valor=self.valor, meta=self.meta, inicio=self.inicio, fim=self.fim,
+                     assinatura=np.array(self.assinatura), **colunas)
+        os.replace(temporario, caminho)
+
+    def __len__(self):
+        return len(self.ano)
+
+    def __contains__(self, chave):
+        return chave in self._indice
+
+    def chaves(self, ods=None, fonte=None):
+        """Chaves das séries, opcionalmente filtradas por ODS e arquivo de origem"""
+        mascara = np.ones(len(self.series['chave']), dtype=bool)
+        if ods is not None:
+            mascara &= self.series['ods'] == ods
+        if fonte is not None:
+            mascara &= self.series['fonte'] == fonte
+        return self.series['chave'][mascara].tolist()
+
+    def principal(self, ods, territorio=TERRITORIO_ESTADO):
+        """Chave da série do indicador principal do ODS no território (None se não houver)"""
+        indices = np.flatnonzero(self.series['principal'] & (self.series['ods'] == ods)
+                                 & (self.series['territorio'] == territorio))
+        return str(self.series['chave'][indices[0]]) if len(indices) else None
+
+    def serie(self, chave):
+        """(anos, valores) da série, como visões dos arrays do armazém"""
+        i = self._indice[chave]
+        fatia = slice(self.inicio[i], self.fim[i])
+        return self.ano[fatia], self.valor[fatia]
+
+    def historico(self, chave):
+        """Série no formato usado pelos geradores: [{'ano': 2017, 'valor': 2.1}, ...]"""
+        anos, valores = self.serie(chave)
+        return [{'ano': ano, 'valor': valor} for ano, valor in zip(anos.tolist(), valores.tolist())]
+
+    def meta_serie(self, chave):
+        """Meta da série (None se não houver)"""
+        i = self._indice[chave]
+        meta = self.meta[self.inicio[i]]
+        return None if np.isnan(meta) else float(meta)
+
+    def matriz(self, chaves, anos=None):
+        """(anos, matriz séries × anos com NaN nos anos sem dado, metas) para as chaves informadas"""
+        indices = np.array([self._indice[chave] for chave in chaves], dtype=np.int64)
+        tamanhos = self.fim[indices] - self.inicio[indices]
+        deslocamentos = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+        posicoes = np.repeat(self.inicio[indices] - deslocamentos, tamanhos) + np.arange(tamanhos.sum())
+        linhas = np.repeat(np.arange(len(indices)), tamanhos)
+        anos, matriz = preencher_matriz(linhas, self.ano[posicoes], self.valor[posicoes], len(indices), anos)
+        return anos, matriz, self.meta[self.inicio[indices]]
+
+    def descricao(self, chave):
+        """Atributos da série: fonte, ods, indicador, unidade, territorio, principal"""
+        i = self._indice[chave]
+        return {coluna: valores[i].item() for coluna, valores in self.series.items()}
+
+    def consultar(self, ods=None, ano_inicio=None, ano_fim=None):
+        """Linhas filtradas por ODS e intervalo de anos, como dicionário de colunas"""
+        indice_serie = np.repeat(np.arange(len(self.inicio)), self.fim - self.inicio)
+        mascara = np.ones(len(self.ano), dtype=bool)
+        if ods is not None:
+            mascara &= (self.series['ods'] == ods)[indice_serie]
+        if ano_inicio is not None:
+            mascara &= self.ano >= ano_inicio
+        if ano_fim is not None:
+            mascara &= self.ano <= ano_fim
+        return {
+            'chave': self.series['chave'][indice_serie[mascara]],
+            'ods': self.series['ods'][indice_serie[mascara]],
+            'ano': self.ano[mascara],
+            'valor': self.valor[mascara],
+            'meta': self.meta[mascara],
+        }
+
+
+_armazens = {}
+
+
+def carregar_armazem(banco, cache=CACHE_INDICADORES_FILE):
+    """
+    Retorna o armazém da base de séries `banco`, reaproveitando (nesta ordem)
+    a instância já carregada no processo, o arquivo de cache e, por último,
+    a própria base.
+    """
+    assinatura = hash_parametros({'versao': VERSAO_ARMAZEM, 'base': banco.assinatura_base()})
+    armazem = _armazens.get(banco.caminho)
+    if armazem is not None and armazem.assinatura == assinatura:
+        return armazem
+
+    armazem = None
+    if cache and os.path.exists(cache):
+        try:
+            armazem = ArmazemIndicadores.abrir(cache)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"AVISO: cache de indicadores ilegível ({e}), reconstruindo")
+        if armazem is not None and armazem.assinatura != assinatura:
+            armazem = None
+
+    if armazem is None:
+        armazem = ArmazemIndicadores.construir(banco, assinatura)
+        if cache:
+            armazem.salvar(cache)
+
+    _armazens[banco.caminho] = armazem
+    return armazem
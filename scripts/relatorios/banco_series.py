@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""
+Base SQLite das séries temporais dos indicadores.
+
+As séries normalizadas pela ingestão de `dados/` (ver ingestao.py) ficam em
+duas tabelas:
+
+    series  uma linha por série: chave, arquivo de origem, ODS, indicador,
+            unidade, território e meta; índices por (ODS, indicador,
+            território) e por (território, ODS)
+    pontos  (série, ano, valor, origem), com chave primária (série, ano)
+            em uma tabela WITHOUT ROWID: os pontos de uma série ficam
+            contíguos e ordenados por ano no próprio índice primário; um
+            índice por ano atende às consultas de um ano em todas as séries
+
+Assim, um intervalo de anos de uma série e o último valor são buscas de
+intervalo no índice primário (`historico`, `intervalo`, `ultimo`), e o
+último valor de todas as séries de um ODS ou território usa os índices de
+`series` (`ultimos`), sem ler os demais pontos.
+
+O território é o município (`municipios/<m>/...`), a região dos arquivos
+com dados regionais ou TERRITORIO_ESTADO.
+
+`sincronizar` importa os JSON de `dados/` de forma incremental: só os
+arquivos cujo SHA-256 mudou são lidos de novo (o hash fica na tabela
+`arquivos`), em uma única transação. Os pontos de um arquivo têm `origem`
+igual ao arquivo ('indicadores/ods12_consumo_producao'); `carregar` grava em
+lote (upsert) pontos de outras origens, como uma nova safra do IBGE ou do
+SNIS lida de um CSV, que não são apagados quando o arquivo JSON da série é
+reimportado. O mesmo ano gravado pelas duas origens fica com o valor da
+gravação mais recente.
+"""
+
+import os
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from .config import DADOS_DIR, SERIES_FILE
+from .analise import preencher_matriz
+from .fontes import converter_numero
+from .ingestao import arquivos_json, ingerir
+from .manifesto import hash_arquivo, hash_parametros
+
+# Incrementar quando o esquema mudar: a base é recriada a partir de `dados/`
+VERSAO_BANCO = 1
+
+TERRITORIO_ESTADO = 'sergipe'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    chave TEXT NOT NULL UNIQUE,
+    fonte TEXT NOT NULL,
+    ods TEXT NOT NULL DEFAULT '',
+    indicador TEXT NOT NULL DEFAULT '',
+    unidade TEXT NOT NULL DEFAULT '',
+    territorio TEXT NOT NULL DEFAULT '',
+    principal INTEGER NOT NULL DEFAULT 0,
+    meta REAL
+);
+CREATE INDEX IF NOT EXISTS series_ods ON series (ods, indicador, territorio);
+CREATE INDEX IF NOT EXISTS series_territorio ON series (territorio, ods);
+CREATE INDEX IF NOT EXISTS series_fonte ON series (fonte);
+
+CREATE TABLE IF NOT EXISTS pontos (
+    serie INTEGER NOT NULL REFERENCES series (id) ON DELETE CASCADE,
+    ano INTEGER NOT NULL,
+    valor REAL NOT NULL,
+    origem TEXT NOT NULL,
+    PRIMARY KEY (serie, ano)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pontos_ano ON pontos (ano);
+
+CREATE TABLE IF NOT EXISTS arquivos (
+    fonte TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS propriedades (
+    nome TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+UPSERT_SERIE = """
+INSERT INTO series (chave, fonte, ods, indicador, unidade, territorio, principal, meta)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (chave) DO UPDATE SET
+    fonte = excluded.fonte, ods = excluded.ods, indicador = excluded.indicador, unidade = excluded.unidade,
+    territorio = excluded.territorio, principal = excluded.principal, meta = excluded.meta
+"""
+
+UPSERT_PONTO = """
+INSERT INTO pontos (serie, ano, valor, origem) VALUES (?, ?, ?, ?)
+ON CONFLICT (serie, ano) DO UPDATE SET valor = excluded.valor, origem = excluded.origem
+"""
+
+COLUNAS_SERIES = ('chave', 'fonte', 'ods', 'indicador', 'unidade', 'territorio', 'principal', 'meta')
+
+
+def territorio_da_serie(serie):
+    """Território de uma `ingestao.Serie`: município, região ou o estado"""
+    partes = serie.fonte.split('/')
+    if partes[0] == 'municipios' and len(partes) > 2:
+        return partes[1]
+    return serie.regiao or TERRITORIO_ESTADO
+
+
+def versao_leitura():
+    """Hash do esquema e do código de leitura dos JSON: quando muda, todos os arquivos são reimportados"""
+    from . import fontes, ingestao
+    modulos = (__file__, fontes.__file__, ingestao.__file__)
+    return hash_parametros({
+        'versao': VERSAO_BANCO,
+        'codigo': [hash_arquivo(os.path.abspath(modulo)) for modulo in modulos],
+    })
+
+
+def ler_csv(caminho):
+    """
+    Lê uma safra em CSV (separado por vírgula, ponto e vírgula ou tabulação)
+    com as colunas `chave`, `ano` e `valor` e, opcionalmente, `ods`,
+    `indicador`, `unidade` e `territorio` (usadas para criar séries novas).
+    Valores como "78,3%" são aceitos; linhas sem ano ou valor são ignoradas.
+    """
+    with open(caminho, newline='', encoding='utf-8-sig') as file:
+        amostra = file.read(4096)
+        file.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+        except csv.Error:
+            dialeto = csv.excel
+        pontos = []
+        for linha in csv.DictReader(file, dialect=dialeto):
+            ano, valor = converter_numero(linha.get('ano')), converter_numero(linha.get('valor'))
+            if not linha.get('chave') or ano is None or valor is None:
+                continue
+            pontos.append({**linha, 'ano': int(ano), 'valor': valor})
+    return pontos
+
+
+class BancoSeries:
+    """
+    Base SQLite das séries (ver a documentação do módulo). Uma conexão por
+    processo e por thread: use `abrir_banco`, que reaproveita a conexão.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        if caminho != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.conexao = sqlite3.connect(caminho, isolation_level=None)
+        self.conexao.execute('PRAGMA journal_mode = WAL')
+        self.conexao.execute('PRAGMA synchronous = NORMAL')
+        self.conexao.execute('PRAGMA foreign_keys = ON')
+        self._criar_esquema()
+
+    def _criar_esquema(self):
+        versao = self.conexao.execute('PRAGMA user_version').fetchone()[0]
+        if versao not in (0, VERSAO_BANCO):
+            # Esquema antigo: a base é só uma cópia indexada de dados/ e das safras carregadas
+            print(f"AVISO: base de séries na versão {versao}, recriando (carregue as safras em CSV novamente)")
+            with self._transacao():
+                for tabela in ('pontos', 'series', 'arquivos', 'propriedades'):
+                    self.conexao.execute(f'DROP TABLE IF EXISTS {tabela}')
+        self.conexao.executescript(ESQUEMA)
+        self.conexao.execute(f'PRAGMA user_version = {VERSAO_BANCO}')
+
+    @contextmanager
+    def _transacao(self):
+        """BEGIN/COMMIT (ROLLBACK em caso de erro): a conexão fica em modo autocommit fora dela"""
+        self.conexao.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.conexao
+        except BaseException:
+            self.conexao.execute('ROLLBACK')
+            raise
+        self.conexao.execute('COMMIT')
+
+    def fechar(self):
+        self.conexao.close()
+
+    # Importação e carga
+
+    def sincronizar(self, dados_dir=DADOS_DIR):
+        """
+        Importa os JSON de `dados_dir` que mudaram desde a última
+        sincronização e remove as séries dos arquivos apagados. Retorna o
+        número de arquivos importados.
+        """
+        versao = versao_leitura()
+        registrados = dict(self.conexao.execute('SELECT fonte, hash FROM arquivos'))
+        importados = registrados if self._propriedade('versao_leitura') == versao else {}
+
+        atuais = {}
+        for arquivo in arquivos_json(dados_dir):
+            fonte = os.path.splitext(os.path.relpath(arquivo, dados_dir))[0].replace(os.sep, '/')
+            atuais[fonte] = arquivo
+        alterados = [arquivo for fonte, arquivo in atuais.items()
+                     if importados.get(fonte) != hash_arquivo(arquivo)]
+        removidos = [fonte for fonte in registrados if fonte not in atuais]
+        if not alterados and not removidos and importados:
+            return 0
+
+        ingestao = ingerir(dados_dir, alterados)
+        with self._transacao():
+            for fonte in removidos:
+                self.conexao.execute('DELETE FROM series WHERE fonte = ?', (fonte,))
+                self.conexao.execute('DELETE FROM arquivos WHERE fonte = ?', (fonte,))
+            for arquivo in ingestao.arquivos:
+                if arquivo.erro is not None:
+                    print(f"AVISO: {arquivo.fonte} ignorado na base de séries ({arquivo.erro.mensagem})")
+                    continue
+                self._importar_arquivo(arquivo)
+            self._definir_propriedade('versao_leitura', versao)
+        return len(alterados)
+
+    def _importar_arquivo(self, arquivo):
+        """Substitui as séries e os pontos de um arquivo ingerido (dentro de uma transação)"""
+        chaves = [serie.chave for serie in arquivo.series]
+        # Séries que saíram do arquivo e pontos que o arquivo gravou antes (as safras de outras origens ficam)
+        self.conexao.execute(
+            f"DELETE FROM series WHERE fonte = ? AND chave NOT IN ({', '.join('?' * len(chaves))})",
+            (arquivo.fonte, *chaves))
+        self.conexao.execute(
+            'DELETE FROM pontos WHERE origem = ? AND serie IN (SELECT id FROM series WHERE fonte = ?)',
+            (arquivo.fonte, arquivo.fonte))
+
+        self.conexao.executemany(UPSERT_SERIE, [
+            (s.chave, s.fonte, s.ods, s.indicador, s.unidade, territorio_da_serie(s), int(s.principal), s.meta)
+            for s in arquivo.series
+        ])
+        ids = self._ids(chaves)
+        self.conexao.executemany(UPSERT_PONTO, (
+            (ids[serie.chave], ano, valor, arquivo.fonte)
+            for serie in arquivo.series
+            for ano, valor in zip(serie.anos, serie.valores)
+        ))
+        self.conexao.execute('INSERT OR REPLACE INTO arquivos (fonte, hash) VALUES (?, ?)',
+                             (arquivo.fonte, arquivo.hash))
+
+    def carregar(self, pontos, origem):
+        """
+        Grava em lote (upsert) `pontos` de uma safra externa, dicionários
+        com `chave`, `ano` e `valor`. Séries inexistentes são criadas com
+        `ods`, `indicador`, `unidade` e `territorio` do primeiro ponto.
+        Retorna o número de pontos gravados.
+        """
+        pontos = list(pontos)
+        novas = {}
+        for ponto in pontos:
+            novas.setdefault(ponto['chave'], ponto)
+        with self._transacao():
+            existentes = self._ids(novas)
+            self.conexao.executemany(
+                'INSERT INTO series (chave, fonte, ods, indicador, unidade, territorio) VALUES (?, ?, ?, ?, ?, ?)',
+                [(chave, origem, p.get('ods') or '', p.get('indicador') or '', p.get('unidade') or '',
+                  p.get('territorio') or TERRITORIO_ESTADO)
+                 for chave, p in novas.items() if chave not in existentes])
+            ids = self._ids(novas)
+            self.conexao.executemany(UPSERT_PONTO, (
+                (ids[p['chave']], int(p['ano']), float(p['valor']), origem) for p in pontos
+            ))
+        return len(pontos)
+
+    def _ids(self, chaves):
+        """{chave: id} das séries existentes entre `chaves`"""
+        ids = {}
+        chaves = list(chaves)
+        for i in range(0, len(chaves), 500):
+            lote = chaves[i:i + 500]
+            ids.update(self.conexao.execute(
+                f"SELECT chave, id FROM series WHERE chave IN ({', '.join('?' * len(lote))})", lote))
+        return ids
+
+    def _propriedade(self, nome):
+        linha = self.conexao.execute('SELECT valor FROM propriedades WHERE nome = ?', (nome,)).fetchone()
+        return linha[0] if linha else None
+
+    def _definir_propriedade(self, nome, valor):
+        self.conexao.execute('INSERT OR REPLACE INTO propriedades (nome, valor) VALUES (?, ?)', (nome, valor))
+
+    # Consultas
+
+    def series(self, ods=None, indicador=None, territorio=None):
+        """Atributos das séries (dicionários com COLUNAS_SERIES), filtradas por ODS, indicador e território"""
+        filtros, valores = _filtros(ods=ods, indicador=indicador, territorio=territorio)
+        consulta = f"SELECT {', '.join(COLUNAS_SERIES)} FROM series{filtros} ORDER BY chave"
+        return [dict(zip(COLUNAS_SERIES, linha)) for linha in self.conexao.execute(consulta, valores)]
+
+    def principal(self, ods, territorio=TERRITORIO_ESTADO):
+        """Chave da série do indicador principal do ODS no território (None se não houver)"""
+        linha = self.conexao.execute(
+            'SELECT chave FROM series WHERE ods = ? AND territorio = ? AND principal ORDER BY chave LIMIT 1',
+            (ods, territorio)).fetchone()
+        return linha[0] if linha else None
+
+    def _pontos(self, chave, ano_inicio=None, ano_fim=None):
+        consulta = 'SELECT ano, valor FROM pontos WHERE serie = (SELECT id FROM series WHERE chave = ?)'
+        valores = [chave]
+        if ano_inicio is not None:
+            consulta += ' AND ano >= ?'
+            valores.append(ano_inicio)
+        if ano_fim is not None:
+            consulta += ' AND ano <= ?'
+            valores.append(ano_fim)
+        return self.conexao.execute(consulta + ' ORDER BY ano', valores).fetchall()
+
+    def historico(self, chave, ano_inicio=None, ano_fim=None):
+        """Pontos da série no intervalo, no formato dos geradores: [{'ano': 2017, 'valor': 2.1}, ...]"""
+        return [{'ano': ano, 'valor': valor} for ano, valor in self._pontos(chave, ano_inicio, ano_fim)]
+
+    def intervalo(self, chave, ano_inicio=None, ano_fim=None):
+        """(anos, valores) da série no intervalo, como arrays NumPy"""
+        pontos = self._pontos(chave, ano_inicio, ano_fim)
+        return (np.array([p[0] for p in pontos], dtype=np.int32),
+                np.array([p[1] for p in pontos], dtype=np.float64))
+
+    def ultimo(self, chave):
+        """(ano, valor) do ponto mais recente da série (None se não houver)"""
+        return self.conexao.execute(
+            'SELECT ano, valor FROM pontos WHERE serie = (SELECT id FROM series WHERE chave = ?) '
+            'ORDER BY ano DESC LIMIT 1', (chave,)).fetchone()
+
+    def ultimos(self, ods=None, territorio=None):
+        """{chave: (ano, valor)} do ponto mais recente de cada série do ODS e do território"""
+        filtros, valores = _filtros('s.', ods=ods, territorio=territorio)
+        return {chave: (ano, valor) for chave, ano, valor in self.conexao.execute(
+            'SELECT s.chave, p.ano, p.valor FROM series s JOIN pontos p ON p.serie = s.id '
+            f'AND p.ano = (SELECT MAX(ano) FROM pontos WHERE serie = s.id){filtros} ORDER BY s.chave', valores)}
+
+    def percorrer_ultimos(self, ods=None, municipios=False):
+        """
+        Cursor com o ponto mais recente de cada série de algum ODS, como
+        tuplas (chave, territorio, ods, indicador, unidade, ano, valor, meta)
+        ordenadas por território, ODS e chave. As linhas são lidas da base à
+        medida que o cursor é percorrido. Com `municipios`, só as séries de
+        `dados/municipios/`.
+        """
+        filtros, valores = _filtros('s.', ' AND ', ods=ods)
+        if municipios:
+            filtros += " AND s.fonte LIKE 'municipios/%'"
+        return self.conexao.execute(
+            'SELECT s.chave, s.territorio, s.ods, s.indicador, s.unidade, p.ano, p.valor, s.meta FROM series s '
+            'JOIN pontos p ON p.serie = s.id AND p.ano = (SELECT MAX(ano) FROM pontos WHERE serie = s.id) '
+            f"WHERE s.ods != ''{filtros} ORDER BY s.territorio, CAST(SUBSTR(s.ods, 4) AS INTEGER), s.chave", valores)
+
+    def ano(self, ano, ods=None):
+        """{chave: valor} de todas as séries (do ODS) com ponto no ano"""
+        filtros, valores = _filtros('s.', ' AND ', ods=ods)
+        return dict(self.conexao.execute(
+            f'SELECT s.chave, p.valor FROM pontos p JOIN series s ON s.id = p.serie WHERE p.ano = ?{filtros}',
+            (ano, *valores)))
+
+    def matriz(self, chaves, anos=None):
+        """
+        (anos, matriz séries × anos com NaN nos anos sem dado, metas) das
+        `chaves`, em uma consulta; é a partir dela que o armazém colunar é
+        montado (ver armazem.py). Uma chave sem série fica só com NaN.
+        """
+        chaves = list(chaves)
+        linha_da_chave = {chave: i for i, chave in enumerate(chaves)}
+        selecao = 'WHERE s.chave IN (SELECT value FROM json_each(?))'
+        parametro = (json.dumps(chaves),)
+        metas = np.full(len(chaves), np.nan)
+        for chave, meta in self.conexao.execute(f'SELECT s.chave, s.meta FROM series s {selecao}', parametro):
+            if meta is not None:
+                metas[linha_da_chave[chave]] = meta
+        pontos = self.conexao.execute(
+            f'SELECT s.chave, p.ano, p.valor FROM series s JOIN pontos p ON p.serie = s.id {selecao}',
+            parametro).fetchall()
+        linhas = np.array([linha_da_chave[p[0]] for p in pontos], dtype=np.int64)
+        anos, matriz = preencher_matriz(linhas, np.array([p[1] for p in pontos], dtype=np.int32),
+                                        np.array([p[2] for p in pontos], dtype=np.float64), len(chaves), anos)
+        return anos, matriz, metas
+
+    def assinatura(self, chave):
+        """Hash dos pontos da série, para o manifesto notar safras carregadas fora dos JSON"""
+        return hashlib.sha256(repr(self._pontos(chave)).encode()).hexdigest()
+
+    def assinatura_base(self):
+        """
+        Hash do conteúdo da base: SHA-256 dos arquivos importados, versão da
+        leitura e, para cada safra carregada de fora dos JSON, a contagem e
+        as somas dos seus pontos. Muda sempre que uma importação ou uma
+        carga muda os dados (ver armazem.carregar_armazem).
+        """
+        return hash_parametros({
+            'leitura': self._propriedade('versao_leitura'),
+            'arquivos': self.conexao.execute('SELECT fonte, hash FROM arquivos ORDER BY fonte').fetchall(),
+            'safras': self.conexao.execute(
+                'SELECT origem, COUNT(*), TOTAL(ano), TOTAL(valor), TOTAL(ano * valor) FROM pontos '
+                'WHERE origem NOT IN (SELECT fonte FROM arquivos) GROUP BY origem ORDER BY origem').fetchall(),
+        })
+
+    def resumo(self):
+        """{'series', 'pontos', 'arquivos'}: contagens da base"""
+        return {tabela: self.conexao.execute(f'SELECT COUNT(*) FROM {tabela}').fetchone()[0]
+                for tabela in ('series', 'pontos', 'arquivos')}
+
+
+def _filtros(prefixo='', juncao=' WHERE ', **colunas):
+    """(' WHERE a = ? AND b = ?', valores) para as colunas informadas (ignora None)"""
+    usadas = [(coluna, valor) for coluna, valor in colunas.items() if valor is not None]
+    if not usadas:
+        return '', []
+    return juncao + ' AND '.join(f'{prefixo}{coluna} = ?' for coluna, _ in usadas), [v for _, v in usadas]
+
+
+_bancos = {}
+
+
+def abrir_banco(dados_dir=DADOS_DIR, caminho=SERIES_FILE, sincronizar=True):
+    """
+    Retorna a base de séries em `caminho`, reaproveitando a conexão já aberta
+    neste processo e nesta thread, sincronizada com `dados_dir`.
+    """
+    chave = (os.path.abspath(caminho), os.getpid(), threading.get_ident())
+    banco = _bancos.get(chave)
+    if banco is None:
+        banco = _bancos[chave] = BancoSeries(caminho)
+    if sincronizar:
+        inicio = time.perf_counter()
+        importados = banco.sincronizar(dados_dir)
+        if importados:
+            print(f"Base de séries: {importados} arquivo(s) importado(s) em {time.perf_counter() - inicio:.2f} s")
+    return banco
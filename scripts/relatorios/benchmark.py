@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de escala do pipeline de relatórios.
+
+Gera árvores `dados/` sintéticas em escalas crescentes (número de ODS, anos
+por série, municípios e indicadores complementares por arquivo) e executa
+nelas, com a instrumentação ligada (ver instrumentacao.py):
+
+- `ods12`: o relatório do ODS 12 (carregar → analisar → gráficos → PDF);
+- `aprimorar`: o relatório aprimorado do ODS 12;
+- `lote`: os relatórios de todos os ODS;
+- `municipios`: os relatórios por município e ODS.
+
+Cada escala roda em um processo novo, para que o pico de memória não herde
+o das escalas anteriores, e é repetida `repeticoes` vezes (a mediana do tempo
+de cada etapa é o resultado). Por etapa são registrados wall, CPU e pico de
+memória; por fase, a vazão em relatórios por segundo.
+
+O resultado pode ser salvo como linha de base e comparado com ela: uma
+etapa regride quando fica mais lenta que a base além de `limite` (fração) e
+de `minimo_s` segundos, e uma fase quando sua vazão cai na mesma proporção.
+
+    limfs-relatorios benchmark --escalas pequena media --salvar-base
+    limfs-relatorios benchmark --escalas pequena media --limite 0.2   # sai com 1 se regredir
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import platform
+import statistics
+import tempfile
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from .config import ConfigRelatorios, CORES_ODS
+
+# Escalas: ODS com arquivo de indicador, anos por série, municípios e
+# indicadores complementares por arquivo
+ESCALAS = {
+    'pequena': {'ods': 6, 'anos': 8, 'municipios': 4, 'indicadores': 4},
+    'media': {'ods': 18, 'anos': 20, 'municipios': 20, 'indicadores': 12},
+    'grande': {'ods': 18, 'anos': 40, 'municipios': 80, 'indicadores': 40},
+}
+FASES = ('ods12', 'aprimorar', 'lote', 'municipios')
+LIMITE_REGRESSAO = 0.25
+MINIMO_REGRESSAO_S = 0.05
+VERSAO_RESULTADO = 1
+
+# Slugs dos arquivos de indicador (o do ODS 12 é o que ods12.py espera)
+SLUGS_ODS = {
+    1: 'pobreza', 2: 'fome_zero', 3: 'saude', 4: 'educacao', 5: 'genero', 6: 'agua_saneamento',
+    7: 'energia', 8: 'trabalho', 9: 'industria', 10: 'desigualdades', 11: 'cidades',
+    12: 'consumo_producao', 13: 'clima', 14: 'vida_agua', 15: 'vida_terrestre', 16: 'paz_justica',
+    17: 'parcerias', 18: 'igualdade_racial',
+}
+TENDENCIAS = ('crescente', 'decrescente', 'estável')
+ANO_FINAL = 2024
+
+
+def _gravar_json(caminho, dados):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as file:
+        json.dump(dados, file, ensure_ascii=False)
+
+
+def _indicador_sintetico(rng, numero, anos, indicadores):
+    """Arquivo de indicador no formato de dados/indicadores/ods*_*.json"""
+    inicio = rng.uniform(5, 60)
+    passo = rng.uniform(-1.5, 2.5)
+    historico = []
+    valor = inicio
+    for ano in range(ANO_FINAL - anos + 1, ANO_FINAL + 1):
+        valor = max(0.1, valor + passo + rng.gauss(0, 0.8))
+        historico.append({'ano': ano, 'valor': round(valor, 2)})
+    dados = {
+        'meta': {
+            'titulo': f'ODS {numero} - Indicador sintético {numero}',
+            'descricao': f'Objetivo sintético {numero} para o benchmark de escala',
+            'ultima_atualizacao': f'{ANO_FINAL + 1}-04-12',
+            'cor_primaria': CORES_ODS.get(f'ods{numero}', '#1E386A'),
+        },
+        'dados': {'valor': historico[-1]['valor'], 'unidade': '%',
+                  'descricao': f'Indicador principal sintético do ODS {numero}'},
+        'historico': historico,
+        'indicadores_detalhados': [
+            {'nome': f'Indicador complementar {i + 1}', 'valor': round(rng.uniform(0, 100), 1),
+             'unidade': '%', 'tendencia': rng.choice(TENDENCIAS)}
+            for i in range(indicadores)
+        ],
+    }
+    if rng.random() < 0.7:
+        dados['meta_2030'] = round(historico[-1]['valor'] * rng.uniform(1.1, 1.6), 1)
+    return dados
+
+
+def gerar_arvore(destino, ods, anos, municipios, indicadores, semente=0):
+    """
+    Cria em `destino/dados` uma árvore sintética e retorna `destino`.
+
+    São gerados os ODS 1 a `ods` (o ODS 12 sempre, pois os relatórios do
+    ODS 12 dependem dele), `ods-config.json`, `residuos_reciclados.json` e
+    `municipios` diretórios municipais com os mesmos ODS. As séries têm
+    `anos` pontos até 2024 e cada arquivo tem `indicadores` indicadores
+    complementares. A mesma semente gera a mesma árvore.
+    """
+    rng = random.Random(semente)
+    dados_dir = os.path.join(destino, 'dados')
+    numeros = sorted(set(range(1, min(ods, len(SLUGS_ODS)) + 1)) | {12})
+
+    _gravar_json(os.path.join(dados_dir, 'ods-config.json'), {
+        'objetivos_desenvolvimento_sustentavel': [
+            {'id': n, 'codigo': f'ods{n}', 'titulo': f'Objetivo sintético {n}',
+             'descricao': f'Objetivo sintético {n} para o benchmark de escala',
+             'cor_primaria': CORES_ODS.get(f'ods{n}')}
+            for n in numeros
+        ]
+    })
+    _gravar_json(os.path.join(dados_dir, 'residuos_reciclados.json'), {
+        'fonte': 'residuos_reciclados', 'ultimaAtualizacao': f'{ANO_FINAL + 1}-04-12',
+        'dados': {'valor': 6.2, 'ano': ANO_FINAL},
+    })
+    for n in numeros:
+        _gravar_json(os.path.join(dados_dir, 'indicadores', f'ods{n}_{SLUGS_ODS[n]}.json'),
+                     _indicador_sintetico(rng, n, anos, indicadores))
+
+    for m in range(municipios):
+        diretorio = os.path.join(dados_dir, 'municipios', f'municipio-{m:03d}')
+        _gravar_json(os.path.join(diretorio, 'municipio.json'), {'nome': f'Município {m:03d}'})
+        for n in numeros:
+            _gravar_json(os.path.join(diretorio, f'ods{n}_{SLUGS_ODS[n]}.json'),
+                         _indicador_sintetico(rng, n, anos, indicadores))
+    return destino
+
+
+def _tamanho_arvore(destino):
+    arquivos, total = 0, 0
+    for raiz, _, nomes in os.walk(os.path.join(destino, 'dados')):
+        for nome in nomes:
+            arquivos += 1
+            total += os.path.getsize(os.path.join(raiz, nome))
+    return {'arquivos': arquivos, 'bytes': total}
+
+
+def _executar_fases(config, backend_graficos, max_workers):
+    """Executa as fases uma vez, medindo cada uma; retorna o número de relatórios por fase"""
+    from . import api
+    from .instrumentacao import medir
+
+    relatorios = {}
+    with medir('ods12', fase='ods12'):
+        api.gerar_relatorio_ods12(config, backend_graficos, forcar=True)
+    relatorios['ods12'] = 1
+    with medir('aprimorar', fase='aprimorar'):
+        api.aprimorar_relatorio_ods12(config, backend_graficos, forcar=True)
+    relatorios['aprimorar'] = 1
+    with medir('lote', fase='lote'):
+        resultados, _ = api.gerar_relatorios(config, max_workers=max_workers, backend_graficos=backend_graficos,
+                                             forcar=True)
+    relatorios['lote'] = len(resultados)
+    with medir('municipios', fase='municipios'):
+        resultados, _, _ = api.gerar_relatorios_municipios(config, max_workers=max_workers,
+                                                           backend_graficos=backend_graficos, forcar=True)
+    relatorios['municipios'] = len(resultados)
+    return relatorios
+
+
+def _etapas_da_repeticao(registros, pid):
+    """
+    Soma os registros por etapa. Etapas dos trabalhadores dos pools (outro
+    pid) recebem o prefixo da fase, como as do próprio processo:
+    `lote/relatorio/gerar_graficos`.
+    """
+    etapas = {}
+    for r in registros:
+        chave = r['caminho'] if r['pid'] == pid else f"{r['rotulos'].get('fase', '?')}/{r['caminho']}"
+        etapa = etapas.setdefault(chave, {'wall_s': 0.0, 'cpu_s': 0.0, 'rss_pico_mb': 0.0, 'quantidade': 0})
+        etapa['wall_s'] += r['wall_s']
+        etapa['cpu_s'] += r['cpu_s']
+        etapa['rss_pico_mb'] = max(etapa['rss_pico_mb'], r.get('rss_pico_mb') or 0.0)
+        etapa['quantidade'] += 1
+    return etapas
+
+
+def executar_escala(nome, parametros, diretorio, repeticoes=3, backend_graficos='vetorial', max_workers=None,
+                    semente=0):
+    """
+    Gera a árvore da escala em `diretorio/nome` e executa as fases
+    `repeticoes` vezes. Retorna {parametros, dados, etapas, vazao}, com a
+    mediana de wall e CPU e o maior pico de memória de cada etapa.
+    """
+    from .instrumentacao import configurar, ler_metricas
+
+    # Importações fora da medição: o custo de inicialização é medido à parte (--medir-inicio)
+    from . import api, ods12, ods12_aprimorado, lote, municipios
+
+    destino = gerar_arvore(os.path.join(diretorio, nome), semente=semente, **parametros)
+    config = ConfigRelatorios(destino)
+    repeticoes_etapas, duracoes = [], []
+    for i in range(repeticoes):
+        # Sem saídas nem caches da repetição anterior
+        shutil.rmtree(config.report_dir, ignore_errors=True)
+        os.makedirs(config.report_dir)
+        metricas = os.path.join(destino, f'metricas_{i}.jsonl')
+        configurar(metricas)
+        try:
+            with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+                relatorios = _executar_fases(config, backend_graficos, max_workers)
+        finally:
+            configurar()
+        etapas = _etapas_da_repeticao(ler_metricas(metricas), os.getpid())
+        repeticoes_etapas.append(etapas)
+        duracoes.append({fase: etapas[fase]['wall_s'] for fase in FASES})
+
+    etapas = {}
+    for chave in repeticoes_etapas[0]:
+        medidas = [r[chave] for r in repeticoes_etapas if chave in r]
+        etapas[chave] = {
+            'wall_s': statistics.median(m['wall_s'] for m in medidas),
+            'cpu_s': statistics.median(m['cpu_s'] for m in medidas),
+            'rss_pico_mb': max(m['rss_pico_mb'] for m in medidas),
+            'quantidade': medidas[0]['quantidade'],
+        }
+    vazao = {fase: relatorios[fase] / statistics.median(d[fase] for d in duracoes) for fase in FASES}
+    return {'parametros': parametros, 'dados': _tamanho_arvore(destino), 'relatorios': relatorios,
+            'etapas': etapas, 'vazao': vazao}
+
+
+def executar_benchmark(escalas=('pequena', 'media'), repeticoes=3, backend_graficos='vetorial', max_workers=None,
+                       diretorio=None, semente=0):
+    """
+    Executa as escalas, cada uma em um processo novo, e retorna o resultado
+    completo ({versao, ambiente, configuracao, escalas}).
+
+    As árvores são criadas em `diretorio` (padrão: um diretório temporário,
+    removido ao final).
+    """
+    temporario = diretorio is None
+    diretorio = diretorio or tempfile.mkdtemp(prefix='limfs_benchmark_')
+    resultado = {
+        'versao': VERSAO_RESULTADO,
+        'ambiente': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                     'cpus': os.cpu_count()},
+        'configuracao': {'repeticoes': repeticoes, 'graficos': backend_graficos, 'workers': max_workers,
+                         'semente': semente},
+        'escalas': {},
+    }
+    try:
+        for nome in escalas:
+            print(f"Escala '{nome}' {ESCALAS[nome]}...", file=sys.stderr)
+            # fork: o processo da escala começa com este, que não importou matplotlib nem reportlab
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('fork')) as executor:
+                resultado['escalas'][nome] = executor.submit(
+                    executar_escala, nome, ESCALAS[nome], diretorio, repeticoes, backend_graficos,
+                    max_workers, semente).result()
+    finally:
+        if temporario:
+            shutil.rmtree(diretorio, ignore_errors=True)
+    return resultado
+
+
+def comparar(resultado, base, limite=LIMITE_REGRESSAO, minimo_s=MINIMO_REGRESSAO_S):
+    """
+    Compara `resultado` com a linha de base e retorna a lista de regressões
+    ({escala, etapa, base, atual, variacao}).
+
+    Só são comparadas escalas e etapas presentes nos dois. Uma etapa regride
+    quando seu wall passa de `base × (1 + limite)` e aumenta mais de
+    `minimo_s` segundos (etapas de milissegundos oscilam demais); uma fase,
+    quando sua vazão cai abaixo de `base / (1 + limite)`.
+    """
+    regressoes = []
+    for nome, escala in resultado['escalas'].items():
+        escala_base = base.get('escalas', {}).get(nome)
+        if not escala_base:
+            continue
+        for chave, etapa in escala['etapas'].items():
+            anterior = escala_base['etapas'].get(chave)
+            if anterior is None:
+                continue
+            if (etapa['wall_s'] > anterior['wall_s'] * (1 + limite)
+                    and etapa['wall_s'] - anterior['wall_s'] > minimo_s):
+                regressoes.append({'escala': nome, 'etapa': chave, 'base': anterior['wall_s'],
+                                   'atual': etapa['wall_s'],
+                                   'variacao': etapa['wall_s'] / anterior['wall_s'] - 1})
+        for fase, vazao in escala['vazao'].items():
+            anterior = escala_base['vazao'].get(fase)
+            if anterior and vazao < anterior / (1 + limite):
+                regressoes.append({'escala': nome, 'etapa': f'vazao:{fase}', 'base': anterior, 'atual': vazao,
+                                   'variacao': vazao / anterior - 1})
+    return regressoes
+
+
+def ler_resultado(caminho):
+    """Resultado salvo por `salvar_resultado` (None se o arquivo não existe)"""
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def salvar_resultado(resultado, caminho):
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as file:
+        json.dump(resultado, file, ensure_ascii=False, indent=2, sort_keys=True)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Cache persistente de gráficos endereçado por conteúdo.
+
+A chave de cada gráfico é o hash dos dados plotados, rótulos, parâmetros da
+figura (tamanho, dpi, cores) e do estado do matplotlib (rcParams e versão).
+Se a chave já existe em `docs/relatorios/charts/cache`, o PNG é reaproveitado
+e só copiado para o caminho de destino; caso contrário o gráfico é desenhado.
+Os formatos exportados de um mesmo desenho (SVG, miniatura, ver
+imagens.exportar_figura) ficam ao lado do PNG, com a mesma chave.
+
+A limpeza remove entradas mais antigas que `max_idade_dias` e, em seguida, as
+menos usadas recentemente até que o cache caiba em `max_bytes`.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+
+from .config import CACHE_GRAFICOS_DIR
+
+MAX_BYTES_PADRAO = 200 * 1024 * 1024
+MAX_IDADE_DIAS_PADRAO = 30
+EXTENSOES = ('.png', '.jpg', '.jpeg', '.svg')
+
+
+def _estado_matplotlib():
+    """Resumo estável do estado global do matplotlib que afeta a renderização"""
+    import matplotlib as mpl
+    return {
+        'versao': mpl.__version__,
+        'backend': mpl.get_backend(),
+        'rcParams': repr(sorted((k, repr(v)) for k, v in mpl.rcParams.items())),
+    }
+
+
+def calcular_chave(parametros):
+    """Hash SHA-256 dos parâmetros do gráfico e do estado do matplotlib"""
+    conteudo = json.dumps(
+        {'grafico': parametros, 'matplotlib': _estado_matplotlib()},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+class CacheGraficos:
+    """Cache de imagens (PNG ou JPEG) indexado pelo hash do conteúdo do gráfico"""
+
+    def __init__(self, diretorio=CACHE_GRAFICOS_DIR, max_bytes=MAX_BYTES_PADRAO,
+                 max_idade_dias=MAX_IDADE_DIAS_PADRAO, ativo=True):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.max_idade = max_idade_dias * 86400 if max_idade_dias else None
+        self.ativo = ativo
+        self.acertos = 0
+        self.falhas = 0
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def caminho_entrada(self, chave, extensao='.png'):
+        return os.path.join(self.diretorio, f'{chave}{extensao}')
+
+    def obter(self, destino, parametros, desenhar):
+        """
+        Garante que `destino` contenha o gráfico descrito por `parametros`.
+
+        `desenhar(caminho)` só é chamado quando não há entrada válida no cache;
+        deve salvar o PNG em `caminho`. Retorna o caminho de destino.
+        """
+        if not self.ativo:
+            desenhar(destino)
+            return destino
+
+        chave = calcular_chave(parametros)
+        extensao = os.path.splitext(destino)[1].lower() or '.png'
+        entrada = self.caminho_entrada(chave, extensao)
+
+        if os.path.exists(entrada):
+            self.acertos += 1
+            os.utime(entrada)  # marca o uso recente para a limpeza por LRU
+        else:
+            self.falhas += 1
+            temporario = f'{entrada}.{os.getpid()}.tmp{extensao}'
+            desenhar(temporario)
+            os.replace(temporario, entrada)
+
+        if os.path.abspath(destino) != os.path.abspath(entrada):
+            os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+            shutil.copyfile(entrada, destino)
+        return destino
+
+    def obter_exportacoes(self, saidas, parametros, exportar):
+        """
+        Como `obter`, para os formatos de um único desenho: `saidas` é
+        {formato: destino}, com a imagem de impressão em 'impressao' e None
+        para os formatos devolvidos em bytes (inclusive 'buffer', os bytes da
+        impressão). `exportar(caminhos)` grava todos os formatos de uma vez e
+        só é chamado se faltar alguma entrada. Retorna {formato: destino ou bytes}.
+        """
+        if not self.ativo:
+            return exportar(saidas)
+
+        from .imagens import EXTENSOES_EXPORTACAO
+
+        chave = calcular_chave(parametros)
+        entradas = {}
+        for formato in saidas:
+            if formato in ('impressao', 'buffer'):
+                extensao = os.path.splitext(saidas.get('impressao') or '')[1].lower() or '.png'
+                entradas[formato] = self.caminho_entrada(chave, extensao)
+            else:
+                entradas[formato] = self.caminho_entrada(f'{chave}-{formato}', EXTENSOES_EXPORTACAO[formato])
+
+        faltantes = {formato: entrada for formato, entrada in entradas.items()
+                     if formato != 'buffer' and not os.path.exists(entrada)}
+        if 'buffer' in entradas and not os.path.exists(entradas['buffer']):
+            faltantes['impressao'] = entradas['buffer']
+        if faltantes:
+            self.falhas += 1
+            temporarios = {f: f'{e}.{os.getpid()}.tmp{os.path.splitext(e)[1]}' for f, e in faltantes.items()}
+            exportar(temporarios)
+            for formato, temporario in temporarios.items():
+                os.replace(temporario, faltantes[formato])
+        else:
+            self.acertos += 1
+
+        resultado = {}
+        for formato, entrada in entradas.items():
+            os.utime(entrada)  # marca o uso recente para a limpeza por LRU
+            destino = saidas[formato]
+            if destino:
+                if os.path.abspath(destino) != os.path.abspath(entrada):
+                    os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+                    shutil.copyfile(entrada, destino)
+                resultado[formato] = destino
+            else:
+                with open(entrada, 'rb') as file:
+                    resultado[formato] = file.read()
+        return resultado
+
+    def limpar(self):
+        """Remove entradas expiradas e as menos usadas até respeitar o limite de tamanho"""
+        agora = time.time()
+        entradas = []
+        removidas = 0
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(EXTENSOES) or '.tmp' in nome:
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                info = os.stat(caminho)
+            except FileNotFoundError:
+                continue
+            if self.max_idade and agora - info.st_mtime > self.max_idade:
+                os.remove(caminho)
+                removidas += 1
+                continue
+            entradas.append((info.st_mtime, info.st_size, caminho))
+
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        if self.max_bytes is not None:
+            for _, tamanho, caminho in sorted(entradas):
+                if total <= self.max_bytes:
+                    break
+                os.remove(caminho)
+                total -= tamanho
+                removidas += 1
+        return removidas
+
+    def resumo(self):
+        return f"cache de gráficos: {self.acertos} reaproveitados, {self.falhas} renderizados"
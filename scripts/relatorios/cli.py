@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+"""
+Linha de comando `limfs-relatorios`.
+
+Subcomandos:
+
+    gerar        relatórios técnicos de todos os ODS (--ods12: relatório detalhado do ODS 12)
+    aprimorar    relatório técnico aprimorado do ODS 12
+    municipios   relatórios por município e ODS (dados/municipios/)
+    consolidado  todos os ODS e municípios em um PDF (ou em volumes), seção a seção, com memória limitada
+    anexo        anexo estatístico: todos os indicadores de todos os municípios em uma tabela longa
+    painel       artefatos JSON pré-calculados e pré-comprimidos para o painel web (docs/painel/)
+    series       base SQLite das séries temporais: importa dados/, carrega safras em CSV e consulta
+    publicar     copia os PDFs para um diretório endereçado por conteúdo, com manifesto
+    validar      verifica se os arquivos de indicadores podem gerar relatórios
+    listar       lista os ODS disponíveis e os relatórios já gerados
+    metricas     resume um arquivo de métricas por etapa
+    benchmark    mede o pipeline em árvores de dados sintéticas e compara com a linha de base
+    observar     observa dados/ e regenera só os relatórios afetados por cada alteração
+    servir       servidor HTTP local que gera relatórios e gráficos sob demanda, com cache
+
+Com `--metricas ARQUIVO`, cada etapa do pipeline (carregar, analisar,
+gráficos, PDF, cada gráfico) grava uma linha JSON com tempo, CPU e memória;
+`--profile DIR` grava também perfis do cProfile e snapshots do tracemalloc
+(ver `instrumentacao`). Com `--reprodutivel`, os PDFs trazem a data dos
+dados e os mesmos dados geram os mesmos bytes (ver `publicacao`).
+
+Cada subcomando importa apenas os módulos de que precisa: `validar` e
+`listar` não carregam pandas, matplotlib nem reportlab. Com `--medir-inicio`,
+o tempo de inicialização do subcomando (até o fim das suas importações) é
+exibido na saída de erro.
+"""
+
+import time
+
+_INICIO = time.perf_counter()
+
+import os
+import sys
+import argparse
+import importlib
+
+from .config import BACKENDS, ConfigRelatorios
+
+# Módulos importados por subcomando antes da execução
+MODULOS = {
+    'gerar': ('.api', '.lote', '.manifesto'),
+    'gerar_ods12': ('.api', '.ods12', '.manifesto'),
+    'aprimorar': ('.api', '.ods12_aprimorado', '.manifesto'),
+    'municipios': ('.api', '.municipios', '.manifesto'),
+    'consolidado': ('.api', '.consolidado', '.gerador'),
+    'anexo': ('.api', '.anexos', '.manifesto'),
+    'painel': ('.api', '.painel', '.manifesto'),
+    'series': ('.api', '.banco_series'),
+    'publicar': ('.api', '.publicacao'),
+    'validar': ('.api', '.validacao'),
+    'listar': ('.api', '.validacao'),
+    'metricas': ('.instrumentacao',),
+    'benchmark': ('.benchmark',),
+    'observar': ('.observador',),
+    'servir': ('.servidor',),
+}
+
+
+def _gerar(args, config):
+    from . import api
+
+    if args.ods12:
+        print("=== Gerador de Relatório Técnico ODS 12 ===")
+        saida = api.gerar_relatorio_ods12(config, args.graficos, args.forcar)
+        print("\n=== Processo concluído com sucesso ===")
+        print(f"Relatório disponível em: {saida}")
+        return 0
+
+    print("=== Gerador de Relatórios Técnicos ODS ===")
+    inicio = time.perf_counter()
+    resultados, erros = api.gerar_relatorios(config, filtro=args.ods, max_workers=args.workers,
+                                             backend_graficos=args.graficos, forcar=args.forcar,
+                                             exportar=args.exportar or ())
+    total = time.perf_counter() - inicio
+
+    for resultado in resultados:
+        situacao = 'atualizado' if resultado.get('atualizado') else f"{resultado['duracao']:.2f}s"
+        print(f"  {resultado['codigo']:>5}: {situacao} -> {resultado['relatorio']}")
+
+    gerados = [r for r in resultados if not r.get('atualizado')]
+    soma = sum(r['duracao'] for r in gerados)
+    print(f"\n=== {len(gerados)} relatórios gerados, {len(resultados) - len(gerados)} já atualizados, "
+          f"em {total:.2f}s (soma sequencial: {soma:.2f}s) ===")
+    print(f"Relatórios disponíveis em: {config.report_dir}")
+
+    if erros:
+        print(f"{len(erros)} relatório(s) com erro")
+        return 1
+    return 0
+
+
+def _aprimorar(args, config):
+    from . import api
+
+    saida = api.aprimorar_relatorio_ods12(config, args.graficos, args.forcar)
+    print(f"Processo concluído! O relatório técnico aprimorado foi salvo em: {saida}")
+    return 0
+
+
+def _municipios(args, config):
+    from . import api
+
+    print("=== Relatórios Técnicos por Município ===")
+    resultados, erros, resumo = api.gerar_relatorios_municipios(
+        config, municipios=args.municipio, filtro=args.ods, max_workers=args.workers,
+        backend_graficos=args.graficos, forcar=args.forcar)
+    if not resultados and not erros:
+        print(f"Nenhum dado municipal encontrado em {config.municipios_dir}")
+        return 0
+
+    print(f"\n=== {resumo['gerados']} relatórios gerados, {resumo['atualizados']} já atualizados, "
+          f"{resumo['erros']} com erro, em {resumo['duracao']:.2f}s "
+          f"({resumo['relatorios_por_segundo']:.1f} relatórios/s) ===")
+    for pid, pico in sorted(resumo['pico_memoria_mb'].items()):
+        print(f"  processo {pid}: pico de memória {pico:.0f} MB")
+    print(f"Relatórios disponíveis em: {config.municipios_report_dir}")
+    return 1 if erros else 0
+
+
+def _consolidado(args, config):
+    from . import api
+
+    print("=== Relatório Consolidado dos ODS ===")
+    resumo = api.gerar_relatorio_consolidado(config, filtro=args.ods, incluir_municipios=not args.sem_municipios,
+                                             paginas_por_volume=args.paginas_por_volume,
+                                             backend_graficos=args.graficos,
+                                             anexo_estatistico=args.anexo_estatistico)
+    pico = f", pico de memória {resumo['pico_memoria_mb']:.0f} MB" if resumo['pico_memoria_mb'] else ''
+    print(f"\n=== {resumo['secoes']} seções, {resumo['paginas']} páginas em {len(resumo['volumes'])} "
+          f"volume(s), em {resumo['duracao']:.2f}s{pico} ===")
+    for volume in resumo['volumes']:
+        print(f"  {volume}")
+    if resumo['erros']:
+        print(f"{len(resumo['erros'])} seção(ões) com erro")
+        return 1
+    return 0
+
+
+def _anexo(args, config):
+    from . import api
+
+    resumo = api.gerar_anexo_estatistico(config, filtro=args.ods, forcar=args.forcar)
+    if resumo['atualizado']:
+        print(f"Anexo já atualizado, nada a fazer (use --forcar para gerar novamente): {resumo['relatorio']}")
+        return 0
+    print(f"=== {resumo['linhas']} linhas em {resumo['paginas']} páginas, em {resumo['duracao']:.2f}s ===")
+    print(f"Anexo disponível em: {resumo['relatorio']}")
+    return 0
+
+
+def _painel(args, config):
+    from . import api
+
+    resumo = api.gerar_painel(config, incluir_municipios=not args.sem_municipios, forcar=args.forcar)
+    if resumo['atualizado']:
+        print(f"Artefatos do painel já atualizados: {resumo['indice']}")
+        return 0
+    comprimidos = ', '.join(f"{formato} {resumo[formato] / 1024:.1f} KB" for formato in ('gzip', 'br')
+                            if formato in resumo)
+    print(f"=== {resumo['artefatos']} artefatos ({resumo['bytes'] / 1024:.1f} KB; {comprimidos}), "
+          f"{resumo['gravados']} arquivos gravados, {resumo['removidos']} removidos, "
+          f"em {resumo['duracao']:.2f}s ===")
+    print(f"Índice: {resumo['indice']}")
+    return 0
+
+
+def _series(args, config):
+    from . import api
+
+    resumo = api.atualizar_series(config, args.csv or (), args.origem)
+    print(f"Base de séries: {resumo['series']} séries, {resumo['pontos']} pontos de {resumo['arquivos']} "
+          f"arquivos ({resumo['importados']} importados, {resumo['carregados']} pontos carregados de CSV, "
+          f"{resumo['duracao']:.2f}s)")
+    if args.chave:
+        for ponto in api.consultar_series(config, args.chave, ano_inicio=args.de, ano_fim=args.ate):
+            print(f"  {ponto['ano']}  {ponto['valor']:g}")
+    elif args.ods or args.territorio:
+        for chave, (ano, valor) in api.consultar_series(config, ods=args.ods, territorio=args.territorio).items():
+            print(f"  {chave}: {valor:g} ({ano})")
+    return 0
+
+
+def _publicar(args, config):
+    from . import api
+
+    resumo = api.publicar_relatorios(config)
+    for nome in resumo['alterados']:
+        print(f"  alterado: {nome}")
+    for nome in resumo['removidos']:
+        print(f"  removido: {nome}")
+    print(f"=== {len(resumo['alterados'])} alterado(s), {resumo['inalterados']} inalterado(s), "
+          f"{len(resumo['removidos'])} removido(s); {resumo['objetos_gravados']} objeto(s) gravado(s), "
+          f"{resumo['objetos_removidos']} removido(s) ===")
+    print(f"Manifesto: {resumo['manifesto']}")
+    return 0
+
+
+def _validar(args, config):
+    from . import api
+
+    problemas = api.validar_dados(config)
+    for problema in problemas:
+        print(f"  [{problema['nivel'].upper():>5}] {problema['arquivo']}: {problema['mensagem']}")
+    erros = sum(1 for p in problemas if p['nivel'] == 'erro')
+    print(f"{erros} erro(s), {len(problemas) - erros} aviso(s)")
+    return 1 if erros else 0
+
+
+def _listar(args, config):
+    from . import api
+
+    for ods in api.listar_ods(config):
+        meta = f"{ods['meta_2030']:g}" if ods['meta_2030'] is not None else '-'
+        relatorio = 'gerado' if ods['relatorio'] else '-'
+        print(f"  {ods['codigo']:>5}  {ods['pontos']:>2} pontos até {ods['ultimo_ano'] or '-'}  "
+              f"meta {meta:>6}  {relatorio:>6}  {ods['titulo']}")
+    return 0
+
+
+def _metricas(args, config):
+    from .instrumentacao import ler_metricas, resumir_metricas
+
+    grupos = resumir_metricas(ler_metricas(args.arquivo))
+    largura = max([len(g['caminho']) for g in grupos] + [5])
+    print(f"{'etapa':<{largura}} {'n':>5} {'erros':>5} {'total s':>9} {'médio s':>9} {'máx s':>9} "
+          f"{'CPU s':>9} {'RSS MB':>7}")
+    for g in grupos:
+        rss = f"{g['rss_pico_mb']:.0f}" if g['rss_pico_mb'] is not None else '-'
+        print(f"{g['caminho']:<{largura}} {g['quantidade']:>5} {g['erros']:>5} {g['wall_total_s']:>9.3f} "
+              f"{g['wall_medio_s']:>9.3f} {g['wall_max_s']:>9.3f} {g['cpu_total_s']:>9.3f} {rss:>7}")
+    return 0
+
+
+def _benchmark(args, config):
+    from . import benchmark
+
+    base_padrao = os.path.join(config.report_dir, 'benchmark', 'linha_de_base.json')
+    resultado = benchmark.executar_benchmark(args.escalas, args.repeticoes, args.graficos, args.workers,
+                                             args.diretorio)
+    saida = args.saida or os.path.join(config.report_dir, 'benchmark', 'resultado.json')
+    benchmark.salvar_resultado(resultado, saida)
+
+    for nome, escala in resultado['escalas'].items():
+        vazao = ', '.join(f"{fase} {valor:.1f}/s" for fase, valor in escala['vazao'].items())
+        print(f"=== {nome}: {escala['parametros']}, {escala['dados']['arquivos']} arquivos, vazão: {vazao} ===")
+        for chave, etapa in sorted(escala['etapas'].items()):
+            print(f"  {chave:<60} {etapa['wall_s']:>8.3f}s  CPU {etapa['cpu_s']:>8.3f}s  "
+                  f"{etapa['rss_pico_mb']:>6.0f} MB")
+    print(f"Resultado salvo em: {saida}")
+
+    base_arquivo = args.base or base_padrao
+    if args.salvar_base:
+        benchmark.salvar_resultado(resultado, base_arquivo)
+        print(f"Linha de base salva em: {base_arquivo}")
+        return 0
+    base = benchmark.ler_resultado(base_arquivo)
+    if base is None:
+        print(f"Sem linha de base em {base_arquivo} (use --salvar-base)")
+        return 0
+    regressoes = benchmark.comparar(resultado, base, args.limite)
+    for r in regressoes:
+        print(f"  REGRESSÃO [{r['escala']}] {r['etapa']}: {r['base']:.3f} -> {r['atual']:.3f} "
+              f"({r['variacao']:+.0%})")
+    print(f"{len(regressoes)} regressão(ões) acima de {args.limite:.0%} em relação a {base_arquivo}")
+    return 1 if regressoes else 0
+
+
+def _observar(args, config):
+    from .observador import observar
+
+    print("=== Observação de dados/ ===")
+    observar(config, backend_graficos=args.graficos, max_workers=args.workers,
+             municipios=not args.sem_municipios, espera=args.espera, varredura=args.varredura,
+             intervalo=args.intervalo, inicial=args.inicial)
+    return 0
+
+
+def _servir(args, config):
+    from .servidor import servir
+
+    servir(config, args.host, args.porta, backend_graficos=args.graficos, max_workers=args.workers,
+           max_bytes_memoria=args.memoria_mb * 2 ** 20, max_bytes_disco=args.disco_mb * 2 ** 20,
+           silencioso=args.silencioso)
+    return 0
+
+
+def _adicionar_opcoes_graficos(subparser):
+    subparser.add_argument('--graficos', choices=BACKENDS, default='vetorial',
+                           help='vetorial (reportlab.graphics) ou matplotlib (PNG a 300 dpi)')
+    subparser.add_argument('--forcar', action='store_true', help='gera mesmo sem mudanças nos dados')
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='limfs-relatorios',
+                                     description='Relatórios técnicos dos ODS do LIMFS')
+    parser.add_argument('--base-dir', help='raiz do repositório (padrão: este repositório)')
+    parser.add_argument('--medir-inicio', action='store_true',
+                        help='exibe o tempo de inicialização do subcomando')
+    parser.add_argument('--metricas', metavar='ARQUIVO',
+                        help='grava métricas por etapa em JSON lines (- para a saída de erro)')
+    parser.add_argument('--profile', '--perfil', dest='perfil', metavar='DIR',
+                        help='grava perfis do cProfile e snapshots do tracemalloc em DIR')
+    parser.add_argument('--reprodutivel', action='store_true',
+                        help='PDFs byte a byte reprodutíveis, com a data da última atualização dos dados')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    gerar = subparsers.add_parser('gerar', help='gera os relatórios técnicos dos ODS')
+    gerar.add_argument('--ods', nargs='+', help='códigos dos ODS a gerar (ex.: ods1 ods12)')
+    gerar.add_argument('--workers', type=int, default=None, help='número de processos (padrão: núcleos da CPU)')
+    gerar.add_argument('--ods12', action='store_true',
+                       help='gera o relatório técnico detalhado do ODS 12 (sem --ods, --workers e --exportar)')
+    gerar.add_argument('--exportar', nargs='+', choices=('web', 'miniatura', 'buffer'),
+                       help='com --graficos matplotlib, grava também o SVG (web) e a miniatura de cada gráfico '
+                            'do mesmo desenho do PNG; buffer passa as imagens ao PDF em memória')
+    _adicionar_opcoes_graficos(gerar)
+    gerar.set_defaults(executar=_gerar)
+
+    aprimorar = subparsers.add_parser('aprimorar', help='gera o relatório técnico aprimorado do ODS 12')
+    _adicionar_opcoes_graficos(aprimorar)
+    aprimorar.set_defaults(executar=_aprimorar)
+
+    municipios = subparsers.add_parser('municipios', help='gera os relatórios por município e ODS')
+    municipios.add_argument('--municipio', nargs='+', help='municípios a gerar (nomes dos diretórios)')
+    municipios.add_argument('--ods', nargs='+', help='códigos dos ODS a gerar (ex.: ods1 ods12)')
+    municipios.add_argument('--workers', type=int, default=None, help='número de processos (padrão: núcleos da CPU)')
+    _adicionar_opcoes_graficos(municipios)
+    municipios.set_defaults(executar=_municipios)
+
+    consolidado = subparsers.add_parser('consolidado', help='gera o relatório consolidado de todos os ODS')
+    consolidado.add_argument('--ods', nargs='+', help='códigos dos ODS a incluir (ex.: ods1 ods12)')
+    consolidado.add_argument('--sem-municipios', action='store_true', help='omite o anexo municipal')
+    consolidado.add_argument('--paginas-por-volume', type=int, default=None,
+                             help='divide o documento em volumes de aproximadamente N páginas')
+    consolidado.add_argument('--graficos', choices=BACKENDS, default='vetorial',
+                             help='vetorial (reportlab.graphics) ou matplotlib (PNG a 300 dpi)')
+    consolidado.add_argument('--anexo-estatistico', action='store_true',
+                             help='termina com a tabela de todos os indicadores de todos os municípios')
+    consolidado.set_defaults(executar=_consolidado)
+
+    anexo = subparsers.add_parser('anexo', help='gera o anexo estatístico dos municípios (tabela longa)')
+    anexo.add_argument('--ods', nargs='+', help='códigos dos ODS a incluir (ex.: ods1 ods12)')
+    anexo.add_argument('--forcar', action='store_true', help='gera mesmo sem mudanças nos dados')
+    anexo.set_defaults(executar=_anexo)
+
+    painel = subparsers.add_parser('painel', help='grava os artefatos pré-calculados do painel web')
+    painel.add_argument('--sem-municipios', action='store_true', help='omite os rankings municipais')
+    painel.add_argument('--forcar', action='store_true', help='gera mesmo sem mudanças nos dados')
+    painel.set_defaults(executar=_painel)
+
+    series = subparsers.add_parser('series', help='atualiza e consulta a base SQLite de séries temporais')
+    series.add_argument('--csv', action='append', metavar='ARQUIVO',
+                        help='carrega uma safra (colunas chave, ano, valor); pode ser repetido')
+    series.add_argument('--origem', metavar='ROTULO', help='rótulo da safra (padrão: nome do arquivo CSV)')
+    series.add_argument('--chave', help='mostra os pontos da série (ex.: indicadores/ods12_consumo_producao)')
+    series.add_argument('--ods', help='mostra o último valor de cada série do ODS (ex.: ods12)')
+    series.add_argument('--territorio', help='mostra o último valor de cada série do território (ex.: sergipe)')
+    series.add_argument('--de', type=int, metavar='ANO', help='primeiro ano (com --chave)')
+    series.add_argument('--ate', type=int, metavar='ANO', help='último ano (com --chave)')
+    series.set_defaults(executar=_series)
+
+    publicar = subparsers.add_parser('publicar', help='publica os PDFs endereçados por conteúdo, com manifesto')
+    publicar.set_defaults(executar=_publicar)
+
+    validar = subparsers.add_parser('validar', help='verifica os arquivos de indicadores')
+    validar.set_defaults(executar=_validar)
+
+    listar = subparsers.add_parser('listar', help='lista os ODS disponíveis')
+    listar.set_defaults(executar=_listar)
+
+    metricas = subparsers.add_parser('metricas', help='resume um arquivo de métricas por etapa')
+    metricas.add_argument('arquivo', help='arquivo JSON lines gravado com --metricas ou --profile')
+    metricas.set_defaults(executar=_metricas)
+
+    bench = subparsers.add_parser('benchmark', help='mede o pipeline em árvores de dados sintéticas')
+    bench.add_argument('--escalas', nargs='+', choices=('pequena', 'media', 'grande'),
+                       default=['pequena', 'media'], help='escalas a medir (padrão: pequena media)')
+    bench.add_argument('--repeticoes', type=int, default=3, help='repetições por escala (vale a mediana)')
+    bench.add_argument('--workers', type=int, default=None, help='processos do lote e dos municípios')
+    bench.add_argument('--graficos', choices=BACKENDS, default='vetorial',
+                       help='vetorial (reportlab.graphics) ou matplotlib (PNG a 300 dpi)')
+    bench.add_argument('--diretorio', help='onde criar as árvores sintéticas (padrão: temporário, removido)')
+    bench.add_argument('--saida', help='arquivo do resultado (padrão: docs/relatorios/benchmark/resultado.json)')
+    bench.add_argument('--base', help='linha de base (padrão: docs/relatorios/benchmark/linha_de_base.json)')
+    bench.add_argument('--salvar-base', action='store_true', help='salva o resultado como nova linha de base')
+    bench.add_argument('--limite', type=float, default=0.25,
+                       help='regressão tolerada por etapa, em fração do tempo da base (padrão: 0.25)')
+    bench.set_defaults(executar=_benchmark)
+
+    observador = subparsers.add_parser('observar', help='regenera os relatórios afetados quando dados/ muda')
+    observador.add_argument('--workers', type=int, default=None, help='processos dos lotes (padrão: núcleos da CPU)')
+    observador.add_argument('--graficos', choices=BACKENDS, default='vetorial',
+                            help='vetorial (reportlab.graphics) ou matplotlib (PNG a 300 dpi)')
+    observador.add_argument('--sem-municipios', action='store_true', help='não regenera os relatórios municipais')
+    observador.add_argument('--espera', type=float, default=0.5,
+                            help='segundos sem alterações antes de regenerar (padrão: 0.5)')
+    observador.add_argument('--varredura', action='store_true', help='observa por varredura em vez do inotify')
+    observador.add_argument('--intervalo', type=float, default=1.0,
+                            help='intervalo da varredura, em segundos (padrão: 1)')
+    observador.add_argument('--inicial', action='store_true',
+                            help='faz uma geração incremental completa antes de observar')
+    observador.set_defaults(executar=_observar)
+
+    servidor = subparsers.add_parser('servir', help='servidor HTTP local de relatórios e gráficos sob demanda')
+    servidor.add_argument('--host', default='127.0.0.1', help='endereço (padrão: 127.0.0.1)')
+    servidor.add_argument('--porta', type=int, default=8765, help='porta (padrão: 8765)')
+    servidor.add_argument('--workers', type=int, default=None, help='processos de geração (padrão: núcleos da CPU)')
+    servidor.add_argument('--graficos', choices=BACKENDS, default='vetorial',
+                          help='gráficos dos PDFs: vetorial (reportlab.graphics) ou matplotlib')
+    servidor.add_argument('--memoria-mb', type=int, default=64, help='cache em memória, em MB (padrão: 64)')
+    servidor.add_argument('--disco-mb', type=int, default=512, help='cache em disco, em MB (padrão: 512)')
+    servidor.add_argument('--silencioso', action='store_true', help='não registra cada requisição')
+    servidor.set_defaults(executar=_servir)
+    return parser
+
+
+def main(argv=None):
+    """Executa o subcomando e retorna o código de saída"""
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'ods12', False):
+        # O relatório detalhado é um só, gerado no processo principal, sem filtro nem exportações
+        ignoradas = [opcao for opcao, valor in (('--ods', args.ods), ('--workers', args.workers),
+                                                ('--exportar', args.exportar)) if valor is not None]
+        if ignoradas:
+            parser.error(f"gerar --ods12 não aceita {', '.join(ignoradas)}")
+    config = ConfigRelatorios(args.base_dir) if args.base_dir else ConfigRelatorios()
+    config.reprodutivel = args.reprodutivel
+
+    modulos = MODULOS['gerar_ods12' if getattr(args, 'ods12', False) else args.comando]
+    for modulo in modulos:
+        importlib.import_module(modulo, __package__)
+    if args.medir_inicio:
+        print(f"Inicialização de '{args.comando}': {(time.perf_counter() - _INICIO) * 1000:.1f} ms",
+              file=sys.stderr)
+
+    if not (args.metricas or args.perfil):
+        return args.executar(args, config)
+
+    from .instrumentacao import configurar, medir
+    configurar(args.metricas, args.perfil)
+    with medir('comando', comando=args.comando):
+        return args.executar(args, config)
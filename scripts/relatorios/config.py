@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração compartilhada dos relatórios técnicos dos ODS.
+
+Centraliza caminhos do projeto, cores oficiais e o estilo padrão dos gráficos
+para que o relatório do ODS 12 e os relatórios em lote usem os mesmos valores.
+"""
+
+import os
+from dataclasses import dataclass
+
+# Caminhos dos arquivos
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DADOS_DIR = os.path.join(BASE_DIR, 'dados')
+INDICADORES_DIR = os.path.join(DADOS_DIR, 'indicadores')
+MUNICIPIOS_DIR = os.path.join(DADOS_DIR, 'municipios')
+ODS_CONFIG_FILE = os.path.join(DADOS_DIR, 'ods-config.json')
+REPORT_DIR = os.path.join(BASE_DIR, 'docs', 'relatorios')
+CHARTS_DIR = os.path.join(REPORT_DIR, 'charts')
+CACHE_GRAFICOS_DIR = os.path.join(CHARTS_DIR, 'cache')
+CACHE_INDICADORES_FILE = os.path.join(REPORT_DIR, 'cache', 'indicadores.npz')
+SERIES_FILE = os.path.join(REPORT_DIR, 'cache', 'series.sqlite')
+MANIFESTO_FILE = os.path.join(REPORT_DIR, 'manifesto_build.json')
+PAINEL_DIR = os.path.join(BASE_DIR, 'docs', 'painel')
+
+# Ano de referência da Agenda 2030
+ANO_META = 2030
+
+# Cores oficiais dos ODS (mesmos valores de src/utils/coresODS.js)
+CORES_ODS = {
+    'ods1': '#E5243B',
+    'ods2': '#DDA63A',
+    'ods3': '#4C9F38',
+    'ods4': '#C5192D',
+    'ods5': '#FF3A21',
+    'ods6': '#26BDE2',
+    'ods7': '#FCC30B',
+    'ods8': '#A21942',
+    'ods9': '#FD6925',
+    'ods10': '#DD1367',
+    'ods11': '#FD9D24',
+    'ods12': '#BF8B2E',
+    'ods13': '#3F7E44',
+    'ods14': '#0A97D9',
+    'ods15': '#56C02B',
+    'ods16': '#00689D',
+    'ods17': '#19486A',
+    'ods18': '#6F1D78',
+}
+COR_PADRAO = '#1E386A'
+
+# Metas 2030 conhecidas para ODS cujo arquivo de indicador não traz a meta
+METAS_2030 = {
+    'ods12': 15.0,  # Meta nacional para reciclagem de resíduos sólidos urbanos
+}
+
+# Cores auxiliares usadas nas barras de comparação
+CORES_COMPARACAO = ['#3F7E44', '#56C02B', '#DDA63A']
+
+
+# Ajustes aplicados sobre o estilo 'seaborn-v0_8-whitegrid' nos relatórios
+RC_RELATORIO = {
+    'font.family': 'sans-serif',
+    'font.sans-serif': ['Arial', 'Liberation Sans'],
+    'axes.labelsize': 12,
+    'axes.titlesize': 14,
+    'xtick.labelsize': 10,
+    'ytick.labelsize': 10,
+}
+
+# Backends de gráficos: vetorial (reportlab.graphics) ou matplotlib (PNG)
+BACKENDS = ('vetorial', 'matplotlib')
+
+# Imagens dos gráficos matplotlib: caixa da figura no PDF (polegadas) e
+# resolução na página (ver imagens.py)
+CAIXA_FIGURA = (6, 4)
+DPI_IMAGENS = 300
+
+# Estilos disponíveis para os gráficos ('padrao' = padrão do matplotlib)
+ESTILOS_GRAFICOS = {
+    'relatorio': ['seaborn-v0_8-whitegrid', RC_RELATORIO],
+    'padrao': ['default'],
+}
+
+
+def configurar_matplotlib(backend=None):
+    """Aplica o estilo padrão dos relatórios ao matplotlib"""
+    import matplotlib as mpl
+    if backend:
+        mpl.use(backend)
+    import matplotlib.pyplot as plt
+
+    plt.style.use(ESTILOS_GRAFICOS['relatorio'])
+    return plt
+
+
+@dataclass
+class ConfigRelatorios:
+    """
+    Caminhos de uma execução, passados explicitamente aos geradores.
+
+    Basta informar `base_dir` (raiz do repositório); os demais caminhos são
+    derivados dele quando não informados. Com `reprodutivel`, os PDFs não
+    dependem do momento da geração (ver publicacao.py).
+    """
+
+    base_dir: str = BASE_DIR
+    dados_dir: str = None
+    report_dir: str = None
+    charts_dir: str = None
+    painel_dir: str = None
+    reprodutivel: bool = False
+
+    def __post_init__(self):
+        self.base_dir = os.path.abspath(self.base_dir)
+        self.dados_dir = self.dados_dir or os.path.join(self.base_dir, 'dados')
+        self.report_dir = self.report_dir or os.path.join(self.base_dir, 'docs', 'relatorios')
+        self.charts_dir = self.charts_dir or os.path.join(self.report_dir, 'charts')
+        self.painel_dir = self.painel_dir or os.path.join(self.base_dir, 'docs', 'painel')
+
+    @property
+    def indicadores_dir(self):
+        return os.path.join(self.dados_dir, 'indicadores')
+
+    @property
+    def municipios_dir(self):
+        return os.path.join(self.dados_dir, 'municipios')
+
+    @property
+    def municipios_report_dir(self):
+        return os.path.join(self.report_dir, 'municipios')
+
+    @property
+    def ods_config_file(self):
+        return os.path.join(self.dados_dir, 'ods-config.json')
+
+    @property
+    def cache_graficos_dir(self):
+        return os.path.join(self.charts_dir, 'cache')
+
+    @property
+    def cache_indicadores_file(self):
+        return os.path.join(self.report_dir, 'cache', 'indicadores.npz')
+
+    @property
+    def publicacao_dir(self):
+        return os.path.join(self.report_dir, 'publicacao')
+
+    @property
+    def series_file(self):
+        return os.path.join(self.report_dir, 'cache', 'series.sqlite')
+
+    @property
+    def manifesto_file(self):
+        return os.path.join(self.report_dir, 'manifesto_build.json')
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Relatório consolidado: todos os ODS do estado e, como anexo, todos os pares
+(município, ODS) de `dados/municipios/`, em um único PDF ou em volumes. Com
+`anexo_estatistico`, termina com a tabela de todos os indicadores de todos os
+municípios (ver anexos.py).
+
+O documento é montado seção a seção (ver secoes.py): cada ODS, e cada ODS de
+cada município, é carregado, analisado e desenhado apenas quando sua seção é
+montada, e descartado em seguida; a junção grava uma seção de cada vez. O
+pico de memória fica no nível de um relatório individual, qualquer que seja o
+número de páginas, em um PDF único ou em volumes.
+"""
+
+import os
+import time
+
+from .config import ConfigRelatorios
+from .fontes import carregar_config_ods, descobrir_arquivos_ods
+from .municipios import descobrir_municipios
+from .instrumentacao import medir, pico_memoria_mb
+from .secoes import construir_em_secoes
+
+ARQUIVO_CONSOLIDADO = 'relatorio_consolidado_ods.pdf'
+
+
+def _titulo_secao(codigo, config_ods, local=None):
+    titulo = f"ODS {codigo[3:]}"
+    if config_ods.get(codigo, {}).get('titulo'):
+        titulo += f" – {config_ods[codigo]['titulo']}"
+    return f"{local}: {titulo}" if local else titulo
+
+
+def _fabrica(arquivo, config_ods, charts_dir, backend_graficos, local, reprodutivel=False):
+    """Função que, chamada na montagem da seção, executa o gerador e produz seus flowables"""
+    def fabrica():
+        from .gerador import ODSReportGenerator
+
+        gerador = ODSReportGenerator(arquivo, config_ods, charts_dir=charts_dir, workers_graficos=0,
+                                     backend_graficos=backend_graficos, local=local, reprodutivel=reprodutivel)
+        for etapa in (gerador.carregar_dados, gerador.analisar_dados, gerador.gerar_graficos):
+            with medir(etapa.__name__):
+                etapa()
+        with medir('elementos'):
+            elementos = list(gerador.elementos())
+        yield from elementos
+    return fabrica
+
+
+def secoes_consolidado(config, filtro=None, incluir_municipios=True, backend_graficos='vetorial',
+                       anexo_estatistico=False):
+    """Gera as seções (titulo, fabrica) do relatório consolidado, sem carregar nenhum dado"""
+    config_ods = carregar_config_ods(config.ods_config_file)
+    charts_dir = os.path.join(config.charts_dir, 'consolidado')
+
+    for arquivo in descobrir_arquivos_ods(config.indicadores_dir):
+        codigo = os.path.basename(arquivo).split('_')[0]
+        if filtro and codigo not in filtro:
+            continue
+        yield (_titulo_secao(codigo, config_ods),
+               _fabrica(arquivo, config_ods, charts_dir, backend_graficos, 'Sergipe', config.reprodutivel))
+
+    if incluir_municipios:
+        for tarefa in descobrir_municipios(config.municipios_dir, filtro_ods=filtro):
+            yield (_titulo_secao(tarefa['codigo'], config_ods, tarefa['nome']),
+                   _fabrica(tarefa['arquivo'], config_ods, os.path.join(charts_dir, tarefa['municipio']),
+                            backend_graficos, tarefa['nome'], config.reprodutivel))
+
+    if anexo_estatistico:
+        from .anexos import secao_anexo_municipios
+        yield secao_anexo_municipios(config, filtro)
+
+
+def gerar_consolidado(config=None, filtro=None, incluir_municipios=True, paginas_por_volume=None,
+                      backend_graficos='vetorial', anexo_estatistico=False):
+    """
+    Gera o relatório consolidado em `report_dir` e retorna o resumo de
+    `construir_em_secoes`, acrescido de `duracao` e `pico_memoria_mb`.
+
+    Seções com erro são omitidas e listadas em `erros`.
+    """
+    config = config or ConfigRelatorios()
+    inicio = time.perf_counter()
+    resumo = construir_em_secoes(os.path.join(config.report_dir, ARQUIVO_CONSOLIDADO),
+                                 secoes_consolidado(config, filtro, incluir_municipios, backend_graficos,
+                                                    anexo_estatistico),
+                                 paginas_por_volume=paginas_por_volume, numerar_paginas=True,
+                                 ignorar_erros=True, reprodutivel=config.reprodutivel)
+    if backend_graficos == 'matplotlib':
+        # As seções renderizam no próprio processo: o cache de gráficos é limpo uma vez, no fim
+        from .cache_graficos import CacheGraficos
+        CacheGraficos(os.path.join(config.charts_dir, 'consolidado', 'cache')).limpar()
+    resumo['duracao'] = time.perf_counter() - inicio
+    resumo['pico_memoria_mb'] = pico_memoria_mb()
+    return resumo
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura dos arquivos de indicadores dos ODS.
+
+Os arquivos em `dados/indicadores/ods*_*.json` não seguem um formato único:
+alguns usam `meta`/`dados`/`historico`, outros `odsId`/`indicadorPrincipal`
+com anos e valores em texto ("2018", "78,3%"), e o ODS 18 agrupa vários
+indicadores. As funções abaixo convertem cada arquivo em um dicionário simples
+com título, cor, série histórica e meta.
+
+`indicador_de_dados` converte um arquivo decodificado em um `IndicadorODS`
+compacto (classe com __slots__, série em arrays), usado também pela ingestão
+concorrente de `dados/` (ingestao.py).
+"""
+
+import os
+import re
+import json
+import glob
+from array import array
+from dataclasses import dataclass
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, o json da biblioteca padrão
+    orjson = None
+
+from .config import INDICADORES_DIR, ODS_CONFIG_FILE, CORES_ODS, COR_PADRAO, METAS_2030
+
+PADRAO_ARQUIVO_ODS = re.compile(r'^ods(\d+)_[\w-]+\.json$')
+
+NAN = float('nan')
+
+
+def decodificar_json(conteudo):
+    """Decodifica o conteúdo (bytes) de um arquivo JSON, com orjson quando disponível"""
+    if orjson is not None:
+        try:
+            return orjson.loads(conteudo)
+        except orjson.JSONDecodeError:
+            pass  # NaN, inteiros enormes etc.: o json da biblioteca padrão decide
+    return json.loads(conteudo)
+
+
+def ler_json(caminho):
+    """Lê e decodifica um arquivo JSON"""
+    with open(caminho, 'rb') as file:
+        return decodificar_json(file.read())
+
+
+def converter_numero(valor):
+    """Converte valores como 6.2, "2018" ou "78,3%" em float (None se inválido)"""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = str(valor).strip().replace('%', '').replace(' ', '')
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+def normalizar_historico(historico):
+    """Normaliza uma lista de pontos {ano, valor} com anos inteiros, ordenada por ano"""
+    serie = []
+    for ponto in historico or []:
+        ano = converter_numero(ponto.get('ano'))
+        valor = converter_numero(ponto.get('valor'))
+        if ano is None or valor is None:
+            continue
+        item = {'ano': int(ano), 'valor': valor}
+        meta = converter_numero(ponto.get('meta'))
+        if meta is not None:
+            item['meta'] = meta
+        serie.append(item)
+    serie.sort(key=lambda p: p['ano'])
+    return serie
+
+
+def colunas_historico(historico):
+    """
+    Mesma normalização de `normalizar_historico`, mas em colunas compactas:
+    (anos, valores, metas) como `array` de int e float, sem um objeto por
+    ponto. `metas` tem NaN nos pontos sem meta e é None se nenhum tiver.
+    """
+    anos, valores, metas = array('i'), array('d'), array('d')
+    com_meta = False
+    for ponto in historico or ():
+        ano, valor, meta = ponto.get('ano'), ponto.get('valor'), ponto.get('meta')
+        # Caminho rápido para o caso comum (ano int, valor float); texto e
+        # valores estranhos passam por converter_numero
+        if type(ano) is not int:
+            ano = converter_numero(ano)
+            if ano is None:
+                continue
+            ano = int(ano)
+        if type(valor) is not float:
+            valor = converter_numero(valor)
+            if valor is None:
+                continue
+        if meta is not None:
+            meta = converter_numero(meta)
+        if meta is None:
+            meta = NAN
+        else:
+            com_meta = True
+        anos.append(ano)
+        valores.append(valor)
+        metas.append(meta)
+
+    if any(anos[i] > anos[i + 1] for i in range(len(anos) - 1)):
+        ordem = sorted(range(len(anos)), key=anos.__getitem__)
+        anos = array('i', [anos[i] for i in ordem])
+        valores = array('d', [valores[i] for i in ordem])
+        metas = array('d', [metas[i] for i in ordem])
+    if not com_meta:
+        metas = None
+    return anos, valores, metas
+
+
+def carregar_config_ods(caminho=ODS_CONFIG_FILE):
+    """Lê `ods-config.json` e retorna um dicionário indexado pelo código do ODS"""
+    try:
+        config = ler_json(caminho)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"AVISO: configuração dos ODS indisponível ({e})")
+        return {}
+
+    return {
+        ods['codigo']: {
+            'titulo': ods.get('titulo'),
+            'descricao': ods.get('descricao'),
+            'cor_primaria': ods.get('cor_primaria'),
+            'cor_secundaria': ods.get('cor_secundaria'),
+        }
+        for ods in config.get('objetivos_desenvolvimento_sustentavel', [])
+        if ods.get('codigo')
+    }
+
+
+def descobrir_arquivos_ods(indicadores_dir=INDICADORES_DIR):
+    """Lista os arquivos `ods*_*.json`, ordenados pelo número do ODS"""
+    arquivos = []
+    for caminho in glob.glob(os.path.join(indicadores_dir, 'ods*_*.json')):
+        correspondencia = PADRAO_ARQUIVO_ODS.match(os.path.basename(caminho))
+        if correspondencia:
+            arquivos.append((int(correspondencia.group(1)), os.path.basename(caminho), caminho))
+    return [caminho for _, _, caminho in sorted(arquivos)]
+
+
+def _indicador_principal(dados):
+    """Retorna (descrição, unidade, histórico, meta 2030) do indicador principal"""
+    if 'indicadorPrincipal' in dados:
+        principal = dados['indicadorPrincipal']
+        valor = principal.get('valor')
+        unidade = '%' if isinstance(valor, str) and valor.strip().endswith('%') else ''
+        return principal.get('descricao'), unidade, dados.get('historico'), None
+
+    if isinstance(dados.get('indicadores'), dict) and 'historico' not in dados:
+        # ODS 18: vários indicadores no mesmo arquivo, o primeiro é o principal
+        principal = next(iter(dados['indicadores'].values()), {})
+        return (principal.get('titulo'), principal.get('unidade', ''),
+                principal.get('historico'), principal.get('meta_2030'))
+
+    resumo = dados.get('dados', {})
+    return resumo.get('descricao'), resumo.get('unidade', ''), dados.get('historico'), dados.get('meta_2030')
+
+
+@dataclass(slots=True)
+class IndicadorDetalhado:
+    """Indicador complementar de um arquivo de ODS"""
+
+    nome: str
+    valor: float = None
+    unidade: str = ''
+    tendencia: str = ''
+
+
+def _indicadores_detalhados(dados):
+    """Lista os indicadores complementares como `IndicadorDetalhado`"""
+    detalhados = dados.get('indicadores_detalhados') or dados.get('indicadoresDetalhados') or []
+    if not detalhados and isinstance(dados.get('indicadores'), dict):
+        return tuple(
+            IndicadorDetalhado(ind.get('titulo') or '', converter_numero((ind.get('dados') or {}).get('valor')),
+                               ind.get('unidade', ''), ind.get('tendencia', ''))
+            for ind in list(dados['indicadores'].values())[1:]
+        )
+    return tuple(
+        IndicadorDetalhado(ind.get('nome') or ind.get('titulo') or '', converter_numero(ind.get('valor')),
+                           ind.get('unidade', ''), ind.get('tendencia', ''))
+        for ind in detalhados
+    )
+
+
+@dataclass(slots=True)
+class IndicadorODS:
+    """
+    Indicador principal de um arquivo `ods*_*.json`, tal como está no arquivo.
+
+    A série fica em `anos`/`valores` (arrays). Título, descrição e cor do
+    arquivo são os valores brutos: `como_dict` aplica `ods-config.json` e os
+    padrões e retorna o dicionário de `carregar_indicador_ods`.
+    """
+
+    codigo: str
+    numero: int
+    slug: str
+    arquivo: str
+    titulo: str = None
+    descricao: str = None
+    cor: str = None
+    indicador: str = None
+    unidade: str = ''
+    ultima_atualizacao: str = None
+    meta_2030: float = None
+    anos: array = None
+    valores: array = None
+    detalhados: tuple = ()
+
+    def historico(self):
+        return [{'ano': ano, 'valor': valor} for ano, valor in zip(self.anos, self.valores)]
+
+    def titulo_exibido(self, config_ods=None):
+        """Título de ods-config.json ou do arquivo, sem o prefixo 'ODS n - '"""
+        titulo = (config_ods or {}).get(self.codigo, {}).get('titulo') or self.titulo or f'ODS {self.numero}'
+        return re.sub(r'^ODS\s*\d+\s*-\s*', '', titulo)
+
+    def como_dict(self, config_ods=None):
+        config = (config_ods or {}).get(self.codigo, {})
+        titulo = self.titulo_exibido(config_ods)
+        return {
+            'codigo': self.codigo,
+            'numero': self.numero,
+            'slug': self.slug,
+            'arquivo': self.arquivo,
+            'titulo': titulo,
+            'descricao': config.get('descricao') or self.descricao or '',
+            'cor': config.get('cor_primaria') or self.cor or CORES_ODS.get(self.codigo, COR_PADRAO),
+            'indicador': self.indicador or titulo,
+            'unidade': self.unidade,
+            'ultima_atualizacao': self.ultima_atualizacao,
+            'historico': self.historico(),
+            'meta_2030': self.meta_2030,
+            'indicadores_detalhados': [
+                {'nome': d.nome, 'valor': d.valor, 'unidade': d.unidade, 'tendencia': d.tendencia}
+                for d in self.detalhados
+            ],
+        }
+
+
+def indicador_de_dados(dados, caminho):
+    """Converte o conteúdo decodificado de um arquivo `ods*_*.json` em um `IndicadorODS`"""
+    nome_arquivo = os.path.basename(caminho)
+    numero = int(PADRAO_ARQUIVO_ODS.match(nome_arquivo).group(1))
+    codigo = f'ods{numero}'
+    meta_info = dados.get('meta') if isinstance(dados.get('meta'), dict) else {}
+
+    descricao_indicador, unidade, historico, meta_2030 = _indicador_principal(dados)
+    anos, valores, metas = colunas_historico(historico)
+
+    # Metas anuais (ex.: ODS 7 e 11) servem de referência quando não há meta 2030
+    if meta_2030 is None and metas is not None and metas[-1] == metas[-1]:
+        meta_2030 = metas[-1]
+    if meta_2030 is None:
+        meta_2030 = METAS_2030.get(codigo)
+
+    return IndicadorODS(
+        codigo=codigo,
+        numero=numero,
+        slug=os.path.splitext(nome_arquivo)[0],
+        arquivo=caminho,
+        titulo=meta_info.get('titulo') or dados.get('titulo'),
+        descricao=meta_info.get('descricao') or dados.get('descricao'),
+        cor=meta_info.get('cor_primaria') or dados.get('cor_primaria') or dados.get('corPrimaria'),
+        indicador=descricao_indicador,
+        unidade=unidade or '',
+        ultima_atualizacao=(meta_info.get('ultima_atualizacao') or dados.get('dataAtualizacao')
+                            or dados.get('data_atualizacao')),
+        meta_2030=converter_numero(meta_2030),
+        anos=anos,
+        valores=valores,
+        detalhados=_indicadores_detalhados(dados),
+    )
+
+
+def carregar_indicador_ods(caminho, config_ods=None):
+    """Lê um arquivo de indicador de ODS e retorna seus dados normalizados"""
+    return indicador_de_dados(ler_json(caminho), caminho).como_dict(config_ods)
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador genérico de relatório técnico para qualquer ODS.
+
+Segue o mesmo fluxo do `ODS12ReportGenerator` (carregar → analisar → gráficos
+→ PDF), mas obtém título, cor, série histórica e meta do arquivo de indicador
+e de `dados/ods-config.json` em vez de valores fixos no código.
+"""
+
+import os
+
+import numpy as np
+
+from .config import REPORT_DIR, CHARTS_DIR, ANO_META, CORES_COMPARACAO, CAIXA_FIGURA, DPI_IMAGENS
+from .fontes import carregar_indicador_ods
+from .analise import matriz_series, analisar_series, analise_da_serie
+from .previsao import campos_grafico, descrever_previsao
+from .graficos_vetoriais import criar_estagio
+from .secoes import construir_em_secoes
+from .modelos_relatorio import carregar_modelo
+from .instrumentacao import medir
+from .publicacao import data_relatorio
+
+
+# Modelo do relatório (modelos/relatorio_ods.json)
+MODELO = 'relatorio_ods'
+
+
+class ODSReportGenerator:
+    """
+    Classe para geração de relatório técnico de um ODS a partir do seu arquivo de indicador.
+
+    `local` é o território descrito no texto (o estado ou um município).
+    Com o backend matplotlib, `exportar` (formatos 'web', 'miniatura' e
+    'buffer', ver imagens.FORMATOS_EXPORTACAO) grava também o SVG e a
+    miniatura de cada gráfico, do mesmo desenho do PNG, em `exportacoes`;
+    com 'buffer', o PDF recebe as imagens em memória. Com `reprodutivel`, o
+    PDF traz a data da última atualização do indicador e os mesmos dados
+    geram os mesmos bytes (ver publicacao.py).
+    """
+
+    def __init__(self, arquivo, config_ods=None, report_dir=REPORT_DIR, charts_dir=CHARTS_DIR,
+                 workers_graficos=None, backend_graficos='vetorial', local='Sergipe', exportar=(),
+                 reprodutivel=False):
+        self.arquivo = arquivo
+        self.config_ods = config_ods or {}
+        self.local = local
+        self.report_dir = report_dir
+        self.info = {}
+        self.historico = []
+        self.analise = {}
+        self.graficos = {}
+        self.output_file = None
+        self.charts_base = charts_dir
+        self.charts_dir = charts_dir
+        self.workers_graficos = workers_graficos
+        self.backend_graficos = backend_graficos
+        self.exportar = tuple(exportar) if backend_graficos == 'matplotlib' else ()
+        self.exportacoes = {}
+        self.reprodutivel = reprodutivel
+        self.renderizacao = None
+
+    def carregar_dados(self):
+        """Importa os dados do arquivo JSON do indicador"""
+        self.info = carregar_indicador_ods(self.arquivo, self.config_ods)
+        self.historico = self.info['historico']
+        self.output_file = os.path.join(self.report_dir, f"relatorio_tecnico_{self.info['slug']}.pdf")
+        self.charts_dir = os.path.join(self.charts_base, self.info['slug'])
+
+        if len(self.historico) < 2:
+            raise ValueError(f"{self.info['slug']}: série histórica insuficiente ({len(self.historico)} pontos)")
+
+        print(f"[{self.info['codigo']}] Dados carregados: {len(self.historico)} registros")
+        return True
+
+    def analisar_dados(self):
+        """Calcula variação, crescimento anual, distância da meta e projeção (ver analise.py)"""
+        meta = self.info['meta_2030']
+        anos, matriz = matriz_series([self.historico])
+        resultado = analisar_series(anos, matriz, [np.nan if meta is None else meta])
+        self.analise = analise_da_serie(resultado, 0)
+
+        print(f"[{self.info['codigo']}] Análise concluída")
+        return True
+
+    def _submeter(self, nome, spec):
+        """Agenda um gráfico, com os destinos dos formatos exportados (None: bytes em memória)"""
+        if self.exportar:
+            destinos = {'web': os.path.join(self.charts_dir, f'{nome}.svg'),
+                        'miniatura': os.path.join(self.charts_dir, f'{nome}_miniatura.png'),
+                        'buffer': None}
+            spec = dict(spec, exportar={formato: destinos[formato] for formato in self.exportar})
+        self.renderizacao.submeter(nome, spec)
+
+    def gerar_graficos(self):
+        """Agenda os gráficos de evolução, comparação com a meta e projeção"""
+        os.makedirs(self.charts_dir, exist_ok=True)
+        if self.backend_graficos == 'matplotlib':
+            self.renderizacao = criar_estagio('matplotlib', max_workers=self.workers_graficos,
+                                              cache_dir=os.path.join(self.charts_base, 'cache'))
+        else:
+            self.renderizacao = criar_estagio(self.backend_graficos)
+        cor = self.info['cor']
+        unidade = f" ({self.info['unidade']})" if self.info['unidade'] else ''
+        anos = [p['ano'] for p in self.historico]
+        valores = [p['valor'] for p in self.historico]
+        comum = {'xlabel': 'Ano', 'ylabel': f'Valor{unidade}', 'caixa': CAIXA_FIGURA, 'dpi': DPI_IMAGENS}
+
+        # Gráfico 1: Evolução histórica
+        self._submeter('evolucao', dict(comum, **{
+            'tipo': 'linha',
+            'destino': os.path.join(self.charts_dir, 'evolucao.png'),
+            'x': anos, 'y': valores, 'cor': cor,
+            'titulo': f"Evolução: {self.info['indicador']} ({anos[0]}-{anos[-1]})",
+        }))
+
+        if self.info['meta_2030'] is None:
+            print(f"[{self.info['codigo']}] Sem meta 2030: gráficos de meta omitidos")
+            return True
+
+        # Gráfico 2: Situação atual vs. meta
+        meta = self.info['meta_2030']
+        self._submeter('comparativo', dict(comum, **{
+            'tipo': 'barras',
+            'destino': os.path.join(self.charts_dir, 'comparativo.png'),
+            'categorias': [f"{self.local} ({self.analise['ano_atual']})", f'Meta {ANO_META}'],
+            'valores': [self.analise['valor_atual'], meta],
+            'cores': [cor, CORES_COMPARACAO[2]],
+            'rotulo_formato': '{:g}', 'rotulo_peso': 'bold', 'rotulo_deslocamento': 0,
+            'titulo': 'Situação Atual vs. Meta', 'xlabel': None, 'grade': 'y',
+        }))
+
+        # Gráfico 3: Projeção até 2030
+        self._submeter('projecao', dict(comum, **{
+            'tipo': 'projecao',
+            'destino': os.path.join(self.charts_dir, 'projecao.png'),
+            'x': anos, 'y': valores,
+            'x_proj': [p[0] for p in self.analise['projecao']],
+            'y_proj': [p[1] for p in self.analise['projecao']],
+            **campos_grafico(self.analise['previsao'], self.analise['ano_atual'], self.analise['valor_atual']),
+            'meta': meta, 'cor': cor, 'cor_projecao': CORES_COMPARACAO[1], 'cor_meta': CORES_COMPARACAO[2],
+            'cor_previsao': CORES_COMPARACAO[0],
+            'legendas': {'meta': f"Meta {ANO_META}: {meta:g}"},
+            'titulo': f'Projeção até {ANO_META} para Atingir a Meta',
+        }))
+        return True
+
+    def aguardar_graficos(self):
+        """Aguarda a renderização dos gráficos agendados"""
+        with medir('aguardar_graficos'):
+            self.graficos = self.renderizacao.aguardar()
+        self.exportacoes = self.renderizacao.exportacoes()
+        print(f"[{self.info['codigo']}] {self.renderizacao.resumo()}")
+
+    def contexto(self):
+        """Dados que o modelo do relatório recebe (ver modelos_relatorio.py)"""
+        info = self.info
+        analise = self.analise
+        unidade = info['unidade']
+        meta = analise.get('meta') if 'gap_meta' in analise else None
+        texto_previsao = descrever_previsao(analise['previsao'], unidade, meta)
+        return {
+            'info': info,
+            'analise': analise,
+            'local': self.local,
+            'data': data_relatorio(self.reprodutivel, info['ultima_atualizacao']),
+            'ano_meta': ANO_META,
+            # Com 'buffer', o PDF embute as imagens direto da memória
+            'graficos': {nome: self.exportacoes.get(nome, {}).get('buffer', grafico)
+                         for nome, grafico in self.graficos.items()},
+            'texto_previsao': texto_previsao,
+            'previsao_na_evolucao': '' if meta is not None else ' ' + texto_previsao,
+            'indicadores': [
+                {'nome': ind['nome'], 'tendencia': ind['tendencia'],
+                 'valor': '-' if ind['valor'] is None else f"{ind['valor']:g} {ind['unidade']}".strip()}
+                for ind in info['indicadores_detalhados']
+            ],
+        }
+
+    def elementos(self):
+        """
+        Gera os flowables do relatório um a um, depois de aguardar os gráficos.
+
+        O layout vem do modelo compilado (compartilhado pelo processo); aqui
+        só são ligados os dados. Usado por `gerar_relatorio` e, seção a seção,
+        pelo relatório consolidado (ver secoes.py e consolidado.py).
+        """
+        self.aguardar_graficos()
+        yield from carregar_modelo(MODELO).renderizar(self.contexto())
+
+    def gerar_relatorio(self):
+        """Gera o relatório técnico em PDF"""
+        os.makedirs(self.report_dir, exist_ok=True)
+        construir_em_secoes(self.output_file, [(self.info['titulo'], self.elementos)], reprodutivel=self.reprodutivel)
+        print(f"[{self.info['codigo']}] Relatório gerado: {self.output_file}")
+        return True
+
+    def executar(self):
+        """Executa o fluxo completo, medindo cada etapa, e retorna o caminho do PDF"""
+        relatorio = os.path.splitext(os.path.basename(self.arquivo))[0]
+        with medir('relatorio', relatorio=relatorio, local=self.local):
+            for etapa in (self.carregar_dados, self.analisar_dados, self.gerar_graficos, self.gerar_relatorio):
+                with medir(etapa.__name__):
+                    etapa()
+        return self.output_file
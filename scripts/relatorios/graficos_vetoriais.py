@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+Backend vetorial de gráficos com reportlab.graphics.
+
+Converte as mesmas especificações usadas pelo estágio de renderização
+(linha, barras, projeção, pizza) em objetos `Drawing`, inseridos no PDF como
+flowables. Não há etapa raster (PNG em disco a 300 dpi), o que deixa os PDFs
+menores e a geração mais rápida. O backend matplotlib continua disponível com
+`backend='matplotlib'`.
+"""
+
+import io
+import time
+
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.platypus import Image
+from reportlab.graphics.shapes import Drawing, String, Group, Polygon
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.widgets.markers import makeMarker
+
+from .config import BACKENDS
+from .instrumentacao import medir
+
+# Abreviações de cor do matplotlib usadas nas especificações
+_CORES_MATPLOTLIB = {
+    'r': colors.red, 'g': colors.green, 'b': colors.blue,
+    'k': colors.black, 'w': colors.white, 'y': colors.yellow,
+}
+
+_MARCADORES = {'o': 'FilledCircle', 's': 'FilledSquare', '^': 'FilledTriangle'}
+
+FONTE = 'Helvetica'
+FONTE_TITULO = 'Helvetica-Bold'
+COR_GRADE = colors.HexColor('#CCCCCC')
+
+
+def _cor(valor):
+    if isinstance(valor, colors.Color):
+        return valor
+    if valor in _CORES_MATPLOTLIB:
+        return _CORES_MATPLOTLIB[valor]
+    if isinstance(valor, str) and valor.startswith('#'):
+        return colors.HexColor(valor)
+    return colors.toColor(valor)
+
+
+def _lista_cores(cores, quantidade):
+    if isinstance(cores, str):
+        return [_cor(cores)] * quantidade
+    return [_cor(cores[i % len(cores)]) for i in range(quantidade)]
+
+
+def _traco_grade(eixo, spec, direcao):
+    """Aplica a grade tracejada do relatório a um eixo"""
+    grade = spec.get('grade', 'both')
+    if grade in ('both', direcao):
+        eixo.visibleGrid = 1
+        eixo.gridStrokeColor = COR_GRADE
+        eixo.gridStrokeDashArray = (3, 3)
+        eixo.gridStrokeWidth = 0.5
+
+
+def _titulo_e_rotulos(desenho, spec, area):
+    """Adiciona título e rótulos dos eixos ao redor da área do gráfico"""
+    largura, altura = desenho.width, desenho.height
+    fonte_titulo = spec.get('titulo_fonte', {})
+    tamanho = fonte_titulo.get('fontsize', 14)
+    if spec.get('titulo'):
+        desenho.add(String(largura / 2, altura - tamanho - 4, spec['titulo'], fontName=FONTE_TITULO,
+                           fontSize=tamanho, textAnchor='middle'))
+    if spec.get('xlabel'):
+        desenho.add(String(area[0] + area[2] / 2, 6, spec['xlabel'], fontName=FONTE, fontSize=11,
+                           textAnchor='middle'))
+    if spec.get('ylabel'):
+        rotulo = Group(String(0, 0, spec['ylabel'], fontName=FONTE, fontSize=11, textAnchor='middle'))
+        rotulo.transform = (0, 1, -1, 0, 14, area[1] + area[3] / 2)
+        desenho.add(rotulo)
+
+
+def _area(desenho, spec):
+    """Retângulo (x, y, largura, altura) disponível para o gráfico"""
+    margem_esq = 60 if spec.get('ylabel') else 40
+    margem_inf = 40 if spec.get('xlabel') else 28
+    if spec.get('rotacao_x'):
+        margem_inf += 50
+    margem_sup = 40 if spec.get('titulo') else 12
+    return (margem_esq, margem_inf, desenho.width - margem_esq - 20, desenho.height - margem_inf - margem_sup)
+
+
+def _plot_linhas(area, series, spec, extras_y=()):
+    """LinePlot com eixos numéricos (anos no eixo x); `extras_y` também entram na escala do eixo y"""
+    plot = LinePlot()
+    plot.x, plot.y, plot.width, plot.height = area
+    plot.data = [serie['pontos'] for serie in series]
+    for i, serie in enumerate(series):
+        linha = plot.lines[i]
+        linha.strokeColor = serie['cor']
+        linha.strokeWidth = serie.get('largura', 2)
+        if serie.get('tracejado'):
+            linha.strokeDashArray = serie['tracejado']
+        if serie.get('marcador') in _MARCADORES:
+            linha.symbol = makeMarker(_MARCADORES[serie['marcador']], size=5,
+                                      fillColor=serie['cor'], strokeColor=serie['cor'])
+
+    todos_x = [x for serie in series for x, _ in serie['pontos']]
+    todos_y = [y for serie in series for _, y in serie['pontos']] + list(extras_y)
+    plot.xValueAxis.valueMin = min(todos_x)
+    plot.xValueAxis.valueMax = max(todos_x)
+    plot.xValueAxis.valueStep = 1 if max(todos_x) - min(todos_x) <= 15 else None
+    plot.xValueAxis.labelTextFormat = '%d'
+    plot.yValueAxis.valueMin = min(0, min(todos_y))
+    plot.yValueAxis.valueMax = max(todos_y) * 1.1 if max(todos_y) > 0 else 1
+    for eixo in (plot.xValueAxis, plot.yValueAxis):
+        eixo.labels.fontName = FONTE
+        eixo.labels.fontSize = 9
+    _traco_grade(plot.xValueAxis, spec, 'x')
+    _traco_grade(plot.yValueAxis, spec, 'y')
+    return plot
+
+
+def _desenhar_linha(desenho, spec, area):
+    desenho.add(_plot_linhas(area, [{
+        'pontos': list(zip(spec['x'], spec['y'])),
+        'cor': _cor(spec['cor']),
+        'marcador': spec.get('marcador', 'o'),
+    }], spec))
+
+
+def _faixa(plot, x, inferior, superior, cor):
+    """Polígono do intervalo de previsão nas coordenadas do LinePlot (escalas fixadas em _plot_linhas)"""
+    eixo_x, eixo_y = plot.xValueAxis, plot.yValueAxis
+
+    def ponto(px, py):
+        return (plot.x + (px - eixo_x.valueMin) / ((eixo_x.valueMax - eixo_x.valueMin) or 1) * plot.width,
+                plot.y + (py - eixo_y.valueMin) / ((eixo_y.valueMax - eixo_y.valueMin) or 1) * plot.height)
+
+    contorno = [ponto(px, py) for px, py in zip(x, inferior)]
+    contorno += [ponto(px, py) for px, py in reversed(list(zip(x, superior)))]
+    return Polygon([c for p in contorno for c in p], fillColor=cor, fillOpacity=0.15,
+                   strokeColor=None, strokeWidth=0)
+
+
+def _desenhar_projecao(desenho, spec, area):
+    legendas = spec.get('legendas', {})
+    x_proj, x_prev = list(spec.get('x_proj', [])), list(spec.get('x_prev', []))
+    x_min = min(list(spec['x']) + x_proj + x_prev)
+    x_max = max(list(spec['x']) + x_proj + x_prev)
+    cor_previsao = _cor(spec.get('cor_previsao', spec['cor']))
+    series = [
+        {'pontos': list(zip(spec['x'], spec['y'])), 'cor': _cor(spec['cor']),
+         'marcador': spec.get('marcador', 'o'), 'nome': legendas.get('historico', 'Dados históricos')},
+    ]
+    if x_proj:
+        series.append({'pontos': list(zip(x_proj, spec['y_proj'])), 'cor': _cor(spec.get('cor_projecao', spec['cor'])),
+                       'marcador': spec.get('marcador_projecao', 's'), 'tracejado': (6, 3),
+                       'nome': legendas.get('projecao', 'Projeção necessária')})
+    if x_prev:
+        series.append({'pontos': list(zip(x_prev, spec['y_prev'])), 'cor': cor_previsao, 'tracejado': (2, 2),
+                       'nome': legendas.get('previsao', 'Previsão da tendência')})
+    series.append({'pontos': [(x_min, spec['meta']), (x_max, spec['meta'])], 'cor': _cor(spec.get('cor_meta', '#DDA63A')),
+                   'largura': 1.5, 'tracejado': None if spec.get('estilo_meta') == '-' else (6, 2, 1, 2),
+                   'nome': legendas.get('meta', f"Meta: {spec['meta']}")})
+
+    faixa = spec.get('x_faixa') and spec.get('y_faixa_inf')
+    extras = list(spec['y_faixa_inf']) + list(spec['y_faixa_sup']) if faixa else []
+    plot = _plot_linhas(area, series, spec, extras)
+    pares = [(serie['cor'], serie['nome']) for serie in series]
+    if faixa:
+        desenho.add(_faixa(plot, spec['x_faixa'], spec['y_faixa_inf'], spec['y_faixa_sup'], cor_previsao))
+        pares.append((colors.Color(cor_previsao.red, cor_previsao.green, cor_previsao.blue, 0.25),
+                      legendas.get('intervalo', 'Intervalo de previsão (95%)')))
+    desenho.add(plot)
+
+    legenda = Legend()
+    legenda.x, legenda.y = area[0] + area[2] - 150, area[1] + 14 * len(pares) + 20
+    legenda.deltay = 14
+    legenda.columnMaximum = len(pares)
+    legenda.fontName = FONTE
+    legenda.fontSize = 9
+    legenda.alignment = 'right'
+    legenda.colorNamePairs = pares
+    desenho.add(legenda)
+
+
+def _desenhar_barras(desenho, spec, area):
+    valores = list(spec['valores'])
+    grafico = VerticalBarChart()
+    grafico.x, grafico.y, grafico.width, grafico.height = area
+    grafico.data = [valores]
+    grafico.categoryAxis.categoryNames = [str(c) for c in spec['categorias']]
+    grafico.categoryAxis.labels.fontName = FONTE
+    grafico.categoryAxis.labels.fontSize = 9
+    if spec.get('rotacao_x'):
+        grafico.categoryAxis.labels.angle = spec['rotacao_x']
+        grafico.categoryAxis.labels.boxAnchor = 'ne'
+    grafico.valueAxis.valueMin = min(0, min(valores))
+    grafico.valueAxis.valueMax = max(valores) * 1.15 if max(valores) > 0 else 1
+    grafico.valueAxis.labels.fontName = FONTE
+    grafico.valueAxis.labels.fontSize = 9
+    _traco_grade(grafico.valueAxis, spec, 'y')
+    grafico.bars.strokeColor = None
+    for i, cor in enumerate(_lista_cores(spec['cores'], len(valores))):
+        grafico.bars[(0, i)].fillColor = cor
+
+    formato = spec.get('rotulo_formato')
+    if formato:
+        grafico.barLabelFormat = lambda v: formato.format(v)
+        grafico.barLabels.nudge = 8
+        grafico.barLabels.fontName = FONTE_TITULO if spec.get('rotulo_peso') == 'bold' else FONTE
+        grafico.barLabels.fontSize = 9
+    desenho.add(grafico)
+
+
+def _desenhar_pizza(desenho, spec, area):
+    pizza = Pie()
+    lado = min(area[2], area[3]) * 0.75
+    pizza.x = area[0] + (area[2] - lado) / 2
+    pizza.y = area[1] + (area[3] - lado) / 2
+    pizza.width = pizza.height = lado
+    valores = list(spec['valores'])
+    total = float(sum(valores)) or 1.0
+    pizza.data = valores
+    pizza.labels = [f"{rotulo} ({v / total * 100:.1f}%)" for rotulo, v in zip(spec['rotulos'], valores)]
+    pizza.startAngle = 90
+    pizza.direction = 'anticlockwise'
+    pizza.slices.strokeColor = colors.white
+    pizza.slices.fontName = FONTE
+    pizza.slices.fontSize = 9
+    for i, cor in enumerate(_lista_cores(spec['cores'], len(valores))):
+        pizza.slices[i].fillColor = cor
+    desenho.add(pizza)
+
+
+DESENHISTAS = {
+    'linha': _desenhar_linha,
+    'barras': _desenhar_barras,
+    'projecao': _desenhar_projecao,
+    'pizza': _desenhar_pizza,
+}
+
+
+def criar_desenho(spec):
+    """Cria um Drawing com o tamanho da figura da especificação (em pontos)"""
+    largura, altura = spec.get('figsize', (10, 6))
+    desenho = Drawing(largura * inch, altura * inch)
+    area = _area(desenho, spec) if spec['tipo'] != 'pizza' else (20, 20, desenho.width - 40, desenho.height - 60)
+    DESENHISTAS[spec['tipo']](desenho, spec, area)
+    _titulo_e_rotulos(desenho, spec, area)
+    return desenho
+
+
+def criar_figura(grafico, largura, altura):
+    """
+    Flowable para um gráfico: `Image` quando é o caminho ou os bytes de um
+    PNG (ver imagens.exportar_figura), ou o `Drawing` redimensionado para
+    (largura, altura) quando é vetorial.
+    """
+    if isinstance(grafico, bytes):
+        grafico = io.BytesIO(grafico)
+    if isinstance(grafico, (str, io.BytesIO)):
+        img = Image(grafico)
+        img.drawHeight = altura
+        img.drawWidth = largura
+        return img
+
+    escala_x = largura / grafico.width
+    escala_y = altura / grafico.height
+    grafico.scale(escala_x, escala_y)
+    grafico.width, grafico.height = largura, altura
+    grafico.hAlign = 'CENTER'
+    return grafico
+
+
+class EstagioVetorial:
+    """Mesma interface de EstagioRenderizacao, produzindo Drawings em vez de PNGs"""
+
+    def __init__(self):
+        self._specs = {}
+        self.resultados = {}
+
+    def submeter(self, nome, spec):
+        self._specs[nome] = spec
+
+    def aguardar(self):
+        """Cria os desenhos e retorna {nome: Drawing}"""
+        desenhos = {}
+        for nome, spec in self._specs.items():
+            inicio = time.perf_counter()
+            with medir('grafico', grafico=nome, tipo=spec['tipo']):
+                desenhos[nome] = criar_desenho(spec)
+            self.resultados[nome] = {'tipo': spec['tipo'], 'cache': False, 'duracao': time.perf_counter() - inicio}
+        return desenhos
+
+    def encerrar(self):
+        pass
+
+    def exportacoes(self):
+        """Sem formatos exportados: os desenhos vão direto para o PDF"""
+        return {}
+
+    def tempos(self):
+        return {nome: r['duracao'] for nome, r in self.resultados.items()}
+
+    def resumo(self):
+        tempos = ', '.join(f"{nome} {duracao * 1000:.1f}ms" for nome, duracao in self.tempos().items())
+        return f"{len(self._specs)} gráficos vetoriais [{tempos}]"
+
+
+def criar_estagio(backend='vetorial', **kwargs):
+    """Cria o estágio de gráficos para o backend escolhido"""
+    if backend == 'vetorial':
+        return EstagioVetorial()
+    if backend == 'matplotlib':
+        from .renderizacao import EstagioRenderizacao
+        return EstagioRenderizacao(**kwargs)
+    raise ValueError(f"Backend de gráficos desconhecido: {backend} (use {', '.join(BACKENDS)})")
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Imagens dos gráficos no tamanho exato em que aparecem no PDF.
+
+Antes, os gráficos eram salvos a 300 dpi em 10×6 polegadas com
+`bbox_inches='tight'` e depois espremidos em uma caixa de 6×4 polegadas pelo
+`Image` do reportlab: o PDF recebia quase o triplo dos pixels exibidos, com
+a proporção distorcida, e um canal alfa (SMask) que nunca é usado.
+
+Uma especificação com `caixa` (largura e altura no PDF, em polegadas) é
+renderizada para ocupar exatamente essa caixa a `dpi` pontos por polegada:
+
+- a figura mantém a largura de projeto (`figsize`, que define o tamanho
+  relativo das fontes) e ganha a proporção da caixa;
+- o dpi da renderização é ajustado para que a imagem tenha
+  `caixa × dpi` pixels;
+- o buffer RGBA do Agg é gravado diretamente como RGB, sem a codificação
+  PNG intermediária do matplotlib: PNG otimizado (em paleta quando a imagem
+  tem até 256 cores, sem perdas) ou, para destinos `.jpg`, JPEG, que o
+  reportlab embute sem decodificar.
+
+`exportar_figura` produz vários formatos a partir de um único desenho da
+figura: a imagem de impressão, uma miniatura reduzida do mesmo buffer, os
+bytes da imagem em memória (para o PDF, sem passar pelo disco) e o SVG para a
+web, gravado pelo backend vetorial a partir da figura já diagramada.
+
+`deduplicar` faz com que imagens de conteúdo idêntico em um lote apontem
+para o mesmo arquivo, que o reportlab embute uma única vez por documento.
+"""
+
+import io
+import os
+
+from .config import DPI_IMAGENS
+from .manifesto import hash_arquivo
+
+QUALIDADE_JPEG = 90
+
+# Formatos de `exportar_figura`: impressão (PNG ou JPEG), web (SVG), miniatura
+# (PNG) e buffer (bytes da imagem de impressão, sem arquivo)
+FORMATOS_EXPORTACAO = ('impressao', 'web', 'miniatura', 'buffer')
+EXTENSOES_EXPORTACAO = {'impressao': '.png', 'web': '.svg', 'miniatura': '.png'}
+LARGURA_MINIATURA = 320
+
+
+def geometria(spec):
+    """
+    (figsize, dpi) com que a especificação deve ser renderizada para ter
+    exatamente `caixa` polegadas a `dpi` pontos por polegada no PDF.
+    """
+    largura, altura = spec['caixa']
+    largura_projeto = spec.get('figsize', (10, 6))[0]
+    dpi = spec.get('dpi', DPI_IMAGENS) * largura / largura_projeto
+    return (largura_projeto, largura_projeto * altura / largura), dpi
+
+
+def formato_do_arquivo(caminho):
+    """'jpeg' para arquivos .jpg/.jpeg, 'png' para os demais"""
+    return 'jpeg' if os.path.splitext(caminho)[1].lower() in ('.jpg', '.jpeg') else 'png'
+
+
+def _codificar(imagem, formato, qualidade=QUALIDADE_JPEG):
+    """Bytes da imagem RGB em JPEG ou em PNG otimizado (em paleta, sem perdas, com até 256 cores)"""
+    from PIL import Image
+
+    saida = io.BytesIO()
+    if formato == 'jpeg':
+        # Sem subamostragem de cor, para não borrar linhas finas e texto
+        imagem.save(saida, 'JPEG', quality=qualidade, optimize=True, subsampling=0)
+    else:
+        cores = imagem.getcolors(256)
+        if cores is not None:
+            # Paleta exata com as cores presentes: sem perdas
+            paleta = Image.new('P', (1, 1))
+            paleta.putpalette([canal for _, cor in cores for canal in cor])
+            imagem = imagem.quantize(palette=paleta, dither=Image.Dither.NONE)
+        imagem.save(saida, 'PNG', optimize=True)
+    return saida.getvalue()
+
+
+def _gravar(caminho, conteudo):
+    with open(caminho, 'wb') as file:
+        file.write(conteudo)
+
+
+def exportar_figura(fig, dpi, saidas, largura_miniatura=LARGURA_MINIATURA, qualidade=QUALIDADE_JPEG):
+    """
+    Desenha `fig` uma única vez a `dpi` e grava cada formato de `saidas`
+    ({formato: caminho}, ver FORMATOS_EXPORTACAO). Um caminho None (e o
+    formato 'buffer') devolve os bytes em vez de gravar um arquivo.
+
+    Retorna ({formato: caminho ou bytes}, (largura, altura) da imagem em pixels).
+    """
+    from PIL import Image
+
+    desconhecidos = set(saidas) - set(FORMATOS_EXPORTACAO)
+    if desconhecidos:
+        raise ValueError(f"Formatos de exportação desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    fig.set_dpi(dpi)
+    resultado = {}
+    largura, altura = fig.canvas.get_width_height(physical=True)
+    if set(saidas) & {'impressao', 'buffer', 'miniatura'}:
+        fig.canvas.draw()
+        # O fundo da figura é opaco: o canal alfa só viraria uma SMask no PDF
+        imagem = Image.frombuffer('RGBA', (largura, altura), fig.canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+        imagem = imagem.convert('RGB')
+
+    impressao = saidas.get('impressao')
+    if 'impressao' in saidas or 'buffer' in saidas:
+        formato = formato_do_arquivo(impressao) if impressao else 'png'
+        conteudo = _codificar(imagem, formato, qualidade)
+        if impressao:
+            _gravar(impressao, conteudo)
+        if 'impressao' in saidas:
+            resultado['impressao'] = impressao or conteudo
+        if 'buffer' in saidas:
+            resultado['buffer'] = conteudo
+
+    if 'miniatura' in saidas:
+        # Reduzida do mesmo buffer, sem desenhar a figura de novo
+        miniatura = imagem.resize((largura_miniatura, max(1, round(altura * largura_miniatura / largura))),
+                                  Image.Resampling.LANCZOS)
+        conteudo = _codificar(miniatura, 'png')
+        if saidas['miniatura']:
+            _gravar(saidas['miniatura'], conteudo)
+        resultado['miniatura'] = saidas['miniatura'] or conteudo
+
+    if 'web' in saidas:
+        import matplotlib as mpl
+        # Sem data e com identificadores fixos: o mesmo gráfico gera o mesmo SVG
+        saida = saidas['web'] or io.BytesIO()
+        with mpl.rc_context({'svg.hashsalt': 'limfs', 'svg.fonttype': 'none'}):
+            fig.savefig(saida, format='svg', metadata={'Date': None})
+        resultado['web'] = saidas['web'] or saida.getvalue()
+    return resultado, (largura, altura)
+
+
+def salvar_figura(fig, caminho, dpi, qualidade=QUALIDADE_JPEG):
+    """Renderiza `fig` a `dpi` e grava a imagem otimizada em `caminho`; retorna (largura, altura) em pixels"""
+    return exportar_figura(fig, dpi, {'impressao': caminho}, qualidade=qualidade)[1]
+
+
+def deduplicar(caminhos):
+    """
+    Recebe {nome: caminho} e retorna o mesmo mapeamento com arquivos de
+    conteúdo idêntico substituídos pelo primeiro deles.
+
+    Valores que não são caminhos de arquivo (Drawings) são mantidos.
+    """
+    canonicos = {}
+    resultado = {}
+    for nome, caminho in caminhos.items():
+        if not isinstance(caminho, str) or not os.path.exists(caminho):
+            resultado[nome] = caminho
+            continue
+        resultado[nome] = canonicos.setdefault(hash_arquivo(caminho), caminho)
+    return resultado
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Ingestão concorrente e tipada da árvore `dados/`.
+
+`ingerir(dados_dir)` lê todos os JSON de `dados_dir` (inclusive
+`indicadores/` e `municipios/`) em um pool de threads. Cada arquivo é lido
+de uma vez e tem o SHA-256 calculado sobre os mesmos bytes (o hash é
+memorizado para o manifesto e para a base de séries, ver
+manifesto.hash_arquivo). Depois é decodificado com orjson (ver
+fontes.decodificar_json) e convertido, ainda na thread, em registros com
+__slots__, e o dicionário decodificado é descartado:
+
+- `Serie`: uma série normalizada (importada pela base de séries, ver
+  banco_series.py), com anos e valores em `array` (sem um objeto Python
+  por ponto);
+- `IndicadorODS` (fontes.py): o indicador principal de um `ods*_*.json`,
+  com a mesma série compartilhada com a `Serie` correspondente.
+
+Um arquivo ilegível, com JSON inválido ou em formato inesperado não
+interrompe a ingestão: vira um `ErroIngestao` em `Ingestao.erros`.
+
+A leitura e o SHA-256 liberam o GIL; a decodificação não, então o ganho das
+threads está na E/S (cache de disco frio, sistemas de arquivos em rede). O
+ganho com o cache quente vem de ler cada arquivo uma única vez, do orjson e
+de não materializar um dicionário por ponto.
+"""
+
+import os
+import re
+import glob
+import time
+import hashlib
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import DADOS_DIR
+from .fontes import (PADRAO_ARQUIVO_ODS, IndicadorODS, converter_numero, colunas_historico, decodificar_json,
+                     indicador_de_dados)
+from .manifesto import memorizar_hash
+
+# Arquivos de configuração e monitoramento, sem séries de indicadores
+ARQUIVOS_IGNORADOS = {'ods-config.json', 'historico-alertas.json'}
+
+PADRAO_ODS_TEXTO = re.compile(r'ODS\s*(\d+)', re.IGNORECASE)
+
+# Arquivos por tarefa do pool: poucas tarefas grandes custam menos que uma por arquivo
+ARQUIVOS_POR_TAREFA = 32
+
+
+@dataclass(slots=True)
+class Serie:
+    """Série de um indicador: atributos e pontos em colunas (`anos` int, `valores` float)"""
+
+    chave: str
+    fonte: str
+    anos: object
+    valores: object
+    ods: str = ''
+    indicador: str = ''
+    unidade: str = ''
+    regiao: str = ''
+    principal: bool = False
+    meta: float = None
+
+    def __len__(self):
+        return len(self.anos)
+
+
+@dataclass(slots=True)
+class ErroIngestao:
+    """Falha ao ler, decodificar ou interpretar um arquivo"""
+
+    arquivo: str
+    fonte: str
+    mensagem: str
+
+
+@dataclass(slots=True)
+class ArquivoIngerido:
+    """
+    Resultado da ingestão de um arquivo: `fonte` é o caminho relativo a
+    `dados/` sem extensão (ex.: 'indicadores/ods1_pobreza'); `indicador`
+    só existe para os arquivos `ods*_*.json`.
+    """
+
+    arquivo: str
+    fonte: str
+    hash: str = None
+    series: tuple = ()
+    indicador: IndicadorODS = None
+    erro: ErroIngestao = None
+
+
+@dataclass(slots=True)
+class Ingestao:
+    """Todos os arquivos de uma árvore `dados/`, na ordem de `arquivos_json`"""
+
+    dados_dir: str
+    arquivos: list
+    duracao: float = 0.0
+
+    @property
+    def series(self):
+        return [serie for arquivo in self.arquivos for serie in arquivo.series]
+
+    @property
+    def indicadores(self):
+        """{caminho: IndicadorODS} dos arquivos `ods*_*.json` lidos sem erro"""
+        return {a.arquivo: a.indicador for a in self.arquivos if a.indicador is not None}
+
+    @property
+    def erros(self):
+        return [a.erro for a in self.arquivos if a.erro is not None]
+
+    @property
+    def hashes(self):
+        """{caminho relativo: SHA-256} de todos os arquivos legíveis"""
+        return {os.path.relpath(a.arquivo, self.dados_dir): a.hash for a in self.arquivos if a.hash}
+
+
+def arquivos_json(dados_dir=DADOS_DIR):
+    """Arquivos JSON de `dados_dir` com séries de indicadores, em ordem"""
+    arquivos = glob.glob(os.path.join(dados_dir, '**', '*.json'), recursive=True)
+    return sorted(a for a in arquivos if os.path.basename(a) not in ARQUIVOS_IGNORADOS)
+
+
+def _codigo_ods(valor):
+    """Converte "ODS 1", 1 ou "ods1" no código "ods1" ('' se não houver)"""
+    if isinstance(valor, int):
+        return f'ods{valor}'
+    correspondencia = PADRAO_ODS_TEXTO.search(str(valor or ''))
+    return f'ods{correspondencia.group(1)}' if correspondencia else ''
+
+
+def _serie(chave, fonte, pontos, ods='', indicador='', unidade='', regiao='', meta=None, principal=False):
+    anos, valores, _ = colunas_historico(pontos)
+    return Serie(chave, fonte, anos, valores, ods, indicador or '', unidade or '', regiao or '', principal,
+                 converter_numero(meta))
+
+
+def _series_ods(indicador, dados, fonte):
+    """Arquivos `ods*_*.json`: indicador principal e, no ODS 18, os indicadores complementares"""
+    titulo = indicador.indicador or indicador.titulo_exibido()
+    series = [Serie(fonte, fonte, indicador.anos, indicador.valores, indicador.codigo, titulo,
+                    indicador.unidade, '', True, indicador.meta_2030)]
+    if isinstance(dados.get('indicadores'), dict) and 'historico' not in dados:
+        for chave, complementar in list(dados['indicadores'].items())[1:]:
+            series.append(_serie(f'{fonte}/{chave}', fonte, complementar.get('historico'), indicador.codigo,
+                                 complementar.get('titulo'), complementar.get('unidade'),
+                                 meta=complementar.get('meta_2030')))
+    return series
+
+
+def _series_painel(dados, fonte):
+    """`indicadores.json`: uma série por cartão do painel (grafico.labels × grafico.dados)"""
+    series = []
+    for item in dados.get('indicadores', []):
+        grafico = item.get('grafico') or {}
+        pontos = [{'ano': ano, 'valor': valor}
+                  for ano, valor in zip(grafico.get('labels', []), grafico.get('dados', []))]
+        series.append(_serie(f"{fonte}/{item.get('id')}", fonte, pontos, _codigo_ods(item.get('ods')),
+                             item.get('titulo'), grafico.get('unidade')))
+    return series
+
+
+def _series_genericas(dados, fonte):
+    """Arquivos com lista `dados` (por região), `historico` ou só o último valor em `dados`"""
+    resumo = dados.get('dados')
+    if isinstance(resumo, list):
+        pontos = resumo
+    elif isinstance(dados.get('historico'), list):
+        pontos = dados['historico']
+    elif isinstance(resumo, dict) and 'ano' in resumo:
+        pontos = [resumo]
+    else:
+        return []
+
+    resumo = resumo if isinstance(resumo, dict) else {}
+    ods = _codigo_ods((dados.get('indicadorODS') or {}).get('objetivo'))
+    indicador = (dados.get('nome') or dados.get('indicador') or dados.get('titulo')
+                 or resumo.get('descricao') or dados.get('fonte'))
+    unidade = dados.get('unidade') or resumo.get('unidade')
+    meta = dados.get('meta_ods', dados.get('meta_2030'))
+
+    # Pontos com `regiao` (lista principal e `dadosRegionais`) viram uma série por região
+    por_regiao = {}
+    for ponto in list(pontos) + list(dados.get('dadosRegionais') or []):
+        por_regiao.setdefault(ponto.get('regiao') or '', []).append(ponto)
+
+    series = []
+    for i, (regiao, pontos_regiao) in enumerate(por_regiao.items()):
+        chave = fonte if i == 0 else f'{fonte}/{regiao}'
+        series.append(_serie(chave, fonte, pontos_regiao, ods, indicador, unidade, regiao,
+                             meta if i == 0 else None))
+    return series
+
+
+def ingerir_arquivo(caminho, dados_dir=DADOS_DIR):
+    """Lê, calcula o hash, decodifica e converte um arquivo; erros ficam no resultado"""
+    fonte = os.path.splitext(os.path.relpath(caminho, dados_dir))[0].replace(os.sep, '/')
+    resultado = ArquivoIngerido(caminho, fonte)
+    try:
+        with open(caminho, 'rb') as file:
+            info = os.fstat(file.fileno())
+            conteudo = file.read()
+    except OSError as e:
+        resultado.erro = ErroIngestao(caminho, fonte, f"{type(e).__name__}: {e}")
+        return resultado
+    resultado.hash = hashlib.sha256(conteudo).hexdigest()
+    memorizar_hash(caminho, info, resultado.hash)
+
+    try:
+        dados = decodificar_json(conteudo)
+        if PADRAO_ARQUIVO_ODS.match(os.path.basename(caminho)):
+            resultado.indicador = indicador_de_dados(dados, caminho)
+            resultado.series = tuple(_series_ods(resultado.indicador, dados, fonte))
+        elif not isinstance(dados, dict):
+            pass
+        elif isinstance(dados.get('indicadores'), list):
+            resultado.series = tuple(_series_painel(dados, fonte))
+        else:
+            resultado.series = tuple(_series_genericas(dados, fonte))
+    except (ValueError, AttributeError, TypeError) as e:
+        resultado.indicador, resultado.series = None, ()
+        resultado.erro = ErroIngestao(caminho, fonte, f"{type(e).__name__}: {e}")
+    return resultado
+
+
+def _ingerir_lote(caminhos, dados_dir):
+    return [ingerir_arquivo(caminho, dados_dir) for caminho in caminhos]
+
+
+def ingerir(dados_dir=DADOS_DIR, arquivos=None, max_workers=None):
+    """
+    Ingere `arquivos` (padrão: `arquivos_json(dados_dir)`) em um pool de
+    threads e retorna a `Ingestao`, com os arquivos na ordem de entrada.
+    `max_workers=1` lê tudo na thread atual.
+    """
+    inicio = time.perf_counter()
+    arquivos = arquivos_json(dados_dir) if arquivos is None else list(arquivos)
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    if max_workers == 1 or len(arquivos) <= ARQUIVOS_POR_TAREFA:
+        ingeridos = _ingerir_lote(arquivos, dados_dir)
+    else:
+        lotes = [arquivos[i:i + ARQUIVOS_POR_TAREFA] for i in range(0, len(arquivos), ARQUIVOS_POR_TAREFA)]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(lotes))) as executor:
+            ingeridos = [a for lote in executor.map(_ingerir_lote, lotes, [dados_dir] * len(lotes)) for a in lote]
+    return Ingestao(dados_dir, ingeridos, time.perf_counter() - inicio)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação das etapas do pipeline de relatórios.
+
+Cada etapa (carregar, analisar, gráficos, PDF, cada gráfico, cada seção do
+consolidado) é envolvida por `medir`:
+
+    with medir('gerar_graficos', relatorio='ods1_pobreza'):
+        gerador.gerar_graficos()
+
+Com a instrumentação ativa (`limfs-relatorios --metricas arquivo.jsonl` ou
+`configurar(metricas=...)`), cada etapa grava uma linha JSON com:
+
+- `etapa` e `caminho` (etapas aninhadas: `comando/relatorio/gerar_graficos`);
+- os rótulos da etapa e das etapas que a contêm (`relatorio`, `grafico`, ...);
+- `inicio` (UTC), `pid`, `wall_s` (tempo decorrido) e `cpu_s` (CPU do
+  processo);
+- `rss_pico_mb`, o pico de memória residente do processo até o fim da etapa;
+- `blocos`, a variação líquida de blocos alocados pelo Python
+  (`sys.getallocatedblocks`), e `coletas_gc`, as coletas do gc na etapa;
+- `erro`, se a etapa falhou.
+
+Com `--profile DIR`, o tracemalloc é ligado e cada linha ganha
+`pico_python_mb` (pico de memória alocada pelo Python durante a etapa). As
+etapas mais externas de cada processo (o comando, cada relatório gerado em
+um trabalhador) também gravam em DIR um perfil do cProfile (`.prof`, para
+`pstats`/snakeviz) e um snapshot do tracemalloc (`.tracemalloc`, para
+`tracemalloc.Snapshot.load`), cujos caminhos vão na linha (`perfil` e
+`snapshot`). Os snapshots são só gravados: agrupá-los por linha de código
+custa segundos e fica para a análise.
+
+A configuração vai em variáveis de ambiente, herdadas pelos processos dos
+pools. Sem instrumentação ativa, `medir` não mede nada. `resumir_metricas`
+agrega um arquivo de métricas por etapa (`limfs-relatorios metricas`).
+"""
+
+import gc
+import os
+import re
+import sys
+import json
+import time
+import itertools
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows: pico de memória não disponível
+    resource = None
+
+VARIAVEL_METRICAS = 'LIMFS_METRICAS'
+VARIAVEL_PERFIL = 'LIMFS_PERFIL'
+
+# Etapa em andamento no contexto atual: {'caminho', 'rotulos', 'pico', 'pid'}
+_etapa_atual = contextvars.ContextVar('etapa_atual', default=None)
+_sequencia = itertools.count(1)
+
+
+def configurar(metricas=None, perfil=None):
+    """
+    Ativa a instrumentação neste processo e nos processos criados a partir
+    dele. `metricas` é o arquivo JSON lines ('-' para a saída de erro);
+    com `perfil` (diretório) e sem `metricas`, as linhas vão para
+    `perfil/metricas.jsonl`.
+    """
+    if perfil:
+        os.makedirs(perfil, exist_ok=True)
+        metricas = metricas or os.path.join(perfil, 'metricas.jsonl')
+    for variavel, valor in ((VARIAVEL_METRICAS, metricas), (VARIAVEL_PERFIL, perfil)):
+        if valor:
+            os.environ[variavel] = valor if valor == '-' else os.path.abspath(valor)
+        else:
+            os.environ.pop(variavel, None)
+
+
+def pico_memoria_mb():
+    """Pico de memória residente do processo atual, em MB (None se indisponível)"""
+    if resource is None:
+        return None
+    # ru_maxrss é em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _coletas_gc():
+    return sum(estatistica['collections'] for estatistica in gc.get_stats())
+
+
+def emitir(registro):
+    """Grava uma linha JSON no destino das métricas (uma única escrita em modo append)"""
+    destino = os.environ.get(VARIAVEL_METRICAS)
+    if not destino:
+        return
+    linha = json.dumps(registro, ensure_ascii=False, default=str) + '\n'
+    if destino == '-':
+        sys.stderr.write(linha)
+        return
+    descritor = os.open(destino, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(descritor, linha.encode('utf-8'))
+    finally:
+        os.close(descritor)
+
+
+def _nome_perfil(registro):
+    partes = [registro['etapa']] + [str(v) for v in registro['rotulos'].values()]
+    nome = re.sub(r'[^\w.-]+', '_', '_'.join(partes)).strip('_')[:80]
+    return f"{nome}_{registro['pid']}_{next(_sequencia)}"
+
+
+@contextmanager
+def medir(etapa, **rotulos):
+    """
+    Mede a etapa e grava sua linha de métricas ao final (também em caso de
+    erro, que é propagado). Produz o dicionário do registro, ao qual o
+    chamador pode acrescentar campos (ex.: `paginas`).
+    """
+    if not os.environ.get(VARIAVEL_METRICAS):
+        yield {}
+        return
+
+    pai = _etapa_atual.get()
+    herdados = pai['rotulos'] if pai else {}
+    if pai is not None and pai['pid'] != os.getpid():
+        # Contexto herdado no fork de um trabalhador: a etapa é a mais externa
+        # deste processo, mas mantém os rótulos de quem criou o pool
+        pai = None
+    perfil = os.environ.get(VARIAVEL_PERFIL)
+    quadro = {
+        'caminho': f"{pai['caminho']}/{etapa}" if pai else etapa,
+        'rotulos': {**herdados, **rotulos},
+        'pico': 0,
+        'pid': os.getpid(),
+    }
+    registro = {'etapa': etapa, 'caminho': quadro['caminho'], 'rotulos': quadro['rotulos'],
+                'inicio': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), 'pid': os.getpid()}
+
+    profiler = None
+    if perfil:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if pai is not None:
+            # reset_peak apaga o pico da etapa externa: guarda-o antes
+            pai['pico'] = max(pai['pico'], tracemalloc.get_traced_memory()[1])
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+        tracemalloc.reset_peak()
+
+    token = _etapa_atual.set(quadro)
+    coletas, blocos = _coletas_gc(), sys.getallocatedblocks()
+    if profiler is not None:
+        profiler.enable()
+    cpu, wall = time.process_time(), time.perf_counter()
+    try:
+        yield registro
+    except BaseException as e:
+        registro['erro'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        if profiler is not None:
+            profiler.disable()
+        _etapa_atual.reset(token)
+        registro.update({
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'rss_pico_mb': pico_memoria_mb(),
+            'blocos': sys.getallocatedblocks() - blocos,
+            'coletas_gc': _coletas_gc() - coletas,
+        })
+        if perfil:
+            _registrar_perfil(registro, quadro, pai, perfil, profiler)
+        emitir(registro)
+
+
+def _registrar_perfil(registro, quadro, pai, perfil, profiler):
+    import tracemalloc
+
+    pico = max(quadro['pico'], tracemalloc.get_traced_memory()[1])
+    registro['pico_python_mb'] = round(pico / 2 ** 20, 3)
+    if pai is not None:
+        pai['pico'] = max(pai['pico'], pico)
+        return
+
+    base = os.path.join(perfil, _nome_perfil(registro))
+    profiler.dump_stats(base + '.prof')
+    tracemalloc.take_snapshot().dump(base + '.tracemalloc')
+    registro['perfil'] = base + '.prof'
+    registro['snapshot'] = base + '.tracemalloc'
+
+
+def ler_metricas(caminho):
+    """Registros de um arquivo de métricas (linhas inválidas são ignoradas)"""
+    registros = []
+    with open(caminho, 'r', encoding='utf-8') as file:
+        for linha in file:
+            try:
+                registros.append(json.loads(linha))
+            except json.JSONDecodeError:
+                continue
+    return registros
+
+
+def resumir_metricas(registros):
+    """
+    Agrega os registros por caminho de etapa: quantidade, erros, wall total,
+    médio e máximo, CPU total e maior pico de memória. Ordenado pelo wall
+    total, do maior para o menor.
+    """
+    grupos = {}
+    for r in registros:
+        g = grupos.setdefault(r['caminho'], {'caminho': r['caminho'], 'quantidade': 0, 'erros': 0,
+                                             'wall_total_s': 0.0, 'wall_max_s': 0.0, 'cpu_total_s': 0.0,
+                                             'rss_pico_mb': None})
+        g['quantidade'] += 1
+        g['erros'] += 'erro' in r
+        g['wall_total_s'] += r['wall_s']
+        g['wall_max_s'] = max(g['wall_max_s'], r['wall_s'])
+        g['cpu_total_s'] += r['cpu_s']
+        if r.get('rss_pico_mb') is not None:
+            g['rss_pico_mb'] = max(g['rss_pico_mb'] or 0.0, r['rss_pico_mb'])
+    for g in grupos.values():
+        g['wall_medio_s'] = g['wall_total_s'] / g['quantidade']
+    return sorted(grupos.values(), key=lambda g: -g['wall_total_s'])
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Geração em lote dos relatórios técnicos de todos os ODS.
+
+Cada ODS passa pelo fluxo completo (carregar → analisar → gráficos → PDF) em
+um processo separado, de modo que o tempo total fica próximo ao do ODS mais
+lento em vez da soma de todos. Com um manifesto de build, os ODS cujo arquivo
+de indicadores, configuração e código não mudaram desde a última geração são
+pulados.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .config import INDICADORES_DIR, ODS_CONFIG_FILE, REPORT_DIR, CHARTS_DIR
+from .fontes import carregar_config_ods, descobrir_arquivos_ods
+
+
+def gerar_relatorio_ods(arquivo, config_ods=None, report_dir=REPORT_DIR, charts_dir=CHARTS_DIR,
+                        backend_graficos='vetorial', exportar=(), reprodutivel=False):
+    """
+    Executa o fluxo completo para um arquivo de indicador (roda no processo
+    trabalhador). `exportar`: formatos extras dos gráficos; `reprodutivel`:
+    PDF sem dependência do momento da geração (ver gerador.py).
+    """
+    # Importação tardia: o processo principal não precisa de matplotlib/reportlab
+    from .gerador import ODSReportGenerator
+
+    inicio = time.perf_counter()
+    # Os gráficos são renderizados no próprio trabalhador: o paralelismo já é por ODS
+    gerador = ODSReportGenerator(arquivo, config_ods, report_dir=report_dir, charts_dir=charts_dir,
+                                 workers_graficos=0, backend_graficos=backend_graficos, exportar=exportar,
+                                 reprodutivel=reprodutivel)
+    saida = gerador.executar()
+    return {
+        'arquivo': arquivo,
+        'codigo': gerador.info['codigo'],
+        'relatorio': saida,
+        'graficos': {nome: g for nome, g in gerador.graficos.items() if isinstance(g, str)},
+        'exportacoes': [c for formatos in gerador.exportacoes.values() for c in formatos.values()
+                        if isinstance(c, str)],
+        'duracao': time.perf_counter() - inicio,
+    }
+
+
+def _codigo_arquivo(arquivo):
+    return os.path.basename(arquivo).split('_')[0]
+
+
+def _chave_manifesto(arquivo):
+    """Chave do relatório no manifesto, pelo nome do arquivo (dois arquivos podem ter o mesmo ODS)"""
+    return f"relatorio:{os.path.splitext(os.path.basename(arquivo))[0]}"
+
+
+def gerar_todos(indicadores_dir=INDICADORES_DIR, report_dir=REPORT_DIR, charts_dir=CHARTS_DIR,
+                filtro=None, max_workers=None, backend_graficos='vetorial', manifesto=None,
+                ods_config_file=ODS_CONFIG_FILE, exportar=(), reprodutivel=False):
+    """
+    Gera os relatórios de todos os ODS em paralelo.
+
+    Retorna (resultados, erros): a falha de um ODS é registrada em `erros`
+    sem interromper os demais. Com `manifesto` (ver manifesto.ManifestoBuild),
+    os ODS já atualizados entram em `resultados` com `atualizado=True` sem
+    serem gerados de novo. `exportar` lista os formatos extras dos gráficos
+    do backend matplotlib (ver gerador.ODSReportGenerator); `reprodutivel`
+    gera PDFs que só mudam quando os dados mudam (ver publicacao.py).
+    """
+    parametros = {'graficos': backend_graficos}
+    if exportar:
+        parametros['exportar'] = sorted(exportar)
+    if reprodutivel:
+        parametros['reprodutivel'] = True
+    config_ods = carregar_config_ods(ods_config_file)
+    arquivos = descobrir_arquivos_ods(indicadores_dir)
+    if filtro:
+        arquivos = [a for a in arquivos if _codigo_arquivo(a) in filtro]
+
+    resultados, erros = [], []
+    pendentes = arquivos
+    if manifesto is not None:
+        pendentes = []
+        for arquivo in arquivos:
+            chave = _chave_manifesto(arquivo)
+            if manifesto.atualizado(chave, [arquivo, ods_config_file], parametros):
+                resultados.append({'arquivo': arquivo, 'codigo': _codigo_arquivo(arquivo),
+                                   'relatorio': manifesto.saidas(chave)[0], 'graficos': {},
+                                   'duracao': 0.0, 'atualizado': True})
+            else:
+                pendentes.append(arquivo)
+
+    if not pendentes:
+        return resultados, erros
+
+    max_workers = max_workers or min(len(pendentes), os.cpu_count() or 1)
+    print(f"Gerando {len(pendentes)} relatórios com {max_workers} processos...")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {
+            executor.submit(gerar_relatorio_ods, arquivo, config_ods, report_dir, charts_dir,
+                            backend_graficos, exportar, reprodutivel): arquivo
+            for arquivo in pendentes
+        }
+        for futuro in as_completed(futuros):
+            arquivo = futuros[futuro]
+            try:
+                resultado = futuro.result()
+                resultados.append(resultado)
+                if manifesto is not None:
+                    manifesto.registrar(_chave_manifesto(arquivo), [arquivo, ods_config_file],
+                                        [resultado['relatorio'], *resultado['graficos'].values(),
+                                         *resultado['exportacoes']], parametros)
+            except Exception as e:
+                print(f"ERRO ao gerar relatório de {os.path.basename(arquivo)}: {e}")
+                erros.append({'arquivo': arquivo, 'erro': str(e)})
+
+    resultados.sort(key=lambda r: arquivos.index(r['arquivo']))
+
+    # Limpeza do cache de gráficos uma única vez, depois que todos os processos terminaram
+    if backend_graficos == 'matplotlib':
+        from .cache_graficos import CacheGraficos
+        CacheGraficos(os.path.join(charts_dir, 'cache')).limpar()
+    return resultados, erros
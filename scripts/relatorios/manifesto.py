@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Manifesto de build para geração incremental dos relatórios.
+
+Para cada artefato (relatório ou gráfico) o manifesto guarda o hash dos
+arquivos de entrada em `dados/`, a versão do código que o gerou, o hash dos
+parâmetros e a lista de arquivos de saída. Uma execução posterior consulta
+`atualizado()` e pula as etapas cujas entradas não mudaram, refazendo só o que
+depende do arquivo alterado.
+"""
+
+import os
+import json
+import glob
+import hashlib
+
+from .config import MANIFESTO_FILE
+
+VERSAO_MANIFESTO = 1
+
+_PACOTE_DIR = os.path.dirname(os.path.abspath(__file__))
+_hashes_arquivos = {}
+
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo de um arquivo (None se não existir), memorizado por mtime/tamanho"""
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    assinatura = (info.st_mtime_ns, info.st_size)
+    memorizado = _hashes_arquivos.get(caminho)
+    if memorizado and memorizado[0] == assinatura:
+        return memorizado[1]
+
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as file:
+        for bloco in iter(lambda: file.read(1 << 16), b''):
+            sha.update(bloco)
+    _hashes_arquivos[caminho] = (assinatura, sha.hexdigest())
+    return sha.hexdigest()
+
+
+def memorizar_hash(caminho, info, sha256):
+    """Registra o hash de um arquivo já lido por outro caminho (ver ingestao.py), com o `os.stat` da leitura"""
+    _hashes_arquivos[caminho] = ((info.st_mtime_ns, info.st_size), sha256)
+
+
+def hash_parametros(parametros):
+    """SHA-256 de parâmetros serializáveis em JSON"""
+    conteudo = json.dumps(parametros, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def versao_codigo(*arquivos):
+    """Hash do código-fonte do pacote `relatorios`, dos modelos de relatório e dos scripts informados"""
+    fontes = (sorted(glob.glob(os.path.join(_PACOTE_DIR, '*.py'))) +
+              sorted(glob.glob(os.path.join(_PACOTE_DIR, 'modelos', '*.json'))) +
+              [os.path.abspath(a) for a in arquivos])
+    return hash_parametros({os.path.relpath(f, _PACOTE_DIR): hash_arquivo(f) for f in fontes})
+
+
+class ManifestoBuild:
+    """
+    Registro persistente de entradas, código e saídas de cada artefato gerado.
+
+    Com `forcar=True` nenhum artefato é considerado atualizado, mas os novos
+    registros continuam sendo gravados.
+    """
+
+    def __init__(self, caminho=MANIFESTO_FILE, versao=None, forcar=False):
+        self.caminho = caminho
+        self.versao = versao
+        self.forcar = forcar
+        self.artefatos = {}
+        self.alterado = False
+        try:
+            with open(caminho, 'r', encoding='utf-8') as file:
+                dados = json.load(file)
+            if dados.get('versao_manifesto') == VERSAO_MANIFESTO:
+                self.artefatos = dados.get('artefatos', {})
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def relativo(self, caminho):
+        """Caminho relativo ao manifesto, para que o registro não dependa de onde o repositório está"""
+        return os.path.relpath(os.path.abspath(caminho), os.path.dirname(self.caminho))
+
+    def _assinatura(self, entradas, parametros):
+        return {
+            'entradas': {self.relativo(e): hash_arquivo(e) for e in entradas},
+            'codigo': self.versao,
+            'parametros': hash_parametros(parametros) if parametros is not None else None,
+        }
+
+    def atualizado(self, chave, entradas=(), parametros=None):
+        """True se o artefato foi gerado com as mesmas entradas, código e parâmetros e suas saídas existem"""
+        registro = self.artefatos.get(chave)
+        if self.forcar or not registro:
+            return False
+        assinatura = self._assinatura(entradas, parametros)
+        if any(registro.get(campo) != valor for campo, valor in assinatura.items()):
+            return False
+        return all(os.path.exists(os.path.join(os.path.dirname(self.caminho), s)) for s in registro['saidas'])
+
+    def saidas(self, chave):
+        """Caminhos absolutos das saídas registradas para o artefato"""
+        base = os.path.dirname(self.caminho)
+        return [os.path.normpath(os.path.join(base, s)) for s in self.artefatos.get(chave, {}).get('saidas', [])]
+
+    def registrar(self, chave, entradas=(), saidas=(), parametros=None):
+        """Registra (ou substitui) o artefato após gerá-lo"""
+        registro = self._assinatura(entradas, parametros)
+        registro['saidas'] = [self.relativo(s) for s in saidas]
+        self.artefatos[chave] = registro
+        self.alterado = True
+
+    def dependentes(self, arquivo):
+        """Chaves dos artefatos que têm `arquivo` entre suas entradas"""
+        relativo = self.relativo(arquivo)
+        return [chave for chave, registro in self.artefatos.items() if relativo in registro.get('entradas', {})]
+
+    def salvar(self):
+        if not self.alterado:
+            return
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temporario = f'{self.caminho}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as file:
+            json.dump({'versao_manifesto': VERSAO_MANIFESTO, 'artefatos': self.artefatos},
+                      file, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporario, self.caminho)
+        self.alterado = False
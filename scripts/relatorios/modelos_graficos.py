@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Modelos reutilizáveis de figuras para renderização de gráficos em massa.
+
+Cada combinação de tipo de gráfico (linha, barras, projeção, pizza), tamanho
+e estilo ganha uma única Figure/Axes, criada e estilizada na primeira vez.
+Os gráficos seguintes só atualizam os dados dos artistas existentes (linhas,
+barras, rótulos), de modo que a memória fica limitada ao número de modelos,
+não ao número de gráficos produzidos. O tempo de cada renderização é
+registrado em `tempos`. `exportar` grava vários formatos (PNG, SVG,
+miniatura, bytes) de um único desenho.
+"""
+
+import time
+from collections import OrderedDict, deque
+
+MAX_MODELOS = 16
+MAX_TEMPOS = 1000
+
+
+def _rc(chave):
+    import matplotlib as mpl
+    return mpl.rcParams[chave]
+
+
+def _lista_cores(cores, quantidade):
+    if isinstance(cores, str):
+        return [cores] * quantidade
+    return [cores[i % len(cores)] for i in range(quantidade)]
+
+
+class ModeloGrafico:
+    """Figure/Axes estilizados uma única vez e reaproveitados para um tipo de gráfico"""
+
+    def __init__(self, tipo, figsize):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.tipo = tipo
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.artistas = {}
+        self.temporarios = []
+        self.usos = 0
+
+    def _limpar_temporarios(self):
+        for artista in self.temporarios:
+            artista.remove()
+        self.temporarios = []
+
+    def _atualizar_linha(self, spec):
+        ax = self.ax
+        if 'linha' not in self.artistas:
+            self.artistas['linha'], = ax.plot([], [], linewidth=2)
+        linha = self.artistas['linha']
+        linha.set_data(spec['x'], spec['y'])
+        linha.set_color(spec['cor'])
+        linha.set_marker(spec.get('marcador', 'o'))
+        linha.set_label(spec.get('legenda') or '_linha')
+
+    def _atualizar_projecao(self, spec):
+        ax = self.ax
+        if 'historico' not in self.artistas:
+            self.artistas['historico'], = ax.plot([], [], linewidth=2)
+            self.artistas['projecao'], = ax.plot([], [], linestyle='--', linewidth=2)
+            self.artistas['meta'] = ax.axhline(y=0)
+            self.artistas['previsao'], = ax.plot([], [], linestyle=':', linewidth=2)
+            # As bordas da faixa entram no relim(), que ignora o fill_between
+            self.artistas['faixa_inf'], = ax.plot([], [], linewidth=0.8)
+            self.artistas['faixa_sup'], = ax.plot([], [], linewidth=0.8)
+        legendas = spec.get('legendas', {})
+
+        historico = self.artistas['historico']
+        historico.set_data(spec['x'], spec['y'])
+        historico.set_color(spec['cor'])
+        historico.set_marker(spec.get('marcador', 'o'))
+        historico.set_label(legendas.get('historico', 'Dados históricos'))
+
+        projecao = self.artistas['projecao']
+        projecao.set_data(spec.get('x_proj', []), spec.get('y_proj', []))
+        projecao.set_color(spec.get('cor_projecao', spec['cor']))
+        projecao.set_marker(spec.get('marcador_projecao', 's'))
+        projecao.set_alpha(spec.get('alfa_projecao', 1.0))
+        projecao.set_label(legendas.get('projecao', 'Projeção necessária') if spec.get('x_proj') else '_projecao')
+
+        # Previsão da tendência (previsao.py) e intervalo de previsão, se houver
+        cor_previsao = spec.get('cor_previsao', spec['cor'])
+        previsao = self.artistas['previsao']
+        previsao.set_data(spec.get('x_prev', []), spec.get('y_prev', []))
+        previsao.set_color(cor_previsao)
+        previsao.set_label(legendas.get('previsao', 'Previsão da tendência') if spec.get('x_prev') else '_previsao')
+        for borda, chave in (('faixa_inf', 'y_faixa_inf'), ('faixa_sup', 'y_faixa_sup')):
+            linha = self.artistas[borda]
+            linha.set_data(spec.get('x_faixa', []) if spec.get(chave) else [], spec.get(chave) or [])
+            linha.set_color(cor_previsao)
+            linha.set_alpha(0.4)
+            linha.set_label('_' + borda)
+        if spec.get('x_faixa') and spec.get('y_faixa_inf'):
+            self.temporarios.append(self.ax.fill_between(
+                spec['x_faixa'], spec['y_faixa_inf'], spec['y_faixa_sup'], color=cor_previsao, alpha=0.15,
+                linewidth=0, label=legendas.get('intervalo', 'Intervalo de previsão (95%)')))
+
+        meta = self.artistas['meta']
+        meta.set_ydata([spec['meta'], spec['meta']])
+        meta.set_color(spec.get('cor_meta', '#DDA63A'))
+        meta.set_linestyle(spec.get('estilo_meta', '-.'))
+        meta.set_label(legendas.get('meta', f"Meta: {spec['meta']}"))
+        ax.legend()
+
+    def _atualizar_barras(self, spec):
+        ax = self.ax
+        valores = spec['valores']
+        cores = _lista_cores(spec['cores'], len(valores))
+        barras = self.artistas.get('barras')
+
+        if barras is not None and len(barras) == len(valores):
+            for retangulo, valor, cor in zip(barras, valores, cores):
+                retangulo.set_height(valor)
+                retangulo.set_facecolor(cor)
+        else:
+            # A quantidade de barras mudou: troca o contêiner em vez de acumular artistas
+            if barras is not None:
+                barras.remove()
+            barras = ax.bar(range(len(valores)), valores, color=cores)
+            self.artistas['barras'] = barras
+
+        ax.set_xticks(range(len(valores)))
+        rotacao = spec.get('rotacao_x') or 0
+        ax.set_xticklabels([str(c) for c in spec['categorias']], rotation=rotacao,
+                           ha='right' if rotacao else 'center')
+
+        formato = spec.get('rotulo_formato')
+        if formato:
+            deslocamento = spec.get('rotulo_deslocamento', 0.5)
+            for i, v in enumerate(valores):
+                self.temporarios.append(ax.text(i, v + deslocamento, formato.format(v), ha='center',
+                                                fontweight=spec.get('rotulo_peso', 'normal')))
+
+    def _atualizar_pizza(self, spec):
+        # As fatias variam em número e geometria: o Axes é limpo e reaproveitado
+        self.ax.clear()
+        self.ax.pie(spec['valores'], labels=spec['rotulos'], autopct='%1.1f%%', startangle=90,
+                    colors=spec['cores'])
+        self.ax.axis('equal')
+
+    def atualizar(self, spec):
+        """Aplica os dados e textos da especificação aos artistas do modelo"""
+        ax = self.ax
+        self._limpar_temporarios()
+        getattr(self, f'_atualizar_{self.tipo}')(spec)
+
+        titulo_fonte = {'fontsize': _rc('axes.titlesize'), 'fontweight': _rc('axes.titleweight')}
+        titulo_fonte.update(spec.get('titulo_fonte', {}))
+        ax.set_title(spec.get('titulo', ''), **titulo_fonte)
+        ax.set_xlabel(spec.get('xlabel') or '')
+        ax.set_ylabel(spec.get('ylabel') or '')
+
+        if self.tipo != 'pizza':
+            # Restaura a grade do estilo antes de aplicar a da especificação
+            ax.grid(False)
+            if _rc('axes.grid'):
+                ax.grid(True, axis=_rc('axes.grid.axis'), linestyle=_rc('grid.linestyle'), alpha=_rc('grid.alpha'))
+            grade = spec.get('grade', 'both')
+            if grade:
+                ax.grid(True, axis=grade, linestyle='--', alpha=0.7)
+            ax.relim()
+            ax.autoscale_view()
+            self.fig.tight_layout()
+        self.usos += 1
+
+
+class RenderizadorModelos:
+    """Renderiza especificações reaproveitando um modelo de figura por tipo, tamanho e estilo"""
+
+    def __init__(self, max_modelos=MAX_MODELOS):
+        self.max_modelos = max_modelos
+        self.modelos = OrderedDict()
+        self.tempos = deque(maxlen=MAX_TEMPOS)
+
+    def modelo(self, spec):
+        chave = (spec['tipo'], tuple(spec.get('figsize', (10, 6))), spec.get('estilo', 'relatorio'))
+        if chave in self.modelos:
+            self.modelos.move_to_end(chave)
+        else:
+            self.modelos[chave] = ModeloGrafico(spec['tipo'], chave[1])
+            if len(self.modelos) > self.max_modelos:
+                self.modelos.popitem(last=False)
+        return self.modelos[chave]
+
+    def renderizar(self, spec, caminho):
+        """
+        Desenha a especificação no modelo correspondente e salva em `caminho`.
+
+        Com `caixa`, a imagem sai no tamanho exato da figura no PDF (ver
+        imagens.py); sem ela, é salva pelo `savefig` com `dpi` e `bbox_inches`.
+        """
+        inicio = time.perf_counter()
+        if 'caixa' in spec:
+            from .imagens import geometria, salvar_figura
+            figsize, dpi = geometria(spec)
+            spec = dict(spec, figsize=figsize)
+            modelo = self.modelo(spec)
+            modelo.atualizar(spec)
+            salvar_figura(modelo.fig, caminho, dpi)
+        else:
+            modelo = self.modelo(spec)
+            modelo.atualizar(spec)
+            modelo.fig.savefig(caminho, dpi=spec.get('dpi', 'figure'), bbox_inches=spec.get('bbox_inches'))
+        duracao = time.perf_counter() - inicio
+        self.tempos.append({'grafico': spec.get('destino', caminho), 'tipo': spec['tipo'], 'duracao': duracao})
+        return duracao
+
+    def exportar(self, spec, saidas):
+        """
+        Desenha a especificação uma única vez e grava todos os formatos de
+        `saidas` (ver imagens.exportar_figura). Sem `caixa`, a figura é
+        exportada no tamanho de `figsize`. Retorna {formato: caminho ou bytes}.
+        """
+        from .imagens import geometria, exportar_figura
+
+        inicio = time.perf_counter()
+        spec = dict(spec, caixa=spec.get('caixa') or spec.get('figsize', (10, 6)))
+        figsize, dpi = geometria(spec)
+        spec['figsize'] = figsize
+        modelo = self.modelo(spec)
+        modelo.atualizar(spec)
+        resultado, _ = exportar_figura(modelo.fig, dpi, saidas)
+        self.tempos.append({'grafico': spec.get('destino'), 'tipo': spec['tipo'],
+                            'duracao': time.perf_counter() - inicio})
+        return resultado
+
+
+_renderizador = None
+
+
+def renderizador_do_processo():
+    """Renderizador compartilhado pelo processo atual (um por trabalhador do pool)"""
+    global _renderizador
+    if _renderizador is None:
+        _renderizador = RenderizadorModelos()
+    return _renderizador
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Modelos declarativos de relatório, compilados uma vez por processo.
+
+O layout de cada relatório fica em `modelos/<nome>.json`: os estilos de
+parágrafo e a sequência de elementos (parágrafos com campos como
+`{analise[valor_atual]:g}`, espaços, figuras, tabelas, listas, quebras de
+página e blocos condicionais). Exemplo:
+
+    {
+      "estilos": {"Justify": {"alignment": "justify", "fontSize": 12, "leading": 14}},
+      "elementos": [
+        {"tipo": "paragrafo", "estilo": "Section", "texto": "1. INTRODUÇÃO"},
+        {"tipo": "paragrafo", "estilo": "Justify", "texto": ["Saindo de {analise[valor_inicial]:g} ",
+                                                            "em {analise[ano_inicial]}."]},
+        {"tipo": "se", "campo": "graficos.evolucao", "elementos": [
+          {"tipo": "figura", "grafico": "evolucao", "largura": 6, "altura": 4}
+        ]},
+        {"tipo": "espaco", "altura": 12}
+      ]
+    }
+
+`carregar_modelo(nome)` compila o arquivo: a folha de estilos é criada uma
+única vez, o markup dos parágrafos sem campos é analisado uma única vez (os
+fragmentos são reaproveitados em cada relatório) e as tabelas estáticas já
+ficam prontas. Gerar um relatório é só ligar os dados:
+
+    modelo = carregar_modelo('relatorio_ods')
+    flowables = modelo.renderizar({'info': ..., 'analise': ..., 'graficos': ...})
+
+Tipos de elemento:
+
+- `paragrafo`: `texto` (string ou lista de strings concatenadas) e `estilo`;
+- `espaco`: `altura` em pontos;
+- `quebra`: quebra de página;
+- `figura`: `grafico` (chave em `contexto['graficos']`), `largura` e `altura`
+  em polegadas;
+- `tabela`: `cabecalho`, `linhas` (lista fixa ou nome de uma lista do
+  contexto, formatada pelas `colunas`), `larguras` em pontos ou
+  `larguras_relativas` (fração da largura útil) e os comandos `estilo_tabela`
+  do reportlab; cores são nomes de `reportlab.lib.colors` ou `#RRGGBB`. Uma
+  tabela que passa de uma página repete o cabeçalho (LongTable); para
+  milhares de linhas, ver anexos.py;
+- `lista`: `itens` (textos) com marcadores, no `estilo` dado;
+- `se`: os `elementos` só entram se o `campo` (caminho com pontos no
+  contexto) existir e não for vazio; `senao` opcional.
+
+Um modelo pode reutilizar a folha de estilos de outro com
+`"estilos_de": "<nome>"`.
+"""
+
+import os
+import json
+from functools import lru_cache
+from string import Formatter
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Spacer, LongTable, TableStyle, PageBreak, ListFlowable
+from reportlab.platypus.paragraph import cleanBlockQuotedText, textTransformFrags
+from reportlab.platypus.paraparser import ParaParser
+
+from .graficos_vetoriais import criar_figura
+from .secoes import LARGURA_UTIL
+
+MODELOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelos')
+
+ALINHAMENTOS = {'left': TA_LEFT, 'center': TA_CENTER, 'right': TA_RIGHT, 'justify': TA_JUSTIFY}
+
+
+class ErroModelo(ValueError):
+    """Modelo de relatório inválido"""
+
+
+def _cor(valor):
+    """Cor a partir de `#RRGGBB` ou de um nome de reportlab.lib.colors; None se não for cor"""
+    if not isinstance(valor, str):
+        return None
+    if valor.startswith('#'):
+        return colors.HexColor(valor)
+    cor = getattr(colors, valor, None)
+    return cor if isinstance(cor, colors.Color) else None
+
+
+def _texto(definicao, chave='texto'):
+    texto = definicao.get(chave, '')
+    return ''.join(texto) if isinstance(texto, list) else texto
+
+
+def _tem_campos(texto):
+    return any(campo is not None for _, campo, _, _ in Formatter().parse(texto))
+
+
+def _buscar(contexto, caminho):
+    valor = contexto
+    for parte in caminho.split('.'):
+        if not isinstance(valor, dict) or parte not in valor:
+            return None
+        valor = valor[parte]
+    return valor
+
+
+def _presente(valor):
+    if valor is None:
+        return False
+    return not (isinstance(valor, (str, list, tuple, dict)) and len(valor) == 0)
+
+
+def compilar_estilos(definicoes):
+    """Folha de estilos padrão do reportlab acrescida dos estilos do modelo"""
+    styles = getSampleStyleSheet()
+    for nome, atributos in definicoes.items():
+        atributos = dict(atributos)
+        base = atributos.pop('base', None)
+        if 'alignment' in atributos:
+            atributos['alignment'] = ALINHAMENTOS[atributos['alignment']]
+        if 'textColor' in atributos:
+            atributos['textColor'] = _cor(atributos['textColor'])
+        styles.add(ParagraphStyle(name=nome, parent=styles[base] if base else None, **atributos))
+    return styles
+
+
+class _Paragrafo:
+    """Parágrafo; sem campos, o markup é analisado na compilação e os fragmentos reaproveitados"""
+
+    def __init__(self, texto, estilo):
+        self.estilo = estilo
+        self.dinamico = _tem_campos(texto)
+        self.texto = texto if self.dinamico else cleanBlockQuotedText(texto.format_map({}))
+        self.frags = None
+        if not self.dinamico:
+            # O mesmo que Paragraph faz a cada instância, feito uma vez
+            parser = ParaParser()
+            parser.caseSensitive = 1
+            estilo_analisado, self.frags, _ = parser.parse(self.texto, estilo)
+            if self.frags is None:
+                raise ErroModelo(f"markup inválido no parágrafo: {self.texto[:40]!r}")
+            textTransformFrags(self.frags, estilo_analisado)
+            self.estilo = estilo_analisado
+
+    def renderizar(self, contexto):
+        if self.dinamico:
+            yield Paragraph(self.texto.format_map(contexto), self.estilo)
+        else:
+            yield Paragraph(self.texto, self.estilo, frags=list(self.frags))
+
+
+class _Espaco:
+    def __init__(self, altura):
+        self.altura = altura
+
+    def renderizar(self, contexto):
+        yield Spacer(1, self.altura)
+
+
+class _Quebra:
+    def renderizar(self, contexto):
+        yield PageBreak()
+
+
+class _Figura:
+    def __init__(self, grafico, largura, altura):
+        self.grafico = grafico
+        self.largura = largura * inch
+        self.altura = altura * inch
+
+    def renderizar(self, contexto):
+        yield criar_figura(contexto['graficos'][self.grafico], self.largura, self.altura)
+
+
+class _Tabela:
+    """Tabela com cabeçalho; linhas fixas ficam prontas na compilação"""
+
+    def __init__(self, definicao, styles):
+        self.cabecalho = definicao.get('cabecalho')
+        if 'larguras_relativas' in definicao:
+            self.larguras = [LARGURA_UTIL * f for f in definicao['larguras_relativas']]
+        else:
+            self.larguras = definicao.get('larguras')
+        self.colunas = [(c['texto'], styles[c['estilo']] if 'estilo' in c else None)
+                        if isinstance(c, dict) else (c, None)
+                        for c in definicao.get('colunas', [])]
+        self.linhas = definicao['linhas']
+        if isinstance(self.linhas, list):
+            self.linhas = ([self.cabecalho] if self.cabecalho else []) + self.linhas
+
+        comandos = [tuple(c) for c in definicao.get('estilo_tabela', [])]
+        self.dinamico = any(isinstance(a, str) and _tem_campos(a) for c in comandos for a in c)
+        self.comandos = comandos
+        self.estilo = None if self.dinamico else TableStyle(self._resolver(comandos, {}))
+
+    @staticmethod
+    def _resolver(comandos, contexto):
+        resolvidos = []
+        for comando in comandos:
+            argumentos = []
+            for a in comando[1:]:
+                if isinstance(a, str):
+                    a = a.format_map(contexto)
+                    cor = _cor(a)
+                    a = cor if cor is not None else a
+                elif isinstance(a, list):
+                    a = tuple(a)
+                argumentos.append(a)
+            resolvidos.append((comando[0], *argumentos))
+        return resolvidos
+
+    def _celula(self, formato, estilo, item):
+        texto = formato.format_map(item)
+        return Paragraph(texto, estilo) if estilo is not None else texto
+
+    def renderizar(self, contexto):
+        if isinstance(self.linhas, list):
+            dados = self.linhas
+        else:
+            dados = [self.cabecalho] if self.cabecalho else []
+            dados += [[self._celula(formato, estilo, item) for formato, estilo in self.colunas]
+                      for item in contexto[self.linhas]]
+        tabela = LongTable(dados, colWidths=self.larguras, repeatRows=1 if self.cabecalho else 0)
+        tabela.setStyle(self.estilo or TableStyle(self._resolver(self.comandos, contexto)))
+        yield tabela
+
+
+class _Lista:
+    def __init__(self, itens, estilo, marcador):
+        self.itens = [_Paragrafo(item, estilo) for item in itens]
+        self.marcador = marcador
+
+    def renderizar(self, contexto):
+        itens = [p for item in self.itens for p in item.renderizar(contexto)]
+        yield ListFlowable(itens, bulletType=self.marcador, start=0)
+
+
+class _Condicional:
+    def __init__(self, campo, elementos, senao):
+        self.campo = campo
+        self.elementos = elementos
+        self.senao = senao
+
+    def renderizar(self, contexto):
+        ramo = self.elementos if _presente(_buscar(contexto, self.campo)) else self.senao
+        for elemento in ramo:
+            yield from elemento.renderizar(contexto)
+
+
+class ModeloRelatorio:
+    """Modelo compilado: estilos prontos e uma árvore de elementos que só recebe dados"""
+
+    def __init__(self, nome, styles, elementos):
+        self.nome = nome
+        self.styles = styles
+        self.elementos = elementos
+
+    @classmethod
+    def compilar(cls, nome, definicao, styles=None):
+        """Compila a `definicao` (dicionário do JSON); `styles` substitui os estilos do modelo"""
+        if styles is None:
+            styles = compilar_estilos(definicao.get('estilos', {}))
+        return cls(nome, styles, cls._compilar_elementos(nome, definicao.get('elementos', []), styles))
+
+    @classmethod
+    def _compilar_elementos(cls, nome, definicoes, styles):
+        elementos = []
+        for i, d in enumerate(definicoes):
+            tipo = d.get('tipo')
+            try:
+                if tipo == 'paragrafo':
+                    elementos.append(_Paragrafo(_texto(d), styles[d['estilo']]))
+                elif tipo == 'espaco':
+                    elementos.append(_Espaco(d['altura']))
+                elif tipo == 'quebra':
+                    elementos.append(_Quebra())
+                elif tipo == 'figura':
+                    elementos.append(_Figura(d['grafico'], d.get('largura', 6), d.get('altura', 4)))
+                elif tipo == 'tabela':
+                    elementos.append(_Tabela(d, styles))
+                elif tipo == 'lista':
+                    itens = [''.join(t) if isinstance(t, list) else t for t in d['itens']]
+                    elementos.append(_Lista(itens, styles[d['estilo']], d.get('marcador', 'bullet')))
+                elif tipo == 'se':
+                    elementos.append(_Condicional(d['campo'],
+                                                  cls._compilar_elementos(nome, d.get('elementos', []), styles),
+                                                  cls._compilar_elementos(nome, d.get('senao', []), styles)))
+                else:
+                    raise ErroModelo(f"tipo de elemento desconhecido: {tipo!r}")
+            except KeyError as e:
+                raise ErroModelo(f"{nome}: elemento {i} ({tipo}) sem {e}") from None
+            except ErroModelo as e:
+                raise ErroModelo(f"{nome}: elemento {i}: {e}") from None
+        return elementos
+
+    def renderizar(self, contexto):
+        """Gera os flowables do relatório para o `contexto` (dicionário com os dados)"""
+        for elemento in self.elementos:
+            yield from elemento.renderizar(contexto)
+
+
+def _arquivo_modelo(nome):
+    return nome if nome.endswith('.json') else os.path.join(MODELOS_DIR, f'{nome}.json')
+
+
+@lru_cache(maxsize=None)
+def carregar_modelo(nome):
+    """
+    Compila o modelo `nome` (em `modelos/`) ou o arquivo JSON indicado.
+
+    O resultado fica em cache pelo resto do processo: todos os relatórios
+    gerados com o mesmo modelo compartilham estilos e fragmentos.
+    """
+    with open(_arquivo_modelo(nome), 'r', encoding='utf-8') as file:
+        definicao = json.load(file)
+    styles = carregar_modelo(definicao['estilos_de']).styles if 'estilos_de' in definicao else None
+    return ModeloRelatorio.compilar(nome, definicao, styles)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Relatórios técnicos por município e por ODS.
+
+Os dados municipais ficam em `dados/municipios/<municipio>/`, com um arquivo
+por ODS nos mesmos formatos de `dados/indicadores/ods*_*.json`, e um
+`municipio.json` opcional com o nome oficial (`{"nome": "São Cristóvão",
+"codigo_ibge": "2806701"}`); sem ele, o nome vem do nome do diretório:
+
+    dados/municipios/aracaju/municipio.json
+    dados/municipios/aracaju/ods1_pobreza.json
+    dados/municipios/aracaju/ods6_agua_saneamento.json
+
+Cada par (município, ODS) é gerado por `ODSReportGenerator` em um pool de
+processos limitado. Os trabalhadores recebem a configuração dos ODS uma única
+vez (no inicializador), já importam reportlab e compilam o modelo do relatório
+antes da primeira tarefa, e reaproveitam tudo isso nos relatórios seguintes. No
+máximo 2 tarefas por trabalhador ficam pendentes por vez, de modo que a
+memória do processo principal não cresce com milhares de relatórios. A falha
+de um relatório é registrada sem interromper o lote, inclusive quando um
+trabalhador é encerrado (o pool é recriado). O resumo informa relatórios por
+segundo e o pico de memória de cada trabalhador.
+"""
+
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .config import MUNICIPIOS_DIR, ODS_CONFIG_FILE, REPORT_DIR, CHARTS_DIR
+from .fontes import carregar_config_ods, descobrir_arquivos_ods
+from .instrumentacao import pico_memoria_mb
+
+# Tarefas pendentes por trabalhador
+TAREFAS_POR_TRABALHADOR = 2
+
+_config_ods_trabalhador = {}
+
+
+def _nome_municipio(diretorio):
+    """Nome do município segundo `municipio.json` ou, na falta dele, o nome do diretório"""
+    slug = os.path.basename(diretorio)
+    try:
+        with open(os.path.join(diretorio, 'municipio.json'), 'r', encoding='utf-8') as file:
+            return json.load(file).get('nome') or slug
+    except (OSError, json.JSONDecodeError):
+        return slug.replace('-', ' ').replace('_', ' ').title()
+
+
+def descobrir_municipios(municipios_dir=MUNICIPIOS_DIR, filtro_municipios=None, filtro_ods=None):
+    """
+    Lista as tarefas (uma por município e ODS) encontradas em `municipios_dir`.
+
+    Cada tarefa é um dicionário com `municipio` (slug), `nome`, `codigo` do
+    ODS e `arquivo`. Sem o diretório, retorna uma lista vazia.
+    """
+    if not os.path.isdir(municipios_dir):
+        return []
+
+    tarefas = []
+    for slug in sorted(os.listdir(municipios_dir)):
+        diretorio = os.path.join(municipios_dir, slug)
+        if not os.path.isdir(diretorio) or (filtro_municipios and slug not in filtro_municipios):
+            continue
+        nome = _nome_municipio(diretorio)
+        for arquivo in descobrir_arquivos_ods(diretorio):
+            codigo = os.path.basename(arquivo).split('_')[0]
+            if filtro_ods and codigo not in filtro_ods:
+                continue
+            tarefas.append({'municipio': slug, 'nome': nome, 'codigo': codigo, 'arquivo': arquivo})
+    return tarefas
+
+
+def _iniciar_trabalhador(config_ods):
+    """Prepara o processo trabalhador: configuração dos ODS, importações e modelo compilado"""
+    global _config_ods_trabalhador
+    _config_ods_trabalhador = config_ods
+    from .gerador import MODELO
+    from .modelos_relatorio import carregar_modelo
+    carregar_modelo(MODELO)
+
+
+def gerar_relatorio_municipio(tarefa, report_dir, charts_dir, backend_graficos='vetorial', reprodutivel=False):
+    """
+    Gera o relatório de uma tarefa (roda no processo trabalhador).
+
+    Erros não são propagados: voltam no resultado, com `erro`, para que o
+    processo principal apenas os registre.
+    """
+    from .gerador import ODSReportGenerator
+
+    inicio = time.perf_counter()
+    resultado = dict(tarefa, pid=os.getpid())
+    try:
+        gerador = ODSReportGenerator(tarefa['arquivo'], _config_ods_trabalhador,
+                                     report_dir=os.path.join(report_dir, tarefa['municipio']),
+                                     charts_dir=os.path.join(charts_dir, tarefa['municipio']),
+                                     workers_graficos=0, backend_graficos=backend_graficos,
+                                     local=tarefa['nome'], reprodutivel=reprodutivel)
+        resultado['relatorio'] = gerador.executar()
+        resultado['graficos'] = {nome: g for nome, g in gerador.graficos.items() if isinstance(g, str)}
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+    resultado['duracao'] = time.perf_counter() - inicio
+    resultado['pico_memoria_mb'] = pico_memoria_mb()
+    return resultado
+
+
+def _chave(tarefa):
+    return f"relatorio:municipios/{tarefa['municipio']}/{tarefa['codigo']}"
+
+
+def _entradas(tarefa, ods_config_file):
+    return [tarefa['arquivo'], ods_config_file,
+            os.path.join(os.path.dirname(tarefa['arquivo']), 'municipio.json')]
+
+
+def resumir(resultados, erros, duracao):
+    """Vazão do lote e pico de memória por trabalhador"""
+    gerados = [r for r in resultados if not r.get('atualizado')]
+    picos = {}
+    for r in gerados + erros:
+        if r.get('pid') is not None and r.get('pico_memoria_mb') is not None:
+            picos[r['pid']] = max(picos.get(r['pid'], 0.0), r['pico_memoria_mb'])
+    return {
+        'gerados': len(gerados),
+        'atualizados': len(resultados) - len(gerados),
+        'erros': len(erros),
+        'duracao': duracao,
+        'relatorios_por_segundo': len(gerados) / duracao if duracao > 0 else 0.0,
+        'pico_memoria_mb': picos,
+    }
+
+
+def gerar_municipios(municipios_dir=MUNICIPIOS_DIR, report_dir=os.path.join(REPORT_DIR, 'municipios'),
+                     charts_dir=os.path.join(CHARTS_DIR, 'municipios'), filtro_municipios=None, filtro_ods=None,
+                     max_workers=None, backend_graficos='vetorial', manifesto=None,
+                     ods_config_file=ODS_CONFIG_FILE, reprodutivel=False):
+    """
+    Gera os relatórios de todos os municípios e ODS em um pool limitado.
+
+    Retorna (resultados, erros, resumo). Os PDFs ficam em
+    `report_dir/<municipio>/`; com `manifesto`, os pares já atualizados
+    entram em `resultados` com `atualizado=True`. `reprodutivel`: ver
+    publicacao.py.
+    """
+    inicio = time.perf_counter()
+    tarefas = descobrir_municipios(municipios_dir, filtro_municipios, filtro_ods)
+    resultados, erros = [], []
+    parametros = {'graficos': backend_graficos}
+    if reprodutivel:
+        parametros['reprodutivel'] = True
+
+    pendentes = tarefas
+    if manifesto is not None:
+        pendentes = []
+        for tarefa in tarefas:
+            if manifesto.atualizado(_chave(tarefa), _entradas(tarefa, ods_config_file), parametros):
+                resultados.append(dict(tarefa, relatorio=manifesto.saidas(_chave(tarefa))[0], graficos={},
+                                       duracao=0.0, atualizado=True))
+            else:
+                pendentes.append(tarefa)
+
+    if pendentes:
+        config_ods = carregar_config_ods(ods_config_file)
+        max_workers = max_workers or min(len(pendentes), os.cpu_count() or 1)
+        municipios = len({t['municipio'] for t in pendentes})
+        print(f"Gerando {len(pendentes)} relatórios de {municipios} municípios com {max_workers} processos...")
+        fila = list(reversed(pendentes))
+        while fila:
+            fila = _executar_pool(fila, config_ods, report_dir, charts_dir, backend_graficos, max_workers,
+                                  manifesto, ods_config_file, resultados, erros, reprodutivel, parametros)
+
+    ordem = {(t['municipio'], t['codigo']): i for i, t in enumerate(tarefas)}
+    resultados.sort(key=lambda r: ordem[(r['municipio'], r['codigo'])])
+
+    if backend_graficos == 'matplotlib' and pendentes:
+        from .cache_graficos import CacheGraficos
+        CacheGraficos(os.path.join(charts_dir, 'cache')).limpar()
+    return resultados, erros, resumir(resultados, erros, time.perf_counter() - inicio)
+
+
+def _executar_pool(fila, config_ods, report_dir, charts_dir, backend_graficos, max_workers,
+                   manifesto, ods_config_file, resultados, erros, reprodutivel=False, parametros=None):
+    """
+    Consome a `fila` (do fim para o início) em um pool, com no máximo
+    TAREFAS_POR_TRABALHADOR tarefas pendentes por trabalhador. Os relatórios
+    gerados são registrados no `manifesto` com os `parametros` da geração.
+
+    Se um trabalhador for encerrado, as tarefas em andamento são registradas
+    como erro e o restante da fila é devolvido para um novo pool.
+    """
+    limite = max_workers * TAREFAS_POR_TRABALHADOR
+    em_andamento = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_iniciar_trabalhador,
+                             initargs=(config_ods,)) as executor:
+        while fila or em_andamento:
+            while fila and len(em_andamento) < limite:
+                tarefa = fila.pop()
+                futuro = executor.submit(gerar_relatorio_municipio, tarefa, report_dir, charts_dir,
+                                         backend_graficos, reprodutivel)
+                em_andamento[futuro] = tarefa
+            concluidos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                try:
+                    resultado = futuro.result()
+                except BrokenProcessPool as e:
+                    for tarefa in em_andamento.values():
+                        print(f"ERRO ao gerar {tarefa['municipio']}/{tarefa['codigo']}: trabalhador encerrado")
+                        erros.append(dict(tarefa, erro=f"BrokenProcessPool: {e}"))
+                    return fila
+                tarefa = em_andamento.pop(futuro)
+                if 'erro' in resultado:
+                    print(f"ERRO ao gerar {tarefa['municipio']}/{tarefa['codigo']}: {resultado['erro']}")
+                    erros.append(resultado)
+                    continue
+                resultados.append(resultado)
+                if manifesto is not None:
+                    manifesto.registrar(_chave(tarefa), _entradas(tarefa, ods_config_file),
+                                        [resultado['relatorio'], *resultado['graficos'].values()],
+                                        parametros)
+    return fila
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Modo observação: regenera só os relatórios afetados quando `dados/` muda.
+
+`limfs-relatorios observar` é um processo de longa duração. Ele importa
+reportlab e os geradores (e, com `--graficos matplotlib`, o matplotlib) uma
+única vez, compila os modelos dos relatórios, abre a base de séries e carrega
+o armazém de indicadores e fica observando `dados/`:
+
+- no Linux, pelo inotify (chamadas da libc via ctypes, sem dependências), e
+  cada diretório criado passa a ser observado também;
+- nos demais sistemas (ou com `--varredura`), comparando mtime e tamanho dos
+  arquivos a cada `intervalo` segundos.
+
+As alterações são agrupadas: a reconstrução começa quando nenhum arquivo
+muda por `espera` segundos (ou depois de `espera_maxima`, se as escritas não
+pararem). Cada arquivo alterado é mapeado aos relatórios que dependem dele
+(`alvos_afetados`):
+
+    indicadores/odsN_*.json         relatório do ODS N
+    municipios/<m>/odsN_*.json      relatório do município m no ODS N
+    municipios/<m>/municipio.json   todos os relatórios do município m
+    ods-config.json                 todos os relatórios
+    entradas do ODS 12              relatório detalhado e aprimorado do ODS 12
+    demais arquivos                 os artefatos que o têm como entrada no
+                                    manifesto de build
+
+Só esses relatórios são refeitos, pelas funções de `api.py`: o manifesto
+ainda pula os que não mudaram e os gráficos com o mesmo conteúdo são
+reaproveitados. Os pools de processos dos lotes são criados por fork deste
+processo, já aquecido. A falha de uma reconstrução é exibida e a observação
+continua.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import importlib
+
+from .config import ConfigRelatorios
+from .fontes import PADRAO_ARQUIVO_ODS
+from .instrumentacao import medir
+
+# Eventos do inotify (ver inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+# Arquivos gravados por completo, movidos (gravação atômica) ou removidos;
+# IN_MODIFY é omitido para não reagir a escritas pela metade
+EVENTOS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_CABECALHO_EVENTO = struct.Struct('iIII')
+
+# Módulos importados antes da primeira alteração
+MODULOS_AQUECIDOS = ('.api', '.lote', '.gerador', '.ods12', '.ods12_aprimorado', '.municipios', '.manifesto')
+
+
+class ObservadorInotify:
+    """Alterações em `raiz` e seus subdiretórios, pelo inotify do Linux"""
+
+    def __init__(self, raiz):
+        self.raiz = raiz
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            numero = ctypes.get_errno()
+            raise OSError(numero, os.strerror(numero))
+        self._diretorios = {}
+        self._observar_arvore(raiz)
+
+    def _observar_arvore(self, raiz):
+        """Observa `raiz` e seus subdiretórios; retorna os arquivos que já existem neles"""
+        arquivos = []
+        for diretorio, _, nomes in os.walk(raiz):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(diretorio), EVENTOS)
+            if wd < 0:
+                numero = ctypes.get_errno()
+                if diretorio == raiz:
+                    raise OSError(numero, os.strerror(numero), diretorio)
+                continue  # removido antes de ser observado
+            self._diretorios[wd] = diretorio
+            arquivos.extend(os.path.join(diretorio, nome) for nome in nomes)
+        return arquivos
+
+    def alteracoes(self, timeout=None):
+        """
+        Caminhos alterados, aguardando até `timeout` segundos (None: até a
+        primeira alteração). Se a fila do kernel transbordar, inclui `raiz`.
+        """
+        prontos, _, _ = select.select([self.fd], [], [], timeout)
+        if not prontos:
+            return set()
+        try:
+            buffer = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+
+        alterados, posicao = set(), 0
+        while posicao < len(buffer):
+            wd, mascara, _, tamanho = _CABECALHO_EVENTO.unpack_from(buffer, posicao)
+            inicio_nome = posicao + _CABECALHO_EVENTO.size
+            nome = buffer[inicio_nome:inicio_nome + tamanho].rstrip(b'\0')
+            posicao = inicio_nome + tamanho
+
+            if mascara & IN_Q_OVERFLOW:
+                alterados.add(self.raiz)
+                continue
+            if mascara & IN_IGNORED:
+                self._diretorios.pop(wd, None)
+                continue
+            diretorio = self._diretorios.get(wd)
+            if diretorio is None or not nome:
+                continue
+            caminho = os.path.join(diretorio, os.fsdecode(nome))
+            if mascara & IN_ISDIR:
+                # Diretório novo (ex.: um município): observa e trata o conteúdo como alterado
+                if mascara & (IN_CREATE | IN_MOVED_TO):
+                    alterados.update(self._observar_arvore(caminho))
+                continue
+            alterados.add(caminho)
+        return alterados
+
+    def fechar(self):
+        os.close(self.fd)
+
+
+class ObservadorVarredura:
+    """Alterações em `raiz` por varredura periódica de mtime e tamanho (sem inotify)"""
+
+    def __init__(self, raiz, intervalo=1.0):
+        self.raiz = raiz
+        self.intervalo = intervalo
+        self._estado = self._varrer()
+
+    def _varrer(self):
+        estado = {}
+        for diretorio, _, nomes in os.walk(self.raiz):
+            for nome in nomes:
+                caminho = os.path.join(diretorio, nome)
+                try:
+                    info = os.stat(caminho)
+                except FileNotFoundError:
+                    continue
+                estado[caminho] = (info.st_mtime_ns, info.st_size)
+        return estado
+
+    def alteracoes(self, timeout=None):
+        """Caminhos alterados, aguardando até `timeout` segundos (None: até a primeira alteração)"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            atual = self._varrer()
+            alterados = {c for c in atual.keys() | self._estado.keys() if atual.get(c) != self._estado.get(c)}
+            self._estado = atual
+            if alterados:
+                return alterados
+            if limite is None:
+                time.sleep(self.intervalo)
+                continue
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return set()
+            time.sleep(min(self.intervalo, restante))
+
+    def fechar(self):
+        pass
+
+
+def criar_observador(raiz, varredura=False, intervalo=1.0):
+    """Observador pelo inotify quando disponível; senão (ou com `varredura`), por varredura"""
+    if not varredura and sys.platform.startswith('linux'):
+        try:
+            return ObservadorInotify(raiz)
+        except (OSError, AttributeError) as e:
+            print(f"AVISO: inotify indisponível ({e}), observando por varredura a cada {intervalo:g}s")
+    return ObservadorVarredura(raiz, intervalo)
+
+
+def aguardar_alteracoes(observador, espera=0.5, espera_maxima=10.0):
+    """
+    Aguarda a primeira alteração e retorna todas as que chegarem até passar
+    `espera` segundos sem novidades (no máximo `espera_maxima` segundos).
+    """
+    alterados = observador.alteracoes()
+    inicio = time.monotonic()
+    while time.monotonic() - inicio < espera_maxima:
+        novos = observador.alteracoes(espera)
+        if not novos:
+            break
+        alterados |= novos
+    return alterados
+
+
+def _novos_alvos():
+    # municipios: {slug: códigos dos ODS, ou None para todos}
+    return {'todos': False, 'ods': set(), 'ods12': False, 'aprimorar': False, 'municipios': {}}
+
+
+def _marcar_municipio(alvos, municipio, codigo=None):
+    codigos = alvos['municipios'].setdefault(municipio, set())
+    if codigo is None:
+        alvos['municipios'][municipio] = None
+    elif codigos is not None:
+        codigos.add(codigo)
+
+
+def _marcar_chave(alvos, chave):
+    """Marca o relatório de uma chave do manifesto (`relatorio:...`)"""
+    if not chave.startswith('relatorio:'):
+        return
+    nome = chave.split(':', 1)[1]
+    if nome == 'ods12_aprimorado':
+        alvos['aprimorar'] = True
+    elif nome.startswith('municipios/'):
+        _, municipio, codigo = nome.split('/')
+        _marcar_municipio(alvos, municipio, codigo)
+    elif nome == 'ods12_detalhado':
+        alvos['ods12'] = True
+    else:
+        # Relatórios do lote: a chave é o nome do arquivo (ods12_consumo_producao), o filtro é o código
+        alvos['ods'].add(nome.split('_')[0])
+
+
+def alvos_afetados(arquivos, config=None, manifesto=None):
+    """
+    Relatórios que dependem dos `arquivos` alterados em `config.dados_dir`.
+
+    Retorna {'todos', 'ods' (códigos), 'ods12', 'aprimorar', 'municipios'
+    ({slug: códigos, ou None para todos os ODS do município})}. Com
+    `manifesto`, inclui os artefatos que têm o arquivo entre as entradas.
+    """
+    from .ods12 import arquivos_dados
+    from .ods12_aprimorado import arquivos_entrada
+
+    config = config or ConfigRelatorios()
+    entradas_ods12 = set(arquivos_dados(config).values())
+    entradas_aprimorado = set(arquivos_entrada(config))
+    alvos = _novos_alvos()
+
+    for arquivo in arquivos:
+        if arquivo in (config.dados_dir, config.ods_config_file):
+            alvos['todos'] = True
+            continue
+        if not arquivo.endswith('.json'):
+            continue  # temporários de editores, arquivos de trava etc.
+
+        partes = os.path.relpath(arquivo, config.dados_dir).split(os.sep)
+        arquivo_ods = PADRAO_ARQUIVO_ODS.match(partes[-1])
+        if partes[0] == 'indicadores' and len(partes) == 2 and arquivo_ods:
+            alvos['ods'].add(f'ods{arquivo_ods.group(1)}')
+        elif partes[0] == 'municipios' and len(partes) == 3:
+            if partes[2] == 'municipio.json':
+                _marcar_municipio(alvos, partes[1])
+            elif arquivo_ods:
+                _marcar_municipio(alvos, partes[1], f'ods{arquivo_ods.group(1)}')
+
+        alvos['ods12'] = alvos['ods12'] or arquivo in entradas_ods12
+        alvos['aprimorar'] = alvos['aprimorar'] or arquivo in entradas_aprimorado
+        if manifesto is not None:
+            for chave in manifesto.dependentes(arquivo):
+                _marcar_chave(alvos, chave)
+
+    # O aprimorado parte do PDF do relatório detalhado do ODS 12
+    alvos['aprimorar'] = alvos['aprimorar'] or alvos['ods12']
+    return alvos
+
+
+def descrever_alvos(alvos):
+    """Resumo legível dos alvos, para a saída do comando"""
+    if alvos['todos']:
+        return 'todos os relatórios'
+    partes = sorted(alvos['ods'], key=lambda c: int(c[3:]) if c[3:].isdigit() else 0)
+    if alvos['ods12']:
+        partes.append('ods12 detalhado')
+    if alvos['aprimorar']:
+        partes.append('ods12 aprimorado')
+    for municipio, codigos in sorted(alvos['municipios'].items()):
+        partes.append(f"{municipio}/{','.join(sorted(codigos)) if codigos else '*'}")
+    return ', '.join(partes)
+
+
+def aquecer(config=None, backend_graficos='vetorial'):
+    """
+    Importa os geradores, compila os modelos dos relatórios e carrega a base
+    de séries, o armazém de indicadores (montado a partir dela) e a versão do
+    código, para que a primeira reconstrução não pague esses custos. Retorna
+    a duração em segundos.
+    """
+    config = config or ConfigRelatorios()
+    inicio = time.perf_counter()
+    for modulo in MODULOS_AQUECIDOS:
+        importlib.import_module(modulo, __package__)
+    if backend_graficos == 'matplotlib':
+        import matplotlib
+        matplotlib.use('Agg')
+        importlib.import_module('matplotlib.pyplot')
+
+    from . import gerador, ods12, ods12_aprimorado
+    from .armazem import carregar_armazem
+    from .banco_series import abrir_banco
+    from .manifesto import versao_codigo
+    from .modelos_relatorio import carregar_modelo
+
+    for modelo in (gerador.MODELO, ods12.MODELO, ods12_aprimorado.MODELO, ods12_aprimorado.MODELO_COMPLEMENTO):
+        carregar_modelo(modelo)
+    try:
+        carregar_armazem(abrir_banco(config.dados_dir, config.series_file), config.cache_indicadores_file)
+    except Exception as e:
+        print(f"AVISO: base de séries ou armazém de indicadores não carregados ({e})")
+    versao_codigo()
+    return time.perf_counter() - inicio
+
+
+def _executar(resumo, grupo, funcao, *args, **kwargs):
+    """Executa a geração de um grupo de relatórios; a falha é registrada em `resumo`"""
+    try:
+        return funcao(*args, **kwargs)
+    except Exception as e:
+        print(f"ERRO ao regenerar {grupo}: {e}")
+        resumo['erros'].append(f"{grupo}: {type(e).__name__}: {e}")
+        return None
+
+
+def _contar(resumo, resultados, erros=()):
+    gerados = sum(1 for r in resultados if not r.get('atualizado'))
+    resumo['gerados'] += gerados
+    resumo['atualizados'] += len(resultados) - gerados
+    resumo['erros'].extend(e.get('erro', '') for e in erros)
+
+
+def _contar_unico(resumo, saida, inicio):
+    # As funções de um único relatório retornam o PDF também quando ele já estava atualizado
+    if saida is not None:
+        _contar(resumo, [{'atualizado': not (os.path.exists(saida) and os.path.getmtime(saida) >= inicio)}])
+
+
+def reconstruir(config, alvos, backend_graficos='vetorial', max_workers=None, municipios=True):
+    """
+    Regenera os relatórios de `alvos` (ver `alvos_afetados`) pelas funções
+    de `api.py`. Retorna {'gerados', 'atualizados', 'erros'}; a falha de um
+    grupo é registrada sem interromper os demais.
+    """
+    from . import api
+
+    resumo = {'gerados': 0, 'atualizados': 0, 'erros': []}
+    todos = alvos['todos']
+    if todos or alvos['ods']:
+        lote = _executar(resumo, 'relatórios dos ODS', api.gerar_relatorios, config,
+                         filtro=None if todos else sorted(alvos['ods']), max_workers=max_workers,
+                         backend_graficos=backend_graficos)
+        if lote is not None:
+            _contar(resumo, *lote)
+    if todos or alvos['ods12']:
+        inicio = time.time()
+        saida = _executar(resumo, 'relatório do ODS 12', api.gerar_relatorio_ods12, config, backend_graficos)
+        _contar_unico(resumo, saida, inicio)
+    if todos or alvos['aprimorar']:
+        inicio = time.time()
+        saida = _executar(resumo, 'relatório aprimorado do ODS 12', api.aprimorar_relatorio_ods12, config,
+                          backend_graficos)
+        _contar_unico(resumo, saida, inicio)
+
+    if municipios:
+        for municipio, codigos in ({None: None} if todos else alvos['municipios']).items():
+            lote = _executar(resumo, f"municípios ({municipio or 'todos'})", api.gerar_relatorios_municipios,
+                             config, municipios=[municipio] if municipio else None,
+                             filtro=sorted(codigos) if codigos else None, max_workers=max_workers,
+                             backend_graficos=backend_graficos)
+            if lote is not None:
+                _contar(resumo, *lote[:2])
+    return resumo
+
+
+def observar(config=None, backend_graficos='vetorial', max_workers=None, municipios=True, espera=0.5,
+             espera_maxima=10.0, varredura=False, intervalo=1.0, inicial=False, limite_lotes=None):
+    """
+    Observa `config.dados_dir` e regenera os relatórios afetados a cada lote
+    de alterações, até ser interrompido (Ctrl+C) ou até processar
+    `limite_lotes` lotes. Com `inicial`, faz antes uma geração incremental
+    completa. Retorna o número de lotes processados.
+    """
+    config = config or ConfigRelatorios()
+    duracao = aquecer(config, backend_graficos)
+    print(f"Processo aquecido em {duracao:.2f}s")
+    if inicial:
+        inicio = time.perf_counter()
+        resumo = reconstruir(config, dict(_novos_alvos(), todos=True), backend_graficos, max_workers, municipios)
+        print(f"Geração inicial: {resumo['gerados']} gerados, {resumo['atualizados']} já atualizados, "
+              f"em {time.perf_counter() - inicio:.2f}s")
+
+    from .manifesto import ManifestoBuild
+
+    observador = criar_observador(config.dados_dir, varredura, intervalo)
+    print(f"Observando {config.dados_dir} ({type(observador).__name__}); Ctrl+C para encerrar")
+    lotes = 0
+    try:
+        while limite_lotes is None or lotes < limite_lotes:
+            alterados = aguardar_alteracoes(observador, espera, espera_maxima)
+            inicio = time.perf_counter()
+            alvos = alvos_afetados(alterados, config, ManifestoBuild(config.manifesto_file))
+            descricao = descrever_alvos(alvos)
+            if not descricao:
+                continue
+            lotes += 1
+            print(f"\n{len(alterados)} arquivo(s) alterado(s): {descricao}")
+            with medir('reconstrucao', arquivos=len(alterados)) as registro:
+                resumo = reconstruir(config, alvos, backend_graficos, max_workers, municipios)
+                registro.update(gerados=resumo['gerados'], erros=len(resumo['erros']))
+            print(f"=== {resumo['gerados']} relatório(s) gerado(s), {resumo['atualizados']} já atualizado(s), "
+                  f"{len(resumo['erros'])} erro(s), em {time.perf_counter() - inicio:.2f}s ===")
+    except KeyboardInterrupt:
+        print("\nObservação encerrada")
+    finally:
+        observador.fechar()
+    return lotes
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de Relatório Técnico do ODS 12 - Consumo e Produção Responsáveis
+Laboratório de Indicadores para Monitoramento das Famílias Sergipanas (LIMFS)
+
+Importa dados relacionados ao ODS 12 dos arquivos JSON do projeto, realiza
+análises técnicas e gera um relatório detalhado em formato PDF. Os caminhos
+vêm de um `ConfigRelatorios`; use `gerar_relatorio_ods12()` (ou o comando
+`limfs-relatorios gerar --ods12`).
+
+Data: 14/04/2025
+"""
+
+import os
+
+from .config import ConfigRelatorios, CAIXA_FIGURA, DPI_IMAGENS
+from .banco_series import abrir_banco
+from .analise import matriz_series, analisar_series, analise_da_serie
+from .previsao import campos_grafico, descrever_previsao
+from .graficos_vetoriais import criar_estagio
+from .secoes import construir_em_secoes
+from .modelos_relatorio import carregar_modelo
+from .fontes import ler_json
+from .instrumentacao import medir
+from .publicacao import data_relatorio
+
+# O estilo dos gráficos (seaborn-v0_8-whitegrid + fontes) é aplicado em cada
+# tarefa de renderização, ver config.ESTILOS_GRAFICOS
+
+# Definição das cores ODS 12
+ODS12_COLOR = "#BF8B2E"
+ODS12_COLOR_LIGHT = "rgba(191, 139, 46, 0.2)"
+
+# Modelo do relatório (modelos/relatorio_ods12.json)
+MODELO = 'relatorio_ods12'
+
+
+def arquivos_dados(config):
+    """Arquivos de `dados/` dos quais o relatório depende"""
+    return {
+        'residuos': os.path.join(config.dados_dir, 'residuos_reciclados.json'),
+        'dados_historicos': os.path.join(config.dados_dir, 'indicadores.json'),
+        'indicador': os.path.join(config.indicadores_dir, 'ods12_consumo_producao.json')
+    }
+
+
+def arquivo_saida(config):
+    return os.path.join(config.report_dir, 'relatorio_tecnico_ods12.pdf')
+
+
+class ODS12ReportGenerator:
+    """Classe para geração de relatório técnico do ODS 12"""
+    
+    def __init__(self, config=None, backend_graficos='vetorial', manifesto=None):
+        self.config = config or ConfigRelatorios()
+        self.data_files = arquivos_dados(self.config)
+        self.output_file = arquivo_saida(self.config)
+        self.backend_graficos = backend_graficos
+        self.manifesto = manifesto
+        self.dados = {}
+        self.historico = []
+        self.ultima_atualizacao = None
+        self.dados_complementares = {}
+        
+    def carregar_dados(self):
+        """Importa os dados dos arquivos JSON"""
+        print("Importando dados do ODS 12...")
+        
+        # Carregar dados de resíduos reciclados
+        try:
+            data = ler_json(self.data_files['residuos'])
+            self.dados['residuos'] = data.get('dados', {})
+            self.ultima_atualizacao = data.get('ultimaAtualizacao')
+            print(f"Dados de resíduos carregados: {self.ultima_atualizacao}")
+        except Exception as e:
+            print(f"ERRO ao importar dados de resíduos: {e}")
+            raise
+                
+        # Carregar a série histórica da base de séries (dados/ e safras carregadas, ver banco_series.py)
+        try:
+            banco = abrir_banco(self.config.dados_dir, self.config.series_file)
+            dados_historicos = banco.historico(banco.principal('ods12'))
+            
+            self.historico = dados_historicos
+            print(f"Dados históricos carregados: {len(dados_historicos)} registros")
+        except Exception as e:
+            print(f"ERRO ao importar dados históricos: {e}")
+            
+        # Carregar dados complementares para o relatório
+        self.dados_complementares = {
+            'meta_nacional': 15.0,  # Meta nacional para reciclagem em 2030
+            'media_brasil': 4.0,    # Média nacional atual
+            'melhor_estado': 12.5,  # Estado com melhor desempenho
+            'programas': [
+                {'nome': 'Coleta Seletiva Municipal', 'municipios': 15, 'percentual': 20.0},
+                {'nome': 'Cooperativas de Reciclagem', 'municipios': 8, 'percentual': 10.7},
+                {'nome': 'Ecopontos de Coleta', 'municipios': 12, 'percentual': 16.0},
+                {'nome': 'Compostagem', 'municipios': 5, 'percentual': 6.7}
+            ]
+        }
+        
+        return True
+        
+    def analisar_dados(self):
+        """Realiza análise dos dados importados"""
+        print("Analisando dados do ODS 12...")
+        
+        # Análise vetorizada da série (variação, CAGR, tendência, meta e projeção até 2030)
+        anos, matriz = matriz_series([self.historico])
+        resultado = analisar_series(anos, matriz, [self.dados_complementares['meta_nacional']])
+        self.analise = analise_da_serie(resultado, 0)
+        
+        print("Análise concluída com sucesso")
+        return True
+        
+    def gerar_graficos(self):
+        """Agenda os gráficos do relatório (vetoriais ou PNGs renderizados em paralelo)"""
+        print("Gerando gráficos para o relatório...")
+        
+        # Diretório para salvar os gráficos
+        charts_dir = self.config.charts_dir
+        os.makedirs(charts_dir, exist_ok=True)
+        self.renderizacao = criar_estagio(self.backend_graficos, manifesto=self.manifesto,
+                                          cache_dir=self.config.cache_graficos_dir)
+        
+        anos = [p['ano'] for p in self.historico]
+        valores = [p['valor'] for p in self.historico]
+        meta = self.dados_complementares['meta_nacional']
+        
+        # Gráfico 1: Evolução histórica
+        self.renderizacao.submeter('grafico1_path', {
+            'tipo': 'linha',
+            'destino': os.path.join(charts_dir, 'evolucao_reciclagem.png'),
+            'x': anos, 'y': valores, 'cor': ODS12_COLOR,
+            'titulo': (f'Evolução da Taxa de Reciclagem de Resíduos Sólidos Urbanos em Sergipe '
+                       f'({anos[0]}-{anos[-1]})'),
+            'xlabel': 'Ano', 'ylabel': 'Percentual (%)',
+            'caixa': CAIXA_FIGURA, 'dpi': DPI_IMAGENS
+        })
+        
+        # Gráfico 2: Comparação com meta e média nacional
+        self.renderizacao.submeter('grafico2_path', {
+            'tipo': 'barras',
+            'destino': os.path.join(charts_dir, 'comparativo_reciclagem.png'),
+            'categorias': [f"Sergipe ({self.analise['ano_atual']})", 'Média Brasil', 'Melhor Estado', 'Meta 2030'],
+            'valores': [
+                self.analise['valor_atual'],
+                self.dados_complementares['media_brasil'],
+                self.dados_complementares['melhor_estado'],
+                meta
+            ],
+            'cores': [ODS12_COLOR, '#3F7E44', '#56C02B', '#DDA63A'],
+            'rotulo_formato': '{}%', 'rotulo_peso': 'bold',
+            'titulo': 'Comparação da Taxa de Reciclagem: Situação Atual vs. Meta',
+            'ylabel': 'Percentual (%)', 'grade': 'y',
+            'caixa': CAIXA_FIGURA, 'dpi': DPI_IMAGENS
+        })
+        
+        # Gráfico 3: Projeção até 2030
+        self.renderizacao.submeter('grafico3_path', {
+            'tipo': 'projecao',
+            'destino': os.path.join(charts_dir, 'projecao_reciclagem.png'),
+            'x': anos, 'y': valores,
+            'x_proj': [p[0] for p in self.analise['projecao']],
+            'y_proj': [p[1] for p in self.analise['projecao']],
+            **campos_grafico(self.analise['previsao'], self.analise['ano_atual'], self.analise['valor_atual']),
+            'meta': meta, 'cor': ODS12_COLOR, 'cor_projecao': '#56C02B', 'cor_meta': '#DDA63A',
+            'cor_previsao': '#3F7E44',
+            'legendas': {'meta': f"Meta 2030: {meta}%"},
+            'titulo': 'Projeção da Taxa de Reciclagem até 2030 para Atingir a Meta',
+            'xlabel': 'Ano', 'ylabel': 'Percentual (%)',
+            'caixa': CAIXA_FIGURA, 'dpi': DPI_IMAGENS
+        })
+        
+        # Gráfico 4: Iniciativas por município
+        self.renderizacao.submeter('grafico4_path', {
+            'tipo': 'barras',
+            'destino': os.path.join(charts_dir, 'iniciativas_reciclagem.png'),
+            'categorias': [p['nome'] for p in self.dados_complementares['programas']],
+            'valores': [p['percentual'] for p in self.dados_complementares['programas']],
+            'cores': ['#BF8B2E', '#3F7E44', '#56C02B', '#DDA63A'],
+            'rotulo_formato': '{}%', 'rotacao_x': 45,
+            'titulo': 'Iniciativas de Gestão de Resíduos por Município em Sergipe',
+            'ylabel': 'Percentual de Municípios (%)', 'grade': 'y',
+            'caixa': CAIXA_FIGURA, 'dpi': DPI_IMAGENS
+        })
+        
+        return True
+    
+    def aguardar_graficos(self):
+        """Aguarda os gráficos agendados em gerar_graficos (caminhos de PNG ou Drawings)"""
+        with medir('aguardar_graficos'):
+            graficos = self.renderizacao.aguardar()
+        for nome, caminho in graficos.items():
+            setattr(self, nome, caminho)
+        print(f"Gráficos gerados com sucesso ({self.renderizacao.resumo()})")
+    
+    def contexto(self):
+        """Dados que o modelo do relatório recebe (ver modelos_relatorio.py)"""
+        return {
+            'analise': self.analise,
+            'complementares': self.dados_complementares,
+            'programas': self.dados_complementares['programas'],
+            'cor': ODS12_COLOR,
+            'data': data_relatorio(self.config.reprodutivel, self.ultima_atualizacao),
+            'ultima_atualizacao': self.ultima_atualizacao,
+            'anos_historico': len(self.historico),
+            'ano_anterior': self.historico[-2]['ano'],
+            'variacao_ultimo_ano': self.historico[-1]['valor'] - self.historico[-2]['valor'],
+            'texto_previsao': descrever_previsao(self.analise['previsao'], '%',
+                                                 self.dados_complementares['meta_nacional']),
+            'graficos': {'evolucao': self.grafico1_path, 'comparativo': self.grafico2_path,
+                         'projecao': self.grafico3_path, 'iniciativas': self.grafico4_path},
+        }
+
+    def elementos(self):
+        """Gera os flowables do relatório a partir do modelo compilado, depois de aguardar os gráficos (ver secoes.py)"""
+        self.aguardar_graficos()
+        yield from carregar_modelo(MODELO).renderizar(self.contexto())
+    
+    def gerar_relatorio(self):
+        """Gera o relatório técnico em PDF"""
+        print(f"Gerando relatório técnico em PDF: {self.output_file}")
+        os.makedirs(self.config.report_dir, exist_ok=True)
+        
+        # Construir o documento
+        construir_em_secoes(self.output_file, [('Relatório Técnico: ODS 12', self.elementos)],
+                            reprodutivel=self.config.reprodutivel)
+        
+        print(f"Relatório técnico gerado com sucesso: {self.output_file}")
+        return True
+
+def gerar_relatorio_ods12(config=None, backend_graficos='vetorial', manifesto=None):
+    """
+    Executa o fluxo completo e retorna o caminho do PDF.
+
+    Com `manifesto`, o relatório só é refeito quando os dados, o código ou o
+    backend mudaram desde a última geração.
+    """
+    config = config or ConfigRelatorios()
+    entradas = list(arquivos_dados(config).values())
+    # A série pode ter safras carregadas na base fora dos JSON: o hash dos pontos entra nos parâmetros
+    banco = abrir_banco(config.dados_dir, config.series_file)
+    parametros = {'graficos': backend_graficos, 'serie': banco.assinatura(banco.principal('ods12'))}
+    if config.reprodutivel:
+        parametros['reprodutivel'] = True
+    if manifesto is not None and manifesto.atualizado('relatorio:ods12_detalhado', entradas, parametros):
+        print(f"Relatório já atualizado, nada a fazer (use --forcar para gerar novamente): {arquivo_saida(config)}")
+        return arquivo_saida(config)
+    
+    gerador = ODS12ReportGenerator(config, backend_graficos=backend_graficos, manifesto=manifesto)
+    
+    # Executar o fluxo completo, medindo cada etapa
+    with medir('relatorio', relatorio='ods12'):
+        for etapa in (gerador.carregar_dados, gerador.analisar_dados, gerador.gerar_graficos,
+                      gerador.gerar_relatorio):
+            with medir(etapa.__name__):
+                etapa()
+    
+    if manifesto is not None:
+        manifesto.registrar('relatorio:ods12_detalhado', entradas, [gerador.output_file], parametros)
+    return gerador.output_file
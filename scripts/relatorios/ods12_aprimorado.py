@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Relatório técnico aprimorado do ODS 12 com dados adicionais.
+
+Complementa o relatório inicial, adicionando análises mais detalhadas sobre os
+indicadores de Consumo e Produção Responsáveis em Sergipe. Nada é lido nem
+desenhado na importação: os caminhos vêm de um `ConfigRelatorios` passado a
+`aprimorar_relatorio_ods12()` (ou ao comando `limfs-relatorios aprimorar`).
+
+Quando `relatorio_tecnico_ods12.pdf` já existe, o relatório aprimorado é esse
+PDF seguido das seções novas (distribuição dos resíduos, iniciativas por
+município, ações prioritárias e referências, modelo
+`relatorio_ods12_complemento`): só elas e os seus dois gráficos são montados,
+as páginas da base são copiadas como estão e os marcadores ganham uma entrada
+por seção (ver secoes.complementar). Sem o relatório base, o documento
+aprimorado completo é montado do zero, como antes.
+"""
+
+import os
+import json
+import numpy as np
+
+from .config import ConfigRelatorios, CAIXA_FIGURA, DPI_IMAGENS
+from .previsao import prever_series, previsao_da_serie, campos_grafico, descrever_previsao
+from .graficos_vetoriais import criar_estagio
+from .secoes import construir_em_secoes, complementar
+from .modelos_relatorio import carregar_modelo
+from .fontes import ler_json
+from .banco_series import abrir_banco
+from .instrumentacao import medir
+
+# Simular dados de distribuição dos tipos de resíduos reciclados
+TIPOS_RESIDUOS = ['Plástico', 'Papel/Papelão', 'Vidro', 'Metal', 'Orgânicos', 'Outros']
+PERCENTUAIS_TIPOS = [30, 25, 15, 20, 5, 5]  # Porcentagem de cada tipo no total reciclado
+
+# Simular dados de iniciativas sustentáveis por município
+MUNICIPIOS = ['Aracaju', 'Nossa Senhora do Socorro', 'São Cristóvão', 'Lagarto', 'Itabaiana', 'Outros']
+INICIATIVAS_POR_MUNICIPIO = [42, 18, 15, 12, 10, 38]
+
+# Modelo do relatório (modelos/relatorio_ods12_aprimorado.json)
+MODELO = 'relatorio_ods12_aprimorado'
+
+# Seções acrescentadas ao relatório base (modelos/relatorio_ods12_complemento.json), em ordem
+MODELO_COMPLEMENTO = 'relatorio_ods12_complemento'
+SECOES_COMPLEMENTO = [
+    ('distribuicao', '5. Distribuição dos Resíduos Reciclados'),
+    ('municipios', '6. Iniciativas Sustentáveis por Município'),
+    ('acoes', '7. Ações Prioritárias'),
+    ('referencias', '8. Referências'),
+]
+
+RELATORIO_BASE = 'relatorio_tecnico_ods12.pdf'
+RELATORIO_APRIMORADO = 'relatorio_tecnico_aprimorado_ods12.pdf'
+
+# Primeiro ano da série de reciclagem mostrada no relatório aprimorado
+ANO_INICIO_HISTORICO = 2018
+
+
+# Função para carregar dados JSON
+def load_json_data(dados_dir, filename):
+    filepath = os.path.join(dados_dir, filename)
+    try:
+        return ler_json(filepath)
+    except FileNotFoundError:
+        print(f"Arquivo não encontrado: {filepath}")
+        return {}
+    except json.JSONDecodeError:
+        print(f"Erro ao decodificar JSON do arquivo: {filepath}")
+        return {}
+
+# Série histórica da reciclagem (indicador principal do ODS 12) a partir da base de séries
+def gerar_dados_historicos(banco):
+    # Só o intervalo mostrado no relatório é lido (ver banco_series.py)
+    anos, valores = banco.intervalo(banco.principal('ods12'), ANO_INICIO_HISTORICO)
+    
+    # Previsão da tendência até 2030, com intervalo de previsão (ver previsao.py)
+    previsao = previsao_da_serie(prever_series(anos, valores[np.newaxis]), 0)
+    
+    return {
+        'anos': anos.tolist(),
+        'valores': valores.tolist(),
+        'previsao': previsao
+    }
+
+# Os gráficos são descritos como tarefas independentes, desenhados como vetores
+# (reportlab.graphics) ou renderizados em paralelo pelo matplotlib (backend Agg);
+# o PDF aguarda os resultados.
+
+# Função para criar gráfico de barras
+def criar_grafico_barras(titulo, dados_x, dados_y, nome_arquivo, legenda_x, legenda_y, output_dir):
+    return {
+        'tipo': 'barras',
+        'estilo': 'padrao',
+        'destino': os.path.join(output_dir, nome_arquivo),
+        'categorias': list(dados_x),
+        'valores': list(dados_y),
+        'cores': '#3FB049',  # cor verde do ODS 12
+        'titulo': titulo,
+        'titulo_fonte': {'fontsize': 14, 'fontweight': 'bold'},
+        'xlabel': legenda_x,
+        'ylabel': legenda_y,
+        'grade': 'y',
+        'caixa': CAIXA_FIGURA,
+        'dpi': DPI_IMAGENS
+    }
+
+# Função para criar gráfico de pizza
+def criar_grafico_pizza(titulo, labels, valores, nome_arquivo, output_dir):
+    return {
+        'tipo': 'pizza',
+        'estilo': 'padrao',
+        'destino': os.path.join(output_dir, nome_arquivo),
+        'figsize': (8, 8),
+        'rotulos': list(labels),
+        'valores': list(valores),
+        'cores': ['#3FB049', '#56C456', '#76D275', '#98E097', '#B8EBB8', '#D8F5D8'],
+        'titulo': titulo,
+        'titulo_fonte': {'fontsize': 14, 'fontweight': 'bold'},
+        'caixa': (4, 4),
+        'dpi': DPI_IMAGENS
+    }
+
+# Função para criar gráfico de linha com projeção
+def criar_grafico_linha_projetado(titulo, anos, valores, previsao, nome_arquivo, output_dir):
+    return {
+        'tipo': 'projecao',
+        'estilo': 'padrao',
+        'destino': os.path.join(output_dir, nome_arquivo),
+        'figsize': (12, 6),
+        'x': list(anos),
+        'y': list(valores),
+        **campos_grafico(previsao, anos[-1], valores[-1]),
+        'meta': 15,
+        'cor': '#3FB049',
+        'cor_previsao': '#3FB049',
+        'cor_meta': 'r',
+        'estilo_meta': '-',
+        'legendas': {'historico': 'Percentual reciclado', 'previsao': 'Projeção', 'meta': 'Meta ODS (15%)'},
+        'titulo': titulo,
+        'titulo_fonte': {'fontsize': 14, 'fontweight': 'bold'},
+        'xlabel': 'Ano',
+        'ylabel': 'Percentual (%)',
+        'caixa': CAIXA_FIGURA,
+        'dpi': DPI_IMAGENS
+    }
+
+# Agendar os gráficos das seções novas (os únicos do modo incremental)
+def agendar_graficos_complemento(estagio, output_dir):
+    estagio.submeter('pizza', criar_grafico_pizza(
+        'Distribuição dos Tipos de Resíduos Reciclados em Sergipe (2024)',
+        TIPOS_RESIDUOS,
+        PERCENTUAIS_TIPOS,
+        'ods12_tipos_residuos.png',
+        output_dir
+    ))
+
+    estagio.submeter('municipios', criar_grafico_barras(
+        'Iniciativas de Consumo e Produção Sustentável por Município (2024)',
+        MUNICIPIOS,
+        INICIATIVAS_POR_MUNICIPIO,
+        'ods12_iniciativas_municipios.png',
+        'Município',
+        'Número de Iniciativas',
+        output_dir
+    ))
+
+# Agendar os gráficos para o relatório completo
+def agendar_graficos(estagio, dados_historicos, output_dir):
+    estagio.submeter('historico', criar_grafico_barras(
+        f"Evolução do Percentual de Resíduos Reciclados em Sergipe "
+        f"({dados_historicos['anos'][0]}-{dados_historicos['anos'][-1]})",
+        dados_historicos['anos'],
+        dados_historicos['valores'],
+        'ods12_evolucao_reciclagem.png',
+        'Ano',
+        'Percentual de Resíduos Reciclados (%)',
+        output_dir
+    ))
+
+    agendar_graficos_complemento(estagio, output_dir)
+
+    estagio.submeter('projecao', criar_grafico_linha_projetado(
+        'Projeção do Percentual de Resíduos Reciclados até 2030',
+        dados_historicos['anos'],
+        dados_historicos['valores'],
+        dados_historicos['previsao'],
+        'ods12_projecao_2030.png',
+        output_dir
+    ))
+
+# Flowables do relatório aprimorado, gerados um a um (ver secoes.py)
+def elementos_relatorio(estagio, residuos_data, dados_historicos):
+    """Flowables do relatório aprimorado, a partir do modelo compilado (ver modelos_relatorio.py)"""
+    # Aguardar os gráficos agendados antes de montar o documento
+    graficos = estagio.aguardar()
+    contexto = {
+        'valor_atual': residuos_data.get('dados', {}).get('valor', 'N/A'),
+        'ultima_atualizacao': residuos_data.get('ultimaAtualizacao', 'data não disponível'),
+        'texto_previsao': descrever_previsao(dados_historicos['previsao'], '%', 15),
+        'graficos': graficos,
+    }
+    yield from carregar_modelo(MODELO).renderizar(contexto)
+
+
+def secoes_complemento(estagio):
+    """(titulo, fabrica) das seções acrescentadas ao relatório base, para secoes.complementar"""
+    graficos = {}
+
+    def fabrica(secao):
+        def elementos():
+            # Os gráficos são aguardados uma única vez, ao montar a primeira seção
+            if not graficos:
+                graficos.update(estagio.aguardar())
+            contexto = {'secao': {secao: True}, 'graficos': graficos}
+            yield from carregar_modelo(MODELO_COMPLEMENTO).renderizar(contexto)
+        return elementos
+
+    return [(titulo, fabrica(secao)) for secao, titulo in SECOES_COMPLEMENTO]
+
+
+# Função para acrescentar as seções novas ao relatório existente, sem montá-lo de novo
+def complementar_relatorio(estagio, relatorio_existente, output_dir, reprodutivel=False):
+    relatorio_aprimorado = os.path.join(output_dir, RELATORIO_APRIMORADO)
+    resumo = complementar(relatorio_existente, relatorio_aprimorado, secoes_complemento(estagio),
+                          'Relatório Técnico: ODS 12', reprodutivel=reprodutivel)
+    print(f"Relatório aprimorado gerado com sucesso em: {relatorio_aprimorado} "
+          f"({resumo['paginas_base']} páginas do relatório base + {resumo['paginas'] - resumo['paginas_base']} novas)")
+    return relatorio_aprimorado
+
+# Função para gerar o relatório aprimorado completo, quando não há relatório base
+def aprimorar_relatorio(estagio, residuos_data, output_dir, dados_historicos, reprodutivel=False):
+    relatorio_aprimorado = os.path.join(output_dir, RELATORIO_APRIMORADO)
+    
+    # Construir documento
+    construir_em_secoes(relatorio_aprimorado, [(
+        'Relatório Técnico Aprimorado: ODS 12',
+        lambda: elementos_relatorio(estagio, residuos_data, dados_historicos)
+    )], reprodutivel=reprodutivel)
+    
+    print(f"Relatório aprimorado gerado com sucesso em: {relatorio_aprimorado}")
+    return relatorio_aprimorado
+
+def arquivos_entrada(config):
+    """Dados de resíduos, série do ODS 12 e relatório base, dos quais o relatório aprimorado depende"""
+    return [os.path.join(config.dados_dir, 'residuos_reciclados.json'),
+            os.path.join(config.indicadores_dir, 'ods12_consumo_producao.json'),
+            os.path.join(config.report_dir, RELATORIO_BASE)]
+
+
+def aprimorar_relatorio_ods12(config=None, backend_graficos='vetorial', manifesto=None):
+    """
+    Gera o relatório aprimorado e retorna o caminho do PDF.
+
+    Se o relatório base existe, só as seções novas são montadas e acrescentadas
+    a ele (ver a documentação do módulo). Com `manifesto`, nada é refeito se os
+    dados de resíduos, o relatório base e o código não mudaram desde a última
+    geração.
+    """
+    config = config or ConfigRelatorios()
+    entradas = arquivos_entrada(config)
+    relatorio_existente = os.path.join(config.report_dir, RELATORIO_BASE)
+    incremental = os.path.exists(relatorio_existente)
+    parametros = {'graficos': backend_graficos, 'modo': 'incremental' if incremental else 'completo'}
+    if not incremental:
+        # No modo incremental a série já está no relatório base (que é uma das entradas)
+        banco = abrir_banco(config.dados_dir, config.series_file)
+        parametros['serie'] = banco.assinatura(banco.principal('ods12'))
+    if config.reprodutivel:
+        parametros['reprodutivel'] = True
+    saida = os.path.join(config.report_dir, RELATORIO_APRIMORADO)
+    if manifesto is not None and manifesto.atualizado('relatorio:ods12_aprimorado', entradas, parametros):
+        print("Relatório aprimorado já atualizado, nada a fazer (use --forcar para gerar novamente)")
+        return saida
+    
+    os.makedirs(config.report_dir, exist_ok=True)
+    if not incremental:
+        print("Relatório original não encontrado. Criando um novo relatório.")
+    with medir('relatorio', relatorio='ods12_aprimorado', modo=parametros['modo']):
+        if incremental:
+            with medir('gerar_graficos'):
+                estagio = criar_estagio(backend_graficos, manifesto=manifesto,
+                                        cache_dir=config.cache_graficos_dir)
+                agendar_graficos_complemento(estagio, config.report_dir)
+            
+            with medir('complementar_relatorio'):
+                relatorio_final = complementar_relatorio(estagio, relatorio_existente, config.report_dir,
+                                                         config.reprodutivel)
+        else:
+            with medir('carregar_dados'):
+                residuos_data = load_json_data(config.dados_dir, 'residuos_reciclados.json')
+            
+            with medir('analisar_dados'):
+                dados_historicos = gerar_dados_historicos(banco)
+            
+            with medir('gerar_graficos'):
+                estagio = criar_estagio(backend_graficos, manifesto=manifesto,
+                                        cache_dir=config.cache_graficos_dir)
+                agendar_graficos(estagio, dados_historicos, config.report_dir)
+            
+            # Executar função para criar relatório aprimorado
+            with medir('gerar_relatorio'):
+                relatorio_final = aprimorar_relatorio(estagio, residuos_data, config.report_dir, dados_historicos,
+                                                      config.reprodutivel)
+    if manifesto is not None:
+        manifesto.registrar('relatorio:ods12_aprimorado', entradas, [relatorio_final], parametros)
+    return relatorio_final
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Artefatos pré-calculados para o painel web.
+
+O painel (src/) busca os `dados/*.json` brutos e calcula tendências e
+comparações no navegador, enquanto a análise dos relatórios (analise.py e
+previsao.py) já calcula tudo isso. `gerar_painel` grava o resultado dessa
+análise em arquivos JSON pequenos em `docs/painel/`, um por painel:
+
+    indice.json              versão, assinatura dos dados e, para cada artefato,
+                             o nome do arquivo, o SHA-256 e os tamanhos
+    resumo.<hash>.json       um cartão por ODS: valor atual, tendência, meta,
+                             distância da meta e progresso
+    ods<n>.<hash>.json       cada indicador do ODS: série histórica, análise,
+                             trajetória necessária até a meta e previsão
+    rankings.<hash>.json     ODS ordenados pelo progresso até a meta e, por
+                             ODS, os municípios de dados/municipios/
+
+O nome de cada artefato traz os 12 primeiros dígitos do SHA-256 do conteúdo:
+um arquivo nunca muda depois de publicado e pode ser servido com cache
+imutável, e só `indice.json` precisa ser revalidado. Cada artefato é gravado
+também pré-comprimido (`.gz` e, com o pacote `brotli` instalado, `.br`), com
+compressão máxima e sem data no cabeçalho, de modo que os mesmos dados geram
+os mesmos bytes. Os arquivos que não estão no índice novo nem no anterior são
+removidos.
+
+O JSON é compacto: séries em colunas (`anos`, `valores`), números com até 4
+casas decimais e ausências como `null`.
+"""
+
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+
+import numpy as np
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, só a versão gzip
+    brotli = None
+
+from .config import ANO_META, CORES_ODS, COR_PADRAO, ConfigRelatorios
+from .fontes import carregar_config_ods, descobrir_arquivos_ods
+from .ingestao import ingerir
+from .analise import preencher_matriz, analisar_series, analise_da_serie
+from .municipios import descobrir_municipios
+from .manifesto import hash_parametros
+from .instrumentacao import medir
+
+VERSAO_PAINEL = 1
+
+ARQUIVO_INDICE = 'indice.json'
+
+# Casas decimais dos números gravados
+CASAS = 4
+
+PADRAO_ARTEFATO = re.compile(r'^[\w-]+\.[0-9a-f]{12}\.json(\.gz|\.br)?$')
+
+
+def _comprimir_gzip(dados):
+    return gzip.compress(dados, compresslevel=9, mtime=0)
+
+
+def _comprimir_brotli(dados):
+    return brotli.compress(dados, quality=11)
+
+
+# Formatos pré-comprimidos: nome no índice -> (extensão, função)
+COMPRESSORES = {'gzip': ('.gz', _comprimir_gzip)}
+if brotli is not None:
+    COMPRESSORES['br'] = ('.br', _comprimir_brotli)
+
+
+def _numero(valor):
+    """Float arredondado para o JSON (None para NaN, infinito ou ausente)"""
+    if valor is None:
+        return None
+    valor = float(valor)
+    return round(valor, CASAS) if np.isfinite(valor) else None
+
+
+def _numeros(valores):
+    return [_numero(v) for v in valores]
+
+
+def serializar(conteudo):
+    """JSON compacto e determinístico (chaves ordenadas, sem espaços), em UTF-8"""
+    return json.dumps(conteudo, ensure_ascii=False, sort_keys=True, separators=(',', ':'),
+                      allow_nan=False).encode('utf-8')
+
+
+def _gravar_atomico(caminho, dados):
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'wb') as file:
+        file.write(dados)
+    os.replace(temporario, caminho)
+
+
+def gravar_artefato(diretorio, nome, conteudo):
+    """
+    Grava `conteudo` como `<nome>.<hash>.json` e suas versões comprimidas e
+    retorna o registro do índice. Arquivos que já existem não são regravados:
+    o nome identifica o conteúdo.
+    """
+    dados = serializar(conteudo)
+    sha = hashlib.sha256(dados).hexdigest()
+    arquivo = f'{nome}.{sha[:12]}.json'
+    registro = {'arquivo': arquivo, 'sha256': sha, 'bytes': len(dados), 'gravados': 0}
+
+    caminho = os.path.join(diretorio, arquivo)
+    if not os.path.exists(caminho):
+        _gravar_atomico(caminho, dados)
+        registro['gravados'] += 1
+    for formato, (extensao, comprimir) in COMPRESSORES.items():
+        if os.path.exists(caminho + extensao):
+            registro[formato] = os.path.getsize(caminho + extensao)
+            continue
+        comprimido = comprimir(dados)
+        _gravar_atomico(caminho + extensao, comprimido)
+        registro[formato] = len(comprimido)
+        registro['gravados'] += 1
+    return registro
+
+
+def _analisar(indicadores, metas):
+    """Análise de todas as séries (`IndicadorODS`) de uma vez, na matriz séries × anos"""
+    tamanhos = np.array([len(i.anos) for i in indicadores], dtype=np.int64)
+    anos = np.concatenate([np.frombuffer(i.anos, dtype=np.intc) for i in indicadores] or [np.empty(0, np.intc)])
+    valores = np.concatenate([np.frombuffer(i.valores, dtype=np.float64) for i in indicadores] or [np.empty(0)])
+    linhas = np.repeat(np.arange(len(indicadores)), tamanhos)
+    anos, matriz = preencher_matriz(linhas, anos.astype(np.int32), valores, len(indicadores))
+    resultado = analisar_series(anos, matriz, np.array(metas, dtype=np.float64))
+
+    # Progresso: fração do caminho entre o valor inicial e a meta já percorrida
+    inicial, atual, meta = resultado['valor_inicial'], resultado['valor_atual'], resultado['meta']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultado['progresso'] = np.where(meta != inicial, (atual - inicial) / (meta - inicial),
+                                          np.where(atual == meta, 1.0, np.nan))
+    return resultado
+
+
+def _indicador(info, analise, progresso):
+    """Conteúdo de um indicador no artefato do ODS"""
+    projecao = analise.get('projecao')
+    previsao = analise['previsao']
+    return {
+        'slug': info.slug,
+        'indicador': info.indicador or info.titulo_exibido(),
+        'unidade': info.unidade,
+        'ultima_atualizacao': info.ultima_atualizacao,
+        'historico': {'anos': list(info.anos), 'valores': _numeros(info.valores)},
+        'analise': {
+            'valor_inicial': _numero(analise['valor_inicial']),
+            'valor_atual': _numero(analise['valor_atual']),
+            'ano_inicial': analise['ano_inicial'],
+            'ano_atual': analise['ano_atual'],
+            'variacao_percentual': _numero(analise['variacao_percentual']),
+            'taxa_crescimento_anual': _numero(analise['taxa_crescimento_anual']),
+            'tendencia': analise['tendencia'],
+            'meta': _numero(analise['meta']),
+            'gap_meta': _numero(analise.get('gap_meta')),
+            'taxa_necessaria': _numero(analise.get('taxa_necessaria')),
+            'anos_restantes': analise['anos_restantes'],
+            'progresso': _numero(progresso),
+        },
+        'projecao': None if projecao is None else {
+            'anos': [ano for ano, _ in projecao], 'valores': _numeros(v for _, v in projecao),
+        },
+        'previsao': {
+            'modelo': previsao['modelo'],
+            'anos': previsao['anos'],
+            'valores': _numeros(previsao['valores']),
+            'inferior': None if previsao['inferior'] is None else _numeros(previsao['inferior']),
+            'superior': None if previsao['superior'] is None else _numeros(previsao['superior']),
+            'nivel': previsao['nivel'],
+        },
+    }
+
+
+def _ranking_municipios(tarefas, resultado, sentido):
+    """
+    Municípios de um ODS ordenados pelo valor atual no sentido da meta
+    (decrescente se a meta do estado está acima do seu valor inicial)
+    """
+    entradas = [{
+        'municipio': tarefa['municipio'],
+        'valor_atual': _numero(resultado['valor_atual'][i]),
+        'ano_atual': int(resultado['ano_atual'][i]),
+        'tendencia': str(resultado['tendencia'][i]),
+        'meta': _numero(resultado['meta'][i]),
+        'progresso': _numero(resultado['progresso'][i]),
+    } for i, tarefa in enumerate(tarefas)]
+    entradas.sort(key=lambda e: (e['valor_atual'] is None, -sentido * (e['valor_atual'] or 0), e['municipio']))
+    for posicao, entrada in enumerate(entradas, 1):
+        entrada['posicao'] = posicao
+    return entradas
+
+
+def _entradas(config, incluir_municipios):
+    """(arquivos do estado, tarefas dos municípios, todos os arquivos de `dados/` lidos)"""
+    arquivos = descobrir_arquivos_ods(config.indicadores_dir)
+    tarefas = descobrir_municipios(config.municipios_dir) if incluir_municipios else []
+    entradas = [config.ods_config_file] + arquivos
+    for tarefa in tarefas:
+        entradas += [tarefa['arquivo'], os.path.join(os.path.dirname(tarefa['arquivo']), 'municipio.json')]
+    return arquivos, tarefas, entradas
+
+
+def conteudo_painel(config=None, incluir_municipios=True):
+    """
+    Calcula os artefatos do painel sem gravá-los: retorna ({nome: conteúdo},
+    entradas), com os arquivos de `dados/` usados em `entradas`.
+    """
+    config = config or ConfigRelatorios()
+    config_ods = carregar_config_ods(config.ods_config_file)
+    arquivos, tarefas, entradas = _entradas(config, incluir_municipios)
+    ingestao = ingerir(config.dados_dir, arquivos + [t['arquivo'] for t in tarefas])
+    lidos = {a.arquivo: a for a in ingestao.arquivos}
+    for erro in ingestao.erros:
+        print(f"AVISO: {erro.fonte} ignorado no painel ({erro.mensagem})")
+
+    estaduais = [lidos[a].indicador for a in arquivos if lidos[a].indicador is not None]
+    tarefas = [t for t in tarefas if lidos[t['arquivo']].indicador is not None]
+    municipais = [lidos[t['arquivo']].indicador for t in tarefas]
+
+    # A meta do estado vale para os municípios cujo arquivo não traz meta
+    metas_estado = {}
+    for info in estaduais:
+        metas_estado.setdefault(info.codigo, info.meta_2030)
+    metas = [np.nan if info.meta_2030 is None else info.meta_2030 for info in estaduais]
+    metas += [np.nan if m is None else m for m in
+              (info.meta_2030 if info.meta_2030 is not None else metas_estado.get(info.codigo)
+               for info in municipais)]
+
+    # Séries vazias ficam fora da matriz; `posicao` dá a linha de cada indicador analisado
+    series = [(info, meta) for info, meta in zip(estaduais + municipais, metas) if len(info.anos)]
+    resultado = _analisar([info for info, _ in series], [meta for _, meta in series])
+    posicao = {id(info): i for i, (info, _) in enumerate(series)}
+
+    artefatos, resumo, ranking_ods = {}, [], []
+    por_ods = {}
+    for info in estaduais:
+        por_ods.setdefault(info.codigo, []).append(info)
+
+    for codigo, infos in por_ods.items():
+        config_codigo = config_ods.get(codigo, {})
+        titulo = infos[0].titulo_exibido(config_ods)
+        cor = config_codigo.get('cor_primaria') or infos[0].cor or CORES_ODS.get(codigo, COR_PADRAO)
+        conteudos = []
+        for info in infos:
+            if id(info) not in posicao:
+                continue
+            i = posicao[id(info)]
+            conteudos.append(_indicador(info, analise_da_serie(resultado, i), resultado['progresso'][i]))
+        if not conteudos:
+            continue
+        artefatos[codigo] = {'codigo': codigo, 'numero': infos[0].numero, 'titulo': titulo, 'cor': cor,
+                             'ano_meta': ANO_META, 'indicadores': conteudos}
+
+        principal = conteudos[0]['analise']
+        cartao = {'codigo': codigo, 'numero': infos[0].numero, 'titulo': titulo, 'cor': cor,
+                  'indicador': conteudos[0]['indicador'], 'unidade': conteudos[0]['unidade'],
+                  **{campo: principal[campo] for campo in ('valor_atual', 'ano_atual', 'variacao_percentual',
+                                                            'tendencia', 'meta', 'gap_meta', 'progresso')}}
+        resumo.append(cartao)
+        ranking_ods.append({campo: cartao[campo] for campo in ('codigo', 'titulo', 'progresso', 'tendencia')})
+
+    ranking_ods.sort(key=lambda e: (e['progresso'] is None, -(e['progresso'] or 0), e['codigo']))
+    for i, entrada in enumerate(ranking_ods, 1):
+        entrada['posicao'] = i
+
+    rankings_municipios, nomes = {}, {}
+    por_codigo = {}
+    for tarefa, info in zip(tarefas, municipais):
+        if id(info) in posicao:
+            por_codigo.setdefault(tarefa['codigo'], []).append((tarefa, info))
+    for codigo, pares in por_codigo.items():
+        estado = por_ods.get(codigo, [None])[0]
+        sentido = 1
+        if estado is not None and estado.meta_2030 is not None and len(estado.valores):
+            sentido = 1 if estado.meta_2030 >= estado.valores[0] else -1
+        linhas = [posicao[id(info)] for _, info in pares]
+        parcial = {campo: resultado[campo][linhas] for campo in
+                   ('valor_atual', 'ano_atual', 'tendencia', 'meta', 'progresso')}
+        rankings_municipios[codigo] = {
+            'ordem': 'decrescente' if sentido > 0 else 'crescente',
+            'municipios': _ranking_municipios([t for t, _ in pares], parcial, sentido),
+        }
+        nomes.update({t['municipio']: t['nome'] for t, _ in pares})
+
+    artefatos['resumo'] = {'ano_meta': ANO_META, 'ods': resumo}
+    artefatos['rankings'] = {'ods': ranking_ods, 'municipios': rankings_municipios, 'nomes': nomes}
+    return artefatos, entradas
+
+
+def _ler_indice(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _referenciados(indice):
+    arquivos = set()
+    for registro in indice.get('artefatos', {}).values():
+        arquivos.add(registro['arquivo'])
+        arquivos.update(registro['arquivo'] + extensao for extensao, _ in COMPRESSORES.values())
+    return arquivos
+
+
+def gerar_painel(config=None, manifesto=None, incluir_municipios=True):
+    """
+    Grava os artefatos do painel em `config.painel_dir` e retorna um resumo
+    (artefatos, gravados, removidos, bytes e tamanhos comprimidos, duração).
+
+    Com `manifesto`, nada é recalculado se os arquivos de `dados/` e o
+    código não mudaram (`atualizado=True` no resumo).
+    """
+    config = config or ConfigRelatorios()
+    inicio = time.perf_counter()
+    caminho_indice = os.path.join(config.painel_dir, ARQUIVO_INDICE)
+    parametros = {'municipios': incluir_municipios, 'formatos': sorted(COMPRESSORES)}
+
+    if manifesto is not None:
+        if manifesto.atualizado('painel', _entradas(config, incluir_municipios)[2], parametros):
+            return {'diretorio': config.painel_dir, 'indice': caminho_indice, 'atualizado': True,
+                    'duracao': time.perf_counter() - inicio}
+
+    with medir('painel'):
+        with medir('analisar_dados'):
+            artefatos, entradas = conteudo_painel(config, incluir_municipios)
+
+        os.makedirs(config.painel_dir, exist_ok=True)
+        with medir('gravar_artefatos', artefatos=len(artefatos)):
+            registros = {nome: gravar_artefato(config.painel_dir, nome, conteudo)
+                         for nome, conteudo in sorted(artefatos.items())}
+        gravados = sum(registro.pop('gravados') for registro in registros.values())
+
+        # O índice é gravado por último: quem o lê encontra todos os arquivos que ele cita
+        anterior = _ler_indice(caminho_indice)
+        indice = {
+            'versao': VERSAO_PAINEL,
+            'assinatura': hash_parametros({nome: r['sha256'] for nome, r in registros.items()}),
+            'formatos': sorted(COMPRESSORES),
+            'artefatos': registros,
+        }
+        _gravar_atomico(caminho_indice, json.dumps(indice, ensure_ascii=False, indent=1, sort_keys=True)
+                        .encode('utf-8'))
+
+        # Mantém os arquivos do índice anterior para quem ainda o tem em cache
+        manter = _referenciados(indice) | _referenciados(anterior)
+        removidos = 0
+        for nome in os.listdir(config.painel_dir):
+            if PADRAO_ARTEFATO.match(nome) and nome not in manter:
+                os.remove(os.path.join(config.painel_dir, nome))
+                removidos += 1
+
+    if manifesto is not None:
+        saidas = [caminho_indice] + [os.path.join(config.painel_dir, r['arquivo']) for r in registros.values()]
+        manifesto.registrar('painel', entradas, saidas, parametros)
+
+    return {
+        'diretorio': config.painel_dir,
+        'indice': caminho_indice,
+        'atualizado': False,
+        'artefatos': len(registros),
+        'gravados': gravados,
+        'removidos': removidos,
+        'bytes': sum(r['bytes'] for r in registros.values()),
+        **{formato: sum(r[formato] for r in registros.values()) for formato in COMPRESSORES},
+        'duracao': time.perf_counter() - inicio,
+    }
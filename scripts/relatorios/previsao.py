@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Previsão em lote das séries de indicadores até o ano da meta.
+
+Para todas as séries de uma matriz (séries × anos, NaN nos anos sem dado) são
+ajustados, de forma vetorizada, três modelos:
+
+    linear      mínimos quadrados de y = a + b·ano
+    log_linear  mínimos quadrados de log(y) = a + b·ano (só séries positivas)
+    suavizacao  suavização exponencial de Holt (nível + tendência), com
+                alfa e beta escolhidos em uma grade pelo erro um passo à frente
+
+O modelo de cada série é o de menor erro absoluto médio nos últimos pontos
+observados (holdout), ajustando-se os modelos sem esses pontos. Em seguida o
+modelo escolhido é reajustado com a série completa e produz a previsão até
+`ano_meta` com intervalo de previsão de 95%.
+
+    anos, matriz = matriz_series(historicos)
+    resultado = prever_series(anos, matriz)
+    previsao = previsao_da_serie(resultado, 0)
+"""
+
+import numpy as np
+
+from .config import ANO_META
+
+MODELOS = np.array(['linear', 'log_linear', 'suavizacao'])
+NOMES_MODELOS = {
+    'linear': 'tendência linear',
+    'log_linear': 'crescimento exponencial (log-linear)',
+    'suavizacao': 'suavização exponencial de Holt',
+}
+NIVEL = 0.95
+
+# Grade de parâmetros da suavização de Holt
+ALFAS = np.array([0.2, 0.4, 0.6, 0.8, 1.0])
+BETAS = np.array([0.05, 0.2, 0.4, 0.6, 0.8])
+
+# Quantil 97,5% da distribuição t por graus de liberdade (intervalo de 95%)
+_GL_T = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 12, 15, 20, 30, 60])
+_QUANTIS_T = np.array([12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+                       2.179, 2.131, 2.086, 2.042, 2.000])
+_Z = 1.960
+
+
+def _t_critico(graus_liberdade):
+    gl = np.asarray(graus_liberdade, dtype=np.float64)
+    return np.where(gl > 60, _Z, np.interp(gl, _GL_T, _QUANTIS_T))
+
+
+def _mascara_holdout(validos):
+    """Marca os últimos pontos válidos de cada série (2 com 6+ pontos, 1 com 4-5, nenhum abaixo disso)"""
+    n_validos = validos.sum(axis=1)
+    tamanho = np.where(n_validos >= 6, 2, np.where(n_validos >= 4, 1, 0))
+    posicao_reversa = np.cumsum(validos[:, ::-1], axis=1)[:, ::-1]
+    return validos & (posicao_reversa <= tamanho[:, None])
+
+
+def _ajustar_reta(t, y, mascara):
+    """Mínimos quadrados y = a + b·t em cada linha, usando só os pontos da máscara"""
+    peso = mascara.astype(np.float64)
+    y0 = np.where(mascara, y, 0.0)
+    n = peso.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_medio = (peso * t).sum(axis=1) / n
+        y_medio = y0.sum(axis=1) / n
+        dt = (t[None, :] - t_medio[:, None]) * peso
+        stt = (dt * dt).sum(axis=1)
+        b = np.where(stt > 0, (dt * (y0 - y_medio[:, None])).sum(axis=1) / stt, 0.0)
+        a = y_medio - b * t_medio
+        residuos = np.where(mascara, y0 - (a[:, None] + b[:, None] * t[None, :]), 0.0)
+        sigma = np.sqrt((residuos ** 2).sum(axis=1) / (n - 2))
+    sigma = np.where(n > 2, sigma, np.nan)
+    return {'a': a, 'b': b, 'sigma': sigma, 'n': n, 't_medio': t_medio, 'stt': stt}
+
+
+def _prever_reta(reta, t_alvo):
+    """Previsão e erro padrão de previsão da reta nos instantes `t_alvo` (séries × alvos)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        previsao = reta['a'][:, None] + reta['b'][:, None] * t_alvo
+        alavanca = 1 + 1 / reta['n'][:, None] + (t_alvo - reta['t_medio'][:, None]) ** 2 / reta['stt'][:, None]
+        erro_padrao = reta['sigma'][:, None] * np.sqrt(alavanca)
+    return previsao, erro_padrao, _t_critico(reta['n'] - 2)[:, None]
+
+
+def _ajustar_log(t, y, mascara):
+    """Reta em log(y); séries com algum valor não positivo ficam inválidas"""
+    positivos = np.all(~mascara | (y > 0), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reta = _ajustar_reta(t, np.log(np.where(mascara & (y > 0), y, 1.0)), mascara)
+    reta['valido'] = positivos
+    return reta
+
+
+def _prever_log(reta, t_alvo):
+    previsao_log, erro_padrao, critico = _prever_reta(reta, t_alvo)
+    with np.errstate(over='ignore', invalid='ignore'):
+        previsao = np.exp(previsao_log)
+        inferior = np.exp(previsao_log - critico * erro_padrao)
+        superior = np.exp(previsao_log + critico * erro_padrao)
+    invalidas = ~reta['valido'][:, None]
+    return (np.where(invalidas, np.nan, previsao), np.where(invalidas, np.nan, inferior),
+            np.where(invalidas, np.nan, superior))
+
+
+def _ajustar_holt(y, mascara):
+    """
+    Suavização de Holt em todas as séries e em toda a grade (alfa, beta) de uma vez.
+
+    Anos sem dado avançam o nível pela tendência sem atualização. Retorna o
+    estado final do melhor par de cada série e a previsão feita para cada ano.
+    """
+    n_series, n_anos = y.shape
+    alfa = np.repeat(ALFAS, len(BETAS))[None, :]
+    beta = np.tile(BETAS, len(ALFAS))[None, :]
+    linhas = np.arange(n_series)
+
+    colunas = np.arange(n_anos)
+    i1 = np.argmax(mascara, axis=1)
+    i2 = np.argmax(mascara & (colunas[None, :] > i1[:, None]), axis=1)
+    possui_dois = mascara.sum(axis=1) >= 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tendencia_inicial = np.where(possui_dois, (y[linhas, i2] - y[linhas, i1]) / (i2 - i1), 0.0)
+
+    nivel = np.repeat(y[linhas, i1][:, None], alfa.shape[1], axis=1)
+    tendencia = np.repeat(tendencia_inicial[:, None], alfa.shape[1], axis=1)
+    sse = np.zeros_like(nivel)
+    contagem = np.zeros(n_series)
+    previsoes = np.full((n_series, alfa.shape[1], n_anos), np.nan)
+
+    for j in range(n_anos):
+        ativo = (j > i1)[:, None]
+        previsto = nivel + tendencia
+        previsoes[:, :, j] = np.where(ativo, previsto, np.nan)
+        observado = (mascara[:, j] & (j > i1))[:, None]
+        erro = np.where(observado, y[:, j][:, None] - previsto, 0.0)
+        sse += erro ** 2
+        contagem += observado[:, 0]
+
+        novo_nivel = np.where(observado, alfa * y[:, j][:, None] + (1 - alfa) * previsto,
+                              np.where(ativo, previsto, nivel))
+        tendencia = np.where(observado, beta * (novo_nivel - nivel) + (1 - beta) * tendencia, tendencia)
+        nivel = novo_nivel
+
+    melhor = np.argmin(sse, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt(sse[linhas, melhor] / np.maximum(contagem - 2, 1))
+    return {
+        'nivel': nivel[linhas, melhor],
+        'tendencia': tendencia[linhas, melhor],
+        'alfa': alfa[0, melhor],
+        'beta': beta[0, melhor],
+        'sigma': np.where(contagem >= 3, sigma, np.nan),
+        'previsoes': previsoes[linhas, melhor],
+        'valido': possui_dois,
+    }
+
+
+def _prever_holt(holt, anos, anos_alvo, ultimo_ano):
+    """
+    Previsão de Holt nos `anos_alvo`: dentro do eixo usa a previsão registrada
+    no ajuste; além dele, extrapola nível e tendência do último ano do eixo.
+    """
+    colunas = np.clip(np.searchsorted(anos, anos_alvo), 0, len(anos) - 1)
+    futuro = holt['nivel'][:, None] + holt['tendencia'][:, None] * np.maximum(anos_alvo - anos[-1], 0)
+    previsao = np.where(anos_alvo <= anos[-1], holt['previsoes'][:, colunas], futuro)
+
+    # Variância a h passos do último dado: sigma² · (1 + Σ α²(1 + jβ)², j = 1..h-1)
+    h = np.maximum(anos_alvo[None, :] - ultimo_ano[:, None], 1).astype(np.float64)
+    alfa, beta = holt['alfa'][:, None], holt['beta'][:, None]
+    soma = alfa ** 2 * ((h - 1) + beta * (h - 1) * h + beta ** 2 * (h - 1) * h * (2 * h - 1) / 6)
+    erro_padrao = holt['sigma'][:, None] * np.sqrt(1 + soma)
+    invalidas = ~holt['valido'][:, None]
+    return np.where(invalidas, np.nan, previsao), np.where(invalidas, np.nan, erro_padrao)
+
+
+def _prever_modelos(anos, matriz, mascara, anos_alvo):
+    """
+    Ajusta os três modelos com os pontos da `mascara` e prevê os `anos_alvo`.
+
+    Retorna (previsao, inferior, superior), cada um modelos × séries × alvos.
+    """
+    t = (anos - anos[0]).astype(np.float64)
+    t_alvo = (anos_alvo - anos[0]).astype(np.float64)[None, :]
+    n_anos = len(anos)
+    ultimo_ano = anos[n_anos - 1 - np.argmax(mascara[:, ::-1], axis=1)]
+
+    reta = _ajustar_reta(t, matriz, mascara)
+    previsao_linear, erro_linear, critico = _prever_reta(reta, t_alvo)
+    previsao_log, inferior_log, superior_log = _prever_log(_ajustar_log(t, matriz, mascara), t_alvo)
+    previsao_holt, erro_holt = _prever_holt(_ajustar_holt(matriz, mascara), anos, anos_alvo, ultimo_ano)
+
+    previsao = np.stack([previsao_linear, previsao_log, previsao_holt])
+    inferior = np.stack([previsao_linear - critico * erro_linear, inferior_log, previsao_holt - _Z * erro_holt])
+    superior = np.stack([previsao_linear + critico * erro_linear, superior_log, previsao_holt + _Z * erro_holt])
+    return previsao, inferior, superior
+
+
+def prever_series(anos, matriz, ano_meta=ANO_META):
+    """
+    Escolhe o modelo de cada série pelo erro no holdout e prevê até `ano_meta`.
+
+    Retorna um dicionário de arrays indexados pela série: `modelo`,
+    `erro_holdout` (séries × modelos, inf onde o modelo não se aplica),
+    `anos_previsao` e `previsao`, `inferior`, `superior` (séries ×
+    anos_previsao, NaN até o último ano observado de cada série).
+    Séries com menos de 4 pontos usam o modelo linear.
+    """
+    anos = np.asarray(anos)
+    matriz = np.asarray(matriz, dtype=np.float64)
+    n_series, n_anos = matriz.shape
+    if n_anos == 0:
+        # Sem nenhum ano observado não há o que ajustar: modelo linear, sem previsão
+        vazio = np.empty((n_series, 0))
+        return {
+            'modelo': MODELOS[np.zeros(n_series, dtype=int)],
+            'erro_holdout': np.full((n_series, len(MODELOS)), np.inf),
+            'anos_previsao': np.empty(0, dtype=int),
+            'previsao': vazio,
+            'inferior': vazio,
+            'superior': vazio,
+            'nivel': NIVEL,
+        }
+    linhas = np.arange(n_series)
+    validos = ~np.isnan(matriz)
+
+    # Holdout: ajusta sem os últimos pontos e mede o erro absoluto médio neles
+    holdout = _mascara_holdout(validos)
+    candidatos, _, _ = _prever_modelos(anos, matriz, validos & ~holdout, anos)
+    n_holdout = holdout.sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        erros = np.where(holdout[None], np.abs(candidatos - matriz[None]), 0.0).sum(axis=2) / n_holdout
+    erros = np.where(np.isnan(erros), np.inf, erros).T
+    escolhido = np.where(n_holdout > 0, np.argmin(erros, axis=1), 0)
+
+    # Previsão final com a série completa
+    ultimo_ano = anos[n_anos - 1 - np.argmax(validos[:, ::-1], axis=1)] if n_anos else np.empty(0, dtype=int)
+    ano_inicial = int(ultimo_ano.min()) + 1 if n_series else ano_meta
+    anos_previsao = np.arange(min(ano_inicial, ano_meta), ano_meta + 1)
+    previsao, inferior, superior = _prever_modelos(anos, matriz, validos, anos_previsao)
+    futuros = anos_previsao[None, :] > ultimo_ano[:, None]
+
+    def selecionar(valores):
+        return np.where(futuros, valores[escolhido, linhas], np.nan)
+
+    return {
+        'modelo': MODELOS[escolhido],
+        'erro_holdout': erros,
+        'anos_previsao': anos_previsao,
+        'previsao': selecionar(previsao),
+        'inferior': selecionar(inferior),
+        'superior': selecionar(superior),
+        'nivel': NIVEL,
+    }
+
+
+def previsao_da_serie(resultado, i):
+    """Converte a linha `i` de `prever_series` em um dicionário com listas de Python"""
+    previsao = resultado['previsao'][i]
+    definidos = ~np.isnan(previsao)
+    inferior = resultado['inferior'][i][definidos]
+    superior = resultado['superior'][i][definidos]
+    intervalo = not np.isnan(inferior).any()
+    erro = resultado['erro_holdout'][i][MODELOS == resultado['modelo'][i]][0]
+    return {
+        'modelo': str(resultado['modelo'][i]),
+        'erro_holdout': erro.item() if np.isfinite(erro) else None,
+        'anos': resultado['anos_previsao'][definidos].tolist(),
+        'valores': previsao[definidos].tolist(),
+        'inferior': inferior.tolist() if intervalo else None,
+        'superior': superior.tolist() if intervalo else None,
+        'nivel': resultado['nivel'],
+    }
+
+
+def campos_grafico(previsao, ano_atual, valor_atual):
+    """Campos da especificação do gráfico de projeção: previsão e faixa partindo do último dado"""
+    anos = [ano_atual] + previsao['anos']
+    campos = {'x_prev': anos, 'y_prev': [round(v, 2) for v in [valor_atual] + previsao['valores']]}
+    if previsao['inferior'] is not None:
+        campos['x_faixa'] = anos
+        campos['y_faixa_inf'] = [round(v, 2) for v in [valor_atual] + previsao['inferior']]
+        campos['y_faixa_sup'] = [round(v, 2) for v in [valor_atual] + previsao['superior']]
+    return campos
+
+
+def _formatar(valor):
+    return f"{valor:.1f}" if abs(valor) >= 1 else f"{valor:.3f}"
+
+
+def descrever_previsao(previsao, unidade='', meta=None):
+    """Frase do relatório com o valor previsto para o último ano, o intervalo e a comparação com a meta"""
+    if not previsao['anos']:
+        return ''
+    ano, valor = previsao['anos'][-1], previsao['valores'][-1]
+    texto = (f"Mantida a tendência observada, o modelo de {NOMES_MODELOS[previsao['modelo']]}, escolhido pelo "
+             f"menor erro nos anos mais recentes, prevê {_formatar(valor)}{unidade} em {ano}")
+    if previsao['inferior'] is not None:
+        texto += (f" (intervalo de previsão de {previsao['nivel']:.0%}: {_formatar(previsao['inferior'][-1])}{unidade} "
+                  f"a {_formatar(previsao['superior'][-1])}{unidade})")
+    if meta is not None:
+        texto += f", {'acima' if valor >= meta else 'abaixo'} da meta de {meta:g}{unidade}"
+    return texto + '.'
+
+
+def prever_armazem(armazem, chaves=None, ano_meta=ANO_META):
+    """Prevê de uma vez as séries do armazém (todas, se `chaves` não for informado)"""
+    chaves = armazem.chaves() if chaves is None else list(chaves)
+    anos, matriz, _ = armazem.matriz(chaves)
+    resultado = prever_series(anos, matriz, ano_meta)
+    resultado['chaves'] = np.array(chaves, dtype=str)
+    return resultado
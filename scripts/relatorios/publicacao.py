@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Publicação endereçada por conteúdo dos relatórios em PDF.
+
+Com `ConfigRelatorios(reprodutivel=True)` (opção `--reprodutivel` da linha
+de comando), os mesmos dados geram os mesmos bytes:
+
+- os PDFs são montados no modo invariante do reportlab: data de criação fixa
+  (ou a de SOURCE_DATE_EPOCH, quando definida) e identificador do documento
+  calculado do conteúdo, ver secoes.construir_secao;
+- a data impressa no relatório é a da última atualização dos dados
+  (`data_relatorio`), não a do dia da geração;
+- a junção de seções pelo pypdf já é determinística (identificador derivado
+  do conteúdo, sem data).
+
+`publicar` copia os PDFs de `docs/relatorios/` (inclusive `municipios/`)
+para `docs/relatorios/publicacao/`:
+
+    objetos/<aa>/<sha256>.pdf   cada conteúdo uma única vez, nomeado pelo
+                                SHA-256 (aa: os dois primeiros dígitos)
+    manifesto.json              para cada relatório (caminho relativo a
+                                docs/relatorios/), o SHA-256, o tamanho e o
+                                objeto
+
+Um relatório que não mudou aponta para o mesmo objeto: a etapa de
+sincronização compara o manifesto novo com o publicado e envia (e invalida
+no CDN) só os objetos novos. O manifesto só é regravado quando muda, e os
+objetos que não estão no manifesto novo nem no anterior são removidos.
+"""
+
+import os
+import json
+import shutil
+from datetime import datetime
+
+from .config import ConfigRelatorios
+from .manifesto import hash_arquivo
+
+VERSAO_PUBLICACAO = 1
+
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+FORMATOS_DATA = ('%Y-%m-%d', '%d/%m/%Y', '%Y-%m', '%m/%Y', '%Y')
+
+
+def _converter_data(texto):
+    """Converte datas como '2025-04-12', '12/04/2025' ou '2024' (None se inválida)"""
+    texto = str(texto or '').strip()[:10]
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+
+def data_relatorio(reprodutivel, *datas):
+    """
+    Data impressa nos relatórios (dd/mm/aaaa): a de hoje ou, no modo
+    reprodutível, a mais recente entre `datas` (atualizações dos dados).
+    """
+    if not reprodutivel:
+        return datetime.now().strftime('%d/%m/%Y')
+    convertidas = [data for data in map(_converter_data, datas) if data is not None]
+    return max(convertidas).strftime('%d/%m/%Y') if convertidas else 'não informada'
+
+
+def relatorios_publicaveis(config):
+    """PDFs de `config.report_dir` e de `municipios/`, em ordem (sem a própria publicação nem os caches)"""
+    excluidos = {config.publicacao_dir, os.path.join(config.report_dir, 'cache')}
+    arquivos = []
+    for raiz, diretorios, nomes in os.walk(config.report_dir):
+        diretorios[:] = sorted(d for d in diretorios if os.path.join(raiz, d) not in excluidos)
+        arquivos.extend(os.path.join(raiz, nome) for nome in sorted(nomes) if nome.endswith('.pdf'))
+    return arquivos
+
+
+def _ler_manifesto(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_atomico(caminho, dados=None, origem=None):
+    """Grava `dados` (ou uma cópia do arquivo `origem`) em `caminho`, de forma atômica"""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    if origem is not None:
+        shutil.copyfile(origem, temporario)
+    else:
+        with open(temporario, 'wb') as file:
+            file.write(dados)
+    os.replace(temporario, caminho)
+
+
+def _ler_bytes(caminho):
+    try:
+        with open(caminho, 'rb') as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def publicar(config=None):
+    """
+    Grava os objetos e o manifesto da publicação (ver a documentação do
+    módulo) e retorna o resumo: `alterados` (relatórios novos ou com outro
+    conteúdo), `removidos` (relatórios que saíram), `inalterados`,
+    `objetos_gravados`, `objetos_removidos` e `manifesto`.
+    """
+    config = config or ConfigRelatorios()
+    diretorio = config.publicacao_dir
+    caminho_manifesto = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    anterior = _ler_manifesto(caminho_manifesto).get('relatorios', {})
+
+    relatorios, gravados = {}, 0
+    for arquivo in relatorios_publicaveis(config):
+        sha = hash_arquivo(arquivo)
+        objeto = f'objetos/{sha[:2]}/{sha}.pdf'
+        destino = os.path.join(diretorio, objeto)
+        if not os.path.exists(destino):
+            _gravar_atomico(destino, origem=arquivo)
+            gravados += 1
+        nome = os.path.relpath(arquivo, config.report_dir).replace(os.sep, '/')
+        relatorios[nome] = {'sha256': sha, 'bytes': os.path.getsize(arquivo), 'objeto': objeto}
+
+    conteudo = json.dumps({'versao': VERSAO_PUBLICACAO, 'relatorios': relatorios}, ensure_ascii=False,
+                          sort_keys=True, indent=1).encode('utf-8')
+    if _ler_bytes(caminho_manifesto) != conteudo:
+        _gravar_atomico(caminho_manifesto, conteudo)
+
+    # Objetos do manifesto anterior ficam por uma geração (sincronizações em andamento)
+    referenciados = {r['objeto'] for r in relatorios.values()} | {r['objeto'] for r in anterior.values()}
+    removidos_objetos = 0
+    for raiz, _, nomes in os.walk(os.path.join(diretorio, 'objetos')):
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            if os.path.relpath(caminho, diretorio).replace(os.sep, '/') not in referenciados:
+                os.remove(caminho)
+                removidos_objetos += 1
+
+    return {
+        'alterados': sorted(n for n, r in relatorios.items() if anterior.get(n, {}).get('sha256') != r['sha256']),
+        'removidos': sorted(n for n in anterior if n not in relatorios),
+        'inalterados': sum(1 for n, r in relatorios.items() if anterior.get(n, {}).get('sha256') == r['sha256']),
+        'objetos_gravados': gravados,
+        'objetos_removidos': removidos_objetos,
+        'manifesto': caminho_manifesto,
+    }
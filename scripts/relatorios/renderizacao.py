@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Estágio de renderização de gráficos em paralelo.
+
+Cada gráfico é descrito por um dicionário (a "especificação") com o tipo, os
+dados e o arquivo de destino. As especificações são renderizadas de forma
+independente em um pool de processos com o backend Agg, sem usar o estado
+global do pyplot, e o estágio do PDF aguarda os resultados com `aguardar()`.
+Cada processo reaproveita uma figura por tipo de gráfico (ver modelos_graficos).
+
+Tipos suportados e chaves principais:
+
+    linha     x, y, cor, marcador
+    barras    categorias, valores, cores, rotulo_formato, rotulo_peso, rotacao_x
+    projecao  x, y, x_proj, y_proj, meta, cor, cor_projecao, cor_meta, legendas
+    pizza     rotulos, valores, cores
+
+Chaves comuns: destino, titulo, titulo_fonte, xlabel, ylabel, figsize, dpi,
+bbox_inches, grade ('both', 'y' ou None), estilo ('relatorio' ou 'padrao'),
+caixa (tamanho no PDF, em polegadas). Com `caixa`, a imagem é gerada no
+tamanho exato da figura no PDF a `dpi` pontos por polegada, em PNG ou, se o
+destino terminar em .jpg, em JPEG (ver imagens.py); `bbox_inches` é ignorado.
+
+Com `exportar` ({formato: caminho}, formatos 'web', 'miniatura' e 'buffer'
+de imagens.FORMATOS_EXPORTACAO), o mesmo desenho grava também o SVG, a
+miniatura e/ou devolve os bytes da imagem; um caminho None devolve os bytes.
+O resultado fica em `exportacoes()`.
+"""
+
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from .config import CACHE_GRAFICOS_DIR, ESTILOS_GRAFICOS
+from .instrumentacao import medir
+
+
+def desenhar_grafico(spec, caminho):
+    """Desenha a especificação no modelo de figura do processo e salva em `caminho`"""
+    from .modelos_graficos import renderizador_do_processo
+    return renderizador_do_processo().renderizar(spec, caminho)
+
+
+def exportar_grafico(spec, saidas):
+    """Desenha a especificação uma única vez e grava os formatos de `saidas` ({formato: caminho})"""
+    from .modelos_graficos import renderizador_do_processo
+    return renderizador_do_processo().exportar(spec, saidas)
+
+
+def renderizar_grafico(spec, cache_dir=CACHE_GRAFICOS_DIR):
+    """
+    Renderiza uma especificação (roda no processo trabalhador).
+
+    Usa o cache endereçado por conteúdo quando `cache_dir` é informado.
+    Retorna {'caminho', 'tipo', 'cache', 'duracao'} e, se a especificação
+    tiver `exportar`, 'exportacoes' ({formato: caminho ou bytes}).
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import style
+    from .cache_graficos import CacheGraficos
+
+    inicio = time.perf_counter()
+    destino = spec['destino']
+    os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+    exportacoes = spec.get('exportar')
+    parametros = {k: v for k, v in spec.items() if k not in ('destino', 'exportar')}
+    if exportacoes:
+        # Os caminhos não entram na chave, só os formatos
+        parametros['exportar'] = sorted(exportacoes)
+        saidas = dict(exportacoes, impressao=destino)
+        for caminho in exportacoes.values():
+            if caminho:
+                os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+
+    grafico = os.path.join(os.path.basename(os.path.dirname(destino)), os.path.basename(destino))
+    with medir('grafico', grafico=grafico, tipo=spec['tipo']) as registro, \
+            style.context(ESTILOS_GRAFICOS[spec.get('estilo', 'relatorio')], after_reset=True):
+        cache = CacheGraficos(cache_dir) if cache_dir else None
+        if exportacoes:
+            if cache is not None:
+                exportados = cache.obter_exportacoes(saidas, parametros, lambda c: exportar_grafico(spec, c))
+            else:
+                exportados = exportar_grafico(spec, saidas)
+        elif cache is not None:
+            cache.obter(destino, parametros, lambda caminho: desenhar_grafico(spec, caminho))
+        else:
+            desenhar_grafico(spec, destino)
+        reaproveitado = cache is not None and cache.acertos > 0
+        registro['cache'] = reaproveitado
+
+    resultado = {'caminho': destino, 'tipo': spec['tipo'], 'cache': reaproveitado,
+                 'duracao': time.perf_counter() - inicio}
+    if exportacoes:
+        resultado['exportacoes'] = {f: v for f, v in exportados.items() if f != 'impressao'}
+    return resultado
+
+
+def _futuro_concluido(funcao, *args):
+    """Executa no processo atual e devolve um Future já resolvido"""
+    futuro = Future()
+    try:
+        futuro.set_result(funcao(*args))
+    except Exception as e:
+        futuro.set_exception(e)
+    return futuro
+
+
+class EstagioRenderizacao:
+    """
+    Renderiza gráficos em paralelo e entrega os caminhos quando solicitados.
+
+    Com `max_workers=0` tudo roda no processo atual (útil quando o chamador já
+    é um trabalhador de um pool, como na geração em lote); nesse caso a
+    limpeza do cache de gráficos fica com o chamador, uma única vez depois
+    que todos os trabalhadores terminam. Com um `manifesto`
+    (ver manifesto.ManifestoBuild), gráficos cujo PNG já existe e cuja
+    especificação e código não mudaram nem chegam a ser agendados.
+    """
+
+    def __init__(self, max_workers=None, cache_dir=CACHE_GRAFICOS_DIR, manifesto=None):
+        self.cache_dir = cache_dir
+        self.manifesto = manifesto
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers) if self.max_workers > 0 else None
+        self._futuros = {}
+        self._specs = {}
+        self._encerrado = False
+        self.resultados = {}
+
+    def submeter(self, nome, spec):
+        """Agenda a renderização de um gráfico"""
+        exportacoes = spec.get('exportar') or {}
+        # Formatos devolvidos em bytes precisam do desenho (ou do cache), mesmo com o arquivo atualizado
+        em_memoria = any(caminho is None for caminho in exportacoes.values())
+        if self.manifesto is not None:
+            chave, parametros = self._chave_manifesto(spec)
+            if not em_memoria and self.manifesto.atualizado(chave, parametros=parametros):
+                futuro = Future()
+                resultado = {'caminho': spec['destino'], 'tipo': spec['tipo'], 'cache': True,
+                             'atualizado': True, 'duracao': 0.0}
+                if exportacoes:
+                    resultado['exportacoes'] = dict(exportacoes)
+                futuro.set_result(resultado)
+                self._futuros[nome] = futuro
+                return futuro
+            self._specs[nome] = spec
+        if self._executor:
+            futuro = self._executor.submit(renderizar_grafico, spec, self.cache_dir)
+        else:
+            futuro = _futuro_concluido(renderizar_grafico, spec, self.cache_dir)
+        self._futuros[nome] = futuro
+        return futuro
+
+    def aguardar(self):
+        """
+        Espera todos os gráficos agendados e retorna {nome: caminho}.
+
+        Gráficos de conteúdo idêntico apontam para o mesmo arquivo, embutido
+        uma única vez no PDF.
+        """
+        from .imagens import deduplicar
+
+        resultados = {nome: futuro.result() for nome, futuro in self._futuros.items()}
+        self.encerrar()
+        for nome, spec in self._specs.items():
+            chave, parametros = self._chave_manifesto(spec)
+            exportados = [c for c in (spec.get('exportar') or {}).values() if c]
+            self.manifesto.registrar(chave, saidas=[spec['destino'], *exportados], parametros=parametros)
+        self.resultados = resultados
+        return deduplicar({nome: r['caminho'] for nome, r in resultados.items()})
+
+    def exportacoes(self):
+        """Formatos exportados de cada gráfico com `exportar`: {nome: {formato: caminho ou bytes}}"""
+        return {nome: r['exportacoes'] for nome, r in self.resultados.items() if 'exportacoes' in r}
+
+    def _chave_manifesto(self, spec):
+        parametros = {k: v for k, v in spec.items() if k != 'destino'}
+        return f"grafico:{self.manifesto.relativo(spec['destino'])}", parametros
+
+    def encerrar(self):
+        if self._encerrado:
+            return
+        self._encerrado = True
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+            # Só o estágio dono do pool limpa o cache (ver a documentação da classe)
+            if self.cache_dir:
+                from .cache_graficos import CacheGraficos
+                CacheGraficos(self.cache_dir).limpar()
+
+    def tempos(self):
+        """Tempo de renderização de cada gráfico, em segundos"""
+        return {nome: r['duracao'] for nome, r in self.resultados.items()}
+
+    def resumo(self):
+        reaproveitados = sum(1 for r in self.resultados.values() if r['cache'])
+        atualizados = sum(1 for r in self.resultados.values() if r.get('atualizado'))
+        tempos = ', '.join(f"{nome} {duracao:.2f}s" for nome, duracao in self.tempos().items())
+        return (f"{len(self._futuros)} gráficos, {reaproveitados} reaproveitados do cache "
+                f"({atualizados} já atualizados) [{tempos}]")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.encerrar()
+        return False
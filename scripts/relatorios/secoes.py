@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+Construção de PDFs seção a seção, com memória limitada.
+
+`doc.build` do reportlab precisa de todos os flowables em uma lista e mantém
+as imagens dos gráficos em memória até o fim. Para relatórios grandes (todos
+os ODS, todos os municípios) o documento é descrito como uma sequência de
+seções, cada uma com uma função que gera seus flowables sob demanda:
+
+    secoes = ((gerador.info['titulo'], gerador.elementos) for gerador in geradores)
+    construir_em_secoes('consolidado.pdf', secoes, paginas_por_volume=500)
+
+Cada seção é montada sozinha em um PDF temporário (seus flowables são
+descartados em seguida) e os PDFs temporários são juntados no arquivo final,
+com um marcador por seção. Os flowables e gráficos de uma seção nunca
+coexistem com os das outras.
+
+A junção também é feita seção a seção (`JuncaoIncremental`): os objetos das
+páginas de cada PDF temporário são gravados no arquivo final assim que são
+lidos, e da seção só ficam os números e as posições dos objetos, para a
+tabela de referências gravada no fim. Objetos idênticos (as fontes que cada
+seção declara de novo, um logotipo repetido) são gravados uma vez só. O pico
+de memória fica no nível da maior seção, qualquer que seja o tamanho do
+documento. Com `paginas_por_volume`, o documento é dividido em volumes
+(`nome_vol01.pdf`, `nome_vol02.pdf`, ...) de aproximadamente esse número de
+páginas, sem dividir seções.
+
+Juntar seções requer o pypdf (opcional, para ler os PDFs das seções); um
+documento de uma só seção é montado diretamente no destino, sem ele.
+
+`complementar` acrescenta seções a um PDF já pronto sem montá-lo de novo: as
+páginas da base são copiadas como estão (pypdf), só as seções novas passam
+pelo reportlab, e os marcadores da base ganham os das seções novas.
+
+Com `reprodutivel=True`, cada seção é montada no modo invariante do
+reportlab (data de criação fixa e identificador calculado do conteúdo) e os
+mesmos flowables geram os mesmos bytes (ver publicacao.py).
+"""
+
+import io
+import os
+import shutil
+import hashlib
+import tempfile
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate
+
+from .instrumentacao import medir
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.generic import (ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject,
+                               StreamObject, TextStringObject)
+except ImportError:  # pypdf é necessário apenas para juntar seções
+    PdfReader = PdfWriter = None
+
+MARGEM = 72
+# Largura do quadro de texto em A4 com as margens padrão (doc.width)
+LARGURA_UTIL = A4[0] - 2 * MARGEM
+
+
+def _numerar(inicio):
+    """Callback de página que escreve a numeração contínua no rodapé"""
+    def desenhar(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 9)
+        canvas.drawCentredString(doc.pagesize[0] / 2, MARGEM / 2, f"Página {inicio + doc.page}")
+        canvas.restoreState()
+    return desenhar
+
+
+def construir_secao(destino, flowables, pagesize=A4, numerar_a_partir_de=None, reprodutivel=False):
+    """
+    Monta um PDF com os `flowables` (iterável, consumido aqui) e retorna o
+    número de páginas. Com `numerar_a_partir_de`, as páginas são numeradas a
+    partir desse deslocamento.
+    """
+    # invariant: sem data de geração nem identificador aleatório no PDF
+    opcoes = {'invariant': 1} if reprodutivel else {}
+    doc = SimpleDocTemplate(destino, pagesize=pagesize, rightMargin=MARGEM, leftMargin=MARGEM,
+                            topMargin=MARGEM, bottomMargin=MARGEM, **opcoes)
+    if numerar_a_partir_de is None:
+        doc.build(list(flowables))
+    else:
+        rodape = _numerar(numerar_a_partir_de)
+        doc.build(list(flowables), onFirstPage=rodape, onLaterPages=rodape)
+    return doc.page
+
+
+def _arquivo_volume(destino, numero):
+    raiz, extensao = os.path.splitext(destino)
+    return f"{raiz}_vol{numero:02d}{extensao}"
+
+
+class JuncaoIncremental:
+    """
+    Grava em `destino` um PDF formado pelas páginas de outros PDFs, um de cada
+    vez (ver a documentação do módulo):
+
+        juncao = JuncaoIncremental(destino)
+        for titulo, arquivo in partes:
+            juncao.acrescentar(arquivo, titulo)
+        juncao.fechar()
+
+    Cada PDF acrescentado é lido, tem os objetos alcançáveis das suas páginas
+    renumerados e gravados, e é descartado. Objetos com o mesmo conteúdo
+    (depois da renumeração) são gravados uma vez só. `fechar` grava a árvore
+    de páginas, os marcadores (um por `titulo`, na primeira página da parte),
+    o catálogo e a tabela de referências, e só então o arquivo aparece em
+    `destino`; `descartar` desiste da junção.
+    """
+
+    def __init__(self, destino, versao='1.4'):
+        self.destino = destino
+        self._temporario = destino + '.tmp'
+        self._file = open(self._temporario, 'wb')
+        self._posicoes = [None]  # posição de cada objeto no arquivo, pelo número (0 não é usado)
+        self._identicos = {}  # SHA-256 do conteúdo: número do objeto já gravado
+        self._paginas = []
+        self._marcadores = []
+        self._file.write(f'%PDF-{versao}\n%\xe2\xe3\xcf\xd3\n'.encode('latin-1'))
+        self._raiz_paginas = self._reservar()
+        # Referências da parte em leitura: número no PDF da parte -> número no destino
+        self._numeros = {}
+        self._em_copia = set()
+
+    def _reservar(self):
+        self._posicoes.append(None)
+        return len(self._posicoes) - 1
+
+    def _gravar_objeto(self, numero, conteudo):
+        self._posicoes[numero] = self._file.tell()
+        self._file.write(b'%d 0 obj\n%s\nendobj\n' % (numero, conteudo))
+
+    @staticmethod
+    def _serializar(objeto):
+        buffer = io.BytesIO()
+        objeto.write_to_stream(buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _referencia(numero):
+        return IndirectObject(numero, 0, None)
+
+    def _copiar(self, objeto):
+        """Cópia de um objeto direto com as referências trocadas pelas do destino"""
+        if isinstance(objeto, IndirectObject):
+            return self._referencia(self._copiar_indireto(objeto))
+        if isinstance(objeto, StreamObject):
+            copia = objeto.__class__()
+            copia._data = objeto._data
+            copia.update({chave: self._copiar(valor) for chave, valor in objeto.items()})
+            return copia
+        if isinstance(objeto, DictionaryObject):
+            return DictionaryObject({chave: self._copiar(valor) for chave, valor in objeto.items()})
+        if isinstance(objeto, ArrayObject):
+            return ArrayObject(self._copiar(valor) for valor in objeto)
+        return objeto
+
+    def _copiar_indireto(self, referencia):
+        """
+        Grava o objeto indireto da parte (depois dos que ele referencia) e
+        retorna seu número no destino. Um objeto igual a outro já gravado
+        reaproveita o número dele; um ciclo de referências recebe o número
+        antes de ser gravado.
+        """
+        origem = referencia.idnum
+        numero = self._numeros.get(origem)
+        if numero is not None:
+            return numero
+        if origem in self._em_copia:
+            numero = self._numeros[origem] = self._reservar()
+            return numero
+
+        self._em_copia.add(origem)
+        conteudo = self._serializar(self._copiar(referencia.get_object()))
+        self._em_copia.discard(origem)
+        numero = self._numeros.get(origem)
+        if numero is None:
+            digest = hashlib.sha256(conteudo).digest()
+            numero = self._identicos.get(digest)
+            if numero is None:
+                numero = self._identicos[digest] = self._reservar()
+                self._gravar_objeto(numero, conteudo)
+            self._numeros[origem] = numero
+        else:
+            self._gravar_objeto(numero, conteudo)
+        return numero
+
+    def acrescentar(self, arquivo, titulo=None):
+        """Copia as páginas de `arquivo` para o fim do destino; retorna o número de páginas copiadas"""
+        leitor = PdfReader(arquivo)
+        # pypdf copia para cada página os atributos herdados da árvore de páginas
+        paginas = list(leitor.pages)
+        numeros = [self._reservar() for _ in paginas]
+        self._numeros = {pagina.indirect_reference.idnum: numero for pagina, numero in zip(paginas, numeros)}
+        if titulo is not None and paginas:
+            self._marcadores.append((titulo, numeros[0]))
+        for pagina, numero in zip(paginas, numeros):
+            copia = self._copiar(DictionaryObject({chave: valor for chave, valor in pagina.items()
+                                                   if chave != '/Parent'}))
+            copia[NameObject('/Parent')] = self._referencia(self._raiz_paginas)
+            self._gravar_objeto(numero, self._serializar(copia))
+        self._paginas.extend(numeros)
+        self._numeros = {}
+        return len(paginas)
+
+    def _gravar_marcadores(self):
+        raiz = self._reservar()
+        itens = [self._reservar() for _ in self._marcadores]
+        for i, ((titulo, pagina), numero) in enumerate(zip(self._marcadores, itens)):
+            item = DictionaryObject({
+                NameObject('/Title'): TextStringObject(titulo),
+                NameObject('/Parent'): self._referencia(raiz),
+                NameObject('/Dest'): ArrayObject([self._referencia(pagina), NameObject('/Fit')]),
+            })
+            if i > 0:
+                item[NameObject('/Prev')] = self._referencia(itens[i - 1])
+            if i < len(itens) - 1:
+                item[NameObject('/Next')] = self._referencia(itens[i + 1])
+            self._gravar_objeto(numero, self._serializar(item))
+        self._gravar_objeto(raiz, self._serializar(DictionaryObject({
+            NameObject('/Type'): NameObject('/Outlines'),
+            NameObject('/First'): self._referencia(itens[0]),
+            NameObject('/Last'): self._referencia(itens[-1]),
+            NameObject('/Count'): NumberObject(len(itens)),
+        })))
+        return raiz
+
+    def fechar(self):
+        """Grava a árvore de páginas, os marcadores, o catálogo e a tabela de referências"""
+        self._gravar_objeto(self._raiz_paginas, self._serializar(DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): ArrayObject(self._referencia(numero) for numero in self._paginas),
+            NameObject('/Count'): NumberObject(len(self._paginas)),
+        })))
+        catalogo = DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): self._referencia(self._raiz_paginas),
+        })
+        if self._marcadores:
+            catalogo[NameObject('/Outlines')] = self._referencia(self._gravar_marcadores())
+        raiz = self._reservar()
+        self._gravar_objeto(raiz, self._serializar(catalogo))
+
+        inicio_xref = self._file.tell()
+        linhas = [b'xref\n0 %d\n' % len(self._posicoes), b'0000000000 65535 f \n']
+        linhas += [b'%010d 00000 n \n' % posicao for posicao in self._posicoes[1:]]
+        self._file.write(b''.join(linhas))
+        self._file.write(b'trailer\n<<\n/Size %d\n/Root %d 0 R\n>>\nstartxref\n%d\n%%%%EOF\n'
+                         % (len(self._posicoes), raiz, inicio_xref))
+        self._file.close()
+        os.replace(self._temporario, self.destino)
+
+    def descartar(self):
+        self._file.close()
+        if os.path.exists(self._temporario):
+            os.remove(self._temporario)
+
+
+def _versao_pdf(arquivo):
+    """Versão do cabeçalho de um PDF ('1.4')"""
+    with open(arquivo, 'rb') as file:
+        return file.readline()[5:8].decode('latin-1')
+
+
+def _juntar(partes, destino):
+    """Junta os PDFs das seções em `destino`, com um marcador por seção, uma seção de cada vez"""
+    if len(partes) == 1:
+        shutil.move(partes[0]['arquivo'], destino)
+        return
+
+    juncao = JuncaoIncremental(destino, max(_versao_pdf(parte['arquivo']) for parte in partes))
+    try:
+        for parte in partes:
+            juncao.acrescentar(parte['arquivo'], parte['titulo'])
+            # O PDF da seção já foi copiado: o disco também só guarda o que falta juntar
+            os.remove(parte['arquivo'])
+        juncao.fechar()
+    except BaseException:
+        juncao.descartar()
+        raise
+
+
+def _gravar(writer, destino):
+    temporario = destino + '.tmp'
+    with open(temporario, 'wb') as file:
+        writer.write(file)
+    writer.close()
+    os.replace(temporario, destino)
+
+
+def construir_em_secoes(destino, secoes, paginas_por_volume=None, pagesize=A4, numerar_paginas=False,
+                        ignorar_erros=False, reprodutivel=False):
+    """
+    Monta o documento a partir de `secoes`, um iterável de (titulo, fabrica),
+    onde `fabrica()` retorna os flowables da seção (de preferência um gerador).
+
+    Com `ignorar_erros`, uma seção que falha é registrada e omitida sem
+    interromper as demais; sem ele, o erro é propagado. Retorna um dicionário
+    com `volumes` (caminhos gerados), `paginas`, `secoes` e `erros`
+    ([{'secao', 'erro'}]).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    resumo = {'volumes': [], 'paginas': 0, 'secoes': 0, 'erros': []}
+    temporario = tempfile.mkdtemp(prefix='secoes_', dir=os.path.dirname(os.path.abspath(destino)))
+    partes, paginas_volume = [], 0
+
+    def fechar_volume():
+        nonlocal partes, paginas_volume
+        if not partes:
+            return
+        arquivo = destino if not paginas_por_volume else _arquivo_volume(destino, len(resumo['volumes']) + 1)
+        with medir('juntar', volume=os.path.basename(arquivo)) as registro:
+            _juntar(partes, arquivo)
+            registro['secoes'] = len(partes)
+        resumo['volumes'].append(arquivo)
+        partes, paginas_volume = [], 0
+
+    try:
+        for i, (titulo, fabrica) in enumerate(secoes):
+            if partes and PdfWriter is None:
+                raise ImportError("pypdf é necessário para juntar seções em um PDF (pip install pypdf)")
+            arquivo = os.path.join(temporario, f'secao_{i:06d}.pdf')
+            try:
+                with medir('secao', secao=titulo) as registro:
+                    paginas = construir_secao(arquivo, fabrica(), pagesize,
+                                              resumo['paginas'] if numerar_paginas else None, reprodutivel)
+                    registro['paginas'] = paginas
+            except Exception as e:
+                if not ignorar_erros:
+                    raise
+                print(f"ERRO na seção '{titulo}': {e}")
+                resumo['erros'].append({'secao': titulo, 'erro': f"{type(e).__name__}: {e}"})
+                continue
+            partes.append({'titulo': titulo, 'arquivo': arquivo})
+            resumo['paginas'] += paginas
+            resumo['secoes'] += 1
+            paginas_volume += paginas
+            if paginas_por_volume and paginas_volume >= paginas_por_volume:
+                fechar_volume()
+        fechar_volume()
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+    return resumo
+
+
+def complementar(base, destino, secoes, titulo_base=None, pagesize=A4, reprodutivel=False):
+    """
+    Grava em `destino` o PDF `base` seguido das `secoes` ((titulo, fabrica),
+    como em construir_em_secoes). As páginas da base são copiadas, não
+    montadas de novo; só as seções novas são montadas. Os marcadores da base
+    são mantidos (sem nenhum, `titulo_base` marca a primeira página) e cada
+    seção nova ganha o seu, apontando para sua primeira página. Retorna um
+    dicionário com `paginas_base`, `paginas` e `secoes`.
+    """
+    if PdfWriter is None:
+        raise ImportError("pypdf é necessário para complementar um PDF (pip install pypdf)")
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    temporario = tempfile.mkdtemp(prefix='secoes_', dir=os.path.dirname(os.path.abspath(destino)))
+    try:
+        writer = PdfWriter(clone_from=base)
+        resumo = {'paginas_base': len(writer.pages), 'paginas': len(writer.pages), 'secoes': 0}
+        if titulo_base and not writer.outline:
+            writer.add_outline_item(titulo_base, 0)
+        for i, (titulo, fabrica) in enumerate(secoes):
+            arquivo = os.path.join(temporario, f'secao_{i:06d}.pdf')
+            with medir('secao', secao=titulo) as registro:
+                registro['paginas'] = construir_secao(arquivo, fabrica(), pagesize, reprodutivel=reprodutivel)
+            writer.append(arquivo)
+            writer.add_outline_item(titulo, resumo['paginas'])
+            resumo['paginas'] += registro['paginas']
+            resumo['secoes'] += 1
+        # O leitor abre com o painel de marcadores, que faz as vezes de sumário
+        writer.page_mode = '/UseOutlines'
+        with medir('juntar', volume=os.path.basename(destino)) as registro:
+            # Fontes embutidas tanto na base quanto nas seções novas ficam uma vez só
+            writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+            _gravar(writer, destino)
+            registro['secoes'] = resumo['secoes']
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+    return resumo
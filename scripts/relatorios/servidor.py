@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP local que gera relatórios e gráficos sob demanda.
+
+`limfs-relatorios servir` atende (só biblioteca padrão, `http.server`):
+
+    GET /                                         índice JSON dos ODS e municípios
+    GET /relatorios/<slug>.pdf                    relatório técnico de um arquivo de
+                                                  indicador (ex.: ods1_pobreza)
+    GET /graficos/<slug>/<grafico>.png            gráfico do relatório (evolucao,
+                                                  comparativo, projecao)
+    GET /graficos/<slug>/<grafico>.svg            o mesmo gráfico em SVG, para a web
+    GET /graficos/<slug>/<grafico>_miniatura.png  miniatura do gráfico
+    GET /municipios/<m>/relatorios/<slug>.pdf     o mesmo, para o município m
+    GET /municipios/<m>/graficos/<slug>/<grafico>.png (e .svg, _miniatura.png)
+
+O slug é o nome do arquivo de indicador sem extensão (um ODS pode ter mais
+de um arquivo, como ods9_industria e ods9_industria_inovacao); o índice
+lista o slug e os caminhos de cada um.
+
+Os relatórios são gerados pelo `ODSReportGenerator`, em um diretório
+temporário, por um pool limitado de processos. A chave de cada artefato é o
+hash dos arquivos de entrada (indicador, `ods-config.json`, `municipio.json`),
+da versão do código e do backend de gráficos: enquanto os dados não mudam, a
+resposta é a mesma, e a chave é também o ETag. Um `If-None-Match` com o ETag
+atual recebe 304 sem consultar o cache.
+
+Os artefatos ficam em um cache LRU em dois níveis (`CacheArtefatos`): na
+memória, até `max_bytes_memoria`, e em disco (`docs/relatorios/cache/servidor`),
+até `max_bytes_disco`. Requisições simultâneas para o mesmo artefato
+compartilham uma única geração. Os três gráficos de um relatório, em PNG,
+SVG e miniatura, saem de um único desenho de cada figura (ver
+imagens.exportar_figura) e são guardados juntos.
+"""
+
+import os
+import re
+import json
+import time
+import signal
+import shutil
+import tempfile
+import importlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import ConfigRelatorios
+from .fontes import carregar_config_ods, descobrir_arquivos_ods
+from .manifesto import hash_arquivo, hash_parametros, versao_codigo
+
+MAX_BYTES_MEMORIA_PADRAO = 64 * 1024 * 1024
+MAX_BYTES_DISCO_PADRAO = 512 * 1024 * 1024
+
+TIPOS_CONTEUDO = {'.pdf': 'application/pdf', '.png': 'image/png', '.svg': 'image/svg+xml'}
+
+# Gráficos do relatório de um ODS (ver gerador.ODSReportGenerator.gerar_graficos)
+GRAFICOS = ('evolucao', 'comparativo', 'projecao')
+
+# Arquivos de cada gráfico, todos do mesmo desenho
+ARQUIVOS_GRAFICO = ('{}.png', '{}.svg', '{}_miniatura.png')
+NOMES_GRAFICOS = {modelo.format(nome) for nome in GRAFICOS for modelo in ARQUIVOS_GRAFICO}
+
+ROTA_ARTEFATO = re.compile(
+    r'^(?:/municipios/(?P<municipio>[\w-]+))?'
+    r'/(?:relatorios/(?P<relatorio>ods\d+\w*)\.pdf|graficos/(?P<ods>ods\d+\w*)/(?P<grafico>\w+\.(?:png|svg)))$'
+)
+
+
+class CacheArtefatos:
+    """
+    Cache LRU de artefatos (bytes) em memória e em disco, por chave e nome.
+
+    A memória guarda os usados mais recentemente até `max_bytes_memoria`; o
+    disco guarda todos até `max_bytes_disco`, removendo os de uso mais
+    antigo (mtime, atualizado a cada acerto).
+    """
+
+    def __init__(self, diretorio, max_bytes_memoria=MAX_BYTES_MEMORIA_PADRAO,
+                 max_bytes_disco=MAX_BYTES_DISCO_PADRAO):
+        self.diretorio = diretorio
+        self.max_bytes_memoria = max_bytes_memoria
+        self.max_bytes_disco = max_bytes_disco
+        self._memoria = OrderedDict()
+        self._bytes_memoria = 0
+        self._trava = threading.Lock()
+        self.acertos = {'memoria': 0, 'disco': 0}
+        self.falhas = 0
+        os.makedirs(diretorio, exist_ok=True)
+        self._bytes_disco = sum(os.path.getsize(c) for c in self._arquivos_disco())
+
+    def _arquivos_disco(self):
+        return [os.path.join(self.diretorio, n) for n in os.listdir(self.diretorio) if '.tmp' not in n]
+
+    def _caminho(self, chave, nome):
+        return os.path.join(self.diretorio, f'{chave}-{nome}')
+
+    def _guardar_memoria(self, identificador, conteudo):
+        anterior = self._memoria.pop(identificador, None)
+        if anterior is not None:
+            self._bytes_memoria -= len(anterior)
+        if len(conteudo) > self.max_bytes_memoria:
+            return
+        self._memoria[identificador] = conteudo
+        self._bytes_memoria += len(conteudo)
+        while self._bytes_memoria > self.max_bytes_memoria:
+            _, removido = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(removido)
+
+    def obter(self, chave, nome):
+        """Retorna (conteúdo, origem) com origem 'memoria' ou 'disco', ou (None, None)"""
+        identificador = (chave, nome)
+        with self._trava:
+            conteudo = self._memoria.get(identificador)
+            if conteudo is not None:
+                self._memoria.move_to_end(identificador)
+                self.acertos['memoria'] += 1
+                return conteudo, 'memoria'
+
+        caminho = self._caminho(chave, nome)
+        try:
+            with open(caminho, 'rb') as file:
+                conteudo = file.read()
+            os.utime(caminho)  # uso recente, para a remoção por LRU
+        except FileNotFoundError:
+            with self._trava:
+                self.falhas += 1
+            return None, None
+        with self._trava:
+            self._guardar_memoria(identificador, conteudo)
+            self.acertos['disco'] += 1
+        return conteudo, 'disco'
+
+    def guardar(self, chave, artefatos):
+        """Guarda os artefatos {nome: bytes} de uma chave na memória e no disco"""
+        for nome, conteudo in artefatos.items():
+            caminho = self._caminho(chave, nome)
+            temporario = f'{caminho}.{threading.get_ident()}.tmp'
+            with open(temporario, 'wb') as file:
+                file.write(conteudo)
+            try:
+                anterior = os.path.getsize(caminho)  # o arquivo substituído deixa de contar
+            except FileNotFoundError:
+                anterior = 0
+            os.replace(temporario, caminho)
+            with self._trava:
+                self._guardar_memoria((chave, nome), conteudo)
+                self._bytes_disco += len(conteudo) - anterior
+        if self._bytes_disco > self.max_bytes_disco:
+            self.limpar()
+
+    def limpar(self):
+        """Remove do disco os artefatos de uso mais antigo até respeitar `max_bytes_disco`"""
+        entradas = []
+        for caminho in self._arquivos_disco():
+            try:
+                info = os.stat(caminho)
+            except FileNotFoundError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, caminho))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.max_bytes_disco:
+                break
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+        with self._trava:
+            self._bytes_disco = total
+
+    def resumo(self):
+        return {'acertos_memoria': self.acertos['memoria'], 'acertos_disco': self.acertos['disco'],
+                'falhas': self.falhas, 'bytes_memoria': self._bytes_memoria, 'bytes_disco': self._bytes_disco}
+
+
+def renderizar_artefatos(arquivo, tipo, local, config_ods, backend_graficos):
+    """
+    Gera o relatório (`tipo` 'relatorio') ou os gráficos ('graficos') de um
+    arquivo de indicador em um diretório temporário e retorna {nome: bytes}
+    (roda no processo trabalhador).
+    """
+    from .gerador import ODSReportGenerator
+
+    temporario = tempfile.mkdtemp(prefix='servidor_')
+    try:
+        gerador = ODSReportGenerator(arquivo, config_ods, report_dir=temporario,
+                                     charts_dir=os.path.join(temporario, 'charts'), workers_graficos=0,
+                                     backend_graficos='matplotlib' if tipo == 'graficos' else backend_graficos,
+                                     local=local, exportar=('web', 'miniatura'))
+        if tipo == 'relatorio':
+            with open(gerador.executar(), 'rb') as file:
+                return {'relatorio.pdf': file.read()}
+
+        gerador.carregar_dados()
+        gerador.analisar_dados()
+        gerador.gerar_graficos()
+        gerador.aguardar_graficos()
+        # Gráfico omitido (ex.: sem meta 2030) fica vazio no cache, para não ser gerado de novo
+        artefatos = dict.fromkeys(NOMES_GRAFICOS, b'')
+        for nome, caminho in gerador.graficos.items():
+            caminhos = {f'{nome}.png': caminho, f'{nome}.svg': gerador.exportacoes[nome]['web'],
+                        f'{nome}_miniatura.png': gerador.exportacoes[nome]['miniatura']}
+            for artefato, caminho in caminhos.items():
+                with open(caminho, 'rb') as file:
+                    artefatos[artefato] = file.read()
+        return artefatos
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+
+class ArtefatoNaoEncontrado(LookupError):
+    """ODS, município ou gráfico inexistente"""
+
+
+class ServicoRelatorios:
+    """
+    Localiza, gera e guarda os artefatos servidos, independente do HTTP.
+
+    `obter(municipio, slug, tipo, nome)` retorna (conteúdo, etag, origem);
+    gerações simultâneas da mesma chave são compartilhadas (um único futuro
+    por chave em andamento).
+    """
+
+    def __init__(self, config=None, backend_graficos='vetorial', max_workers=None, cache=None):
+        self.config = config or ConfigRelatorios()
+        self.backend_graficos = backend_graficos
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache or CacheArtefatos(os.path.join(self.config.report_dir, 'cache', 'servidor'))
+        self.geracoes = 0
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._em_andamento = {}
+        self._trava = threading.Lock()
+
+    def fechar(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def aquecer(self):
+        """
+        Importa os geradores (herdados pelos trabalhadores no fork) e cria os
+        trabalhadores antes da primeira requisição
+        """
+        importlib.import_module('.gerador', __package__)
+        import matplotlib
+        matplotlib.use('Agg')
+        importlib.import_module('matplotlib.pyplot')
+        versao_codigo()
+        for futuro in [self._executor.submit(time.sleep, 0) for _ in range(self.max_workers)]:
+            futuro.result()
+
+    def localizar(self, municipio, slug):
+        """Arquivo de indicador (pelo nome sem extensão) e nome do território, estadual ou municipal"""
+        if municipio:
+            from .municipios import _nome_municipio
+            diretorio = os.path.join(self.config.municipios_dir, municipio)
+            local = _nome_municipio(diretorio) if os.path.isdir(diretorio) else None
+        else:
+            diretorio, local = self.config.indicadores_dir, 'Sergipe'
+        if local is not None:
+            for arquivo in descobrir_arquivos_ods(diretorio):
+                if os.path.splitext(os.path.basename(arquivo))[0] == slug:
+                    return arquivo, local
+        raise ArtefatoNaoEncontrado(f"{municipio + '/' if municipio else ''}{slug}")
+
+    def chave(self, arquivo, tipo):
+        """Hash das entradas, da versão do código e do backend: muda quando o artefato mudaria"""
+        entradas = [arquivo, self.config.ods_config_file,
+                    os.path.join(os.path.dirname(arquivo), 'municipio.json')]
+        return hash_parametros({
+            'tipo': tipo,
+            'arquivo': os.path.relpath(arquivo, self.config.dados_dir),
+            'entradas': [hash_arquivo(e) for e in entradas],
+            'versao': versao_codigo(),
+            'graficos': self.backend_graficos if tipo == 'relatorio' else 'matplotlib',
+        })[:32]
+
+    def _gerar(self, chave, arquivo, tipo, local):
+        """
+        Gera e guarda os artefatos da chave. Requisições simultâneas aguardam a
+        mesma geração e só recebem a resposta depois que ela está no cache.
+        """
+        with self._trava:
+            publicado = self._em_andamento.get(chave)
+            if publicado is not None:
+                novo = False
+            else:
+                novo, executor = True, self._executor
+                publicado = self._em_andamento[chave] = Future()
+        if not novo:
+            return publicado.result()
+
+        try:
+            artefatos = executor.submit(renderizar_artefatos, arquivo, tipo, local,
+                                        carregar_config_ods(self.config.ods_config_file),
+                                        self.backend_graficos).result()
+            self.cache.guardar(chave, artefatos)
+        except BaseException as erro:
+            with self._trava:
+                # Um trabalhador foi encerrado: as próximas gerações usam um pool novo
+                if isinstance(erro, BrokenProcessPool) and self._executor is executor:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                self._em_andamento.pop(chave, None)
+            publicado.set_exception(erro)
+            raise
+        with self._trava:
+            self.geracoes += 1
+            self._em_andamento.pop(chave, None)
+        publicado.set_result(artefatos)
+        return artefatos
+
+    def etag(self, municipio, slug, tipo, nome):
+        arquivo, _ = self.localizar(municipio, slug)
+        return f'"{self.chave(arquivo, tipo)}-{nome}"'
+
+    def obter(self, municipio, slug, tipo, nome):
+        """
+        Conteúdo de um artefato (`nome` 'relatorio.pdf' ou um de NOMES_GRAFICOS):
+        retorna (bytes, etag, origem), com origem 'memoria', 'disco' ou 'gerado'.
+        """
+        arquivo, local = self.localizar(municipio, slug)
+        chave = self.chave(arquivo, tipo)
+        etag = f'"{chave}-{nome}"'
+        conteudo, origem = self.cache.obter(chave, nome)
+        if conteudo is None:
+            conteudo, origem = self._gerar(chave, arquivo, tipo, local).get(nome), 'gerado'
+        if not conteudo:
+            raise ArtefatoNaoEncontrado(f"{slug}/{nome}")
+        return conteudo, etag, origem
+
+    def indice(self):
+        """ODS e municípios disponíveis, com os caminhos dos artefatos"""
+        def itens(diretorio, prefixo):
+            for arquivo in descobrir_arquivos_ods(diretorio):
+                slug = os.path.splitext(os.path.basename(arquivo))[0]
+                yield {'codigo': slug.split('_')[0], 'slug': slug,
+                       'relatorio': f'{prefixo}/relatorios/{slug}.pdf',
+                       'graficos': [f'{prefixo}/graficos/{slug}/{modelo.format(nome)}'
+                                    for nome in GRAFICOS for modelo in ARQUIVOS_GRAFICO]}
+
+        municipios = {}
+        if os.path.isdir(self.config.municipios_dir):
+            for slug in sorted(os.listdir(self.config.municipios_dir)):
+                diretorio = os.path.join(self.config.municipios_dir, slug)
+                if os.path.isdir(diretorio):
+                    municipios[slug] = list(itens(diretorio, f'/municipios/{slug}'))
+        return {'ods': list(itens(self.config.indicadores_dir, '')), 'municipios': municipios,
+                'cache': self.cache.resumo(), 'geracoes': self.geracoes}
+
+
+def _etag_corresponde(cabecalho, etag):
+    """True se o If-None-Match contém o ETag (comparação fraca, como manda a RFC 9110)"""
+    if not cabecalho:
+        return False
+    valores = [v.strip() for v in cabecalho.split(',')]
+    return '*' in valores or etag in [v[2:] if v.startswith('W/') else v for v in valores]
+
+
+class ManipuladorRelatorios(BaseHTTPRequestHandler):
+    """Rotas do servidor; o serviço está em `self.server.servico`"""
+
+    server_version = 'limfs-relatorios'
+
+    def log_message(self, formato, *args):
+        if not self.server.silencioso:
+            super().log_message(formato, *args)
+
+    def do_GET(self):
+        self._responder(corpo=True)
+
+    def do_HEAD(self):
+        self._responder(corpo=False)
+
+    def _enviar(self, status, conteudo=b'', tipo='text/plain; charset=utf-8', cabecalhos=None, corpo=True):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(conteudo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if corpo and conteudo:
+            self.wfile.write(conteudo)
+
+    def _responder(self, corpo):
+        servico = self.server.servico
+        caminho = self.path.split('?', 1)[0]
+        if caminho in ('/', '/index.json'):
+            conteudo = json.dumps(servico.indice(), ensure_ascii=False, indent=2).encode('utf-8')
+            self._enviar(HTTPStatus.OK, conteudo, 'application/json; charset=utf-8', corpo=corpo)
+            return
+
+        rota = ROTA_ARTEFATO.match(caminho)
+        if rota is None:
+            self._enviar(HTTPStatus.NOT_FOUND, b'rota desconhecida\n', corpo=corpo)
+            return
+        municipio = rota.group('municipio')
+        if rota.group('relatorio'):
+            slug, tipo, nome = rota.group('relatorio'), 'relatorio', 'relatorio.pdf'
+        elif rota.group('grafico') in NOMES_GRAFICOS:
+            slug, tipo, nome = rota.group('ods'), 'graficos', rota.group('grafico')
+        else:
+            self._enviar(HTTPStatus.NOT_FOUND, f"gráfico desconhecido (use {', '.join(GRAFICOS)})\n"
+                         .encode('utf-8'), corpo=corpo)
+            return
+
+        try:
+            # Dados inalterados: 304 sem tocar no cache nem gerar nada
+            etag = servico.etag(municipio, slug, tipo, nome)
+            if _etag_corresponde(self.headers.get('If-None-Match'), etag):
+                self._enviar(HTTPStatus.NOT_MODIFIED, cabecalhos={'ETag': etag}, corpo=False)
+                return
+            inicio = time.perf_counter()
+            conteudo, etag, origem = servico.obter(municipio, slug, tipo, nome)
+        except ArtefatoNaoEncontrado as e:
+            self._enviar(HTTPStatus.NOT_FOUND, f"não encontrado: {e}\n".encode('utf-8'), corpo=corpo)
+            return
+        except Exception as e:
+            self._enviar(HTTPStatus.INTERNAL_SERVER_ERROR,
+                         f"erro ao gerar {caminho}: {type(e).__name__}: {e}\n".encode('utf-8'), corpo=corpo)
+            return
+
+        self._enviar(HTTPStatus.OK, conteudo, TIPOS_CONTEUDO[os.path.splitext(nome)[1]], {
+            'ETag': etag,
+            'Cache-Control': 'no-cache',  # o navegador guarda, mas revalida com If-None-Match
+            'X-Cache': origem,
+            'Server-Timing': f'gerar;dur={(time.perf_counter() - inicio) * 1000:.1f}',
+        }, corpo=corpo)
+
+
+class ServidorRelatorios(ThreadingHTTPServer):
+    """`ThreadingHTTPServer` com um `ServicoRelatorios` compartilhado pelas requisições"""
+
+    daemon_threads = True
+
+    def __init__(self, endereco, servico, silencioso=False):
+        self.servico = servico
+        self.silencioso = silencioso
+        super().__init__(endereco, ManipuladorRelatorios)
+
+
+def _interromper(sinal, quadro):
+    raise KeyboardInterrupt
+
+
+def servir(config=None, host='127.0.0.1', porta=8765, backend_graficos='vetorial', max_workers=None,
+           max_bytes_memoria=MAX_BYTES_MEMORIA_PADRAO, max_bytes_disco=MAX_BYTES_DISCO_PADRAO, silencioso=False):
+    """Atende requisições até ser interrompido (Ctrl+C)"""
+    config = config or ConfigRelatorios()
+    cache = CacheArtefatos(os.path.join(config.report_dir, 'cache', 'servidor'), max_bytes_memoria,
+                           max_bytes_disco)
+    servico = ServicoRelatorios(config, backend_graficos, max_workers, cache)
+    servico.aquecer()
+    servidor = ServidorRelatorios((host, porta), servico, silencioso)
+    # SIGTERM encerra como o Ctrl+C, sem deixar os trabalhadores do pool órfãos
+    signal.signal(signal.SIGTERM, _interromper)
+    print(f"Servindo relatórios de {config.dados_dir} em http://{host}:{servidor.server_address[1]}/ "
+          f"({servico.max_workers} processos); Ctrl+C para encerrar")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServidor encerrado")
+    finally:
+        servidor.server_close()
+        servico.fechar()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Validação e listagem dos arquivos de indicadores dos ODS.
+
+Usa apenas a ingestão dos JSON (ingestao.py e fontes.py), sem pandas,
+matplotlib ou reportlab, para que `limfs-relatorios validar` e `listar`
+iniciem rápido. Os arquivos são lidos juntos, em um pool de threads, e um
+arquivo ilegível vira um problema em vez de interromper a verificação.
+"""
+
+import os
+
+from .config import ConfigRelatorios
+from .fontes import carregar_config_ods, descobrir_arquivos_ods, ler_json
+from .ingestao import ingerir
+
+
+def _problema(arquivo, nivel, mensagem):
+    return {'arquivo': arquivo, 'nivel': nivel, 'mensagem': mensagem}
+
+
+def validar_dados(config=None):
+    """
+    Verifica se cada arquivo `ods*_*.json` pode gerar um relatório.
+
+    Retorna uma lista de problemas {'arquivo', 'nivel', 'mensagem'}, com nível
+    'erro' (o relatório falharia) ou 'aviso' (o relatório sai incompleto).
+    """
+    config = config or ConfigRelatorios()
+    problemas = []
+    try:
+        ler_json(config.ods_config_file)
+    except (OSError, ValueError) as e:
+        problemas.append(_problema(config.ods_config_file, 'erro', f"configuração dos ODS ilegível: {e}"))
+    config_ods = carregar_config_ods(config.ods_config_file)
+
+    ingestao = ingerir(config.dados_dir, descobrir_arquivos_ods(config.indicadores_dir))
+    for lido in ingestao.arquivos:
+        arquivo, info = lido.arquivo, lido.indicador
+        if lido.erro is not None:
+            problemas.append(_problema(arquivo, 'erro', f"arquivo ilegível: {lido.erro.mensagem}"))
+            continue
+
+        anos = info.anos
+        if len(anos) < 2:
+            problemas.append(_problema(arquivo, 'erro', f"série histórica insuficiente ({len(anos)} pontos)"))
+        if len(set(anos)) != len(anos):
+            problemas.append(_problema(arquivo, 'aviso', "anos repetidos na série histórica"))
+        if info.meta_2030 is None:
+            problemas.append(_problema(arquivo, 'aviso', "sem meta 2030 (gráficos de meta omitidos)"))
+        if info.codigo not in config_ods:
+            problemas.append(_problema(arquivo, 'aviso', f"{info.codigo} ausente de ods-config.json"))
+    return problemas
+
+
+def listar_ods(config=None):
+    """Resumo de cada ODS disponível: código, título, série histórica, meta e relatório gerado"""
+    config = config or ConfigRelatorios()
+    config_ods = carregar_config_ods(config.ods_config_file)
+    ods = []
+    for lido in ingerir(config.dados_dir, descobrir_arquivos_ods(config.indicadores_dir)).arquivos:
+        if lido.erro is not None:
+            print(f"AVISO: {os.path.basename(lido.arquivo)} ignorado ({lido.erro.mensagem})")
+            continue
+        info = lido.indicador
+        relatorio = os.path.join(config.report_dir, f"relatorio_tecnico_{info.slug}.pdf")
+        ods.append({
+            'codigo': info.codigo,
+            'slug': info.slug,
+            'titulo': info.titulo_exibido(config_ods),
+            'pontos': len(info.anos),
+            'ultimo_ano': info.anos[-1] if info.anos else None,
+            'meta_2030': info.meta_2030,
+            'relatorio': relatorio if os.path.exists(relatorio) else None,
+        })
+    return ods
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Torna o pacote `relatorios` (em scripts/) importável pelos testes"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+import pytest
+
+HISTORICOS = {
+    'ods1_pobreza': [(2019, 9.5), (2020, 10.3), (2021, 9.2), (2022, 8.8), (2023, 8.4), (2024, 8.1)],
+    'ods4_educacao': [(2020, 91.0), (2022, 92.5), (2024, 94.0)],
+}
+
+
+def escrever_indicador(dados_dir, nome, historico, descricao='Indicador de teste'):
+    """Grava `indicadores/<nome>.json` no formato dos arquivos dos ODS"""
+    pasta = os.path.join(dados_dir, 'indicadores')
+    os.makedirs(pasta, exist_ok=True)
+    conteudo = {
+        'meta': {'titulo': nome, 'descricao': descricao, 'ultima_atualizacao': '2025-01-01'},
+        'dados': {'valor': historico[-1][1], 'unidade': '%', 'descricao': descricao},
+        'historico': [{'ano': ano, 'valor': valor} for ano, valor in historico],
+    }
+    with open(os.path.join(pasta, f'{nome}.json'), 'w', encoding='utf-8') as file:
+        json.dump(conteudo, file)
+
+
+@pytest.fixture
+def dados_dir(tmp_path):
+    """Pasta dados/ mínima: `ods-config.json` e dois indicadores de ODS"""
+    dados = tmp_path / 'dados'
+    for nome, historico in HISTORICOS.items():
+        escrever_indicador(str(dados), nome, historico)
+    objetivos = [{'codigo': nome.split('_')[0], 'titulo': nome, 'descricao': nome, 'cor_primaria': '#e5243b'}
+                 for nome in HISTORICOS]
+    with open(dados / 'ods-config.json', 'w', encoding='utf-8') as file:
+        json.dump({'meta': {'versao': 'teste'}, 'objetivos_desenvolvimento_sustentavel': objetivos}, file)
+    return str(dados)
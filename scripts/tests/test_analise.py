@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.analise"""
+
+import numpy as np
+
+from relatorios.analise import analisar_series, analise_da_serie, matriz_series
+
+ANOS = np.arange(2018, 2025)
+
+
+def test_serie_vazia_com_meta():
+    historico = [{'ano': int(ano), 'valor': 1.0 + i} for i, ano in enumerate(ANOS)]
+    anos, matriz = matriz_series([historico, []])
+    analise = analise_da_serie(analisar_series(anos, matriz, [5.0, 5.0]), 1)
+    assert analise['meta'] == 5.0
+    assert analise['projecao'] == []
+
+
+def test_serie_so_com_nan_com_meta():
+    matriz = np.vstack([np.linspace(1.0, 5.0, len(ANOS)), np.full(len(ANOS), np.nan)])
+    analise = analise_da_serie(analisar_series(ANOS, matriz, [5.0, 5.0]), 1)
+    assert analise['meta'] == 5.0
+    assert analise['projecao'] == []
+
+
+def test_projecao_comeca_no_valor_atual():
+    matriz = np.linspace(1.0, 4.333, len(ANOS))[np.newaxis]
+    analise = analise_da_serie(analisar_series(ANOS, matriz, [10.0]), 0)
+    assert analise['projecao'][0] == (2024, analise['valor_atual'])
+    assert analise['projecao'][-1][0] == 2030
+
+
+def test_matriz_sem_anos():
+    anos, matriz = matriz_series([[], []])
+    resultado = analisar_series(anos, matriz, [5.0, np.nan])
+    assert matriz.shape == (2, 0)
+    assert np.isnan(resultado['valor_atual']).all()
+    assert resultado['meta'][0] == 5.0
+    assert resultado['projecao'].shape == (2, 0)
+    assert resultado['previsao']['previsao'].shape == (2, 0)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.anexos"""
+
+import re
+
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import SimpleDocTemplate
+
+from relatorios.anexos import FONTE, abreviar, larguras_colunas, tabela_anexo
+
+CABECALHO = ('Município', 'Indicador', 'Valor')
+
+
+def _linhas(quantidade, lidas):
+    for i in range(quantidade):
+        lidas.append(i)
+        yield (f'm{i:04d}', 'Taxa de extrema pobreza', f'{i / 10:.1f}')
+
+
+def test_paginas_com_cabecalho_e_todas_as_linhas_uma_vez(tmp_path):
+    destino = str(tmp_path / 'anexo.pdf')
+    lidas = []
+    SimpleDocTemplate(destino, pagesize=A4).build([tabela_anexo(CABECALHO, _linhas(1500, lidas))])
+
+    paginas = [pagina.extract_text() for pagina in PdfReader(destino).pages]
+    assert len(paginas) > 1
+    assert all(texto.startswith('Município') for texto in paginas)
+    municipios = [m for texto in paginas for m in re.findall(r'm\d{4}', texto)]
+    assert municipios == [f'm{i:04d}' for i in range(1500)]
+    assert lidas == list(range(1500))
+
+
+def test_linhas_lidas_sob_demanda(tmp_path):
+    lidas = []
+    tabela = tabela_anexo(CABECALHO, _linhas(5000, lidas), larguras=[100, 200, 50])
+    tabela.wrap(350, 200)
+    assert len(lidas) < 20
+    primeira, continuacao = tabela.split(350, 200)
+    assert len(primeira._cellvalues) - 1 == tabela._cabem(200)
+    continuacao.wrap(350, 200)
+    assert len(lidas) < 40
+
+
+def test_larguras_ocupam_a_largura_util_e_textos_longos_sao_abreviados():
+    larguras = larguras_colunas(CABECALHO, [('Aracaju', 'x' * 80, '1.0')], largura_total=300)
+    assert abs(sum(larguras) - 300) < 1e-6
+    assert larguras[1] > larguras[0] > larguras[2]
+    abreviado = abreviar('Nossa Senhora do Socorro', 40)
+    assert abreviado.endswith('…') and stringWidth(abreviado, FONTE, 7) <= 40
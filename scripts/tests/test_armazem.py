@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.armazem"""
+
+import os
+
+import numpy as np
+
+from relatorios.armazem import ArmazemIndicadores, carregar_armazem, _armazens
+from relatorios.banco_series import BancoSeries
+
+
+def _banco(tmp_path, dados_dir):
+    banco = BancoSeries(str(tmp_path / 'series.sqlite'))
+    banco.sincronizar(dados_dir)
+    return banco
+
+
+def test_construir_reproduz_a_base(tmp_path, dados_dir):
+    banco = _banco(tmp_path, dados_dir)
+    armazem = ArmazemIndicadores.construir(banco)
+    chave = armazem.principal('ods4')
+    assert chave == banco.principal('ods4')
+    assert armazem.historico(chave) == banco.historico(chave)
+    anos, matriz, _ = armazem.matriz([banco.principal('ods1'), chave])
+    assert np.isnan(matriz[1, list(anos).index(2021)])
+    assert matriz[0, list(anos).index(2021)] == 9.2
+
+
+def test_carregar_reaproveita_o_arquivo_enquanto_a_base_nao_muda(tmp_path, dados_dir):
+    banco = _banco(tmp_path, dados_dir)
+    cache = str(tmp_path / 'armazem.npz')
+    _armazens.clear()
+    primeiro = carregar_armazem(banco, cache)
+    gravado = os.path.getmtime(cache)
+
+    _armazens.clear()
+    segundo = carregar_armazem(banco, cache)
+    assert os.path.getmtime(cache) == gravado
+    assert segundo.assinatura == primeiro.assinatura
+
+    chave = banco.principal('ods1')
+    banco.carregar([{'chave': chave, 'ano': 2025, 'valor': 7.9}], 'csv/safra_2025')
+    terceiro = carregar_armazem(banco, cache)
+    assert terceiro.assinatura != primeiro.assinatura
+    assert terceiro.historico(chave)[-1] == {'ano': 2025, 'valor': 7.9}
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.banco_series"""
+
+import os
+
+import numpy as np
+
+from conftest import escrever_indicador
+from relatorios.banco_series import BancoSeries, ler_csv
+
+POBREZA = 'indicadores/ods1_pobreza'
+
+
+def test_sincronizar_importa_so_arquivos_alterados(tmp_path, dados_dir):
+    banco = BancoSeries(str(tmp_path / 'series.sqlite'))
+    assert banco.sincronizar(dados_dir) == 2
+    assert banco.sincronizar(dados_dir) == 0
+    assert banco.principal('ods1') == POBREZA
+    assert banco.ultimo(POBREZA) == (2024, 8.1)
+
+    escrever_indicador(dados_dir, 'ods1_pobreza', [(2023, 8.4), (2024, 7.9)])
+    assert banco.sincronizar(dados_dir) == 1
+    assert banco.historico(POBREZA) == [{'ano': 2023, 'valor': 8.4}, {'ano': 2024, 'valor': 7.9}]
+
+    os.remove(os.path.join(dados_dir, 'indicadores', 'ods4_educacao.json'))
+    banco.sincronizar(dados_dir)
+    assert banco.principal('ods4') is None
+
+
+def test_carregar_faz_upsert_e_sobrevive_a_reimportacao(tmp_path, dados_dir):
+    banco = BancoSeries(str(tmp_path / 'series.sqlite'))
+    banco.sincronizar(dados_dir)
+    gravados = banco.carregar([
+        {'chave': POBREZA, 'ano': 2024, 'valor': 8.0},
+        {'chave': POBREZA, 'ano': 2025, 'valor': 7.6},
+        {'chave': 'ibge/renda', 'ano': 2025, 'valor': 1.5, 'ods': 'ods1', 'territorio': 'aracaju'},
+    ], 'csv/safra_2025')
+    assert gravados == 3
+    assert banco.historico(POBREZA, ano_inicio=2024) == [{'ano': 2024, 'valor': 8.0}, {'ano': 2025, 'valor': 7.6}]
+    assert banco.series(territorio='aracaju')[0]['ods'] == 'ods1'
+
+    # A reimportação do JSON restaura os anos do arquivo e mantém os anos só da safra
+    escrever_indicador(dados_dir, 'ods1_pobreza', [(2023, 8.4), (2024, 8.1)])
+    banco.sincronizar(dados_dir)
+    assert banco.historico(POBREZA, ano_inicio=2024) == [{'ano': 2024, 'valor': 8.1}, {'ano': 2025, 'valor': 7.6}]
+    assert banco.ultimo('ibge/renda') == (2025, 1.5)
+
+
+def test_matriz_com_chave_inexistente(tmp_path, dados_dir):
+    banco = BancoSeries(str(tmp_path / 'series.sqlite'))
+    banco.sincronizar(dados_dir)
+    anos, matriz, metas = banco.matriz([POBREZA, 'nao/existe'])
+    assert anos.tolist() == list(range(2019, 2025))
+    assert matriz[0].tolist() == [9.5, 10.3, 9.2, 8.8, 8.4, 8.1]
+    assert np.isnan(matriz[1]).all() and np.isnan(metas).all()
+
+
+def test_ler_csv_com_ponto_e_virgula_e_percentual(tmp_path):
+    caminho = tmp_path / 'safra.csv'
+    caminho.write_text('chave;ano;valor\nibge/renda;2024;"78,3%"\nibge/renda;;1\nibge/renda;2025;79\n',
+                       encoding='utf-8')
+    pontos = ler_csv(str(caminho))
+    assert [(p['ano'], p['valor']) for p in pontos] == [(2024, 78.3), (2025, 79.0)]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.cache_graficos"""
+
+import os
+import time
+
+from relatorios.cache_graficos import CacheGraficos
+
+
+def _desenhista(desenhos, conteudo=b'png'):
+    def desenhar(caminho):
+        desenhos.append(caminho)
+        with open(caminho, 'wb') as file:
+            file.write(conteudo)
+    return desenhar
+
+
+def test_reaproveita_o_grafico_com_os_mesmos_parametros(tmp_path):
+    cache = CacheGraficos(str(tmp_path / 'cache'))
+    desenhos = []
+    parametros = {'x': [2020, 2021], 'y': [1.0, 2.0], 'dpi': 300}
+    for nome in ('a.png', 'b.png'):
+        destino = cache.obter(str(tmp_path / nome), parametros, _desenhista(desenhos))
+        assert open(destino, 'rb').read() == b'png'
+    assert len(desenhos) == 1
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+    cache.obter(str(tmp_path / 'c.png'), {**parametros, 'dpi': 150}, _desenhista(desenhos))
+    assert len(desenhos) == 2
+
+
+def test_exportacoes_de_um_desenho_e_buffer(tmp_path):
+    cache = CacheGraficos(str(tmp_path / 'cache'))
+    chamadas = []
+
+    def exportar(caminhos):
+        chamadas.append(sorted(caminhos))
+        for formato, caminho in caminhos.items():
+            with open(caminho, 'wb') as file:
+                file.write(formato.encode())
+        return caminhos
+
+    saidas = {'impressao': str(tmp_path / 'g.png'), 'web': None}
+    resultado = cache.obter_exportacoes(saidas, {'y': [1]}, exportar)
+    assert resultado == {'impressao': saidas['impressao'], 'web': b'web'}
+    assert cache.obter_exportacoes({'buffer': None}, {'y': [1]}, exportar) == {'buffer': b'impressao'}
+    assert chamadas == [['impressao', 'web']]
+
+
+def test_limpar_remove_os_menos_usados_e_os_expirados(tmp_path):
+    cache = CacheGraficos(str(tmp_path), max_bytes=8, max_idade_dias=30)
+    agora = time.time()
+    for nome, idade in (('antigo.png', 2 * 86400), ('recente.png', 0), ('expirado.png', 31 * 86400),
+                        ('medio.png', 86400)):
+        caminho = tmp_path / nome
+        caminho.write_bytes(b'1234')
+        os.utime(caminho, (agora - idade, agora - idade))
+    assert cache.limpar() == 2
+    assert sorted(os.listdir(tmp_path)) == ['medio.png', 'recente.png']
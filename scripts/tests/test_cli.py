@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.cli"""
+
+import pytest
+
+from relatorios.cli import main
+
+
+@pytest.mark.parametrize('opcoes', [['--ods', 'ods1'], ['--workers', '2'], ['--exportar', 'web']])
+def test_gerar_ods12_rejeita_opcoes_do_lote(opcoes, capsys):
+    with pytest.raises(SystemExit) as saida:
+        main(['gerar', '--ods12', *opcoes])
+    assert saida.value.code == 2
+    assert opcoes[0] in capsys.readouterr().err
+
+
+def test_gerar_pula_relatorios_atualizados(tmp_path, dados_dir, capsys):
+    argumentos = ['--base-dir', str(tmp_path), 'gerar', '--workers', '1']
+    assert main(argumentos) == 0
+    assert '2 relatórios gerados, 0 já atualizados' in capsys.readouterr().out
+    assert main(argumentos) == 0
+    assert '0 relatórios gerados, 2 já atualizados' in capsys.readouterr().out
+    assert main([*argumentos, '--forcar']) == 0
+    assert '2 relatórios gerados' in capsys.readouterr().out
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.manifesto e da geração incremental do lote"""
+
+import os
+
+from conftest import escrever_indicador
+from relatorios.api import gerar_relatorios
+from relatorios.config import ConfigRelatorios
+from relatorios.manifesto import ManifestoBuild
+
+
+def _arquivos(tmp_path):
+    entrada, saida = tmp_path / 'entrada.json', tmp_path / 'saida.pdf'
+    entrada.write_text('{"valor": 1}')
+    saida.write_bytes(b'%PDF')
+    return str(entrada), str(saida)
+
+
+def test_atualizado_enquanto_entradas_e_parametros_nao_mudam(tmp_path):
+    entrada, saida = _arquivos(tmp_path)
+    manifesto = ManifestoBuild(str(tmp_path / 'manifesto.json'), versao='v1')
+    assert not manifesto.atualizado('relatorio:a', [entrada], {'graficos': 'vetorial'})
+    manifesto.registrar('relatorio:a', [entrada], [saida], {'graficos': 'vetorial'})
+    manifesto.salvar()
+
+    manifesto = ManifestoBuild(str(tmp_path / 'manifesto.json'), versao='v1')
+    assert manifesto.atualizado('relatorio:a', [entrada], {'graficos': 'vetorial'})
+    assert manifesto.saidas('relatorio:a') == [saida]
+    assert manifesto.dependentes(entrada) == ['relatorio:a']
+    assert not manifesto.atualizado('relatorio:a', [entrada], {'graficos': 'matplotlib'})
+    assert not ManifestoBuild(manifesto.caminho, versao='v2').atualizado('relatorio:a', [entrada],
+                                                                          {'graficos': 'vetorial'})
+    assert not ManifestoBuild(manifesto.caminho, versao='v1', forcar=True).atualizado(
+        'relatorio:a', [entrada], {'graficos': 'vetorial'})
+
+
+def test_entrada_alterada_ou_saida_apagada_refazem(tmp_path):
+    entrada, saida = _arquivos(tmp_path)
+    manifesto = ManifestoBuild(str(tmp_path / 'manifesto.json'))
+    manifesto.registrar('relatorio:a', [entrada], [saida])
+    with open(entrada, 'w') as file:
+        file.write('{"valor": 2}')
+    assert not manifesto.atualizado('relatorio:a', [entrada])
+
+    manifesto.registrar('relatorio:a', [entrada], [saida])
+    os.remove(saida)
+    assert not manifesto.atualizado('relatorio:a', [entrada])
+
+
+def test_lote_refaz_so_os_arquivos_alterados(tmp_path, dados_dir):
+    # Dois arquivos do mesmo ODS: cada um tem a sua chave no manifesto
+    escrever_indicador(dados_dir, 'ods1_pobreza_extrema', [(2020, 4.0), (2022, 3.5), (2024, 3.1)])
+    config = ConfigRelatorios(str(tmp_path))
+    resultados, erros = gerar_relatorios(config, max_workers=1)
+    assert not erros
+    assert not any(r.get('atualizado') for r in resultados)
+
+    resultados, _ = gerar_relatorios(config, max_workers=1)
+    assert all(r.get('atualizado') for r in resultados)
+
+    escrever_indicador(dados_dir, 'ods1_pobreza_extrema', [(2020, 4.0), (2022, 3.5), (2024, 2.9)])
+    resultados, _ = gerar_relatorios(config, max_workers=1)
+    refeitos = [os.path.basename(r['arquivo']) for r in resultados if not r.get('atualizado')]
+    assert refeitos == ['ods1_pobreza_extrema.json']
+    assert len(resultados) == 3
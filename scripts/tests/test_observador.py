@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.observador"""
+
+import os
+
+from relatorios.config import ConfigRelatorios
+from relatorios.manifesto import ManifestoBuild
+from relatorios.observador import alvos_afetados, descrever_alvos
+
+
+def _caminhos(config, *relativos):
+    return [os.path.join(config.dados_dir, *relativo.split('/')) for relativo in relativos]
+
+
+def test_arquivos_de_indicadores_e_municipios(tmp_path):
+    config = ConfigRelatorios(str(tmp_path))
+    alvos = alvos_afetados(_caminhos(config,
+                                     'indicadores/ods3_saude.json',
+                                     'municipios/aracaju/ods5_genero.json',
+                                     'municipios/lagarto/ods1_pobreza.json',
+                                     'municipios/lagarto/municipio.json',
+                                     'municipios/lagarto/ods2_fome.json',
+                                     'indicadores/.ods3_saude.json.swp'), config)
+    assert not alvos['todos'] and not alvos['ods12'] and not alvos['aprimorar']
+    assert alvos['ods'] == {'ods3'}
+    assert alvos['municipios'] == {'aracaju': {'ods5'}, 'lagarto': None}
+    assert descrever_alvos(alvos) == 'ods3, aracaju/ods5, lagarto/*'
+
+
+def test_entradas_do_ods12_e_configuracao(tmp_path):
+    config = ConfigRelatorios(str(tmp_path))
+    alvos = alvos_afetados(_caminhos(config, 'residuos_reciclados.json'), config)
+    assert alvos['ods12'] and alvos['aprimorar'] and not alvos['ods']
+
+    alvos = alvos_afetados(_caminhos(config, 'indicadores/ods12_consumo_producao.json'), config)
+    assert alvos['ods'] == {'ods12'} and alvos['ods12']
+
+    assert alvos_afetados([config.ods_config_file], config)['todos']
+
+
+def test_demais_arquivos_pelo_manifesto(tmp_path):
+    config = ConfigRelatorios(str(tmp_path))
+    extra, = _caminhos(config, 'fontes/ibge.json')
+    manifesto = ManifestoBuild(config.manifesto_file)
+    manifesto.registrar('relatorio:municipios/aracaju/ods7', [extra])
+    manifesto.registrar('relatorio:ods9_industria_inovacao', [extra])
+    manifesto.registrar('anexo:municipios', [extra])
+    alvos = alvos_afetados([extra], config, manifesto)
+    assert alvos['ods'] == {'ods9'}
+    assert alvos['municipios'] == {'aracaju': {'ods7'}}
+    assert alvos_afetados([extra], config)['ods'] == set()
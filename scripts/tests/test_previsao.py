@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.previsao"""
+
+import numpy as np
+
+from relatorios.previsao import prever_series, previsao_da_serie
+
+ANOS = np.arange(2015, 2025)
+RUIDO = np.array([0.3, -0.2, 0.1, -0.4, 0.2, 0.0, -0.1, 0.3, -0.2, 0.1])
+
+
+def test_escolhe_o_modelo_pelo_erro_no_holdout():
+    t = ANOS - ANOS[0]
+    matriz = np.vstack([10 * 1.3 ** t, -5 + 0.8 * t + RUIDO])
+    resultado = prever_series(ANOS, matriz, 2030)
+    assert resultado['modelo'].tolist()[0] == 'log_linear'
+    assert resultado['modelo'][1] != 'log_linear'  # série com valores negativos
+    previsao = previsao_da_serie(resultado, 0)
+    assert previsao['anos'] == list(range(2025, 2031))
+    assert np.isclose(previsao['valores'][-1], 10 * 1.3 ** 15)
+
+
+def test_intervalo_contem_a_previsao_e_se_alarga_com_o_horizonte():
+    matriz = (2 + 0.5 * (ANOS - ANOS[0]) + RUIDO)[np.newaxis]
+    previsao = previsao_da_serie(prever_series(ANOS, matriz, 2030), 0)
+    inferior, valores, superior = (np.array(previsao[c]) for c in ('inferior', 'valores', 'superior'))
+    assert previsao['nivel'] == 0.95
+    assert np.all(inferior < valores) and np.all(valores < superior)
+    assert np.all(np.diff(superior - inferior) > 0)
+
+
+def test_series_curtas_usam_o_modelo_linear():
+    matriz = np.array([[1.0, 2.0, 2.5] + [np.nan] * 7,
+                       [np.nan] * 8 + [3.0, 4.0]])
+    resultado = prever_series(ANOS, matriz, 2030)
+    assert resultado['modelo'].tolist() == ['linear', 'linear']
+    curta = previsao_da_serie(resultado, 1)
+    assert curta['anos'][0] == 2025
+    assert curta['inferior'] is None  # dois pontos não estimam a variância
+    assert previsao_da_serie(resultado, 0)['anos'][0] == 2018
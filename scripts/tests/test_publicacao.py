@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.publicacao e do modo reprodutível"""
+
+import time
+
+from relatorios.api import gerar_relatorios
+from relatorios.config import ConfigRelatorios
+from relatorios.publicacao import data_relatorio, publicar, relatorios_publicaveis
+
+
+def _conteudos(config):
+    conteudos = {}
+    for arquivo in relatorios_publicaveis(config):
+        with open(arquivo, 'rb') as file:
+            conteudos[arquivo] = file.read()
+    return conteudos
+
+
+def test_data_relatorio_reprodutivel():
+    assert data_relatorio(True, '2024-03-01', '12/04/2025', None, 'sem data') == '12/04/2025'
+    assert data_relatorio(True) == 'não informada'
+
+
+def test_pdfs_reprodutiveis_sao_identicos_e_publicados_uma_vez(tmp_path, dados_dir):
+    config = ConfigRelatorios(str(tmp_path))
+    config.reprodutivel = True
+    gerar_relatorios(config, max_workers=1)
+    primeiros = _conteudos(config)
+    assert len(primeiros) == 2
+    publicado = publicar(config)
+    assert publicado['objetos_gravados'] == 2
+
+    time.sleep(1.1)  # a data de criação de um PDF comum mudaria
+    gerar_relatorios(config, max_workers=1, forcar=True)
+    assert _conteudos(config) == primeiros
+    publicado = publicar(config)
+    assert publicado['alterados'] == [] and publicado['inalterados'] == 2
+    assert publicado['objetos_gravados'] == 0
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.secoes: junção incremental das seções"""
+
+import os
+
+from pypdf import PdfReader
+from reportlab.platypus import PageBreak, Paragraph
+from reportlab.lib.styles import getSampleStyleSheet
+
+from relatorios.secoes import construir_em_secoes
+
+ESTILO = getSampleStyleSheet()['Normal']
+
+
+def _secao(nome, paginas):
+    def fabrica():
+        for i in range(paginas):
+            if i:
+                yield PageBreak()
+            yield Paragraph(f"{nome}, página {i + 1}", ESTILO)
+    return nome, fabrica
+
+
+def _falha():
+    raise ValueError("sem dados")
+
+
+def test_pdf_unico_com_paginas_e_marcadores(tmp_path):
+    destino = str(tmp_path / 'consolidado.pdf')
+    secoes = [_secao('ODS 1', 2), ('ODS 2', _falha), _secao('ODS 3', 1), _secao('ODS 4', 3)]
+    resumo = construir_em_secoes(destino, secoes, ignorar_erros=True, reprodutivel=True)
+
+    assert resumo['volumes'] == [destino] and resumo['paginas'] == 6 and resumo['secoes'] == 3
+    assert [erro['secao'] for erro in resumo['erros']] == ['ODS 2']
+    assert sorted(os.listdir(tmp_path)) == ['consolidado.pdf']
+
+    leitor = PdfReader(destino, strict=True)
+    assert [pagina.extract_text().strip() for pagina in leitor.pages] == [
+        'ODS 1, página 1', 'ODS 1, página 2', 'ODS 3, página 1',
+        'ODS 4, página 1', 'ODS 4, página 2', 'ODS 4, página 3']
+    assert [(item.title, leitor.get_destination_page_number(item)) for item in leitor.outline] == [
+        ('ODS 1', 0), ('ODS 3', 2), ('ODS 4', 3)]
+    # A fonte que cada seção declara de novo é gravada uma vez só
+    fontes = {pagina['/Resources']['/Font']['/F1'].indirect_reference.idnum for pagina in leitor.pages}
+    assert len(fontes) == 1
+
+
+def test_volumes_e_juncao_reprodutivel(tmp_path):
+    secoes = [_secao(f'ODS {i}', 2) for i in range(1, 6)]
+    destino = str(tmp_path / 'a' / 'consolidado.pdf')
+    resumo = construir_em_secoes(destino, secoes, paginas_por_volume=4, reprodutivel=True)
+    assert [os.path.basename(volume) for volume in resumo['volumes']] == [
+        'consolidado_vol01.pdf', 'consolidado_vol02.pdf', 'consolidado_vol03.pdf']
+    assert [len(PdfReader(volume).pages) for volume in resumo['volumes']] == [4, 4, 2]
+
+    outro = str(tmp_path / 'b' / 'consolidado.pdf')
+    construir_em_secoes(outro, secoes, paginas_por_volume=4, reprodutivel=True)
+    for volume in resumo['volumes']:
+        with open(volume, 'rb') as a, open(volume.replace(os.sep + 'a' + os.sep, os.sep + 'b' + os.sep), 'rb') as b:
+            assert a.read() == b.read()
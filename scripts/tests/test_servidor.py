@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Testes de relatorios.servidor"""
+
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from relatorios import servidor
+from relatorios.config import ConfigRelatorios
+from relatorios.servidor import CacheArtefatos, ServicoRelatorios, ServidorRelatorios, _etag_corresponde
+
+
+def test_cache_mantem_na_memoria_os_usados_mais_recentemente(tmp_path):
+    cache = CacheArtefatos(str(tmp_path), max_bytes_memoria=10)
+    cache.guardar('a', {'relatorio.pdf': b'aaaaaa'})
+    cache.guardar('b', {'relatorio.pdf': b'bbbbbb'})
+    assert cache.obter('b', 'relatorio.pdf') == (b'bbbbbb', 'memoria')
+    assert cache.obter('a', 'relatorio.pdf') == (b'aaaaaa', 'disco')
+    assert cache.obter('c', 'relatorio.pdf') == (None, None)
+
+
+def test_cache_remove_do_disco_os_de_uso_mais_antigo(tmp_path):
+    cache = CacheArtefatos(str(tmp_path), max_bytes_disco=10)
+    cache.guardar('a', {'relatorio.pdf': b'aaaaaa'})
+    antigo = time.time() - 60
+    os.utime(tmp_path / 'a-relatorio.pdf', (antigo, antigo))
+    cache.guardar('b', {'relatorio.pdf': b'bbbbbb'})
+    assert sorted(os.listdir(tmp_path)) == ['b-relatorio.pdf']
+    assert cache.resumo()['bytes_disco'] == 6
+
+
+def test_cache_substituir_nao_conta_o_arquivo_antigo(tmp_path):
+    cache = CacheArtefatos(str(tmp_path))
+    cache.guardar('a', {'relatorio.pdf': b'aaaaaa'})
+    cache.guardar('a', {'relatorio.pdf': b'aaaa'})
+    assert cache.resumo()['bytes_disco'] == 4
+
+
+@pytest.mark.parametrize('cabecalho, corresponde', [
+    ('"x-relatorio.pdf"', True),
+    ('W/"x-relatorio.pdf"', True),
+    ('"y-relatorio.pdf", "x-relatorio.pdf"', True),
+    ('*', True),
+    ('"y-relatorio.pdf"', False),
+    (None, False),
+])
+def test_etag_corresponde(cabecalho, corresponde):
+    assert _etag_corresponde(cabecalho, '"x-relatorio.pdf"') is corresponde
+
+
+class _ServicoFixo:
+    """Serviço com um único artefato, que conta as vezes em que foi obtido"""
+
+    def __init__(self):
+        self.obtidos = 0
+
+    def etag(self, municipio, slug, tipo, nome):
+        return '"x-relatorio.pdf"'
+
+    def obter(self, municipio, slug, tipo, nome):
+        self.obtidos += 1
+        return b'%PDF', '"x-relatorio.pdf"', 'memoria'
+
+
+def test_if_none_match_recebe_304_sem_obter_o_artefato():
+    servico = _ServicoFixo()
+    http = ServidorRelatorios(('127.0.0.1', 0), servico, silencioso=True)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{http.server_address[1]}/relatorios/ods1_pobreza.pdf'
+    try:
+        with urllib.request.urlopen(url) as resposta:
+            assert resposta.read() == b'%PDF'
+            etag = resposta.headers['ETag']
+        with pytest.raises(urllib.error.HTTPError) as erro:
+            urllib.request.urlopen(urllib.request.Request(url, headers={'If-None-Match': etag}))
+        assert erro.value.code == 304
+        assert servico.obtidos == 1
+    finally:
+        http.shutdown()
+        http.server_close()
+
+
+def test_geracoes_simultaneas_sao_compartilhadas_e_guardadas_antes_da_resposta(tmp_path, monkeypatch):
+    chamadas = []
+
+    def renderizar(arquivo, tipo, local, config_ods, backend_graficos):
+        chamadas.append(arquivo)
+        time.sleep(0.2)
+        return {'relatorio.pdf': b'%PDF'}
+
+    monkeypatch.setattr(servidor, 'renderizar_artefatos', renderizar)
+    servico = ServicoRelatorios(ConfigRelatorios(str(tmp_path)), cache=CacheArtefatos(str(tmp_path / 'cache')))
+    servico._executor.shutdown()
+    servico._executor = ThreadPoolExecutor(max_workers=2)
+    vistos = []
+
+    def requisitar():
+        servico._gerar('k', 'ods1_pobreza.json', 'relatorio', 'Sergipe')
+        vistos.append((servico.cache.obter('k', 'relatorio.pdf')[0], servico.geracoes))
+
+    threads = [threading.Thread(target=requisitar) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    servico.fechar()
+    assert len(chamadas) == 1
+    assert vistos == [(b'%PDF', 1)] * 3